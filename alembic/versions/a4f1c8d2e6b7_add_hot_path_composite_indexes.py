@@ -0,0 +1,49 @@
+"""Add composite indexes for hot report, strike, announcement and POI queries
+
+Revision ID: a4f1c8d2e6b7
+Revises: 7d2c41e9a0b3
+Create Date: 2026-10-19 11:03:27.518406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f1c8d2e6b7'
+down_revision: Union[str, None] = '7d2c41e9a0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reports_user_id_created_at', 'reports', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_reports_status_created_at', 'reports', ['status', 'created_at'], unique=False)
+    op.create_index('ix_reports_category_created_at', 'reports', ['category', 'created_at'], unique=False)
+    op.create_index('ix_reports_priority_created_at', 'reports', ['priority', 'created_at'], unique=False)
+    op.create_index('ix_reports_created_at', 'reports', ['created_at'], unique=False)
+    op.create_index('ix_reports_assigned_to_status', 'reports', ['assigned_to', 'status'], unique=False)
+    op.create_index('ix_strikes_user_id_created_at', 'strikes', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_announcements_active_priority_created_at', 'announcements', ['active', 'priority', 'created_at'], unique=False)
+
+    # points_of_interest is created outside Alembic (create_all); index it if present
+    if sa.inspect(op.get_bind()).has_table('points_of_interest'):
+        op.create_index('ix_points_of_interest_public_created_at', 'points_of_interest', ['status', 'is_public', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('points_of_interest'):
+        op.drop_index('ix_points_of_interest_public_created_at', table_name='points_of_interest')
+
+    op.drop_index('ix_announcements_active_priority_created_at', table_name='announcements')
+    op.drop_index('ix_strikes_user_id_created_at', table_name='strikes')
+    op.drop_index('ix_reports_assigned_to_status', table_name='reports')
+    op.drop_index('ix_reports_created_at', table_name='reports')
+    op.drop_index('ix_reports_priority_created_at', table_name='reports')
+    op.drop_index('ix_reports_category_created_at', table_name='reports')
+    op.drop_index('ix_reports_status_created_at', table_name='reports')
+    op.drop_index('ix_reports_user_id_created_at', table_name='reports')
@@ -0,0 +1,130 @@
+"""Add full-text search over reports and POIs
+
+PostgreSQL: generated tsvector columns (Spanish stemming, accent folding)
+with GIN indexes. SQLite: FTS5 tables kept in sync by triggers.
+backend/services/search.py queries these objects.
+
+Revision ID: b7e3d9f1c2a5
+Revises: a4f1c8d2e6b7
+Create Date: 2026-10-19 12:10:41.204318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d9f1c2a5'
+down_revision: Union[str, None] = 'a4f1c8d2e6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POSTGRES_CONFIG = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+]
+
+POSTGRES_TABLES = {
+    'reports': [
+        "ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('es_unaccent', coalesce(description, '')), 'A') || "
+        "setweight(to_tsvector('es_unaccent', coalesce(ai_keywords, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_reports_search_vector ON reports USING GIN (search_vector)",
+    ],
+    'points_of_interest': [
+        "ALTER TABLE points_of_interest ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('es_unaccent', coalesce(nombre, '')), 'A') || "
+        "setweight(to_tsvector('es_unaccent', coalesce(descripcion, '')), 'B') || "
+        "setweight(to_tsvector('es_unaccent', coalesce(direccion, '')), 'C') || "
+        "setweight(to_tsvector('es_unaccent', coalesce(colonia, '')), 'C')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_points_of_interest_search_vector ON points_of_interest USING GIN (search_vector)",
+    ],
+}
+
+SQLITE_TABLES = {
+    'reports': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(description, ai_keywords, "
+        "content='reports', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS reports_fts_ai AFTER INSERT ON reports BEGIN "
+        "INSERT INTO reports_fts(rowid, description, ai_keywords) "
+        "VALUES (new.id, new.description, new.ai_keywords); END",
+        "CREATE TRIGGER IF NOT EXISTS reports_fts_ad AFTER DELETE ON reports BEGIN "
+        "INSERT INTO reports_fts(reports_fts, rowid, description, ai_keywords) "
+        "VALUES ('delete', old.id, old.description, old.ai_keywords); END",
+        "CREATE TRIGGER IF NOT EXISTS reports_fts_au AFTER UPDATE OF description, ai_keywords ON reports BEGIN "
+        "INSERT INTO reports_fts(reports_fts, rowid, description, ai_keywords) "
+        "VALUES ('delete', old.id, old.description, old.ai_keywords); "
+        "INSERT INTO reports_fts(rowid, description, ai_keywords) "
+        "VALUES (new.id, new.description, new.ai_keywords); END",
+        "INSERT INTO reports_fts(reports_fts) VALUES ('rebuild')",
+    ],
+    'points_of_interest': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS points_of_interest_fts USING fts5(nombre, descripcion, direccion, colonia, "
+        "content='points_of_interest', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS points_of_interest_fts_ai AFTER INSERT ON points_of_interest BEGIN "
+        "INSERT INTO points_of_interest_fts(rowid, nombre, descripcion, direccion, colonia) "
+        "VALUES (new.id, new.nombre, new.descripcion, new.direccion, new.colonia); END",
+        "CREATE TRIGGER IF NOT EXISTS points_of_interest_fts_ad AFTER DELETE ON points_of_interest BEGIN "
+        "INSERT INTO points_of_interest_fts(points_of_interest_fts, rowid, nombre, descripcion, direccion, colonia) "
+        "VALUES ('delete', old.id, old.nombre, old.descripcion, old.direccion, old.colonia); END",
+        "CREATE TRIGGER IF NOT EXISTS points_of_interest_fts_au "
+        "AFTER UPDATE OF nombre, descripcion, direccion, colonia ON points_of_interest BEGIN "
+        "INSERT INTO points_of_interest_fts(points_of_interest_fts, rowid, nombre, descripcion, direccion, colonia) "
+        "VALUES ('delete', old.id, old.nombre, old.descripcion, old.direccion, old.colonia); "
+        "INSERT INTO points_of_interest_fts(rowid, nombre, descripcion, direccion, colonia) "
+        "VALUES (new.id, new.nombre, new.descripcion, new.direccion, new.colonia); END",
+        "INSERT INTO points_of_interest_fts(points_of_interest_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRES_CONFIG:
+            op.execute(statement)
+        tables = POSTGRES_TABLES
+    elif dialect == 'sqlite':
+        tables = SQLITE_TABLES
+    else:
+        return  # Search falls back to ILIKE
+
+    # points_of_interest is created outside Alembic (create_all); it is
+    # indexed only if present. Run install_search_schema() after creating it.
+    inspector = sa.inspect(bind)
+    for table, statements in tables.items():
+        if inspector.has_table(table):
+            for statement in statements:
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    inspector = sa.inspect(bind)
+    for table in ('reports', 'points_of_interest'):
+        if dialect == 'postgresql' and inspector.has_table(table):
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        elif dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+    if dialect == 'postgresql':
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent")
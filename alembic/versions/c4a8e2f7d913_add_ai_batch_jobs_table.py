@@ -0,0 +1,51 @@
+"""Add ai_batch_jobs table for OpenAI Batch API validations
+
+Revision ID: c4a8e2f7d913
+Revises: b7e3d9f1c2a5
+Create Date: 2026-10-19 15:02:17.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f7d913'
+down_revision: Union[str, None] = 'b7e3d9f1c2a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ai_batch_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('openai_batch_id', sa.String(length=100), nullable=False),
+    sa.Column('input_file_id', sa.String(length=100), nullable=False),
+    sa.Column('output_file_id', sa.String(length=100), nullable=True),
+    sa.Column('error_file_id', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('item_ids', sa.JSON(), nullable=False),
+    sa.Column('request_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('applied_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('openai_batch_id')
+    )
+    op.create_index(op.f('ix_ai_batch_jobs_id'), 'ai_batch_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_batch_jobs_kind'), 'ai_batch_jobs', ['kind'], unique=False)
+    op.create_index(op.f('ix_ai_batch_jobs_status'), 'ai_batch_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ai_batch_jobs_status'), table_name='ai_batch_jobs')
+    op.drop_index(op.f('ix_ai_batch_jobs_kind'), table_name='ai_batch_jobs')
+    op.drop_index(op.f('ix_ai_batch_jobs_id'), table_name='ai_batch_jobs')
+    op.drop_table('ai_batch_jobs')
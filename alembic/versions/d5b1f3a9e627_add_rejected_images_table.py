@@ -0,0 +1,44 @@
+"""Add rejected_images table for perceptual-hash photo screening
+
+Revision ID: d5b1f3a9e627
+Revises: c4a8e2f7d913
+Create Date: 2026-10-19 17:41:06.902315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b1f3a9e627'
+down_revision: Union[str, None] = 'c4a8e2f7d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rejected_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('dhash', sa.String(length=16), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('analysis', sa.JSON(), nullable=False),
+    sa.Column('hits', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rejected_images_id'), 'rejected_images', ['id'], unique=False)
+    op.create_index(op.f('ix_rejected_images_sha256'), 'rejected_images', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rejected_images_sha256'), table_name='rejected_images')
+    op.drop_index(op.f('ix_rejected_images_id'), table_name='rejected_images')
+    op.drop_table('rejected_images')
@@ -0,0 +1,13 @@
+"""
+Benchmark suite for UCU Reporta.
+
+- fake_openai: local stand-in for the OpenAI chat completions API with
+  configurable latency, so AI-backed endpoints can be load-tested offline
+- run: boots the API against a seeded database and the fake OpenAI server,
+  drives the hot endpoints and writes a JSON report for regression tracking
+- prefilter: precision/recall of the local text pre-filter on a labelled
+  corpus (prefilter_corpus.jsonl) and the share of OpenAI calls it saves
+
+Usage:
+    python -m backend.benchmarks.run --requests 200 --concurrency 20
+"""
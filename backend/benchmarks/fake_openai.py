@@ -0,0 +1,239 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions with a canned "everything is valid"
+JSON verdict after a configurable delay. The verdict carries the fields
+read by both AIValidator and POIValidator, so every AI-backed endpoint
+takes its happy path. Point the app at it with OPENAI_BASE_URL, which the
+OpenAI client reads natively.
+
+It also implements the parts of the Files and Batch APIs used by
+services/ai_batch.py: uploaded JSONL batches are answered with the same
+verdict after FAKE_OPENAI_BATCH_DELAY_S and exposed as an output file.
+
+Latency (milliseconds) comes from the environment:
+    FAKE_OPENAI_LATENCY_MS   base delay per completion (default 300)
+    FAKE_OPENAI_JITTER_MS    uniform random extra delay (default 0)
+    FAKE_OPENAI_BATCH_DELAY_S  seconds until a batch completes (default 1)
+
+Usage:
+    FAKE_OPENAI_LATENCY_MS=500 uvicorn backend.benchmarks.fake_openai:app --port 8100
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse
+
+
+LATENCY_MS = float(os.getenv("FAKE_OPENAI_LATENCY_MS", "300"))
+JITTER_MS = float(os.getenv("FAKE_OPENAI_JITTER_MS", "0"))
+# Share of answers returned with low confidence (exercises tier escalation)
+LOW_CONFIDENCE_RATE = float(os.getenv("FAKE_OPENAI_LOW_CONFIDENCE_RATE", "0"))
+BATCH_DELAY_S = float(os.getenv("FAKE_OPENAI_BATCH_DELAY_S", "1"))
+
+# Union of the keys read by check_offensive_text, analyze_report, the image
+# analyses and the POI validators
+VERDICT = {
+    # Text moderation
+    "is_offensive": False,
+    "is_inappropriate": False,
+    "is_spam": False,
+    "is_test": False,
+    "is_nonsense": False,
+    "is_too_vague": False,
+    "severity": "low",
+    "detected_words": [],
+    # Report analysis
+    "is_valid": True,
+    "confidence": 0.9,
+    "suggested_category": "via_mal_estado",
+    "suggested_priority": 3,
+    "reasoning": "Reporte consistente con la categoría",
+    "keywords": ["bache", "calle"],
+    "urgency_level": "medium",
+    "estimated_impact": "Impacto moderado en la comunidad",
+    "recommendations": ["Programar reparación"],
+    # Image analysis
+    "image_valid": True,
+    "matches_category": True,
+    "is_joke_or_fake": False,
+    "requires_strike": False,
+    "strike_severity": None,
+    "severity_score": 6,
+    "observed_details": "Bache de tamaño mediano en el pavimento",
+    "quantity_assessment": "moderado",
+    "rejection_reason": None,
+    "professional_feedback": "",
+    # POI validation
+    "approved": True,
+    "categoria": "restaurante",
+    "subcategoria": None,
+    "confidence_categoria": 0.9,
+    "issues": [],
+    "warnings": [],
+    "suggestions": {},
+    "spam_level": "none",
+    "spam_acceptable": True,
+    "is_business_photo": True,
+    "quality": "buena",
+}
+
+app = FastAPI(title="Fake OpenAI", docs_url=None, redoc_url=None)
+stats = {"completions": 0, "by_model": {}, "batches": 0}
+files = {}
+batches = {}
+
+
+def _estimate_tokens(messages) -> int:
+    """Roughly 4 characters per token; images count as a flat 85 tokens."""
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += len(content) // 4
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += len(part.get("text", "")) // 4
+                else:
+                    tokens += 85
+    return max(tokens, 1)
+
+
+def _completion(body) -> dict:
+    """Chat completion object for a request body (counted in stats)."""
+    verdict = VERDICT
+    if LOW_CONFIDENCE_RATE and random.random() < LOW_CONFIDENCE_RATE:
+        verdict = {**VERDICT, "confidence": 0.5, "confidence_categoria": 0.5}
+    content = json.dumps(verdict, ensure_ascii=False)
+    prompt_tokens = _estimate_tokens(body.get("messages", []))
+    completion_tokens = len(content) // 4
+    stats["completions"] += 1
+    model = body.get("model", "gpt-4o-mini")
+    stats["by_model"][model] = stats["by_model"].get(model, 0) + 1
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    delay = LATENCY_MS + random.uniform(0, JITTER_MS)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    return _completion(body)
+
+
+def _file_object(file_id: str) -> dict:
+    stored = files[file_id]
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(stored["content"]),
+        "created_at": stored["created_at"],
+        "filename": stored["filename"],
+        "purpose": stored["purpose"],
+    }
+
+
+def _store_file(filename: str, purpose: str, content: bytes) -> str:
+    file_id = f"file-{uuid.uuid4().hex[:24]}"
+    files[file_id] = {"filename": filename, "purpose": purpose, "content": content, "created_at": int(time.time())}
+    return file_id
+
+
+@app.post("/v1/files")
+async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+    file_id = _store_file(file.filename or "upload.jsonl", purpose, await file.read())
+    return _file_object(file_id)
+
+
+@app.get("/v1/files/{file_id}/content")
+async def file_content(file_id: str):
+    if file_id not in files:
+        raise HTTPException(status_code=404, detail="No such file")
+    return PlainTextResponse(files[file_id]["content"].decode())
+
+
+async def _run_batch(batch_id: str) -> None:
+    batch = batches[batch_id]
+    batch["status"] = "in_progress"
+    await asyncio.sleep(BATCH_DELAY_S)
+    lines = []
+    for raw in files[batch["input_file_id"]]["content"].decode().splitlines():
+        if not raw.strip():
+            continue
+        request = json.loads(raw)
+        completion = _completion(request["body"])
+        lines.append(json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": completion},
+            "error": None,
+        }, ensure_ascii=False))
+    batch["output_file_id"] = _store_file(f"{batch_id}_output.jsonl", "batch_output", "\n".join(lines).encode())
+    batch["request_counts"] = {"total": len(lines), "completed": len(lines), "failed": 0}
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+    stats["batches"] += 1
+
+
+@app.post("/v1/batches")
+async def create_batch(request: Request):
+    body = await request.json()
+    if body.get("input_file_id") not in files:
+        raise HTTPException(status_code=400, detail="No such input file")
+    batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+    batches[batch_id] = {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": body.get("endpoint"),
+        "input_file_id": body["input_file_id"],
+        "completion_window": body.get("completion_window", "24h"),
+        "status": "validating",
+        "output_file_id": None,
+        "error_file_id": None,
+        "errors": None,
+        "created_at": int(time.time()),
+        "completed_at": None,
+        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        "metadata": body.get("metadata"),
+    }
+    asyncio.create_task(_run_batch(batch_id))
+    return batches[batch_id]
+
+
+@app.get("/v1/batches/{batch_id}")
+async def retrieve_batch(batch_id: str):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="No such batch")
+    return batches[batch_id]
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy"}
@@ -0,0 +1,277 @@
+"""
+Local stand-in for an S3-compatible object store.
+
+Implements the subset of the S3 REST API used by services/storage.py
+(path-style addressing only): PUT/GET/HEAD/DELETE of objects, multipart
+uploads, and SHA-256 checksums (x-amz-checksum-sha256, sent as a header or
+as an aws-chunked trailer). Objects live in memory and buckets spring into
+existence on first use.
+
+Presigned requests (X-Amz-Signature in the query string) are verified with
+SigV4 against FAKE_S3_ACCESS_KEY_ID / FAKE_S3_SECRET_ACCESS_KEY, so a PUT
+whose length or checksum differs from what was signed is rejected, as S3
+does. Header-signed requests from the SDK are trusted without checking.
+
+Usage:
+    uvicorn backend.benchmarks.fake_s3:app --port 9100
+
+    STORAGE_BACKEND=s3 S3_BUCKET=media S3_ENDPOINT_URL=http://127.0.0.1:9100 \\
+    S3_ACCESS_KEY_ID=fake S3_SECRET_ACCESS_KEY=fake uvicorn backend.main:app
+"""
+import base64
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import quote
+from xml.etree import ElementTree
+from fastapi import FastAPI, Request, Response
+
+
+ACCESS_KEY_ID = os.getenv("FAKE_S3_ACCESS_KEY_ID", "fake")
+SECRET_ACCESS_KEY = os.getenv("FAKE_S3_SECRET_ACCESS_KEY", "fake")
+
+app = FastAPI(title="Fake S3", docs_url=None, redoc_url=None)
+stats = {"puts": 0, "gets": 0, "heads": 0, "deletes": 0, "rejected": 0}
+buckets: Dict[str, Dict[str, dict]] = {}
+uploads: Dict[str, dict] = {}
+
+
+def _error(status_code: int, code: str, message: str) -> Response:
+    if code in ("SignatureDoesNotMatch", "BadDigest", "AccessDenied"):
+        stats["rejected"] += 1
+    body = f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><Error><Code>{code}</Code><Message>{message}</Message></Error>"
+    return Response(body, status_code=status_code, media_type="application/xml")
+
+
+def _xml(body: str) -> Response:
+    return Response(f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>{body}", media_type="application/xml")
+
+
+def _sha256_b64(data: bytes) -> str:
+    return base64.b64encode(hashlib.sha256(data).digest()).decode("ascii")
+
+
+def _signing_key(date_stamp: str, region: str) -> bytes:
+    key = ("AWS4" + SECRET_ACCESS_KEY).encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+
+def _check_presigned(request: Request) -> Optional[Response]:
+    """Verify a SigV4 query-string signature; None when it is valid."""
+    params = request.query_params
+    credential = params.get("X-Amz-Credential", "").split("/")
+    if len(credential) != 5 or credential[0] != ACCESS_KEY_ID:
+        return _error(403, "InvalidAccessKeyId", "Unknown access key")
+    _, date_stamp, region, _, _ = credential
+    amz_date = params.get("X-Amz-Date", "")
+    try:
+        signed_at = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ")
+    except ValueError:
+        return _error(403, "AccessDenied", "Invalid X-Amz-Date")
+    expires = int(params.get("X-Amz-Expires", "0"))
+    if (datetime.utcnow() - signed_at).total_seconds() > expires:
+        return _error(403, "AccessDenied", "Request has expired")
+
+    signed_headers = params.get("X-Amz-SignedHeaders", "").split(";")
+    canonical_headers = "".join(
+        f"{name}:{' '.join(request.headers.get(name, '').split())}\n" for name in signed_headers
+    )
+    canonical_query = "&".join(
+        f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}"
+        for key, value in sorted(request.query_params.multi_items())
+        if key != "X-Amz-Signature"
+    )
+    canonical_request = "\n".join([
+        request.method,
+        quote(request.url.path, safe="/-_.~"),
+        canonical_query,
+        canonical_headers,
+        ";".join(signed_headers),
+        "UNSIGNED-PAYLOAD",
+    ])
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        f"{date_stamp}/{region}/s3/aws4_request",
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    signature = hmac.new(_signing_key(date_stamp, region), string_to_sign.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature, params.get("X-Amz-Signature", "")):
+        return _error(403, "SignatureDoesNotMatch", "The request signature does not match")
+    return None
+
+
+def _decode_aws_chunked(body: bytes) -> (bytes, Dict[str, str]):
+    """Payload and trailing headers of an aws-chunked request body."""
+    data = bytearray()
+    trailers = {}
+    position = 0
+    while True:
+        line_end = body.index(b"\r\n", position)
+        size = int(body[position:line_end].split(b";")[0], 16)
+        position = line_end + 2
+        if size == 0:
+            break
+        data += body[position:position + size]
+        position += size + 2
+    for line in body[position:].decode().split("\r\n"):
+        if ":" in line:
+            name, value = line.split(":", 1)
+            trailers[name.strip().lower()] = value.strip()
+    return bytes(data), trailers
+
+
+async def _read_payload(request: Request):
+    """Request body plus the SHA-256 checksum the client claimed, if any."""
+    body = await request.body()
+    claimed = request.headers.get("x-amz-checksum-sha256")
+    if "aws-chunked" in request.headers.get("content-encoding", ""):
+        body, trailers = _decode_aws_chunked(body)
+        claimed = trailers.get("x-amz-checksum-sha256", claimed)
+        decoded_length = request.headers.get("x-amz-decoded-content-length")
+        if decoded_length is not None and int(decoded_length) != len(body):
+            return body, claimed, _error(400, "IncompleteBody", "Body length does not match")
+    if claimed is not None and claimed != _sha256_b64(body):
+        return body, claimed, _error(400, "BadDigest", "The SHA256 you specified did not match the calculated checksum")
+    return body, claimed, None
+
+
+def _object_headers(stored: dict, with_checksum: bool) -> Dict[str, str]:
+    headers = {
+        "Content-Type": stored["content_type"],
+        "Content-Length": str(len(stored["data"])),
+        "ETag": f'"{stored["etag"]}"',
+        "Last-Modified": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(stored["modified"])),
+    }
+    if stored.get("cache_control"):
+        headers["Cache-Control"] = stored["cache_control"]
+    if with_checksum and stored.get("checksum_sha256"):
+        headers["x-amz-checksum-sha256"] = stored["checksum_sha256"]
+    return headers
+
+
+@app.put("/{bucket}/{key:path}")
+async def put_object(bucket: str, key: str, request: Request):
+    if "X-Amz-Signature" in request.query_params:
+        rejected = _check_presigned(request)
+        if rejected:
+            return rejected
+    body, claimed, rejected = await _read_payload(request)
+    if rejected:
+        return rejected
+    etag = hashlib.md5(body).hexdigest()
+
+    upload_id = request.query_params.get("uploadId")
+    if upload_id:
+        upload = uploads.get(upload_id)
+        if not upload:
+            return _error(404, "NoSuchUpload", "The specified upload does not exist")
+        upload["parts"][int(request.query_params["partNumber"])] = {"data": body, "etag": etag, "checksum": claimed}
+        headers = {"ETag": f'"{etag}"'}
+        if claimed:
+            headers["x-amz-checksum-sha256"] = claimed
+        return Response(headers=headers)
+
+    buckets.setdefault(bucket, {})[key] = {
+        "data": body,
+        "etag": etag,
+        "content_type": request.headers.get("content-type", "application/octet-stream"),
+        "cache_control": request.headers.get("cache-control"),
+        "checksum_sha256": claimed,
+        "modified": time.time(),
+    }
+    stats["puts"] += 1
+    headers = {"ETag": f'"{etag}"'}
+    if claimed:
+        headers["x-amz-checksum-sha256"] = claimed
+    return Response(headers=headers)
+
+
+@app.post("/{bucket}/{key:path}")
+async def multipart_upload(bucket: str, key: str, request: Request):
+    if "uploads" in request.query_params:
+        upload_id = uuid.uuid4().hex
+        uploads[upload_id] = {
+            "bucket": bucket,
+            "key": key,
+            "content_type": request.headers.get("content-type", "application/octet-stream"),
+            "cache_control": request.headers.get("cache-control"),
+            "checksum": request.headers.get("x-amz-checksum-algorithm", "").upper() == "SHA256",
+            "parts": {},
+        }
+        return _xml(
+            f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key}</Key>"
+            f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+        )
+
+    upload = uploads.pop(request.query_params.get("uploadId", ""), None)
+    if not upload:
+        return _error(404, "NoSuchUpload", "The specified upload does not exist")
+    namespace = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+    root = ElementTree.fromstring(await request.body())
+    numbers = [int(part.findtext(f"{namespace}PartNumber") or part.findtext("PartNumber"))
+               for part in root.iter() if part.tag.endswith("Part")]
+    parts = [upload["parts"][number] for number in numbers]
+    data = b"".join(part["data"] for part in parts)
+    etag = hashlib.md5(b"".join(bytes.fromhex(part["etag"]) for part in parts)).hexdigest() + f"-{len(parts)}"
+    checksum = None
+    if upload["checksum"] and all(part["checksum"] for part in parts):
+        # Composite checksum: hash of the part checksums, suffixed with the part count
+        composite = hashlib.sha256(b"".join(base64.b64decode(part["checksum"]) for part in parts)).digest()
+        checksum = base64.b64encode(composite).decode("ascii") + f"-{len(parts)}"
+    buckets.setdefault(bucket, {})[key] = {
+        "data": data,
+        "etag": etag,
+        "content_type": upload["content_type"],
+        "cache_control": upload["cache_control"],
+        "checksum_sha256": checksum,
+        "modified": time.time(),
+    }
+    stats["puts"] += 1
+    return _xml(
+        f"<CompleteMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key}</Key>"
+        f"<ETag>\"{etag}\"</ETag></CompleteMultipartUploadResult>"
+    )
+
+
+@app.head("/{bucket}/{key:path}")
+async def head_object(bucket: str, key: str, request: Request):
+    stats["heads"] += 1
+    stored = buckets.get(bucket, {}).get(key)
+    if not stored:
+        return Response(status_code=404)
+    with_checksum = request.headers.get("x-amz-checksum-mode", "").upper() == "ENABLED"
+    return Response(headers=_object_headers(stored, with_checksum))
+
+
+@app.get("/{bucket}/{key:path}")
+async def get_object(bucket: str, key: str, request: Request):
+    if "X-Amz-Signature" in request.query_params:
+        rejected = _check_presigned(request)
+        if rejected:
+            return rejected
+    stored = buckets.get(bucket, {}).get(key)
+    if not stored:
+        return _error(404, "NoSuchKey", "The specified key does not exist.")
+    stats["gets"] += 1
+    headers = _object_headers(stored, with_checksum=False)
+    del headers["Content-Length"]
+    return Response(stored["data"], headers=headers)
+
+
+@app.delete("/{bucket}/{key:path}")
+async def delete_object(bucket: str, key: str):
+    buckets.get(bucket, {}).pop(key, None)
+    stats["deletes"] += 1
+    return Response(status_code=204)
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "objects": sum(len(objects) for objects in buckets.values())}
@@ -0,0 +1,143 @@
+"""
+Precisión y recall del pre-filtro local de texto (backend.services.text_prefilter).
+
+Clasifica un corpus etiquetado (JSONL con "text" y "label": clean,
+offensive, test, nonsense o vague) y reporta, por etiqueta:
+- decididos: textos resueltos localmente con esa etiqueta
+- precisión: de los decididos con esa etiqueta, cuántos eran correctos
+- recall: de los textos con esa etiqueta, cuántos se decidieron bien
+  (escalar al modelo cuenta como no recuperado, no como error)
+
+Además: llamadas a OpenAI ahorradas (textos decididos localmente),
+rechazos falsos de texto válido y tiempo por texto.
+
+El script termina con código 1 si la precisión global de las decisiones
+locales queda por debajo de --min-precision.
+
+Usage:
+    python -m backend.benchmarks.prefilter
+    python -m backend.benchmarks.prefilter --corpus mis_textos.jsonl --show-escalated
+    python -m backend.benchmarks.prefilter --output prefilter.json --min-precision 0.97
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add parent directory to path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.services.text_prefilter import TextPrefilter
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prefilter_corpus.jsonl")
+LABELS = ["clean", "offensive", "test", "nonsense", "vague"]
+
+
+def load_corpus(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(corpus, prefilter: TextPrefilter, repeat: int = 50):
+    rows = []
+    for item in corpus:
+        result = prefilter.classify(item["text"])
+        rows.append({**item, "decision": result["decision"] if result else None})
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in corpus:
+            prefilter.classify(item["text"])
+    micros = (time.perf_counter() - started) / (repeat * len(corpus)) * 1_000_000
+
+    per_label = {}
+    for label in LABELS:
+        total = sum(1 for row in rows if row["label"] == label)
+        decided = [row for row in rows if row["decision"] == label]
+        correct = sum(1 for row in decided if row["label"] == label)
+        per_label[label] = {
+            "total": total,
+            "decided": len(decided),
+            "correct": correct,
+            "precision": round(correct / len(decided), 4) if decided else None,
+            "recall": round(correct / total, 4) if total else None,
+        }
+
+    decided = [row for row in rows if row["decision"]]
+    correct = sum(1 for row in decided if row["decision"] == row["label"])
+    summary = {
+        "texts": len(rows),
+        "decided_locally": len(decided),
+        "calls_saved_pct": round(100 * len(decided) / len(rows), 1) if rows else 0,
+        "precision": round(correct / len(decided), 4) if decided else None,
+        "false_rejections": sum(1 for row in decided if row["label"] == "clean" and row["decision"] != "clean"),
+        "false_accepts": sum(1 for row in decided if row["label"] != "clean" and row["decision"] == "clean"),
+        "microseconds_per_text": round(micros, 1),
+        "labels": per_label,
+    }
+    return summary, rows
+
+
+def print_summary(summary, rows, show_escalated: bool) -> None:
+    print(f"{'etiqueta':<10} {'total':>6} {'decididos':>10} {'precisión':>10} {'recall':>8}")
+    for label, stats in summary["labels"].items():
+        precision = f"{stats['precision']:.1%}" if stats["precision"] is not None else "-"
+        recall = f"{stats['recall']:.1%}" if stats["recall"] is not None else "-"
+        print(f"{label:<10} {stats['total']:>6} {stats['decided']:>10} {precision:>10} {recall:>8}")
+
+    print()
+    print(f"📉 Llamadas a OpenAI ahorradas: {summary['decided_locally']}/{summary['texts']} "
+          f"({summary['calls_saved_pct']}%)")
+    precision = summary["precision"]
+    print(f"🎯 Precisión de decisiones locales: {precision:.1%}" if precision is not None
+          else "🎯 Precisión de decisiones locales: -")
+    print(f"🚫 Rechazos falsos de texto válido: {summary['false_rejections']}")
+    print(f"⚠️  Aceptaciones falsas: {summary['false_accepts']}")
+    print(f"⏱️  {summary['microseconds_per_text']} µs por texto")
+
+    errors = [row for row in rows if row["decision"] and row["decision"] != row["label"]]
+    if errors:
+        print()
+        print("❌ Decisiones incorrectas:")
+        for row in errors:
+            print(f"   [{row['label']} -> {row['decision']}] {row['text']}")
+    if show_escalated:
+        print()
+        print("↗️  Escalados al modelo:")
+        for row in rows:
+            if not row["decision"]:
+                print(f"   [{row['label']}] {row['text']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisión/recall del pre-filtro local de texto")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Corpus JSONL etiquetado")
+    parser.add_argument("--output", help="Guardar el resumen en un archivo JSON")
+    parser.add_argument("--min-precision", type=float, default=0.98,
+                        help="Precisión mínima de decisiones locales (default: 0.98)")
+    parser.add_argument("--show-escalated", action="store_true", help="Listar los textos escalados")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧪 PRE-FILTRO LOCAL DE TEXTO")
+    print("=" * 60)
+
+    corpus = load_corpus(args.corpus)
+    summary, rows = evaluate(corpus, TextPrefilter(accept_clean=True))
+    print_summary(summary, rows, args.show_escalated)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resumen guardado en {args.output}")
+
+    if summary["precision"] is not None and summary["precision"] < args.min_precision:
+        print(f"\n❌ Precisión por debajo de {args.min_precision:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Lista los prompts registrados y su prefijo estático en tokens.
+
+Para cada versión muestra si está activa (AI_PROMPT_VERSIONS o la más
+reciente), los tokens del prefijo compartido por todas las llamadas
+(mensaje de sistema + inicio estático del mensaje de usuario) y si alcanza
+el mínimo que OpenAI cachea automáticamente. Los tokens son exactos con
+tiktoken instalado; sin él, estimados por caracteres.
+
+Para comparar versiones en producción usa /metrics
+(ai_prompt_tokens_total, ai_prompt_duration_seconds).
+
+Usage:
+    python -m backend.check_prompts
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Registran sus prompts al importarse
+import backend.services.ai_validator  # noqa: F401
+import backend.services.poi_validator  # noqa: F401
+from backend.services.prompts import (
+    registered_prompts, get_prompt, count_tokens, tokenizer_available, PROMPT_CACHE_MIN_TOKENS
+)
+
+
+def main():
+    print("=" * 60)
+    print("📝 PROMPTS REGISTRADOS")
+    print("=" * 60)
+    print(f"Conteo: {'tiktoken' if tokenizer_available() else 'estimado por caracteres'}\n")
+
+    print(f"{'prompt':<18} {'versión':<8} {'activa':<7} {'sistema':>8} {'prefijo':>8}  caché")
+    for prompt in registered_prompts():
+        active = "✅" if get_prompt(prompt.name) is prompt else ""
+        cacheable = "sí" if prompt.prefix_tokens >= PROMPT_CACHE_MIN_TOKENS else "no"
+        print(f"{prompt.name:<18} {prompt.label:<8} {active:<7} {count_tokens(prompt.system or ''):>8,} "
+              f"{prompt.prefix_tokens:>8,}  {cacheable}")
+
+    print(f"\nℹ️  OpenAI cachea prefijos de {PROMPT_CACHE_MIN_TOKENS:,}+ tokens")
+
+
+if __name__ == "__main__":
+    main()
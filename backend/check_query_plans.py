@@ -0,0 +1,172 @@
+"""
+Query-plan regression check for hot query paths.
+
+Runs EXPLAIN on the queries issued by the busiest routes and fails if any
+of them reads a whole table or a whole index instead of searching one.
+Supports SQLite (EXPLAIN QUERY PLAN: every filtered query needs a SEARCH
+step, and only covering-index SCANs are accepted) and PostgreSQL (EXPLAIN
+with sequential scans disabled, so the check does not depend on table
+statistics; index scans of filtered queries need an Index Cond).
+
+backend/tests/test_query_plans.py runs the same check under pytest.
+
+Run it against a migrated database (alembic upgrade head):
+
+Usage:
+    python -m backend.check_query_plans
+    python -m backend.check_query_plans --database-url sqlite:///./ucu_reporta.db
+"""
+import sys
+import os
+import re
+import json
+import argparse
+from typing import Callable, List, NamedTuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, Query
+from backend.config import DATABASE_URL
+from backend.models.user import User
+from backend.routes.reports import reports_query, public_approved_reports_query
+from backend.routes.announcements import public_announcements_query
+from backend.routes.points_of_interest import public_pois_query
+from backend.services.moderation import ModerationService
+
+
+class HotQuery(NamedTuple):
+    name: str
+    table: str
+    build: Callable[[Session], Query]
+    # Has a WHERE clause on `table` that an index should search
+    filtered: bool = True
+
+
+# Only used for their role and id; never added to the session
+CITIZEN = User(id=1, role="citizen")
+ADMIN = User(id=1, role="admin")
+
+# Built with the same functions the routes call, so a change to a route's
+# query is checked as it ships
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("reports: mis reportes (GET /reports)", "reports",
+             lambda db: reports_query(db, CITIZEN)),
+    HotQuery("reports: filtro por status (admin)", "reports",
+             lambda db: reports_query(db, ADMIN, status_filter="pendiente")),
+    HotQuery("reports: filtro por categoría (admin)", "reports",
+             lambda db: reports_query(db, ADMIN, category="bache")),
+    HotQuery("reports: rango de prioridad (admin)", "reports",
+             lambda db: reports_query(db, ADMIN, min_priority=4)),
+    HotQuery("reports: públicos aprobados", "reports",
+             lambda db: public_approved_reports_query(db, 5)),
+    HotQuery("strikes: historial de usuario", "strikes",
+             lambda db: ModerationService(db).user_strikes_query(1)),
+    HotQuery("announcements: públicos", "announcements",
+             lambda db: public_announcements_query(db, 10)),
+    HotQuery("points_of_interest: mapa público", "points_of_interest",
+             lambda db: public_pois_query(db)),
+]
+
+
+def compile_sql(conn: Connection, query: Query) -> str:
+    return str(query.statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def sqlite_full_scans(conn: Connection, sql: str, table: str, filtered: bool = True) -> List[str]:
+    """
+    SCAN steps over `table` or one of its indexes (a covering index is only
+    accepted for unfiltered reads), and filtered queries without a SEARCH.
+    """
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    details = [row[-1] for row in rows]
+    scan = re.compile(rf"^SCAN (TABLE )?{table}\b")
+    search = re.compile(rf"^SEARCH (TABLE )?{table}\b")
+    problems = [d for d in details if scan.match(d) and (filtered or "COVERING INDEX" not in d)]
+    if filtered and not any(search.match(d) for d in details):
+        problems.append(f"sin SEARCH sobre {table}")
+    return problems
+
+
+def postgres_full_scans(conn: Connection, sql: str, table: str, filtered: bool = True) -> List[str]:
+    """
+    Seq Scan nodes on `table` (with sequential scans discouraged), and for
+    filtered queries index scans without an Index Cond (a full index walk).
+    """
+    # SET LOCAL only lasts until the end of the current transaction
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    conn.rollback()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+
+    scans = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        node_type = node.get("Node Type")
+        if node.get("Relation Name") == table:
+            if node_type == "Seq Scan":
+                scans.append(f"Seq Scan on {table}")
+            elif (filtered and node_type in ("Index Scan", "Index Only Scan")
+                    and "Index Cond" not in node):
+                scans.append(f"{node_type} using {node.get('Index Name')} sin Index Cond")
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def plan_problems(conn: Connection, db: Session, hot_query: HotQuery) -> List[str]:
+    """Why the plan of one hot query fails the check (empty if it passes)."""
+    if not inspect(conn).has_table(hot_query.table):
+        return [f"tabla {hot_query.table} no existe"]
+    sql = compile_sql(conn, hot_query.build(db))
+    if conn.dialect.name == "sqlite":
+        return sqlite_full_scans(conn, sql, hot_query.table, hot_query.filtered)
+    return postgres_full_scans(conn, sql, hot_query.table, hot_query.filtered)
+
+
+def check_query_plans(database_url: str) -> int:
+    """Run every hot query through EXPLAIN; returns the number of regressions."""
+    engine = create_engine(database_url)
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        print(f"❌ Dialecto no soportado: {dialect}")
+        return 1
+
+    failures = 0
+    with engine.connect() as conn:
+        db = Session(bind=conn)
+        for hot_query in HOT_QUERIES:
+            problems = plan_problems(conn, db, hot_query)
+            if problems:
+                failures += 1
+                print(f"❌ {hot_query.name}: {'; '.join(problems)}")
+            else:
+                print(f"✅ {hot_query.name}")
+        db.close()
+    engine.dispose()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica que las consultas críticas usen índices")
+    parser.add_argument("--database-url", default=DATABASE_URL,
+                        help="Base de datos a revisar (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔎 QUERY PLAN CHECK")
+    print("=" * 60)
+
+    failures = check_query_plans(args.database_url)
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} consulta(s) con full scan (tabla o índice) o tabla faltante")
+        sys.exit(1)
+    print("✅ Todas las consultas usan índices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Remove uploaded files that no report, POI or announcement references.
+
+Usage:
+    python -m backend.cleanup_media --dry-run
+    python -m backend.cleanup_media --min-age-hours 48
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.media_gc import run_media_gc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpieza de archivos subidos sin referencias")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar, no eliminar")
+    parser.add_argument("--min-age-hours", type=float, default=None,
+                        help="Edad mínima de los archivos a eliminar (default: MEDIA_GC_MIN_AGE_HOURS)")
+    parser.add_argument("--verbose", action="store_true", help="Listar cada archivo huérfano")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧹 MEDIA CLEANUP" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 60)
+
+    stats = run_media_gc(dry_run=args.dry_run, min_age_hours=args.min_age_hours)
+
+    if args.verbose:
+        for path in stats["orphaned"]:
+            print(f"   - {path}")
+
+    print(f"Blobs revisados:    {stats['blobs_scanned']}")
+    print(f"Archivos revisados: {stats['files_scanned']}")
+    print(f"Huérfanos:          {len(stats['orphaned'])}")
+    print(f"Eliminados:         {stats['deleted_files']} archivos, {stats['deleted_blobs']} blobs")
+    print(f"Espacio liberado:   {stats['bytes_freed'] / 1024 / 1024:.2f} MB")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
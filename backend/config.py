@@ -40,6 +40,121 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 AI_VALIDATION_ENABLED = os.getenv("AI_VALIDATION_ENABLED", "true").lower() == "true"
 
+# Media storage (local filesystem or S3-compatible object storage)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()  # local, s3
+MEDIA_LOCAL_ROOT = os.getenv("MEDIA_LOCAL_ROOT", "backend/static/uploads/media")
+MEDIA_URL_PREFIX = os.getenv("MEDIA_URL_PREFIX", "/static/uploads/media")
+# Partial uploads: outside backend/static so they are never served, and on the
+# same filesystem as MEDIA_LOCAL_ROOT so finished files are renamed into place
+MEDIA_TMP_DIR = os.getenv("MEDIA_TMP_DIR", "backend/media_tmp")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")  # e.g. http://localhost:9000 for MinIO
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID", "")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY", "")
+S3_PUBLIC_URL = os.getenv("S3_PUBLIC_URL", "")  # CDN/public bucket base URL
+S3_PRESIGN_EXPIRES_SECONDS = int(os.getenv("S3_PRESIGN_EXPIRES_SECONDS", "900"))
+
+# Media garbage collection (unreferenced uploads)
+MEDIA_GC_ENABLED = os.getenv("MEDIA_GC_ENABLED", "true").lower() == "true"
+MEDIA_GC_INTERVAL_MINUTES = int(os.getenv("MEDIA_GC_INTERVAL_MINUTES", "60"))
+MEDIA_GC_MIN_AGE_HOURS = float(os.getenv("MEDIA_GC_MIN_AGE_HOURS", "24"))
+
+# Response cache for public endpoints (landing page)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")  # Optional shared cache, e.g. redis://localhost:6379/0
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # uvicorn --workers; >1 needs Redis for cross-worker invalidation
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json, text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))  # Share of hot-path records kept
+
+# Metrics (Prometheus text format at /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Bearer token Prometheus must send to /metrics; without one the endpoint answers 404
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Per-request SQL audit / N+1 detection (off unless enabled: .env.example and backend/tests turn it on)
+QUERY_AUDIT_ENABLED = os.getenv("QUERY_AUDIT_ENABLED", "false").lower() == "true"
+QUERY_AUDIT_REPEAT_THRESHOLD = int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "5"))  # Same statement N times = N+1
+QUERY_AUDIT_MAX_QUERIES = int(os.getenv("QUERY_AUDIT_MAX_QUERIES", "30"))  # 0 disables the budget warning
+
+# Bulk import of official POIs (CSV/GeoJSON)
+POI_IMPORT_BATCH_SIZE = int(os.getenv("POI_IMPORT_BATCH_SIZE", "1000"))
+POI_IMPORT_MAX_ERRORS = int(os.getenv("POI_IMPORT_MAX_ERRORS", "100"))  # Row errors kept in the summary
+
+# Streaming report export (rows fetched per server-side cursor batch)
+REPORT_EXPORT_BATCH_SIZE = int(os.getenv("REPORT_EXPORT_BATCH_SIZE", "1000"))
+
+# In-memory POI autocomplete index (/points-of-interest/suggest)
+POI_SUGGEST_REFRESH_SECONDS = int(os.getenv("POI_SUGGEST_REFRESH_SECONDS", "300"))  # Full rebuild (picks up other workers' writes)
+POI_SUGGEST_MAX_SCAN = int(os.getenv("POI_SUGGEST_MAX_SCAN", "2000"))  # Index entries ranked per keystroke
+
+# Local pre-filter run before the OpenAI text moderation call
+TEXT_PREFILTER_ENABLED = os.getenv("TEXT_PREFILTER_ENABLED", "true").lower() == "true"
+TEXT_PREFILTER_ACCEPT_CLEAN = os.getenv("TEXT_PREFILTER_ACCEPT_CLEAN", "true").lower() == "true"  # Skip the model for obviously valid text
+
+# Local category/urgency classifier (train with backend/train_report_classifier.py)
+REPORT_CLASSIFIER_ENABLED = os.getenv("REPORT_CLASSIFIER_ENABLED", "true").lower() == "true"
+REPORT_CLASSIFIER_PATH = os.getenv("REPORT_CLASSIFIER_PATH", "backend/ml/report_classifier.json")
+REPORT_CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("REPORT_CLASSIFIER_MIN_CONFIDENCE", "0.9"))  # Below this, ask OpenAI
+
+# Tiered model routing: cheap model first, escalate low-confidence or borderline verdicts
+AI_ROUTING_ENABLED = os.getenv("AI_ROUTING_ENABLED", "true").lower() == "true"
+AI_FAST_MODEL = os.getenv("AI_FAST_MODEL", OPENAI_MODEL)
+AI_STRONG_MODEL = os.getenv("AI_STRONG_MODEL", "gpt-4o")
+AI_FAST_IMAGE_DETAIL = os.getenv("AI_FAST_IMAGE_DETAIL", "low")  # low = 512px thumbnail, fixed token cost
+AI_STRONG_IMAGE_DETAIL = os.getenv("AI_STRONG_IMAGE_DETAIL", "auto")
+AI_ESCALATION_CONFIDENCE = float(os.getenv("AI_ESCALATION_CONFIDENCE", "0.8"))  # Fast verdicts below this escalate
+
+# OpenAI resilience: deadlines, retries and circuit breaker
+AI_CALL_TIMEOUT_SECONDS = float(os.getenv("AI_CALL_TIMEOUT_SECONDS", "15"))
+AI_REQUEST_BUDGET_SECONDS = float(os.getenv("AI_REQUEST_BUDGET_SECONDS", "30"))  # Shared by all AI calls of a request
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+AI_RETRY_BUDGET_RATIO = float(os.getenv("AI_RETRY_BUDGET_RATIO", "0.2"))  # Max retries per recent call
+AI_BREAKER_ERROR_RATE = float(os.getenv("AI_BREAKER_ERROR_RATE", "0.5"))
+AI_BREAKER_MIN_CALLS = int(os.getenv("AI_BREAKER_MIN_CALLS", "10"))
+AI_BREAKER_WINDOW_SECONDS = float(os.getenv("AI_BREAKER_WINDOW_SECONDS", "60"))
+AI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("AI_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# OpenAI Batch API for non-interactive validations (POIs, report backlog)
+AI_BATCH_ENABLED = os.getenv("AI_BATCH_ENABLED", "false").lower() == "true"  # New POIs wait for the batch
+AI_BATCH_WORKER_ENABLED = os.getenv("AI_BATCH_WORKER_ENABLED", "false").lower() == "true"  # Enable in ONE process only
+AI_BATCH_INTERVAL_MINUTES = int(os.getenv("AI_BATCH_INTERVAL_MINUTES", "10"))
+AI_BATCH_MAX_ITEMS = int(os.getenv("AI_BATCH_MAX_ITEMS", "1000"))  # POIs/reports per batch job
+AI_BATCH_MAX_MB = int(os.getenv("AI_BATCH_MAX_MB", "150"))  # OpenAI limit is 200 MB per input file
+AI_BATCH_COMPLETION_WINDOW = os.getenv("AI_BATCH_COMPLETION_WINDOW", "24h")
+
+# Prompt registry (backend/services/prompts.py)
+AI_PROMPT_VERSIONS = os.getenv("AI_PROMPT_VERSIONS", "")  # Pin versions, e.g. "text_moderation=1,image_analysis=1"
+AI_PROMPT_MAX_INPUT_TOKENS = int(os.getenv("AI_PROMPT_MAX_INPUT_TOKENS", "3000"))  # Text tokens per prompt; user text is cut to fit
+
+# Rejected photo screening (perceptual hash of rejected report photos)
+IMAGE_SCREEN_ENABLED = os.getenv("IMAGE_SCREEN_ENABLED", "true").lower() == "true"
+IMAGE_SCREEN_MAX_DISTANCE = int(os.getenv("IMAGE_SCREEN_MAX_DISTANCE", "6"))  # Differing bits out of 64
+IMAGE_SCREEN_REFRESH_SECONDS = int(os.getenv("IMAGE_SCREEN_REFRESH_SECONDS", "60"))  # Load other workers' entries
+
+# AI endpoint rate limiting (validate-photo, report creation, POI pre-validation)
+AI_RATE_LIMIT_ENABLED = os.getenv("AI_RATE_LIMIT_ENABLED", "true").lower() == "true"
+AI_RATE_LIMIT_BACKEND = os.getenv("AI_RATE_LIMIT_BACKEND", "memory")  # memory (per worker) or database (shared)
+AI_RATE_LIMIT_DATABASE_URL = os.getenv("AI_RATE_LIMIT_DATABASE_URL", "")  # Database backend; default is DATABASE_URL
+AI_RATE_LIMIT_USER_PER_MINUTE = float(os.getenv("AI_RATE_LIMIT_USER_PER_MINUTE", "6"))
+AI_RATE_LIMIT_USER_BURST = int(os.getenv("AI_RATE_LIMIT_USER_BURST", "10"))
+AI_RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("AI_RATE_LIMIT_IP_PER_MINUTE", "20"))
+AI_RATE_LIMIT_IP_BURST = int(os.getenv("AI_RATE_LIMIT_IP_BURST", "30"))
+AI_RATE_LIMIT_TRUST_PROXY = os.getenv("AI_RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"  # Client IP from X-Forwarded-For
+AI_MAX_CONCURRENT_REQUESTS = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "16"))  # Per worker process
+AI_CONCURRENCY_WAIT_SECONDS = float(os.getenv("AI_CONCURRENCY_WAIT_SECONDS", "2"))  # Queue this long before a 429
+
+# Idempotency-Key support for report and POI creation
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))  # Stored responses expire after this
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))  # Unfinished requests older than this can be retried
+
 # Print configuration on load (for debugging)
 if ENVIRONMENT == "development":
     print("=" * 60)
@@ -52,4 +167,5 @@ if ENVIRONMENT == "development":
     print(f"Environment: {ENVIRONMENT}")
     print(f"AI Validation: {'✅ Enabled' if AI_VALIDATION_ENABLED else '❌ Disabled'}")
     print(f"OpenAI Model: {OPENAI_MODEL}")
+    print(f"Storage: {STORAGE_BACKEND}")
     print("=" * 60)
@@ -6,10 +6,12 @@ It provides the Base class for models and a SessionLocal factory for database se
 Supports both SQLite (local) and PostgreSQL (Neon/production).
 """
 import os
+import logging
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # CRITICAL: Load .env FIRST before anything else
 # Get the directory where this file is located
@@ -22,9 +24,14 @@ load_dotenv(env_path)
 # Get DATABASE_URL from environment
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database/ucudigital.db")
 
-# Debug: Print what we're using
-print(f"🔍 database.py cargando .env desde: {env_path}")
-print(f"🔍 DATABASE_URL: {SQLALCHEMY_DATABASE_URL[:60]}...")
+logger = logging.getLogger(__name__)
+
+# Debug: Log what we're using (never the password)
+logger.debug("Loaded .env", extra={"env_path": env_path})
+logger.debug(
+    "Database configured",
+    extra={"database_url": make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=True)}
+)
 
 # Ensure database directory exists (only for SQLite)
 if "sqlite" in SQLALCHEMY_DATABASE_URL:
@@ -80,3 +87,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def release_connection(db: Session) -> None:
+    """
+    Return the session's pooled connection before a slow non-database step.
+    
+    Routes that call OpenAI use this so a request doesn't hold a connection
+    through a multi-second AI round trip. Anything not committed is rolled
+    back. Loaded objects (e.g. current_user) are detached with their
+    attributes intact, so they stay readable; the session itself stays
+    usable and checks out a new connection on its next query.
+    
+    Usage:
+        user_id = current_user.id
+        release_connection(db)
+        analysis = await run_in_threadpool(validator.analyze_report, ...)
+        db.add(Report(user_id=user_id, ...))
+        db.commit()
+    """
+    # Reload anything a commit expired, or it could not be read once detached
+    for obj in list(db.identity_map.values()):
+        if inspect(obj).expired_attributes:
+            db.refresh(obj)
+    db.close()
@@ -0,0 +1,420 @@
+"""
+Generador de datos sintéticos para pruebas de escala.
+
+Crea usuarios, reportes, strikes y POIs a escala de ciudad (millones de
+filas) con distribución espacial realista sobre Mérida y Ucú: los puntos
+se agrupan alrededor de colonias y comisarías ponderadas por densidad.
+
+Las filas se insertan por lotes:
+- PostgreSQL: COPY ... FROM STDIN (psycopg2 copy_expert)
+- SQLite y otros: executemany de un INSERT por lote
+
+Los IDs se asignan de forma explícita a partir del máximo existente, así
+que se puede correr sobre una base con datos; en PostgreSQL las
+secuencias se ajustan al final.
+
+Todos los usuarios sintéticos usan el correo synth-<id>@example.com y la
+contraseña "synthetic123".
+
+Usage:
+    python -m backend.generate_synthetic_data --users 100000 --reports 1000000
+    python -m backend.generate_synthetic_data --database-url sqlite:///./scale.db --create-tables
+    python -m backend.generate_synthetic_data --users 0 --reports 0 --pois 50000
+"""
+import sys
+import os
+import io
+import csv
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text, Table
+from sqlalchemy.engine import Connection
+from backend.config import DATABASE_URL, ENVIRONMENT
+from backend.database import Base
+from backend.models import User, Report, Strike, PointOfInterest
+
+
+SYNTHETIC_PASSWORD = "synthetic123"
+
+# Límites aproximados de Mérida (mismos que utils/location_validator.py)
+LAT_RANGE = (20.85, 21.05)
+LON_RANGE = (-89.75, -89.50)
+
+# (zona, latitud, longitud, dispersión en grados, peso relativo, código postal)
+ZONES: List[Tuple[str, float, float, float, float, str]] = [
+    ("Centro", 20.9674, -89.6237, 0.008, 10, "97000"),
+    ("García Ginerés", 20.9800, -89.6380, 0.006, 5, "97070"),
+    ("Itzimná", 20.9940, -89.6130, 0.006, 5, "97100"),
+    ("Montejo", 21.0080, -89.6100, 0.007, 5, "97127"),
+    ("Francisco de Montejo", 21.0180, -89.6620, 0.010, 8, "97203"),
+    ("Chuburná", 21.0080, -89.6450, 0.008, 6, "97205"),
+    ("Pensiones", 20.9930, -89.6620, 0.008, 6, "97219"),
+    ("Ciudad Caucel", 20.9950, -89.7000, 0.012, 9, "97314"),
+    ("Juan Pablo II", 20.9870, -89.6840, 0.008, 6, "97246"),
+    ("Polígono 108", 21.0200, -89.6350, 0.007, 4, "97143"),
+    ("Altabrisa", 21.0200, -89.5850, 0.007, 4, "97130"),
+    ("Vergel", 20.9490, -89.5850, 0.008, 6, "97173"),
+    ("San José Tecoh", 20.9230, -89.6350, 0.009, 7, "97299"),
+    ("Emiliano Zapata Sur", 20.9300, -89.6050, 0.009, 7, "97297"),
+    ("Cholul", 21.0450, -89.5600, 0.006, 3, "97305"),
+    ("Ucú", 21.0317, -89.7464, 0.005, 4, "97357"),
+]
+ZONE_WEIGHTS = [zone[4] for zone in ZONES]
+
+REPORT_CATEGORIES = ["via_mal_estado", "infraestructura_danada", "senalizacion_transito", "iluminacion_visibilidad"]
+CATEGORY_WEIGHTS = [45, 25, 15, 15]
+REPORT_PROBLEMS = {
+    "via_mal_estado": ["Bache profundo", "Hundimiento en el pavimento", "Grieta longitudinal", "Varios baches"],
+    "infraestructura_danada": ["Banqueta rota", "Registro sin tapa", "Fuga de agua en la calle", "Poste dañado"],
+    "senalizacion_transito": ["Señal de alto borrada", "Semáforo descompuesto", "Paso peatonal sin pintar"],
+    "iluminacion_visibilidad": ["Luminaria apagada", "Calle sin alumbrado", "Árbol tapando la luminaria"],
+}
+REPORT_IMPACTS = [
+    "Representa peligro para motociclistas y ciclistas.",
+    "Afecta el paso de vehículos desde hace varias semanas.",
+    "Los vecinos ya reportaron accidentes en la zona.",
+    "Dificulta el paso de peatones, sobre todo de noche.",
+]
+URGENCY_BY_PRIORITY = {1: "low", 2: "low", 3: "medium", 4: "high", 5: "critical"}
+STRIKE_REASONS = [
+    ("Lenguaje ofensivo en la descripción", "description", "medium"),
+    ("Imagen no corresponde al reporte", "photo", "low"),
+    ("Reporte falso o de broma", "both", "high"),
+    ("Texto sin sentido", "description", "low"),
+]
+POI_CATEGORIES = [
+    ("tienda", "abarrotes", 30), ("restaurante", "comida_yucateca", 15), ("restaurante", "tacos", 10),
+    ("cafe", "panaderia", 6), ("salud", "farmacia", 8), ("salud", "consultorio", 5),
+    ("educacion", "escuela", 4), ("belleza", "estetica", 6), ("taller", "mecanico", 5),
+    ("gasolinera", "gasolinera", 2), ("religion", "iglesia", 3), ("parque", "parque", 3),
+    ("supermercado", "local", 3),
+]
+POI_WEIGHTS = [entry[2] for entry in POI_CATEGORIES]
+FIRST_NAMES = ["María", "José", "Juan", "Guadalupe", "Ana", "Luis", "Carlos", "Rosa", "Jorge", "Fernanda",
+               "Miguel", "Andrea", "Manuel", "Sofía", "Ricardo", "Valeria", "Pedro", "Daniela"]
+LAST_NAMES = ["Pech", "Canul", "Chan", "May", "Uc", "Cauich", "González", "Hernández", "López",
+              "Martínez", "Pérez", "Dzul", "Euan", "Tun", "Cocom", "Ku", "Balam", "Sánchez"]
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+def random_point(rng: random.Random) -> Tuple[float, float, str, str]:
+    """(lat, lon, zona, código postal) alrededor de una zona ponderada."""
+    name, lat, lon, spread, _, postal_code = rng.choices(ZONES, weights=ZONE_WEIGHTS)[0]
+    lat = min(max(rng.gauss(lat, spread), LAT_RANGE[0]), LAT_RANGE[1])
+    lon = min(max(rng.gauss(lon, spread), LON_RANGE[0]), LON_RANGE[1])
+    return round(lat, 6), round(lon, 6), name, postal_code
+
+
+def random_created_at(rng: random.Random, now: datetime, days: int) -> datetime:
+    """Fecha en los últimos `days` días, con más actividad reciente."""
+    age_days = min(rng.expovariate(3 / days), days)
+    return now - timedelta(days=age_days, seconds=rng.randint(0, 86399))
+
+
+def generate_users(start_id: int, count: int, hashed_password: str, now: datetime, days: int,
+                   rng: random.Random) -> Iterator[Dict]:
+    for user_id in range(start_id, start_id + count):
+        roll = rng.random()
+        role = "operator" if roll < 0.005 else "supervisor" if roll < 0.006 else "citizen"
+        created_at = random_created_at(rng, now, days)
+        yield {
+            "id": user_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"synth-{user_id}@example.com",
+            "curp": f"SYN{user_id:09d}HYNX01",
+            "hashed_password": hashed_password,
+            "role": role,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "strike_count": 0,
+            "is_banned": 0,
+            "ban_until": None,
+            "ban_reason": None,
+            "last_strike_at": None,
+        }
+
+
+def generate_reports(start_id: int, count: int, pick_user: Callable[[], int], staff_ids: List[int],
+                     now: datetime, days: int, rng: random.Random) -> Iterator[Dict]:
+    for report_id in range(start_id, start_id + count):
+        category = rng.choices(REPORT_CATEGORIES, weights=CATEGORY_WEIGHTS)[0]
+        lat, lon, zone, postal_code = random_point(rng)
+        created_at = random_created_at(rng, now, days)
+        age_days = (now - created_at).days
+        # Reportes viejos tienden a estar resueltos
+        roll = rng.random()
+        if roll < min(0.2 + age_days / days, 0.85):
+            status = "resuelto"
+        elif roll < 0.9:
+            status = "en_proceso"
+        else:
+            status = "pendiente"
+        priority = rng.choices([1, 2, 3, 4, 5], weights=[10, 25, 35, 20, 10])[0]
+        assigned_to = rng.choice(staff_ids) if staff_ids and status != "pendiente" else None
+        description = (
+            f"{rng.choice(REPORT_PROBLEMS[category])} en la calle {rng.randint(1, 150)} "
+            f"x {rng.randint(1, 150)} y {rng.randint(1, 150)}, {zone}, Mérida, C.P. {postal_code}. "
+            f"{rng.choice(REPORT_IMPACTS)}"
+        )
+        yield {
+            "id": report_id,
+            "user_id": pick_user(),
+            "assigned_to": assigned_to,
+            "category": category,
+            "description": description,
+            "latitude": lat,
+            "longitude": lon,
+            "photo_url": None,
+            "priority": priority,
+            "status": status,
+            "ai_validated": 1,
+            "ai_confidence": round(rng.uniform(0.6, 0.98), 2),
+            "ai_suggested_category": category,
+            "ai_urgency_level": URGENCY_BY_PRIORITY[priority],
+            "ai_keywords": json.dumps([category.split("_")[0], zone.lower()], ensure_ascii=False),
+            "ai_reasoning": "Datos sintéticos",
+            "ai_image_valid": 1,
+            "ai_severity_score": min(priority * 2, 10),
+            "ai_observed_details": None,
+            "ai_quantity_assessment": rng.choice(["poco", "moderado", "mucho"]),
+            "ai_rejection_reason": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def generate_strikes(start_id: int, count: int, pick_user: Callable[[], int], now: datetime, days: int,
+                     rng: random.Random) -> Iterator[Dict]:
+    for strike_id in range(start_id, start_id + count):
+        reason, content_type, severity = rng.choice(STRIKE_REASONS)
+        yield {
+            "id": strike_id,
+            "user_id": pick_user(),
+            "reason": reason,
+            "severity": severity,
+            "content_type": content_type,
+            "ai_detection": "Datos sintéticos",
+            "is_offensive": int(content_type == "description" and severity == "medium"),
+            "is_joke": int(severity == "high"),
+            "is_inappropriate": 0,
+            "report_id": None,
+            "created_at": random_created_at(rng, now, days),
+        }
+
+
+def generate_pois(start_id: int, count: int, pick_user: Callable[[], int], now: datetime, days: int,
+                  rng: random.Random) -> Iterator[Dict]:
+    for poi_id in range(start_id, start_id + count):
+        categoria, subcategoria, _ = rng.choices(POI_CATEGORIES, weights=POI_WEIGHTS)[0]
+        lat, lon, zone, postal_code = random_point(rng)
+        created_at = random_created_at(rng, now, days)
+        approved = rng.random() < 0.8
+        yield {
+            "id": poi_id,
+            "user_id": pick_user(),
+            "nombre": f"{categoria.capitalize()} {rng.choice(LAST_NAMES)} {poi_id}",
+            "descripcion": f"{subcategoria.replace('_', ' ').capitalize()} en {zone}",
+            "categoria": categoria,
+            "subcategoria": subcategoria,
+            "categoria_confidence": round(rng.uniform(0.7, 0.99), 2),
+            "categoria_manual_override": False,
+            "direccion": f"Calle {rng.randint(1, 150)} x {rng.randint(1, 150)}, {zone}",
+            "colonia": zone,
+            "codigo_postal": postal_code,
+            "latitude": lat,
+            "longitude": lon,
+            "telefono": f"999{rng.randint(1000000, 9999999)}",
+            "horarios": {"lunes": "9:00-18:00", "sabado": "9:00-14:00"},
+            "ia_status": "approved_ia" if approved else "pending_ia",
+            "ia_confidence_score": round(rng.uniform(0.6, 0.99), 2),
+            "ia_spam_level": "none",
+            "human_status": "approved" if approved else "pending",
+            "status": "approved" if approved else "pending",
+            "is_public": approved,
+            "is_official": False,
+            "views_count": rng.randint(0, 500),
+            "reports_count": 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Bulk insert
+# ---------------------------------------------------------------------------
+
+def _copy_value(value):
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(conn: Connection, table: Table, rows: List[Dict]) -> None:
+    """PostgreSQL COPY FROM STDIN of one batch."""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert(conn: Connection, table: Table, rows: Iterable[Dict], batch_size: int, label: str) -> int:
+    """Insert rows in batches (COPY on PostgreSQL, executemany elsewhere)."""
+    use_copy = conn.dialect.name == "postgresql"
+    inserted = 0
+    started = time.perf_counter()
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        if use_copy:
+            copy_rows(conn, table, batch)
+        else:
+            conn.execute(table.insert(), batch)
+        conn.commit()
+        inserted += len(batch)
+        rate = inserted / (time.perf_counter() - started)
+        print(f"   {label}: {inserted:,} filas ({rate:,.0f} filas/s)", end="\r")
+    if inserted:
+        print()
+    return inserted
+
+
+def next_id(conn: Connection, table: Table) -> int:
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def reset_sequences(conn: Connection, tables: List[Table]) -> None:
+    """Move PostgreSQL serial sequences past the explicitly inserted IDs."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def generate(args) -> None:
+    from backend.routes.users import hash_password
+
+    engine = create_engine(args.database_url)
+    if args.create_tables:
+        from backend.models.name_change_request import NameChangeRequest  # noqa: F401 (registers table)
+        Base.metadata.create_all(engine)
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    users, reports, strikes, pois = (User.__table__, Report.__table__, Strike.__table__,
+                                     PointOfInterest.__table__)
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # Solo afecta a esta conexión; acelera la carga masiva
+            conn.execute(text("PRAGMA synchronous = OFF"))
+
+        first_user = next_id(conn, users)
+        if args.users:
+            print(f"👥 Generando {args.users:,} usuarios...")
+            bulk_insert(conn, users, generate_users(first_user, args.users, hash_password(SYNTHETIC_PASSWORD),
+                                                    now, args.days, rng), args.batch_size, "usuarios")
+
+        if args.users:
+            last_user = first_user + args.users - 1
+            pick_user = lambda: rng.randint(first_user, last_user)
+        else:
+            existing = list(conn.execute(select(users.c.id)).scalars())
+            if not existing and (args.reports or args.strikes or args.pois):
+                print("❌ No hay usuarios; genera usuarios primero (--users)")
+                sys.exit(1)
+            pick_user = lambda: rng.choice(existing)
+        staff_ids = list(conn.execute(
+            select(users.c.id).where(users.c.role.in_(["operator", "supervisor"])).limit(1000)
+        ).scalars())
+
+        if args.reports:
+            print(f"📝 Generando {args.reports:,} reportes...")
+            bulk_insert(conn, reports, generate_reports(next_id(conn, reports), args.reports, pick_user,
+                                                        staff_ids, now, args.days, rng),
+                        args.batch_size, "reportes")
+        if args.strikes:
+            print(f"⚠️  Generando {args.strikes:,} strikes...")
+            bulk_insert(conn, strikes, generate_strikes(next_id(conn, strikes), args.strikes, pick_user,
+                                                        now, args.days, rng),
+                        args.batch_size, "strikes")
+        if args.pois:
+            print(f"📍 Generando {args.pois:,} POIs...")
+            bulk_insert(conn, pois, generate_pois(next_id(conn, pois), args.pois, pick_user,
+                                                  now, args.days, rng),
+                        args.batch_size, "POIs")
+
+        reset_sequences(conn, [users, reports, strikes, pois])
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos a escala de ciudad")
+    parser.add_argument("--database-url", default=DATABASE_URL,
+                        help="Base de datos destino (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=10000, help="Usuarios a crear")
+    parser.add_argument("--reports", type=int, default=100000, help="Reportes a crear")
+    parser.add_argument("--strikes", type=int, default=5000, help="Strikes a crear")
+    parser.add_argument("--pois", type=int, default=5000, help="POIs a crear")
+    parser.add_argument("--days", type=int, default=365, help="Antigüedad máxima de los datos en días")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Filas por lote")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria (resultados reproducibles)")
+    parser.add_argument("--create-tables", action="store_true", help="Crear tablas faltantes antes de insertar")
+    parser.add_argument("--force", action="store_true", help="Permitir ENVIRONMENT=production")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🏭 GENERADOR DE DATOS SINTÉTICOS")
+    print("=" * 60)
+
+    if ENVIRONMENT == "production" and not args.force:
+        print("❌ ENVIRONMENT=production; usa --force si de verdad quieres datos sintéticos aquí")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    generate(args)
+
+    print("=" * 60)
+    print(f"✅ Datos generados en {time.perf_counter() - started:.1f} s")
+    print(f"   Contraseña de los usuarios sintéticos: {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
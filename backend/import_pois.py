@@ -0,0 +1,100 @@
+"""
+Importación masiva de POIs oficiales desde CSV o GeoJSON.
+
+Columnas reconocidas (CSV o properties de GeoJSON): nombre, descripcion,
+categoria, subcategoria, direccion, colonia, codigo_postal, latitude,
+longitude, telefono, whatsapp, email, website, facebook, instagram,
+horarios (JSON o texto libre). También se aceptan alias comunes como
+name, address, lat, lon/lng. En GeoJSON las coordenadas salen de la
+geometría Point.
+
+Los POIs se insertan o actualizan (nombre + coordenadas) ya aprobados,
+públicos y oficiales, sin pasar por la validación IA.
+
+Usage:
+    python -m backend.import_pois datos/escuelas.csv
+    python -m backend.import_pois datos/pois.geojson --source "INEGI DENUE 2024"
+    python -m backend.import_pois datos/pois.csv --dry-run
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from backend.config import DATABASE_URL, POI_IMPORT_BATCH_SIZE
+from backend.models import User
+from backend.services.poi_import import POIImporter, POIImportStats, open_rows, detect_format
+
+
+def print_progress(stats: POIImportStats) -> None:
+    print(f"   Lote {stats.batches}: {stats.processed:,} filas | {stats.inserted:,} nuevas | "
+          f"{stats.updated:,} actualizadas | {stats.invalid:,} inválidas", end="\r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa POIs oficiales desde CSV o GeoJSON")
+    parser.add_argument("file", help="Archivo .csv, .geojson o .json")
+    parser.add_argument("--format", choices=["csv", "geojson"], help="Formato (default: por extensión)")
+    parser.add_argument("--source", help="Nombre de la fuente (default: nombre del archivo)")
+    parser.add_argument("--created-by", help="Correo del admin creador (default: primer admin)")
+    parser.add_argument("--batch-size", type=int, default=POI_IMPORT_BATCH_SIZE, help="Filas por lote")
+    parser.add_argument("--dry-run", action="store_true", help="Solo validar, sin escribir")
+    parser.add_argument("--database-url", default=DATABASE_URL,
+                        help="Base de datos destino (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🏛️  IMPORTACIÓN DE POIs OFICIALES")
+    print("=" * 60)
+
+    fmt = args.format or detect_format(args.file)
+    if not fmt:
+        print("❌ No se pudo detectar el formato; usa --format csv|geojson")
+        sys.exit(1)
+
+    engine = create_engine(args.database_url)
+    with Session(engine) as db:
+        query = db.query(User).filter(User.role == "admin")
+        if args.created_by:
+            query = query.filter(User.email == args.created_by)
+        admin = query.order_by(User.id).first()
+        if not admin:
+            print("❌ No se encontró el usuario admin; crea uno primero (create_admin.py)")
+            sys.exit(1)
+
+        print(f"📄 {args.file} ({fmt}){' — dry run' if args.dry_run else ''}")
+        print(f"👤 Creador: {admin.name} ({admin.email})")
+
+        importer = POIImporter(
+            db,
+            created_by=admin.id,
+            source=args.source or os.path.basename(args.file),
+            batch_size=args.batch_size,
+            dry_run=args.dry_run
+        )
+        try:
+            with open(args.file, encoding="utf-8-sig", newline="") as f:
+                stats = importer.run(open_rows(f, fmt), progress=print_progress)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+    engine.dispose()
+
+    print()
+    print("=" * 60)
+    print(f"✅ {stats.processed:,} filas en {stats.duration_seconds:.2f} s: "
+          f"{stats.inserted:,} nuevas, {stats.updated:,} actualizadas, {stats.invalid:,} inválidas")
+    for error in stats.errors[:20]:
+        print(f"   ⚠️  Fila {error['row']}: {error['error']}")
+    if stats.invalid > 20:
+        print(f"   ... y {stats.invalid - 20} errores más")
+    if stats.invalid:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,13 @@ Main FastAPI application for UCU Reporta.
 This module initializes the FastAPI app, configures middleware,
 includes routers, and sets up the database.
 """
-from fastapi import FastAPI
+import logging
+import secrets
+from typing import Optional
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from backend.utils.logger import setup_logging, shutdown_logging
 from backend.database import engine, Base
 from backend.routes import users as users_router
 from backend.routes import reports as reports_router
@@ -14,10 +18,22 @@ from backend.routes import admin as admin_router
 from backend.routes import name_change as name_change_router
 from backend.routes import points_of_interest as pois_router
 from backend.routes import announcements as announcements_router
-from backend.config import CORS_ORIGINS
+from backend.routes import media as media_router
+from backend.config import CORS_ORIGINS, METRICS_ENABLED, METRICS_TOKEN, QUERY_AUDIT_ENABLED
+from backend.middleware.metrics import MetricsMiddleware
+from backend.middleware.query_audit import QueryAuditMiddleware
+from backend.utils.metrics import registry as metrics_registry, instrument_engine
+from backend.utils import query_audit
+from backend.services.media_gc import start_media_gc
+from backend.services.ai_batch import start_ai_batches
+from backend.utils.static_media import MediaStaticFiles
 from pathlib import Path
 
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
 # Create FastAPI application
 app = FastAPI(
     title="UCU Reporta API",
@@ -31,9 +47,9 @@ app = FastAPI(
 # Configure CORS middleware
 # Allow requests from frontend (loaded from .env)
 # Note: When using wildcard (*), credentials must be False
-print(f"🔧 Configurando CORS con origins: {CORS_ORIGINS}")
+logger.info("Configuring CORS", extra={"origins": CORS_ORIGINS})
 if CORS_ORIGINS == ["*"]:
-    print("✅ Usando CORS wildcard (*) - permitiendo todos los orígenes")
+    logger.info("Using CORS wildcard (*), allowing all origins")
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -43,7 +59,7 @@ if CORS_ORIGINS == ["*"]:
         expose_headers=["*"],
     )
 else:
-    print(f"✅ Usando CORS específico para: {CORS_ORIGINS}")
+    logger.info("Using CORS allow-list", extra={"origins": CORS_ORIGINS})
     app.add_middleware(
         CORSMiddleware,
         allow_origins=CORS_ORIGINS,
@@ -53,6 +69,16 @@ else:
         expose_headers=["*"],
     )
 
+# Request latency, status and per-request DB usage (served at /metrics)
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# N+1 detection and X-Query-Count header (development/test)
+if QUERY_AUDIT_ENABLED:
+    query_audit.instrument_engine(engine)
+    app.add_middleware(QueryAuditMiddleware)
+
 
 # Include routers with their respective prefixes
 app.include_router(users_router.router)          # /auth endpoints
@@ -61,11 +87,17 @@ app.include_router(admin_router.router)          # /admin endpoints
 app.include_router(name_change_router.router)    # /name-change endpoints
 app.include_router(pois_router.router)           # /points-of-interest endpoints
 app.include_router(announcements_router.router)  # /announcements endpoints
+app.include_router(media_router.router)          # /media endpoints
 
-# Mount static files for uploads
+# Mount static files for uploads (ETag, immutable caching and range support)
 UPLOAD_DIR = Path("backend/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", MediaStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+
+# Mount static files for serving uploaded photos (includes the media store)
+STATIC_DIR = Path("backend/static")
+(STATIC_DIR / "uploads").mkdir(parents=True, exist_ok=True)
+app.mount("/static", MediaStaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
 @app.on_event("startup")
@@ -78,8 +110,19 @@ async def startup_event():
     """
     # Tables are managed by Alembic - no auto-creation
     # Base.metadata.create_all(bind=engine)
-    print("✓ UCU Reporta API is running")
-    print("ℹ️  Use 'alembic upgrade head' to apply database migrations")
+    
+    # Periodically remove uploads that no record references
+    start_media_gc()
+    # Submit/apply OpenAI batch validations (AI_BATCH_WORKER_ENABLED)
+    start_ai_batches()
+    logger.info("UCU Reporta API is running")
+    logger.info("Use 'alembic upgrade head' to apply database migrations")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending log records before the process exits."""
+    shutdown_logging()
 
 
 @app.get("/")
@@ -101,6 +144,29 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus metrics endpoint.
+    
+    Returns request, database and OpenAI metrics in text exposition format.
+    Requires "Authorization: Bearer <METRICS_TOKEN>"; without a configured
+    token the endpoint is not served.
+    """
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    if not secrets.compare_digest((authorization or "").encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        return PlainTextResponse(
+            "unauthorized\n",
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -109,13 +175,3 @@ async def health_check():
     Returns the API health status.
     """
     return {"status": "healthy", "service": "UCU Reporta API"}
-
-
-# Mount static files for serving uploaded photos
-from fastapi.staticfiles import StaticFiles
-import os
-
-# Ensure static directory exists
-os.makedirs("backend/static/uploads", exist_ok=True)
-
-app.mount("/static", StaticFiles(directory="backend/static"), name="static")
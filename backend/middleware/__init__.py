@@ -2,5 +2,8 @@
 Middleware package for UCU Reporta.
 """
 from backend.middleware.ban_check import check_user_ban
+from backend.middleware.metrics import MetricsMiddleware
+from backend.middleware.query_audit import QueryAuditMiddleware
+from backend.middleware.rate_limit import limit_ai_requests
 
-__all__ = ["check_user_ban"]
+__all__ = ["check_user_ban", "MetricsMiddleware", "QueryAuditMiddleware", "limit_ai_requests"]
@@ -0,0 +1,75 @@
+"""
+Request metrics middleware.
+
+Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming responses
+untouched) that records, for every HTTP request:
+- latency per route template (/reports/{report_id}, not /reports/42)
+- request count per route and status
+- requests in flight
+- number of SQL statements and time spent in SQL
+- longest pooled connection checkout (should not grow with AI latency)
+"""
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.utils.metrics import (
+    HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT,
+    DB_REQUEST_QUERIES, DB_REQUEST_TIME, DB_REQUEST_MAX_HOLD,
+    RequestDBStats, current_db_stats
+)
+
+
+class MetricsMiddleware:
+    """Records per-route latency, status and database usage"""
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        root_path = scope.get("root_path", "")
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = current_db_stats.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            current_db_stats.reset(token)
+
+            route = route_label(scope, root_path)
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_code)
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            DB_REQUEST_QUERIES.observe(stats.queries, route=route)
+            DB_REQUEST_TIME.observe(stats.seconds, route=route)
+            DB_REQUEST_MAX_HOLD.observe(stats.max_hold_seconds, route=route)
+
+
+def route_label(scope: Scope, root_path: str = "") -> str:
+    """
+    Low-cardinality label for the matched route.
+
+    Uses the route's path template; static mounts are grouped under their
+    mount path and unmatched paths share one label.
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    mount_path = scope.get("root_path", "")
+    if mount_path and mount_path != root_path:
+        return f"{mount_path[len(root_path):]}/*"
+    return "<unmatched>"
@@ -0,0 +1,66 @@
+"""
+Query audit middleware (development/test only).
+
+Audits the SQL statements of each HTTP request, reports the count in the
+X-Query-Count response header and logs likely N+1 patterns and requests
+over the configured query budget.
+"""
+import logging
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.utils.query_audit import audit_queries, publish_request_audit
+from backend.config import QUERY_AUDIT_REPEAT_THRESHOLD, QUERY_AUDIT_MAX_QUERIES
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryAuditMiddleware:
+    """Counts statements per request and flags repeated query shapes"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        repeat_threshold: int = QUERY_AUDIT_REPEAT_THRESHOLD,
+        max_queries: int = QUERY_AUDIT_MAX_QUERIES
+    ):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.max_queries = max_queries
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        with audit_queries(label) as audit:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    # Body may still be streaming; the count so far is final
+                    # for every non-streaming endpoint
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(audit.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._report(audit)
+                publish_request_audit(audit)
+
+    def _report(self, audit) -> None:
+        repeated = audit.repeated(self.repeat_threshold)
+        if repeated:
+            shape, count = repeated[0]
+            logger.warning(
+                "Possible N+1 query",
+                extra={"request": audit.label, "repeats": count, "statement": shape[:300],
+                       "queries": audit.count}
+            )
+        if self.max_queries and audit.count > self.max_queries:
+            logger.warning(
+                "Query budget exceeded",
+                extra={"request": audit.label, "queries": audit.count, "budget": self.max_queries}
+            )
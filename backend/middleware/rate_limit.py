@@ -0,0 +1,171 @@
+"""
+Rate limiting dependency for routes that call OpenAI.
+"""
+import logging
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+from fastapi import HTTPException, status, Depends, Request
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from backend.database import get_db, release_connection
+from backend.models.user import User
+from backend.auth.jwt_handler import get_current_user
+from backend.services.rate_limit import BucketLimit, get_rate_limiter, get_ai_concurrency_limiter
+from backend.services.idempotency import get_idempotency_store
+from backend.utils.metrics import AI_RATE_LIMIT_DECISIONS
+from backend.config import (
+    AI_RATE_LIMIT_ENABLED, AI_RATE_LIMIT_TRUST_PROXY,
+    AI_RATE_LIMIT_USER_PER_MINUTE, AI_RATE_LIMIT_USER_BURST,
+    AI_RATE_LIMIT_IP_PER_MINUTE, AI_RATE_LIMIT_IP_BURST, IDEMPOTENCY_ENABLED
+)
+
+
+logger = logging.getLogger(__name__)
+
+USER_LIMIT = BucketLimit(AI_RATE_LIMIT_USER_PER_MINUTE, AI_RATE_LIMIT_USER_BURST)
+IP_LIMIT = BucketLimit(AI_RATE_LIMIT_IP_PER_MINUTE, AI_RATE_LIMIT_IP_BURST)
+# Retry-After when every AI slot is busy (an AI request takes a few seconds)
+BUSY_RETRY_AFTER_SECONDS = 5
+
+
+def client_ip(request: Request) -> str:
+    """Client address; behind a trusted proxy, the one it appended to X-Forwarded-For."""
+    if AI_RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # Earlier entries come from the client and can be spoofed
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _too_many_requests(error: str, message: str, retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error": error,
+            "message": message,
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+@asynccontextmanager
+async def _ai_admission(
+    request: Request,
+    db: Session,
+    current_user: User,
+    replay_endpoint: Optional[str] = None
+) -> AsyncIterator[None]:
+    """
+    Take the IP and user tokens and a concurrency slot for one request.
+
+    With replay_endpoint, a request whose Idempotency-Key is settled on that
+    endpoint (see IdempotencyStore.settled) is admitted without charging.
+    """
+    if not AI_RATE_LIMIT_ENABLED:
+        yield
+        return
+
+    if replay_endpoint and IDEMPOTENCY_ENABLED:
+        idempotency_key = request.headers.get("idempotency-key")
+        if (idempotency_key and len(idempotency_key) <= 255
+                and get_idempotency_store().settled(db, current_user.id, idempotency_key, replay_endpoint)):
+            AI_RATE_LIMIT_DECISIONS.inc(scope="idempotency", outcome="replayed")
+            yield
+            return
+
+    limiter = get_rate_limiter()
+    buckets = (
+        ("ip", f"ip:{client_ip(request)}", IP_LIMIT),
+        ("user", f"user:{current_user.id}", USER_LIMIT),
+    )
+    for scope, key, limit in buckets:
+        if limit.per_minute <= 0:
+            continue
+        if limiter.blocking:
+            wait = await run_in_threadpool(limiter.acquire, key, limit)
+        else:
+            wait = limiter.acquire(key, limit)
+        if wait > 0:
+            AI_RATE_LIMIT_DECISIONS.inc(scope=scope, outcome="limited")
+            retry_after = math.ceil(wait)
+            logger.info("AI request rate limited", extra={
+                "scope": scope, "user_id": current_user.id, "path": request.url.path, "retry_after": retry_after
+            })
+            raise _too_many_requests(
+                "rate_limited",
+                f"Demasiadas solicitudes. Intenta de nuevo en {retry_after} segundo(s).",
+                retry_after
+            )
+        AI_RATE_LIMIT_DECISIONS.inc(scope=scope, outcome="allowed")
+
+    concurrency = get_ai_concurrency_limiter()
+    if concurrency.max_concurrent <= 0:
+        yield
+        return
+    if concurrency.saturated:
+        # Don't hold the request's pooled connection while queued for a slot
+        release_connection(db)
+    if not await concurrency.acquire():
+        AI_RATE_LIMIT_DECISIONS.inc(scope="concurrency", outcome="limited")
+        logger.warning("AI concurrency cap reached", extra={
+            "max_concurrent": concurrency.max_concurrent, "path": request.url.path
+        })
+        raise _too_many_requests(
+            "ai_busy",
+            "El servicio de validación está ocupado. Intenta de nuevo en unos segundos.",
+            BUSY_RETRY_AFTER_SECONDS
+        )
+    AI_RATE_LIMIT_DECISIONS.inc(scope="concurrency", outcome="allowed")
+    try:
+        yield
+    finally:
+        concurrency.release()
+
+
+async def limit_ai_requests(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dependency to rate limit routes that call OpenAI.
+
+    Takes a token from the client IP's and the user's buckets, then holds
+    a slot of the worker's AI concurrency cap until the request finishes.
+
+    Raises HTTPException 429 with a Retry-After header if a bucket is
+    empty or no slot frees up in time.
+
+    Usage:
+        @router.post("/validate-photo", dependencies=[Depends(limit_ai_requests)])
+        async def validate_photo_with_ai(...):
+            # Within the limits, proceed
+    """
+    async with _ai_admission(request, db, current_user):
+        yield
+
+
+def limit_idempotent_ai_requests(endpoint: str) -> Callable:
+    """
+    limit_ai_requests for a route answered through idempotent_response.
+
+    A retry whose Idempotency-Key already has a stored response on this
+    endpoint (or is still being processed there) is let through without
+    charging: the route answers it from the store without calling OpenAI.
+    Keys settled on other endpoints are charged as usual.
+
+    Usage:
+        @router.post("/", dependencies=[Depends(limit_idempotent_ai_requests("reports"))])
+    """
+    async def dependency(
+        request: Request,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+    ):
+        async with _ai_admission(request, db, current_user, replay_endpoint=endpoint):
+            yield
+
+    return dependency
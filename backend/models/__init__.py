@@ -8,5 +8,10 @@ from backend.models.report import Report
 from backend.models.strike import Strike
 from backend.models.point_of_interest import PointOfInterest
 from backend.models.announcement import Announcement
+from backend.models.media_blob import MediaBlob
+from backend.models.ai_batch_job import AIBatchJob
+from backend.models.rejected_image import RejectedImage
+from backend.models.rate_limit_bucket import RateLimitBucket
+from backend.models.idempotency_key import IdempotencyKey
 
-__all__ = ["User", "Report", "Strike", "PointOfInterest", "Announcement"]
+__all__ = ["User", "Report", "Strike", "PointOfInterest", "Announcement", "MediaBlob", "AIBatchJob", "RejectedImage", "RateLimitBucket", "IdempotencyKey"]
@@ -0,0 +1,52 @@
+"""
+AI batch job model for UCU Reporta.
+
+Tracks OpenAI Batch API jobs used for non-interactive validations
+(see backend/services/ai_batch.py).
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from backend.database import Base
+
+
+class AIBatchJob(Base):
+    """
+    AIBatchJob model for one submitted OpenAI batch.
+
+    Items listed in a job that is still in flight are not submitted again;
+    once the job completes its results are applied in bulk and the job is
+    marked "applied". Failed or expired jobs release their items, which are
+    picked up by the next submission.
+
+    Attributes:
+        id: Primary key
+        kind: What the batch validates ("poi" or "report")
+        openai_batch_id: Batch id returned by OpenAI
+        input_file_id: Uploaded JSONL file
+        output_file_id: Results file (set when the batch finishes)
+        error_file_id: Per-request errors file, if any
+        status: OpenAI batch status, or "applied" once results are stored
+        item_ids: Ids of the POIs/reports included in the batch
+        request_count: Number of JSONL requests submitted
+        applied_count: Items updated from the results
+        failed_count: Requests that returned an error or unusable output
+        error: Reason the batch failed, expired or could not be applied
+        created_at: Submission timestamp
+        completed_at: When results were applied (or the batch failed)
+    """
+    __tablename__ = "ai_batch_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False, index=True)
+    openai_batch_id = Column(String(100), unique=True, nullable=False)
+    input_file_id = Column(String(100), nullable=False)
+    output_file_id = Column(String(100), nullable=True)
+    error_file_id = Column(String(100), nullable=True)
+    status = Column(String(20), nullable=False, default="validating", index=True)
+    item_ids = Column(JSON, nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    applied_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
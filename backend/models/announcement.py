@@ -4,7 +4,7 @@ Announcement model for public announcements on the home page.
 Allows admins and supervisors to create announcements that appear
 on the public home page banner.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from backend.database import Base
@@ -26,6 +26,10 @@ class Announcement(Base):
         expires_at: Optional expiration date
     """
     __tablename__ = "announcements"
+    __table_args__ = (
+        # Public listing: active filter + ORDER BY priority, created_at
+        Index("ix_announcements_active_priority_created_at", "active", "priority", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
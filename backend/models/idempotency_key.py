@@ -0,0 +1,37 @@
+"""
+Idempotency key model for UCU Reporta.
+
+Stored responses of create requests sent with an Idempotency-Key header,
+so client retries get the original response (see
+backend/services/idempotency.py).
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from backend.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model for one (user, key) pair.
+
+    Attributes:
+        user_id: User who sent the request (part of the primary key)
+        key: Client-generated Idempotency-Key header value
+        endpoint: Endpoint label ("reports", "pois") the key was used on
+        request_hash: SHA-256 of the endpoint and request body; a key reused
+            with a different request is rejected
+        status_code: Stored response status; null while the original
+            request is still running
+        response: Stored JSON response body
+        created_at: First request with this key (rows expire after
+            IDEMPOTENCY_TTL_HOURS)
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    endpoint = Column(String(50), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,36 @@
+"""
+Media blob model for UCU Reporta.
+
+Defines the MediaBlob table used by the content-addressed media store.
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from backend.database import Base
+
+
+class MediaBlob(Base):
+    """
+    MediaBlob model for deduplicated uploaded files.
+
+    Each distinct file content is stored exactly once on disk, keyed by its
+    SHA-256 digest. Reports, POIs and announcements reference the blob through
+    its public URL, and ref_count tracks how many records point to it.
+
+    Attributes:
+        id: Primary key
+        sha256: Hex SHA-256 digest of the file content (unique)
+        extension: File extension used on disk (e.g. ".jpg")
+        size_bytes: Size of the stored file
+        ref_count: Number of records referencing this blob (0 = unreferenced)
+        created_at: Timestamp of first upload
+        updated_at: Timestamp of last upload or reference change
+    """
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    extension = Column(String(10), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
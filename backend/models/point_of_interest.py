@@ -4,7 +4,7 @@ Point of Interest Model
 Modelo para puntos de interés (negocios, lugares) en Ucú.
 Incluye validación automática con IA y validación humana.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -22,6 +22,10 @@ class PointOfInterest(Base):
     5. Si aprueba → Aparece en mapa público
     """
     __tablename__ = "points_of_interest"
+    __table_args__ = (
+        # Mapa público: status + is_public, ordenado por created_at
+        Index("ix_points_of_interest_public_created_at", "status", "is_public", "created_at"),
+    )
     
     # Identificación
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,27 @@
+"""
+Rate limit bucket model for UCU Reporta.
+
+Shared token buckets for the AI endpoint rate limiter when several API
+workers run (see backend/services/rate_limit.py).
+"""
+from sqlalchemy import Column, String, Float
+from backend.database import Base
+
+
+class RateLimitBucket(Base):
+    """
+    RateLimitBucket model for one client's token bucket.
+
+    The bucket is stored as a single timestamp (GCRA "theoretical arrival
+    time"): tokens are available while it lies less than the burst size
+    ahead of now. A row whose timestamp is in the past is a full bucket
+    and can be deleted at any time.
+
+    Attributes:
+        key: Bucket key ("user:<id>" or "ip:<address>")
+        tat: Theoretical arrival time, seconds since the epoch
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(128), primary_key=True)
+    tat = Column(Float, nullable=False, index=True)
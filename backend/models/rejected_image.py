@@ -0,0 +1,38 @@
+"""
+Rejected image model for UCU Reporta.
+
+Fingerprints of report photos rejected by the AI, used to answer
+re-uploads locally (see backend/services/image_hash.py).
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from backend.database import Base
+
+
+class RejectedImage(Base):
+    """
+    RejectedImage model for one rejected photo fingerprint.
+
+    Attributes:
+        id: Primary key
+        sha256: Content hash of the uploaded file (exact re-uploads)
+        dhash: 64-bit difference hash as 16 hex chars (near-duplicates);
+            null when the image could not be decoded
+        user_id: User who uploaded it
+        category: Report category it was submitted under
+        analysis: Rejection fields of the AI verdict, returned on a match
+        hits: Re-uploads answered from this entry
+        created_at: When the photo was rejected
+        last_hit_at: Last re-upload answered from this entry
+    """
+    __tablename__ = "rejected_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    dhash = Column(String(16), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    category = Column(String, nullable=True)
+    analysis = Column(JSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
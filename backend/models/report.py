@@ -3,7 +3,7 @@ Report model for UCU Reporta.
 
 Defines the Report table structure for civic incident reporting.
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database import Base
@@ -27,6 +27,15 @@ class Report(Base):
         updated_at: Timestamp of last update
     """
     __tablename__ = "reports"
+    __table_args__ = (
+        # Matched to get_reports: equality filter + ORDER BY created_at DESC
+        Index("ix_reports_user_id_created_at", "user_id", "created_at"),
+        Index("ix_reports_status_created_at", "status", "created_at"),
+        Index("ix_reports_category_created_at", "category", "created_at"),
+        Index("ix_reports_priority_created_at", "priority", "created_at"),
+        Index("ix_reports_created_at", "created_at"),
+        Index("ix_reports_assigned_to_status", "assigned_to", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
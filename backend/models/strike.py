@@ -3,7 +3,7 @@ Strike model for user moderation.
 
 Tracks user infractions for inappropriate content, jokes, offensive material.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.database import Base
@@ -23,6 +23,9 @@ class Strike(Base):
         created_at: When the strike was issued
     """
     __tablename__ = "strikes"
+    __table_args__ = (
+        Index("ix_strikes_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -4,9 +4,11 @@ Admin routes for report management.
 Handles admin dashboard metrics and report status updates.
 Only accessible to users with 'admin' role.
 """
-from datetime import datetime, timedelta
+import logging
+from datetime import date, datetime, timedelta
 from typing import Dict, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import func
@@ -15,9 +17,12 @@ from backend.models.user import User
 from backend.models.report import Report
 from backend.schemas.report import ReportResponse
 from backend.auth.jwt_handler import get_current_user
+from backend.services.response_cache import invalidate_public_cache
+from backend.services.report_export import ExportFilters, export_reports, MEDIA_TYPES, EXTENSIONS
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
 
 
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
@@ -62,6 +67,27 @@ def require_supervisor_or_admin(current_user: User = Depends(get_current_user))
     return current_user
 
 
+def require_staff(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency to ensure user is municipal staff (operator or above).
+    
+    Args:
+        current_user: Authenticated user
+        
+    Returns:
+        User if they are operator, supervisor or admin
+        
+    Raises:
+        403: If user is a citizen
+    """
+    if current_user.role not in ["operator", "supervisor", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Staff access required"
+        )
+    return current_user
+
+
 class StatusUpdate(BaseModel):
     """Schema for updating report status."""
     status: str = Field(..., pattern="^(pendiente|en_proceso|resuelto)$")
@@ -172,6 +198,61 @@ async def get_admin_summary(
     }
 
 
+@router.get("/reports/export")
+async def export_reports_file(
+    format: str = Query("csv", pattern="^(csv|ndjson|geojson)$"),
+    start_date: Optional[date] = Query(None, description="Created on or after (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Created on or before (YYYY-MM-DD)"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(pendiente|en_proceso|resuelto)$"),
+    category: Optional[str] = Query(None),
+    min_priority: Optional[int] = Query(None, ge=1, le=5),
+    staff_user: User = Depends(require_staff)
+):
+    """
+    Stream reports as CSV, NDJSON or GeoJSON for GIS tools.
+    
+    Rows are read with a server-side cursor and sent as they are fetched,
+    so large date ranges never load into memory.
+    
+    Args:
+        format: csv, ndjson or geojson
+        start_date: Only reports created on or after this date
+        end_date: Only reports created on or before this date
+        status_filter: Filter by status
+        category: Filter by category
+        min_priority: Minimum priority (1-5)
+        staff_user: Authenticated operator, supervisor or admin
+        
+    Returns:
+        Streaming file download
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be before end_date"
+        )
+    
+    filters = ExportFilters(
+        start_date=start_date,
+        end_date=end_date,
+        status=status_filter,
+        category=category,
+        min_priority=min_priority
+    )
+    filename = f"reportes-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{EXTENSIONS[format]}"
+    logger.info(
+        "Report export started",
+        extra={"user_id": staff_user.id, "format": format, "start_date": start_date,
+               "end_date": end_date, "status": status_filter, "category": category}
+    )
+    
+    return StreamingResponse(
+        export_reports(format, filters),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.patch("/reports/{report_id}/status", response_model=ReportResponse)
 async def update_report_status(
     report_id: int,
@@ -215,6 +296,7 @@ async def update_report_status(
     
     db.commit()
     db.refresh(report)
+    invalidate_public_cache("reports")
     
     return report
 
@@ -411,6 +493,7 @@ async def assign_report(
     
     db.commit()
     db.refresh(report)
+    invalidate_public_cache("reports")
     
     return {
         "id": report.id,
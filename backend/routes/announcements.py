@@ -3,25 +3,25 @@ Announcement routes for public notices.
 
 Handles CRUD operations for announcements on the home page.
 """
+import logging
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request
+from sqlalchemy.orm import Session, joinedload, Query as OrmQuery
 from pathlib import Path
-import shutil
-import uuid
 from backend.database import get_db
 from backend.models.user import User
 from backend.models.announcement import Announcement
 from backend.schemas.announcement import AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse
 from backend.auth.jwt_handler import get_current_user
+from backend.services.media_store import get_media_store, blob_url, MediaTooLargeError
+from backend.services.response_cache import cached_json_response, invalidate_public_cache
 
 
 router = APIRouter(prefix="/announcements", tags=["announcements"])
+logger = logging.getLogger(__name__)
 
 # Configuración de subida de archivos
-UPLOAD_DIR = Path("backend/uploads/announcements")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
@@ -48,19 +48,21 @@ def require_supervisor_or_admin(current_user: User = Depends(get_current_user))
     Raises:
         HTTPException 403: If user is not supervisor or admin
     """
-    print(f" Auth check: User {current_user.name} (role: {current_user.role})")
     if current_user.role not in ['supervisor', 'admin']:
-        print(f" Access denied for role: {current_user.role}")
+        logger.warning(
+            "Announcement access denied",
+            extra={"user_id": current_user.id, "role": current_user.role}
+        )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Solo supervisores y administradores pueden realizar esta acción"
         )
-    print(f" Access granted")
     return current_user
 
 
 @router.get("/public")
 async def get_public_announcements(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
@@ -68,26 +70,39 @@ async def get_public_announcements(
     Get active announcements for public display (no authentication required).
     
     Returns only active announcements that haven't expired, ordered by priority
-    and creation date.
+    and creation date. Responses are cached and support If-None-Match.
     
     Args:
+        request: Incoming request (cache key and ETag validation)
         limit: Maximum number of announcements to return
         db: Database session
         
     Returns:
         List of active announcements
     """
+    return cached_json_response(
+        request, "announcements", lambda: _load_public_announcements(db, limit)
+    )
+
+
+def public_announcements_query(db: Session, limit: int) -> OrmQuery:
+    """Build the active, non-expired announcements query (also EXPLAINed by check_query_plans)."""
     now = datetime.utcnow()
     
-    announcements = db.query(Announcement)\
+    return db.query(Announcement)\
+        .options(joinedload(Announcement.creator))\
         .filter(Announcement.active == True)\
         .filter(
             (Announcement.expires_at == None) | 
             (Announcement.expires_at > now)
         )\
         .order_by(Announcement.priority.desc(), Announcement.created_at.desc())\
-        .limit(limit)\
-        .all()
+        .limit(limit)
+
+
+def _load_public_announcements(db: Session, limit: int) -> List[dict]:
+    """Query active, non-expired announcements for the public listing."""
+    announcements = public_announcements_query(db, limit).all()
     
     # Add creator name to response
     result = []
@@ -128,7 +143,7 @@ async def get_all_announcements(
     Returns:
         List of announcements
     """
-    query = db.query(Announcement)
+    query = db.query(Announcement).options(joinedload(Announcement.creator))
     
     if not include_inactive:
         query = query.filter(Announcement.active == True)
@@ -214,17 +229,18 @@ async def create_announcement(
         try:
             expires_at_dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
         except Exception as e:
-            print(f"⚠️ Error parsing expires_at: {e}")
+            logger.warning("Invalid expires_at ignored", extra={"expires_at": expires_at, "error": str(e)})
     
-    print(f"\n📝 Creating announcement:")
-    print(f"   Title: {title}")
-    print(f"   Description: {description[:50]}...")
-    print(f"   Type: {announcement_type}")
-    print(f"   Priority: {priority_int}")
-    print(f"   Link URL: {link_url_clean}")
-    print(f"   Expires at: {expires_at_dt}")
-    print(f"   Image: {image.filename if image else 'None'}")
-    print(f"   User: {current_user.name} (ID: {current_user.id})")
+    logger.info(
+        "Creating announcement",
+        extra={
+            "user_id": current_user.id,
+            "type": announcement_type,
+            "priority": priority_int,
+            "expires_at": expires_at_dt,
+            "has_image": bool(image and image.filename),
+        }
+    )
     
     try:
         # Validar imagen si se proporciona
@@ -238,22 +254,18 @@ async def create_announcement(
                     detail=f"Formato de imagen no permitido. Use: {', '.join(ALLOWED_EXTENSIONS)}"
                 )
             
-            # Validar tamaño
-            contents = await image.read()
-            if len(contents) > MAX_FILE_SIZE:
+            # Guardar archivo validando tamaño (contenido idéntico se guarda una sola vez)
+            media_store = get_media_store(db)
+            try:
+                blob = await media_store.store_upload(image, file_ext, max_size=MAX_FILE_SIZE)
+            except MediaTooLargeError:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"La imagen es demasiado grande. Máximo: {MAX_FILE_SIZE / 1024 / 1024}MB"
                 )
             
-            # Guardar archivo
-            filename = f"{uuid.uuid4()}{file_ext}"
-            file_path = UPLOAD_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                f.write(contents)
-            
-            image_url = f"/uploads/announcements/{filename}"
+            image_url = blob_url(blob.sha256, blob.extension)
+            media_store.acquire(image_url)
         
         # Crear anuncio
         new_announcement = Announcement(
@@ -270,6 +282,7 @@ async def create_announcement(
         db.add(new_announcement)
         db.commit()
         db.refresh(new_announcement)
+        invalidate_public_cache("announcements")
         
         return {
             "id": new_announcement.id,
@@ -288,9 +301,7 @@ async def create_announcement(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating announcement: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating announcement")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al crear el anuncio: {str(e)}"
@@ -334,6 +345,7 @@ async def update_announcement(
     
     db.commit()
     db.refresh(announcement)
+    invalidate_public_cache("announcements")
     
     return {
         "id": announcement.id,
@@ -376,7 +388,9 @@ async def delete_announcement(
             detail="Announcement not found"
         )
     
+    get_media_store(db).release(announcement.image_url)
     db.delete(announcement)
     db.commit()
+    invalidate_public_cache("announcements")
     
     return None
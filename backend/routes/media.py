@@ -0,0 +1,121 @@
+"""
+Media routes for direct-to-storage uploads.
+
+With an S3-compatible storage backend, clients upload photos straight to the
+bucket using presigned URLs, so the bytes never pass through API workers:
+
+1. POST /media/presign with the file's SHA-256, extension and size
+2. PUT the file to the returned URL (skipped if the content already exists)
+3. POST /media/confirm to register the blob and get its photo_url
+
+The photo_url is then used like any uploaded photo (report/POI creation).
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend.models.user import User
+from backend.schemas.media import (
+    MediaPresignRequest, MediaConfirmRequest, MediaPresignResponse, MediaUploadResponse
+)
+from backend.auth.jwt_handler import get_current_user
+from backend.services.media_store import get_media_store, blob_key, blob_url, MediaTooLargeError
+from backend.services.storage import get_storage, StorageError
+
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+@router.post("/presign", response_model=MediaPresignResponse)
+async def presign_upload(
+    request: MediaPresignRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a presigned URL to upload a photo directly to storage.
+
+    Returns:
+        exists=True with the photo_url when the content is already stored,
+        otherwise the upload instructions
+
+    Raises:
+        400: If the file is too large or storage doesn't support direct uploads
+    """
+    if request.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Archivo muy grande. Máximo: {MAX_FILE_SIZE // (1024 * 1024)}MB"
+        )
+
+    blob = get_media_store(db).get(request.sha256)
+    if blob:
+        return MediaPresignResponse(exists=True, photo_url=blob_url(blob.sha256, blob.extension))
+
+    storage = get_storage()
+    if not storage.supports_presigned_uploads:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subida directa no disponible; use el endpoint de subida de foto"
+        )
+
+    try:
+        upload = await storage.apresign_upload(
+            blob_key(request.sha256, request.extension),
+            request.sha256,
+            CONTENT_TYPES[request.extension],
+            request.size
+        )
+    except StorageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return MediaPresignResponse(
+        exists=False,
+        photo_url=blob_url(request.sha256, request.extension),
+        upload=upload
+    )
+
+
+@router.post("/confirm", response_model=MediaUploadResponse)
+async def confirm_upload(
+    request: MediaConfirmRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Register a photo uploaded with a presigned URL.
+
+    Raises:
+        400: If the stored object is larger than allowed
+        404: If the object is not in storage, or its checksum or size doesn't match
+    """
+    try:
+        blob = await get_media_store(db).register_uploaded(
+            request.sha256, request.extension, request.size, max_size=MAX_FILE_SIZE
+        )
+    except MediaTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Archivo muy grande. Máximo: {MAX_FILE_SIZE // (1024 * 1024)}MB"
+        )
+    if not blob:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archivo no encontrado en el almacenamiento"
+        )
+
+    return MediaUploadResponse(
+        photo_url=blob_url(blob.sha256, blob.extension),
+        content_hash=blob.sha256
+    )
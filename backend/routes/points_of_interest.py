@@ -3,41 +3,46 @@ Points of Interest API Routes
 
 Endpoints para sistema de POIs con validación IA.
 """
+import io
 import os
-import uuid
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-
-from backend.database import SessionLocal
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query, Header
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, Query as OrmQuery
+from sqlalchemy import func, select
+
+from backend.database import get_db, release_connection
 from backend.models.user import User
 from backend.models.point_of_interest import PointOfInterest
 from backend.schemas.point_of_interest import (
     POICreate, POIUpdate, POIValidateHuman, POIPreValidate,
     POIResponse, POIPublicResponse, PhotoUploadResponse,
-    IAValidationResult, POIStatsResponse
+    IAValidationResult, POIStatsResponse, POIImportResult, POISearchResponse,
+    POISuggestion
 )
 from backend.routes.users import get_current_user
-from backend.services.poi_validator import poi_validator
+from backend.routes.admin import require_admin
+from backend.services.poi_validator import poi_validator, apply_validation_result
+from backend.services.media_store import (
+    get_media_store, blob_url, media_source_for_url, MediaTooLargeError, MediaGoneError
+)
+from backend.services.response_cache import cached_json_response, invalidate_public_cache
+from backend.services.poi_import import POIImporter, open_rows, detect_format
+from backend.services.search import POIS, ranked_ids, search as fulltext_search
+from backend.services.poi_suggest import get_suggest_index
+from backend.services.idempotency import idempotent_response
+from backend.middleware.rate_limit import limit_ai_requests
+from backend.config import AI_BATCH_ENABLED
 
 router = APIRouter(prefix="/points-of-interest", tags=["Points of Interest"])
+logger = logging.getLogger(__name__)
 
 # Configuración
-UPLOAD_DIR = "backend/static/uploads/pois"
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 
-def get_db():
-    """Dependency para obtener sesión de BD."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def require_admin_or_supervisor(current_user: User = Depends(get_current_user)):
     """Dependency para requerir rol admin o supervisor."""
     if current_user.role not in ["admin", "supervisor"]:
@@ -55,6 +60,7 @@ def require_admin_or_supervisor(current_user: User = Depends(get_current_user)):
 @router.post("/upload-photo", response_model=PhotoUploadResponse)
 async def upload_poi_photo(
     photo: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Upload de foto para POI."""
@@ -66,41 +72,28 @@ async def upload_poi_photo(
             detail=f"Tipo de archivo no permitido. Permitidos: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Crear directorio si no existe
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    
-    # Generar nombre único
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # Guardar archivo
+    # Guardar archivo (contenido idéntico se guarda una sola vez)
     try:
-        content = await photo.read()
-        
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Archivo muy grande. Máximo: {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-    except HTTPException:
-        raise
+        blob = await get_media_store(db).store_upload(photo, file_ext, max_size=MAX_FILE_SIZE)
+    except MediaTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al guardar archivo: {str(e)}"
         )
     
-    return PhotoUploadResponse(photo_url=f"/static/uploads/pois/{unique_filename}")
+    return PhotoUploadResponse(photo_url=blob_url(blob.sha256, blob.extension))
 
 
 # ============================================================================
 # Pre-validación con IA
 # ============================================================================
 
-@router.post("/pre-validate", response_model=IAValidationResult)
+@router.post("/pre-validate", response_model=IAValidationResult, dependencies=[Depends(limit_ai_requests)])
 async def pre_validate_poi(
     poi_data: POIPreValidate,
     current_user: User = Depends(get_current_user)
@@ -113,8 +106,7 @@ async def pre_validate_poi(
         # Obtener path de foto si existe
         photo_path = None
         if poi_data.photo_url:
-            # photo_url ya incluye /static/uploads/pois/filename.ext
-            photo_path = f"backend{poi_data.photo_url}"
+            photo_path = media_source_for_url(poi_data.photo_url)
         
         # Validar con IA
         result = await poi_validator.validate_poi(
@@ -142,12 +134,25 @@ async def pre_validate_poi(
 async def create_poi(
     poi_data: POICreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Crear nuevo POI.
-    Automáticamente se valida con IA después de crear.
+    Se valida con IA después de crear; con AI_BATCH_ENABLED queda en
+    "pending_ia" y lo valida el siguiente batch (services/ai_batch.py).
+    Con el header Idempotency-Key, un reintento de la misma solicitud
+    recibe la respuesta guardada sin crear ni validar otra vez.
     """
+    return await idempotent_response(
+        db, current_user.id, idempotency_key, "pois", poi_data,
+        lambda: _create_poi(poi_data, db, current_user),
+        POIResponse
+    )
+
+
+async def _create_poi(poi_data: POICreate, db: Session, current_user: User):
+    """Crear y validar el POI (create_poi sin el manejo de Idempotency-Key)."""
     # Crear POI
     new_poi = PointOfInterest(
         user_id=current_user.id,
@@ -172,14 +177,26 @@ async def create_poi(
     )
     
     db.add(new_poi)
+    try:
+        get_media_store(db).acquire_existing(new_poi.photo_url)
+    except MediaGoneError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La foto ya no está disponible. Vuelve a subirla e inténtalo de nuevo."
+        )
     db.commit()
     db.refresh(new_poi)
     
-    # Validar con IA en background (por ahora síncrono)
+    if AI_BATCH_ENABLED:
+        return new_poi
+    
+    # Validar con IA (síncrono), sin retener la conexión durante la llamada
+    release_connection(db)
     try:
         photo_path = None
         if new_poi.photo_url:
-            photo_path = f"backend{new_poi.photo_url}"
+            photo_path = media_source_for_url(new_poi.photo_url)
         
         ia_result = await poi_validator.validate_poi(
             nombre=new_poi.nombre,
@@ -189,59 +206,155 @@ async def create_poi(
             photo_path=photo_path
         )
         
-        # Actualizar con resultado de IA
-        new_poi.categoria = ia_result.get("categoria")
-        new_poi.subcategoria = ia_result.get("subcategoria")
-        new_poi.categoria_confidence = ia_result.get("confidence_categoria")
-        new_poi.categoria_original_ia = ia_result.get("categoria")
-        new_poi.ia_status = "approved_ia" if ia_result.get("approved") else "rejected_ia"
-        new_poi.ia_confidence_score = ia_result.get("confidence")
-        new_poi.ia_spam_level = ia_result.get("spam_level")
-        new_poi.ia_spam_acceptable = ia_result.get("spam_acceptable")
-        new_poi.ia_warnings = ia_result.get("warnings")
-        new_poi.ia_suggested_changes = ia_result.get("suggestions")
-        new_poi.ia_rejection_reason = ia_result.get("rejection_reason")
-        new_poi.ia_validation_result = ia_result
-        
+        # Actualizar con resultado de IA (new_poi quedó desconectado de la sesión)
+        db.add(new_poi)
+        apply_validation_result(new_poi, ia_result)
         db.commit()
         db.refresh(new_poi)
         
-    except Exception as e:
-        print(f"❌ Error en validación IA: {e}")
+    except Exception:
+        logger.exception("Error en validación IA", extra={"poi_id": new_poi.id})
         # Continuar aunque falle IA
     
     return new_poi
 
 
+# ============================================================================
+# Importación masiva (datasets oficiales)
+# ============================================================================
+
+@router.post("/import", response_model=POIImportResult)
+async def import_official_pois(
+    file: UploadFile = File(...),
+    source: Optional[str] = Query(None, max_length=100),
+    dry_run: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Importar POIs oficiales desde CSV o GeoJSON (solo admins).
+    
+    Hace upsert por nombre + coordenadas, sin validación IA: los POIs
+    quedan aprobados, públicos y oficiales. Con dry_run solo se validan
+    las filas.
+    """
+    fmt = detect_format(file.filename)
+    if not fmt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no soportado. Usa .csv, .geojson o .json"
+        )
+    
+    importer = POIImporter(
+        db,
+        created_by=current_user.id,
+        source=source or file.filename,
+        dry_run=dry_run
+    )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        # Lectura y escritura por lotes fuera del event loop
+        stats = await run_in_threadpool(importer.run, open_rows(stream, fmt))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Archivo inválido: {e}"
+        )
+    finally:
+        stream.detach()
+    
+    if stats.inserted or stats.updated:
+        invalidate_public_cache("pois")
+        get_suggest_index().invalidate()
+    
+    return stats.to_dict()
+
+
 # ============================================================================
 # Listar POIs
 # ============================================================================
 
+def public_pois_query(db: Session, categoria: Optional[str] = None) -> OrmQuery:
+    """
+    Consulta de POIs públicos del mapa, más recientes primero
+    (también la revisa check_query_plans).
+    """
+    query = db.query(PointOfInterest).filter(
+        PointOfInterest.status == "approved",
+        PointOfInterest.is_public == True
+    )
+    
+    if categoria:
+        query = query.filter(PointOfInterest.categoria == categoria)
+    
+    return query.order_by(PointOfInterest.created_at.desc())
+
+
 @router.get("/public", response_model=List[POIPublicResponse])
 async def get_public_pois(
+    request: Request,
     categoria: str = None,
     search: str = None,
     db: Session = Depends(get_db)
 ):
     """
     Obtener POIs públicos (aprobados).
-    Sin autenticación requerida.
+    Sin autenticación requerida. Respuesta cacheada con soporte de ETag.
     """
-    query = db.query(PointOfInterest).filter(
+    def build():
+        query = public_pois_query(db, categoria)
+        
+        if search:
+            # Índice de texto completo (nombre, descripción, dirección)
+            matches = ranked_ids(db, POIS, search)
+            if matches is None:
+                return []
+            query = query.filter(PointOfInterest.id.in_(select(matches.subquery().c.id)))
+        
+        pois = query.all()
+        return [POIPublicResponse.model_validate(poi) for poi in pois]
+    
+    return cached_json_response(request, "pois", build)
+
+
+@router.get("/search", response_model=POISearchResponse)
+async def search_public_pois(
+    q: str = Query(..., min_length=2, max_length=200),
+    categoria: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Búsqueda de texto completo en POIs públicos.
+    Sin acentos ni mayúsculas, ordenada por relevancia y paginada.
+    """
+    filters = [
         PointOfInterest.status == "approved",
         PointOfInterest.is_public == True
-    )
-    
+    ]
     if categoria:
-        query = query.filter(PointOfInterest.categoria == categoria)
+        filters.append(PointOfInterest.categoria == categoria)
     
-    if search:
-        query = query.filter(
-            PointOfInterest.nombre.ilike(f"%{search}%")
-        )
-    
-    pois = query.order_by(PointOfInterest.created_at.desc()).all()
-    return pois
+    pois, total = fulltext_search(db, POIS, q, filters=filters, page=page, page_size=page_size)
+    return {"items": pois, "total": total, "page": page, "page_size": page_size}
+
+
+@router.get("/suggest", response_model=List[POISuggestion], response_model_exclude_none=True)
+async def suggest_pois(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Autocompletar (typeahead) sobre nombres, categorías y colonias de POIs públicos.
+    Se sirve desde un índice en memoria; la BD solo se consulta al reconstruirlo.
+    """
+    index = get_suggest_index()
+    if index.is_stale:
+        # La reconstrucción lee todos los POIs públicos: fuera del event loop
+        await run_in_threadpool(index.ensure_fresh, db)
+    return index.suggest(q, limit=limit)
 
 
 @router.get("/my-pois", response_model=List[POIResponse])
@@ -341,6 +454,8 @@ async def validate_poi(
     
     db.commit()
     db.refresh(poi)
+    invalidate_public_cache("pois")
+    get_suggest_index().sync_poi(poi)
     
     return poi
 
@@ -378,6 +493,8 @@ async def update_poi(
     
     db.commit()
     db.refresh(poi)
+    invalidate_public_cache("pois")
+    get_suggest_index().sync_poi(poi)
     
     return poi
 
@@ -408,9 +525,13 @@ async def delete_poi(
             detail="No tienes permiso para eliminar este POI"
         )
     
-    # Eliminar fotos
-    if poi.photo_url:
-        photo_path = f"backend/static{poi.photo_url}"
+    # Eliminar fotos (las del media store pueden estar compartidas: solo se
+    # libera la referencia; las antiguas con nombre único se borran)
+    media_store = get_media_store(db)
+    if media_store.get_by_url(poi.photo_url):
+        media_store.release(poi.photo_url)
+    elif poi.photo_url:
+        photo_path = f"backend{poi.photo_url}"
         if os.path.exists(photo_path):
             try:
                 os.remove(photo_path)
@@ -419,6 +540,8 @@ async def delete_poi(
     
     db.delete(poi)
     db.commit()
+    invalidate_public_cache("pois")
+    get_suggest_index().remove_poi(poi_id)
     
     return None
 
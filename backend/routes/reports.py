@@ -4,33 +4,49 @@ Report routes for citizen reporting.
 Handles report creation, listing, photo uploads, and deletion.
 """
 import os
-import uuid
 import json
+import logging
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Header
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, Query as OrmQuery
+from backend.database import get_db, release_connection
 from backend.models.user import User
 from backend.models.report import Report
-from backend.schemas.report import ReportCreate, ReportResponse
+from backend.schemas.report import ReportCreate, ReportResponse, ReportSearchResponse
 from backend.auth.jwt_handler import get_current_user
 from backend.utils.priority_engine import calculate_priority
 from backend.services.ai_validator import get_ai_validator
+from backend.services.ai_resilience import request_ai_budget
 from backend.services.moderation import get_moderation_service
+from backend.services.media_store import (
+    get_media_store, blob_source, blob_url, media_source_for_url, MediaGoneError
+)
+from backend.services.response_cache import cached_json_response, invalidate_public_cache
+from backend.services.search import REPORTS, search as fulltext_search
+from backend.services.image_hash import get_rejected_image_index, image_fingerprint
+from backend.services.idempotency import idempotent_response
 from backend.middleware.ban_check import check_user_ban
-from backend.config import AI_VALIDATION_ENABLED
+from backend.middleware.rate_limit import limit_ai_requests, limit_idempotent_ai_requests
+from backend.config import AI_VALIDATION_ENABLED, IMAGE_SCREEN_ENABLED
 from backend.utils.location_validator import validate_report_location
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
+logger = logging.getLogger(__name__)
 
 # Allowed image extensions
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-UPLOAD_DIR = "backend/static/uploads"
 
+# The photo was garbage collected between its upload and its use
+PHOTO_GONE_DETAIL = {
+    "error": "photo_expired",
+    "message": "La foto ya no está disponible. Vuelve a subirla e inténtalo de nuevo."
+}
 
-@router.post("/validate-photo")
+
+@router.post("/validate-photo", dependencies=[Depends(limit_ai_requests), Depends(request_ai_budget)])
 async def validate_photo_with_ai(
     photo: UploadFile = File(...),
     category: str = Query(...),
@@ -44,18 +60,26 @@ async def validate_photo_with_ai(
     
     This endpoint is called first to check if the photo and text are valid.
     Only if validation passes, the frontend will proceed to create the report.
+    The text check and the image analysis share one AI deadline budget, and
+    no pooled DB connection is held while they run; strikes and the media
+    store write use their own short transactions. Photos matching a
+    previously rejected image are rejected locally, without the vision call.
     
     Returns:
         - 200: Content is valid, includes AI analysis
         - 422: Content is invalid (offensive text, invalid image, etc.)
+        - 429: Too many AI requests from this user or IP, or AI capacity busy
     """
     if not AI_VALIDATION_ENABLED:
         return {"valid": True, "message": "AI validation disabled"}
     
     try:
+        # Auth and ban check are done; don't hold their connection during AI calls
+        release_connection(db)
+        
         # STEP 1: Check text for offensive content, nonsense, test, or vague FIRST
         validator = get_ai_validator()
-        text_check = validator.check_offensive_text(description)
+        text_check = await run_in_threadpool(validator.check_offensive_text, description)
         
         # Check for test text first (NO strike, just friendly rejection)
         if text_check.get("is_test"):
@@ -96,7 +120,10 @@ async def validate_photo_with_ai(
                 is_inappropriate=text_check.get("is_inappropriate", False)
             )
             
-            print(f"⚠️  Strike issued for offensive text to user {current_user.id}: {strike_info}")
+            logger.warning(
+                "Strike issued for offensive text",
+                extra={"user_id": current_user.id, "strike": strike_info}
+            )
             
             # Return rejection with JSONResponse
             return JSONResponse(
@@ -120,7 +147,6 @@ async def validate_photo_with_ai(
             )
         
         # STEP 2: If text is clean, proceed with photo validation
-        # Save photo temporarily
         file_ext = os.path.splitext(photo.filename)[1].lower()
         if file_ext not in ALLOWED_EXTENSIONS:
             raise HTTPException(
@@ -128,25 +154,54 @@ async def validate_photo_with_ai(
                 detail="Formato de imagen no permitido"
             )
         
-        # Create temp filename
-        temp_filename = f"temp_{uuid.uuid4()}{file_ext}"
-        temp_path = os.path.join(UPLOAD_DIR, temp_filename)
+        # Save photo in the content-addressed store (unreferenced until a
+        # report attaches it, so retries of the same photo reuse the file)
+        blob = await get_media_store(db).store_upload(photo, file_ext)
+        temp_path = blob_source(blob.sha256, blob.extension)
         
-        # Ensure upload directory exists
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        
-        # Save file
-        with open(temp_path, "wb") as buffer:
-            content = await photo.read()
-            buffer.write(content)
+        # Re-upload of a previously rejected photo (exact or near-duplicate)?
+        screen_match = None
+        image_hash = None
+        if IMAGE_SCREEN_ENABLED:
+            rejected_index = get_rejected_image_index()
+            rejected_index.ensure_fresh(db)
+            screen_match = rejected_index.match_sha(blob.sha256)
+            if screen_match is None:
+                image_hash = await run_in_threadpool(image_fingerprint, temp_path)
+                screen_match = rejected_index.match_hash(image_hash)
+            if screen_match and not screen_match.exact and screen_match.user_id != current_user.id:
+                # A near-duplicate of someone else's rejection may be a hash
+                # collision; a strike needs the vision model's own verdict
+                logger.info(
+                    "Photo resembles another user's rejected image, validating with AI",
+                    extra={"user_id": current_user.id, "rejected_image_id": screen_match.entry_id,
+                           "distance": screen_match.distance}
+                )
+                screen_match = None
+        release_connection(db)
         
-        # Validate with AI
-        validator = get_ai_validator()
-        ai_analysis = validator.analyze_report_with_image(
-            category=category,
-            description=description,
-            image_path=temp_path
-        )
+        if screen_match:
+            # Answer with the stored rejection (same file, or the same user's
+            # own rejected photo). Only the same user uploading it again is a
+            # repeat offense; someone else's identical file keeps the stored verdict
+            ai_analysis = dict(screen_match.analysis)
+            repeat_offense = screen_match.user_id == current_user.id
+            if repeat_offense:
+                ai_analysis["requires_strike"] = True
+                ai_analysis["strike_severity"] = ai_analysis.get("strike_severity") or "low"
+            logger.info(
+                "Photo matched a previously rejected image",
+                extra={"user_id": current_user.id, "rejected_image_id": screen_match.entry_id,
+                       "distance": screen_match.distance, "repeat_offense": repeat_offense}
+            )
+        else:
+            # Validate with AI
+            ai_analysis = await run_in_threadpool(
+                validator.analyze_report_with_image,
+                category=category,
+                description=description,
+                image_path=temp_path
+            )
         
         # Check ONLY for offensive/inappropriate content, NOT category mismatch
         # La IA sugerirá la categoría correcta automáticamente
@@ -155,13 +210,23 @@ async def validate_photo_with_ai(
         is_joke = ai_analysis.get("is_joke_or_fake", False) if ai_analysis else False
         
         # Solo rechazar si es contenido ofensivo, inapropiado o broma
+        # (rejected photos stay unreferenced in the media store)
         if is_offensive or is_inappropriate or is_joke:
-            # Delete temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
             requires_strike = ai_analysis.get("requires_strike", False)
             
+            # Fingerprint the rejection so re-uploads are answered locally
+            if IMAGE_SCREEN_ENABLED:
+                try:
+                    if screen_match:
+                        rejected_index.record_hit(db, screen_match)
+                    if not (screen_match and screen_match.exact):
+                        rejected_index.record_rejection(
+                            db, blob.sha256, image_hash, current_user.id, category, ai_analysis
+                        )
+                except Exception:
+                    db.rollback()
+                    logger.exception("Error recording rejected image", extra={"user_id": current_user.id})
+            
             strike_info = None
             
             # Issue strike if content is offensive, inappropriate, or repeated joke
@@ -189,9 +254,12 @@ async def validate_photo_with_ai(
                         is_joke=is_joke,
                         is_inappropriate=is_inappropriate
                     )
-                    print(f"⚠️  Strike issued to user {current_user.id}: {strike_info}")
-                except Exception as e:
-                    print(f"Error issuing strike: {e}")
+                    logger.warning(
+                        "Strike issued for rejected photo",
+                        extra={"user_id": current_user.id, "strike": strike_info}
+                    )
+                except Exception:
+                    logger.exception("Error issuing strike", extra={"user_id": current_user.id})
             
             # Return rejection with strike info
             detail = {
@@ -200,6 +268,7 @@ async def validate_photo_with_ai(
                 "rejection_reason": ai_analysis.get("rejection_reason", "La imagen no es válida"),
                 "professional_feedback": ai_analysis.get("professional_feedback", 
                     "Por favor, suba una fotografía que muestre claramente el problema reportado."),
+                "matched_previous_rejection": screen_match is not None,
                 "ai_analysis": {
                     "image_valid": ai_analysis.get("image_valid", False),
                     "is_joke_or_fake": is_joke,
@@ -224,10 +293,12 @@ async def validate_photo_with_ai(
                 content={"detail": detail}
             )
         
-        # Photo is valid - keep temp file and return path
+        # Photo is valid - return the stored blob so it can be attached
         return {
             "valid": True,
-            "temp_filename": temp_filename,
+            "temp_filename": f"{blob.sha256}{blob.extension}",
+            "photo_url": blob_url(blob.sha256, blob.extension),
+            "content_hash": blob.sha256,
             "ai_analysis": {
                 "confidence": ai_analysis.get("confidence"),
                 "suggested_category": ai_analysis.get("suggested_category"),
@@ -239,22 +310,47 @@ async def validate_photo_with_ai(
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error validating photo: {e}")
+    except Exception:
+        logger.exception("Error validating photo")
         # If validation fails, allow the photo (fallback)
         return {"valid": True, "message": "Validation failed, proceeding without AI check"}
 
 
 
-@router.post("/", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=ReportResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(limit_idempotent_ai_requests("reports"))])
 async def create_report(
     report_data: ReportCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Create a new civic incident report with AI validation and location validation.
     
+    With an Idempotency-Key header, a retry of the same request gets the
+    stored response instead of creating (and validating) the report again.
+    
+    Args:
+        report_data: Report data (category, description, coordinates, optional photo_url)
+        db: Database session
+        current_user: Authenticated user creating the report
+        idempotency_key: Optional client-generated key identifying this submission
+        
+    Returns:
+        Created report with AI-enhanced metadata
+    """
+    return await idempotent_response(
+        db, current_user.id, idempotency_key, "reports", report_data,
+        lambda: _create_report(report_data, db, current_user),
+        ReportResponse
+    )
+
+
+async def _create_report(report_data: ReportCreate, db: Session, current_user: User):
+    """
+    Validate and create the report (create_report, minus the idempotency handling).
+    
     Uses AI to:
     - Validate category selection
     - Suggest improved priority
@@ -263,6 +359,10 @@ async def create_report(
     
     Validates location to ensure it's in Mérida, Yucatán.
     
+    Runs in three phases so the pooled DB connection is never held across
+    the OpenAI round trip: auth and validation, AI analysis without a
+    connection, then a short write transaction.
+    
     Args:
         report_data: Report data (category, description, coordinates, optional photo_url)
         db: Database session
@@ -289,17 +389,19 @@ async def create_report(
             }
         )
     
-    # STEP 2: AI Validation with Image Analysis
+    # STEP 2: AI Validation with Image Analysis (no DB connection held)
     ai_analysis = None
     if AI_VALIDATION_ENABLED:
+        release_connection(db)
         try:
             validator = get_ai_validator()
             
             # Use complete analysis if photo is provided
             if report_data.photo_url:
                 # Convert photo_url to full path for analysis
-                image_path = f"backend/static{report_data.photo_url}" if not report_data.photo_url.startswith('http') else report_data.photo_url
-                ai_analysis = validator.analyze_report_with_image(
+                image_path = media_source_for_url(report_data.photo_url)
+                ai_analysis = await run_in_threadpool(
+                    validator.analyze_report_with_image,
                     category=report_data.category,
                     description=report_data.description,
                     image_path=image_path
@@ -327,18 +429,19 @@ async def create_report(
                     )
             else:
                 # Text-only analysis
-                ai_analysis = validator.analyze_report(
+                ai_analysis = await run_in_threadpool(
+                    validator.analyze_report,
                     category=report_data.category,
                     description=report_data.description,
                     has_photo=False
                 )
             
-            print(f"🤖 AI Analysis: {ai_analysis}")
+            logger.debug("AI analysis", extra={"ai_analysis": ai_analysis})
         except HTTPException:
             # Re-raise HTTP exceptions (image rejection)
             raise
-        except Exception as e:
-            print(f"⚠️  AI validation failed: {e}")
+        except Exception:
+            logger.exception("AI validation failed")
             ai_analysis = None
     
     # Calculate priority (use AI suggestion if available and confident)
@@ -352,6 +455,7 @@ async def create_report(
             longitude=report_data.longitude
         )
     
+    # STEP 3: Short write transaction
     # Create new report with AI metadata
     new_report = Report(
         user_id=current_user.id,
@@ -378,8 +482,17 @@ async def create_report(
     )
     
     db.add(new_report)
+    try:
+        get_media_store(db).acquire_existing(new_report.photo_url)
+    except MediaGoneError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=PHOTO_GONE_DETAIL
+        )
     db.commit()
     db.refresh(new_report)
+    invalidate_public_cache("reports")
     
     # Add user information to response
     report_dict = {
@@ -396,6 +509,52 @@ async def create_report(
     return report_dict
 
 
+def reports_query(
+    db: Session,
+    current_user: User,
+    status_filter: Optional[str] = None,
+    category: Optional[str] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None
+) -> OrmQuery:
+    """
+    Build the GET /reports/ query (also EXPLAINed by check_query_plans).
+    
+    Citizens only see their own reports; admins see all of them.
+    """
+    # Base query (reporter loaded in the same query, not once per row)
+    query = db.query(Report).options(joinedload(Report.user))
+    
+    # Filter by role
+    if current_user.role == "citizen":
+        # Citizens only see their own reports
+        query = query.filter(Report.user_id == current_user.id)
+    # Admins see all reports (no additional filter needed)
+    
+    # Apply optional filters
+    if status_filter:
+        query = query.filter(Report.status == status_filter)
+    
+    if category:
+        query = query.filter(Report.category == category)
+    
+    if min_priority is not None or max_priority is not None:
+        # Priorities are 1-5: an IN list lets the (priority, created_at) index
+        # be searched, where a range walks the whole created_at index instead
+        query = query.filter(Report.priority.in_(range(min_priority or 1, (max_priority or 5) + 1)))
+    
+    # Order by creation date (newest first)
+    return query.order_by(Report.created_at.desc())
+
+
+def public_approved_reports_query(db: Session, limit: int) -> OrmQuery:
+    """Build the GET /reports/public/approved query (newest approved first)."""
+    return db.query(Report)\
+        .filter(Report.status == 'approved')\
+        .order_by(Report.created_at.desc())\
+        .limit(limit)
+
+
 @router.get("/", response_model=List[ReportResponse])
 async def get_reports(
     status_filter: Optional[str] = Query(None, alias="status"),
@@ -422,37 +581,109 @@ async def get_reports(
     Returns:
         List of reports matching the filters
     """
-    # Base query
-    query = db.query(Report)
+    reports = reports_query(
+        db, current_user, status_filter, category, min_priority, max_priority
+    ).all()
     
-    # Filter by role
-    if current_user.role == "citizen":
-        # Citizens only see their own reports
-        query = query.filter(Report.user_id == current_user.id)
-    # Admins see all reports (no additional filter needed)
+    # Add user information to each report
+    reports_with_users = []
+    for report in reports:
+        report_dict = {
+            **report.__dict__,
+            "user": {
+                "id": report.user.id,
+                "name": report.user.name,
+                "email": report.user.email,
+                "role": report.user.role,
+                "curp": report.user.curp
+            } if report.user else None
+        }
+        reports_with_users.append(report_dict)
     
-    # Apply optional filters
-    if status_filter:
-        query = query.filter(Report.status == status_filter)
+    return reports_with_users
+
+
+@router.get("/public/approved", response_model=List[ReportResponse])
+async def get_public_approved_reports(
+    request: Request,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Get approved reports for public display (no authentication required).
     
-    if category:
-        query = query.filter(Report.category == category)
+    This endpoint is used for the home page banner to show recent approved reports.
+    Responses are cached and support If-None-Match. Declared before
+    /{report_id} so the path is not captured as a report ID.
     
-    if min_priority is not None:
-        query = query.filter(Report.priority >= min_priority)
+    Args:
+        request: Incoming request (cache key and ETag validation)
+        limit: Maximum number of reports to return (default: 5, max: 20)
+        db: Database session
+        
+    Returns:
+        List of approved reports ordered by creation date (newest first)
+    """
+    def build():
+        reports = public_approved_reports_query(db, limit).all()
+        # Public payload: report columns only, no reporter information
+        return [
+            ReportResponse.model_validate(
+                {column.name: getattr(report, column.name) for column in Report.__table__.columns}
+            )
+            for report in reports
+        ]
     
-    if max_priority is not None:
-        query = query.filter(Report.priority <= max_priority)
+    return cached_json_response(request, "reports", build)
+
+
+@router.get("/search", response_model=ReportSearchResponse)
+async def search_reports(
+    q: str = Query(..., min_length=2, max_length=200),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    category: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search over report descriptions and AI keywords.
     
-    # Order by creation date (newest first)
-    query = query.order_by(Report.created_at.desc())
+    Accent-insensitive, ranked by relevance and paginated. Citizens only
+    search their own reports; staff search all of them. Declared before
+    /{report_id} so the path is not captured as a report ID.
     
-    reports = query.all()
+    Args:
+        q: Search text (e.g. "bache calle 60")
+        status_filter: Filter by status
+        category: Filter by category
+        page: Page number (1-based)
+        page_size: Results per page (max 100)
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Matching reports (best match first) with the total count
+    """
+    filters = []
+    if current_user.role == "citizen":
+        filters.append(Report.user_id == current_user.id)
+    if status_filter:
+        filters.append(Report.status == status_filter)
+    if category:
+        filters.append(Report.category == category)
+    
+    reports, total = fulltext_search(
+        db, REPORTS, q,
+        filters=filters,
+        page=page,
+        page_size=page_size,
+        options=[joinedload(Report.user)]
+    )
     
-    # Add user information to each report
-    reports_with_users = []
-    for report in reports:
-        report_dict = {
+    items = [
+        {
             **report.__dict__,
             "user": {
                 "id": report.user.id,
@@ -462,9 +693,10 @@ async def get_reports(
                 "curp": report.user.curp
             } if report.user else None
         }
-        reports_with_users.append(report_dict)
+        for report in reports
+    ]
     
-    return reports_with_users
+    return {"items": items, "total": total, "page": page, "page_size": page_size}
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
@@ -551,8 +783,10 @@ async def delete_report(
                 detail="You can only delete reports with 'pendiente' status"
             )
     
+    get_media_store(db).release(report.photo_url)
     db.delete(report)
     db.commit()
+    invalidate_public_cache("reports")
     
     return None
 
@@ -582,7 +816,8 @@ async def upload_report_photo(
     Raises:
         404: If report not found
         403: If user doesn't have permission
-        400: If file extension is not allowed
+        400: If file extension is not allowed, or the stored photo was
+            garbage collected before it could be attached
     """
     # Get report
     report = db.query(Report).filter(Report.id == report_id).first()
@@ -608,18 +843,10 @@ async def upload_report_photo(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Ensure upload directory exists
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # Save file
+    # Save file (identical content is stored only once)
+    media_store = get_media_store(db)
     try:
-        with open(file_path, "wb") as buffer:
-            content = await photo.read()
-            buffer.write(content)
+        blob = await media_store.store_upload(photo, file_ext)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -627,9 +854,21 @@ async def upload_report_photo(
         )
     
     # Update report with photo URL
-    report.photo_url = f"/static/uploads/{unique_filename}"
+    new_photo_url = blob_url(blob.sha256, blob.extension)
+    if report.photo_url != new_photo_url:
+        try:
+            media_store.acquire_existing(new_photo_url)
+        except MediaGoneError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=PHOTO_GONE_DETAIL
+            )
+        media_store.release(report.photo_url)
+        report.photo_url = new_photo_url
     db.commit()
     db.refresh(report)
+    invalidate_public_cache("reports")
     
     # Add user information to response
     report_dict = {
@@ -644,29 +883,3 @@ async def upload_report_photo(
     }
     
     return report_dict
-
-
-@router.get("/public/approved", response_model=List[ReportResponse])
-async def get_public_approved_reports(
-    limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)
-):
-    """
-    Get approved reports for public display (no authentication required).
-    
-    This endpoint is used for the home page banner to show recent approved reports.
-    
-    Args:
-        limit: Maximum number of reports to return (default: 5, max: 20)
-        db: Database session
-        
-    Returns:
-        List of approved reports ordered by creation date (newest first)
-    """
-    reports = db.query(Report)\
-        .filter(Report.status == 'approved')\
-        .order_by(Report.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    return reports
@@ -3,19 +3,22 @@ User and authentication routes.
 
 Handles user registration, login, and profile endpoints.
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import bcrypt
 from typing import List
 from backend.database import get_db
 from backend.models.user import User
-from backend.models.strike import Strike
+from backend.services.moderation import get_moderation_service
 from backend.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, ChangePassword
 from backend.auth.jwt_handler import create_access_token, get_current_user
 from backend.utils.curp_validator import validate_curp
+from backend.config import LOG_SAMPLE_RATE
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
+logger = logging.getLogger(__name__)
 
 
 def hash_password(password: str) -> str:
@@ -113,27 +116,23 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     # Find user by email
     user = db.query(User).filter(User.email == login_data.email).first()
     
-    # DEBUG: Log login attempt
-    print(f"\n🔐 Login attempt:")
-    print(f"   Email: {login_data.email}")
-    print(f"   User found: {user is not None}")
-    if user:
-        print(f"   User ID: {user.id}")
-        print(f"   User role: {user.role}")
-        print(f"   Hash (first 30): {user.hashed_password[:30]}")
-        password_valid = verify_password(login_data.password, user.hashed_password)
-        print(f"   Password valid: {password_valid}")
-    
-    # Verify user exists and password is correct
+    # Verify user exists and password is correct (bcrypt runs once)
     if not user or not verify_password(login_data.password, user.hashed_password):
-        print(f"   ❌ Login FAILED\n")
+        logger.warning(
+            "Login failed",
+            extra={"user_found": user is not None, "user_id": user.id if user else None}
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"   ✅ Login SUCCESS\n")
+    # Hot path: keep only a sample of successful logins
+    logger.info(
+        "Login succeeded",
+        extra={"user_id": user.id, "role": user.role, "sample_rate": LOG_SAMPLE_RATE}
+    )
     
     # Create access token
     access_token = create_access_token(
@@ -203,7 +202,7 @@ async def get_user_strikes(
         )
     
     # Get all strikes for this user
-    strikes = db.query(Strike).filter(Strike.user_id == user_id).order_by(Strike.created_at.desc()).all()
+    strikes = get_moderation_service(db).get_user_strikes(user_id)
     
     return {
         "user_id": user_id,
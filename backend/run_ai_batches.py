@@ -0,0 +1,94 @@
+"""
+Envía y aplica los batches de validación con IA (OpenAI Batch API).
+
+Primero consulta los batches en curso y aplica los resultados de los que
+terminaron; después envía un batch nuevo por tipo con los elementos
+pendientes (POIs en "pending_ia" y reportes sin análisis de IA). Ver
+backend/services/ai_batch.py.
+
+Pensado para cron (una pasada por ejecución) o para correr con --loop.
+
+Usage:
+    python -m backend.run_ai_batches
+    python -m backend.run_ai_batches --kind poi --no-submit
+    python -m backend.run_ai_batches --loop --interval 600
+    python -m backend.run_ai_batches --dry-run
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from backend.config import DATABASE_URL, AI_BATCH_INTERVAL_MINUTES, AI_VALIDATION_ENABLED
+from backend.services.ai_batch import AIBatchProcessor, KINDS
+
+
+def run_once(processor: AIBatchProcessor, kinds, poll: bool, submit: bool):
+    if poll:
+        finished = processor.poll()
+        for job in finished:
+            print(f"✅ {job.kind:<6} {job.openai_batch_id}: {job.status} | "
+                  f"{job.applied_count:,} aplicados, {job.failed_count:,} fallidos")
+        if not finished:
+            print("⏳ Ningún batch terminado")
+
+    if submit:
+        for kind in kinds:
+            job = processor.submit(kind)
+            if job:
+                print(f"📤 {kind:<6} {job.openai_batch_id}: {len(job.item_ids):,} elementos, "
+                      f"{job.request_count:,} solicitudes")
+            else:
+                print(f"ℹ️  {kind:<6} sin elementos pendientes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Envía y aplica batches de validación con IA")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Base de datos (default: DATABASE_URL)")
+    parser.add_argument("--kind", choices=KINDS + ("all",), default="all", help="Tipo de elementos (default: all)")
+    parser.add_argument("--no-poll", action="store_true", help="No consultar ni aplicar batches en curso")
+    parser.add_argument("--no-submit", action="store_true", help="No enviar batches nuevos")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar elementos pendientes")
+    parser.add_argument("--loop", action="store_true", help="Repetir hasta interrumpir")
+    parser.add_argument("--interval", type=float, default=AI_BATCH_INTERVAL_MINUTES * 60,
+                        help=f"Segundos entre pasadas con --loop (default: {AI_BATCH_INTERVAL_MINUTES * 60})")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📦 BATCHES DE VALIDACIÓN CON IA")
+    print("=" * 60)
+
+    if not AI_VALIDATION_ENABLED:
+        print("❌ La validación con IA está desactivada (OPENAI_API_KEY / AI_VALIDATION_ENABLED)")
+        sys.exit(1)
+
+    kinds = KINDS if args.kind == "all" else (args.kind,)
+    engine = create_engine(args.database_url)
+    try:
+        with Session(engine) as db:
+            processor = AIBatchProcessor(db)
+            if args.dry_run:
+                for kind in kinds:
+                    print(f"📄 {kind:<6} {processor.pending_count(kind):,} elementos pendientes")
+                return
+
+            while True:
+                started = time.perf_counter()
+                run_once(processor, kinds, poll=not args.no_poll, submit=not args.no_submit)
+                print(f"⏱️  {time.perf_counter() - started:.1f} s")
+                if not args.loop:
+                    break
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrumpido")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
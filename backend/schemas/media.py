@@ -0,0 +1,45 @@
+"""
+Pydantic schemas for media uploads.
+
+Used by the direct-to-storage (presigned) upload flow.
+"""
+from typing import Optional, Dict
+from pydantic import BaseModel, Field
+
+
+class MediaPresignRequest(BaseModel):
+    """
+    Schema for requesting a presigned direct upload.
+
+    The client computes the SHA-256 of the file before uploading, so the
+    server can answer with an existing blob instead of a new upload.
+    """
+    sha256: str = Field(..., pattern="^[0-9a-f]{64}$")
+    extension: str = Field(..., pattern=r"^\.(jpg|jpeg|png|gif|webp)$")
+    size: int = Field(..., gt=0)
+
+
+class MediaConfirmRequest(BaseModel):
+    """Schema for confirming a finished direct upload (same size as presigned)."""
+    sha256: str = Field(..., pattern="^[0-9a-f]{64}$")
+    extension: str = Field(..., pattern=r"^\.(jpg|jpeg|png|gif|webp)$")
+    size: int = Field(..., gt=0)
+
+
+class MediaPresignResponse(BaseModel):
+    """
+    Presigned upload instructions.
+
+    If `exists` is true the content is already stored and `photo_url` can be
+    used right away; otherwise the client sends `upload.method` to
+    `upload.url` with `upload.headers` and then calls /media/confirm.
+    """
+    exists: bool
+    photo_url: str
+    upload: Optional[Dict] = None
+
+
+class MediaUploadResponse(BaseModel):
+    """Stored media reference."""
+    photo_url: str
+    content_hash: str
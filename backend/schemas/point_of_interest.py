@@ -243,3 +243,57 @@ class POIStatsResponse(BaseModel):
     rejected: int
     by_category: Dict[str, int]
     by_spam_level: Dict[str, int]
+
+
+class POIImportRow(POICreate):
+    """
+    Fila de un dataset oficial (CSV/GeoJSON).
+    A diferencia de POICreate, la categoría viene en el dataset.
+    """
+    categoria: Optional[str] = Field(None, max_length=50)
+    subcategoria: Optional[str] = Field(None, max_length=50)
+
+
+class POIImportRowError(BaseModel):
+    """
+    Error de validación de una fila importada.
+    """
+    row: int
+    error: str
+
+
+class POIImportResult(BaseModel):
+    """
+    Resumen de una importación masiva de POIs.
+    """
+    source: str
+    dry_run: bool
+    processed: int
+    inserted: int
+    updated: int
+    invalid: int
+    batches: int
+    duration_seconds: float
+    errors: List[POIImportRowError]
+
+
+class POISearchResponse(BaseModel):
+    """
+    Resultados paginados de búsqueda de texto completo.
+    """
+    items: List[POIPublicResponse]
+    total: int
+    page: int
+    page_size: int
+
+
+class POISuggestion(BaseModel):
+    """
+    Sugerencia de autocompletado.
+    type: "poi" (con id y categoría), "categoria" o "colonia" (con count).
+    """
+    type: str
+    text: str
+    id: Optional[int] = None
+    categoria: Optional[str] = None
+    count: Optional[int] = None
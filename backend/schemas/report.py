@@ -4,7 +4,7 @@ Report Pydantic schemas for request/response validation.
 Defines validation models for report-related API operations.
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -85,3 +85,19 @@ class ReportResponse(BaseModel):
     
     class Config:
         from_attributes = True  # Enables ORM mode for SQLAlchemy models
+
+
+class ReportSearchResponse(BaseModel):
+    """
+    Schema for paginated full-text search results.
+    
+    Attributes:
+        items: Reports on this page, best match first
+        total: Total number of matching reports
+        page: Current page (1-based)
+        page_size: Results per page
+    """
+    items: List[ReportResponse]
+    total: int
+    page: int
+    page_size: int
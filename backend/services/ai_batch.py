@@ -0,0 +1,343 @@
+"""
+OpenAI Batch API mode for non-interactive validations.
+
+POI validation and the re-analysis of reports that were stored without AI
+(AI disabled, circuit breaker open, OpenAI errors) don't need interactive
+latency. Instead of one chat completion per item in the request path,
+pending items are written to a JSONL file, submitted as a batch job (half
+the price of synchronous calls, results within the completion window),
+polled, and the results are applied in bulk:
+
+- POIs with ia_status "pending_ia" (new POIs wait here when
+  AI_BATCH_ENABLED is set): data + photo requests per POI, combined with
+  the same rules as POIValidator.validate_poi
+- Reports still open whose analysis is missing or the local default
+  (ai_validated = 0 or DEFAULT_REASONING): text analysis as in
+  AIValidator.analyze_report
+
+Each submission is recorded in ai_batch_jobs; items of a job still in
+flight are not submitted again. Items whose request failed stay pending
+and go into the next batch.
+
+Run it with python -m backend.run_ai_batches (cron or --loop), or in the
+API process with AI_BATCH_WORKER_ENABLED (enable it in one process only).
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from openai import OpenAI
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models.ai_batch_job import AIBatchJob
+from backend.models.point_of_interest import PointOfInterest
+from backend.models.report import Report
+from backend.services.ai_validator import get_ai_validator, DEFAULT_REASONING
+from backend.services.poi_validator import poi_validator, apply_validation_result
+from backend.services.response_cache import invalidate_public_cache
+from backend.utils.metrics import record_openai_usage, AI_BATCH_ITEMS, BATCH_PRICE_FACTOR
+from backend.config import (
+    OPENAI_API_KEY, AI_VALIDATION_ENABLED, AI_BATCH_WORKER_ENABLED, AI_BATCH_INTERVAL_MINUTES,
+    AI_BATCH_MAX_ITEMS, AI_BATCH_MAX_MB, AI_BATCH_COMPLETION_WINDOW
+)
+
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("poi", "report")
+VALIDATORS = {"poi": "poi_validator", "report": "ai_validator"}
+# OpenAI statuses of a batch whose results are not available yet
+IN_FLIGHT = ("validating", "in_progress", "finalizing", "cancelling")
+FAILED = ("failed", "expired", "cancelled")
+QUERY_BATCH_SIZE = 500
+
+
+class AIBatchProcessor:
+    """Builds, submits and applies OpenAI batch jobs"""
+
+    def __init__(self, db: Session, client: Optional[OpenAI] = None,
+                 max_items: int = AI_BATCH_MAX_ITEMS, max_bytes: int = AI_BATCH_MAX_MB * 1024 * 1024):
+        self.db = db
+        # Non-interactive: the SDK's own retries are fine here
+        self.client = client or OpenAI(api_key=OPENAI_API_KEY)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def pending_count(self, kind: str) -> int:
+        """Items waiting for a batch (excluding those already in flight)."""
+        return self._pending_query(kind, self._in_flight_ids(kind)).count()
+
+    def submit(self, kind: str) -> Optional[AIBatchJob]:
+        """
+        Submit one batch job with up to max_items pending items.
+
+        Returns:
+            The new job, or None if nothing was pending
+        """
+        if not AI_VALIDATION_ENABLED:
+            return None
+
+        with tempfile.NamedTemporaryFile("w+b", suffix=".jsonl", delete=False) as f:
+            path = f.name
+        try:
+            item_ids, request_count = self._write_requests(kind, path)
+            if not item_ids:
+                return None
+
+            with open(path, "rb") as f:
+                uploaded = self.client.files.create(file=(f"{kind}-batch.jsonl", f), purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/v1/chat/completions",
+                completion_window=AI_BATCH_COMPLETION_WINDOW,
+                metadata={"kind": kind}
+            )
+        finally:
+            os.remove(path)
+
+        job = AIBatchJob(
+            kind=kind,
+            openai_batch_id=batch.id,
+            input_file_id=uploaded.id,
+            status=batch.status,
+            item_ids=item_ids,
+            request_count=request_count
+        )
+        self.db.add(job)
+        self.db.commit()
+        AI_BATCH_ITEMS.inc(len(item_ids), kind=kind, outcome="submitted")
+        logger.info("AI batch submitted", extra={
+            "kind": kind, "batch_id": batch.id, "items": len(item_ids), "requests": request_count
+        })
+        return job
+
+    def _write_requests(self, kind: str, path: str) -> Tuple[List[int], int]:
+        """Write JSONL requests for pending items until max_items/max_bytes."""
+        item_ids: List[int] = []
+        request_count = 0
+        size = 0
+        with open(path, "wb") as f:
+            for item in self._pending_items(kind):
+                lines = self._requests_for(kind, item)
+                encoded = b"".join(json.dumps(line, ensure_ascii=False).encode() + b"\n" for line in lines)
+                if item_ids and size + len(encoded) > self.max_bytes:
+                    break
+                f.write(encoded)
+                size += len(encoded)
+                item_ids.append(item.id)
+                request_count += len(lines)
+                if len(item_ids) >= self.max_items:
+                    break
+        return item_ids, request_count
+
+    def _requests_for(self, kind: str, item) -> List[Dict]:
+        if kind == "poi":
+            return poi_validator.batch_requests(item)
+        return [get_ai_validator().batch_request(item)]
+
+    def _pending_items(self, kind: str) -> Iterator:
+        """Pending POIs/reports in id order, fetched in fixed-size pages."""
+        query = self._pending_query(kind, self._in_flight_ids(kind))
+        model = PointOfInterest if kind == "poi" else Report
+        last_id = 0
+        while True:
+            page = query.filter(model.id > last_id).order_by(model.id).limit(QUERY_BATCH_SIZE).all()
+            if not page:
+                return
+            yield from page
+            last_id = page[-1].id
+
+    def _pending_query(self, kind: str, exclude: Set[int]):
+        if kind == "poi":
+            query = self.db.query(PointOfInterest).filter(
+                PointOfInterest.ia_status == "pending_ia",
+                PointOfInterest.is_official.is_(False)
+            )
+            model = PointOfInterest
+        else:
+            query = self.db.query(Report).filter(
+                Report.status != "resuelto",
+                or_(Report.ai_validated == 0, Report.ai_reasoning == DEFAULT_REASONING)
+            )
+            model = Report
+        if exclude:
+            query = query.filter(model.id.notin_(exclude))
+        return query
+
+    def _in_flight_ids(self, kind: str) -> Set[int]:
+        jobs = self.db.query(AIBatchJob.item_ids)\
+            .filter(AIBatchJob.kind == kind, AIBatchJob.status.in_(IN_FLIGHT))\
+            .all()
+        return {item_id for (ids,) in jobs for item_id in ids}
+
+    # ------------------------------------------------------------------
+    # Polling and results
+    # ------------------------------------------------------------------
+
+    def poll(self) -> List[AIBatchJob]:
+        """
+        Refresh every in-flight job; apply the results of finished ones.
+
+        Returns:
+            Jobs that reached a final state in this call
+        """
+        finished = []
+        jobs = self.db.query(AIBatchJob).filter(AIBatchJob.status.in_(IN_FLIGHT)).order_by(AIBatchJob.id).all()
+        for job in jobs:
+            batch = self.client.batches.retrieve(job.openai_batch_id)
+            job.output_file_id = batch.output_file_id
+            job.error_file_id = batch.error_file_id
+            if batch.status in IN_FLIGHT:
+                job.status = batch.status
+                self.db.commit()
+                continue
+
+            try:
+                # Expired/cancelled batches can still carry partial output
+                if job.output_file_id:
+                    self._apply(job, self._read_results(job.output_file_id))
+                if job.error_file_id:
+                    job.failed_count += sum(1 for _ in self._read_results(job.error_file_id))
+                job.status = "applied" if batch.status == "completed" else batch.status
+                if batch.status in FAILED:
+                    errors = getattr(batch.errors, "data", None) or []
+                    job.error = "; ".join(e.message for e in errors if e.message) or batch.status
+            except Exception as e:
+                self.db.rollback()
+                logger.exception("Applying AI batch failed", extra={"batch_id": job.openai_batch_id})
+                job.status = "failed"
+                job.error = f"Error al aplicar resultados: {e}"
+            job.completed_at = datetime.now(timezone.utc)
+            self.db.commit()
+            AI_BATCH_ITEMS.inc(job.applied_count, kind=job.kind, outcome="applied")
+            AI_BATCH_ITEMS.inc(len(job.item_ids) - job.applied_count, kind=job.kind, outcome="failed")
+            logger.info("AI batch finished", extra={
+                "kind": job.kind, "batch_id": job.openai_batch_id, "status": job.status,
+                "applied": job.applied_count, "failed": job.failed_count
+            })
+            finished.append(job)
+        return finished
+
+    def _read_results(self, file_id: str) -> Iterator[Dict]:
+        content = self.client.files.content(file_id).text
+        for line in content.splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+    def _parse(self, job: AIBatchJob, line: Dict) -> Optional[Dict]:
+        """JSON verdict of one output line (None for failed requests)."""
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            return None
+        usage = body.get("usage")
+        if usage:
+            record_openai_usage(VALIDATORS[job.kind], "batch", body.get("model", ""),
+                                SimpleNamespace(**usage), price_factor=BATCH_PRICE_FACTOR)
+        try:
+            return json.loads(body["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    def _apply(self, job: AIBatchJob, lines: Iterator[Dict]) -> None:
+        results: Dict[int, Dict[str, Dict]] = {}
+        for line in lines:
+            parts = line.get("custom_id", "").split(":")
+            verdict = self._parse(job, line)
+            if verdict is None:
+                job.failed_count += 1
+                continue
+            item_id = int(parts[1])
+            results.setdefault(item_id, {})[parts[2] if len(parts) > 2 else "text"] = verdict
+
+        if job.kind == "poi":
+            job.applied_count = self._apply_pois(results)
+            invalidate_public_cache("pois")
+        else:
+            job.applied_count = self._apply_reports(results)
+            invalidate_public_cache("reports")
+
+    def _apply_pois(self, results: Dict[int, Dict[str, Dict]]) -> int:
+        applied = 0
+        ids = list(results)
+        for start in range(0, len(ids), QUERY_BATCH_SIZE):
+            # Skip POIs someone validated or deleted since submission
+            pois = self.db.query(PointOfInterest).filter(
+                PointOfInterest.id.in_(ids[start:start + QUERY_BATCH_SIZE]),
+                PointOfInterest.ia_status == "pending_ia"
+            ).all()
+            for poi in pois:
+                verdicts = results[poi.id]
+                combined = poi_validator.combine_batch_results(verdicts.get("data"), verdicts.get("photo"))
+                if combined is None:
+                    continue
+                apply_validation_result(poi, combined)
+                applied += 1
+        return applied
+
+    def _apply_reports(self, results: Dict[int, Dict[str, Dict]]) -> int:
+        validator = get_ai_validator()
+        applied = 0
+        ids = list(results)
+        for start in range(0, len(ids), QUERY_BATCH_SIZE):
+            reports = self.db.query(Report).filter(
+                Report.id.in_(ids[start:start + QUERY_BATCH_SIZE]),
+                or_(Report.ai_validated == 0, Report.ai_reasoning == DEFAULT_REASONING)
+            ).all()
+            for report in reports:
+                analysis = validator.batch_result(results[report.id]["text"], report.category)
+                report.ai_validated = 1
+                report.ai_confidence = analysis["confidence"]
+                report.ai_suggested_category = analysis["suggested_category"]
+                report.ai_urgency_level = analysis["urgency_level"]
+                report.ai_keywords = json.dumps(analysis["keywords"], ensure_ascii=False)
+                report.ai_reasoning = analysis["reasoning"]
+                # Same rule as report creation; only while nobody is working on it
+                if report.status == "pendiente" and analysis["confidence"] > 0.7:
+                    report.priority = analysis["suggested_priority"]
+                applied += 1
+        return applied
+
+
+def run_ai_batches(kinds: Tuple[str, ...] = KINDS, submit: bool = True) -> Dict:
+    """Poll in-flight jobs, then submit pending items, with its own session."""
+    db = SessionLocal()
+    try:
+        processor = AIBatchProcessor(db)
+        finished = processor.poll()
+        submitted = [job for job in (processor.submit(kind) for kind in kinds) if job] if submit else []
+        return {
+            "finished": [(job.kind, job.openai_batch_id, job.status, job.applied_count) for job in finished],
+            "submitted": [(job.kind, job.openai_batch_id, len(job.item_ids)) for job in submitted],
+        }
+    finally:
+        db.close()
+
+
+async def ai_batch_loop():
+    """Background task: poll and submit periodically without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            summary = await loop.run_in_executor(None, run_ai_batches)
+            if summary["finished"] or summary["submitted"]:
+                logger.info("AI batch cycle finished", extra=summary)
+        except Exception:
+            logger.exception("AI batch cycle failed")
+        await asyncio.sleep(AI_BATCH_INTERVAL_MINUTES * 60)
+
+
+def start_ai_batches() -> Optional[asyncio.Task]:
+    """Start the background batch worker if enabled in configuration."""
+    if not AI_BATCH_WORKER_ENABLED or not AI_VALIDATION_ENABLED:
+        return None
+    return asyncio.create_task(ai_batch_loop())
@@ -0,0 +1,281 @@
+"""
+Resilience layer for OpenAI calls: deadlines, retries and a circuit breaker.
+
+The validators used to rely on the OpenAI client defaults (10 minute
+timeout, two hidden retries per call) and chain up to three calls per
+request, so a slow OpenAI held requests (and their DB sessions) open for
+minutes. Every chat completion now goes through resilient_completion:
+
+- Per-call deadline: AI_CALL_TIMEOUT_SECONDS, never past the request budget
+- Request budget: ai_deadline() / request_ai_budget give all AI calls of a
+  request one shared deadline (AI_REQUEST_BUDGET_SECONDS); a call that
+  could not finish in what is left is not started
+- Retries: transient errors (timeouts, connection errors, 429, 5xx) are
+  retried with full-jitter exponential backoff, only while the request
+  budget allows it and the process-wide retry budget (AI_RETRY_BUDGET_RATIO
+  of recent calls) is not spent
+- Circuit breaker: when the transient error rate over the last
+  AI_BREAKER_WINDOW_SECONDS reaches AI_BREAKER_ERROR_RATE, calls fail
+  immediately with CircuitOpenError for AI_BREAKER_COOLDOWN_SECONDS, then a
+  single probe call decides whether to close again
+
+Callers already fall back to their local defaults on any exception; the
+validators also check is_open up front to skip the work entirely.
+"""
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+import openai
+from backend.config import (
+    AI_CALL_TIMEOUT_SECONDS, AI_REQUEST_BUDGET_SECONDS, AI_MAX_RETRIES, AI_RETRY_BUDGET_RATIO,
+    AI_BREAKER_ERROR_RATE, AI_BREAKER_MIN_CALLS, AI_BREAKER_WINDOW_SECONDS, AI_BREAKER_COOLDOWN_SECONDS
+)
+from backend.utils.metrics import openai_completion, AI_CALL_OUTCOMES, AI_BREAKER_STATE, AI_BREAKER_TRANSITIONS
+
+
+logger = logging.getLogger(__name__)
+
+# Don't start an attempt with less time than this left in the budget
+MIN_ATTEMPT_SECONDS = 2.0
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 4.0
+
+TRANSIENT_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class AIUnavailableError(Exception):
+    """The AI call was not made; callers should use their local fallback"""
+
+
+class CircuitOpenError(AIUnavailableError):
+    pass
+
+
+class DeadlineExceededError(AIUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over a sliding time window (thread-safe)"""
+
+    def __init__(
+        self,
+        error_rate: float = AI_BREAKER_ERROR_RATE,
+        min_calls: int = AI_BREAKER_MIN_CALLS,
+        window_seconds: float = AI_BREAKER_WINDOW_SECONDS,
+        cooldown_seconds: float = AI_BREAKER_COOLDOWN_SECONDS,
+        retry_ratio: float = AI_RETRY_BUDGET_RATIO
+    ):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.retry_ratio = retry_ratio
+        self._lock = Lock()
+        self._calls = deque()  # (timestamp, failed)
+        self._failures = 0
+        self._retries = deque()  # timestamps
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        AI_BREAKER_STATE.set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being short-circuited (cooldown not over)"""
+        return self._state == OPEN and time.monotonic() - self._opened_at < self.cooldown_seconds
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open, only one probe at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def allow_retry(self) -> bool:
+        """Take one retry from the process-wide retry budget, if any is left."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            budget = self.retry_ratio * max(len(self._calls), self.min_calls)
+            if self._state != CLOSED or len(self._retries) >= budget:
+                return False
+            self._retries.append(now)
+            return True
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of a call that was allowed through."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._calls.clear()
+                    self._failures = 0
+                    self._transition(CLOSED)
+                return
+
+            self._calls.append((now, failed))
+            self._failures += failed
+            self._trim(now)
+            if (self._state == CLOSED and len(self._calls) >= self.min_calls
+                    and self._failures / len(self._calls) >= self.error_rate):
+                logger.warning("OpenAI circuit breaker opened", extra={
+                    "calls": len(self._calls), "failures": self._failures,
+                    "cooldown_seconds": self.cooldown_seconds
+                })
+                self._open(now)
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._failures -= self._calls.popleft()[1]
+        while self._retries and self._retries[0] < horizon:
+            self._retries.popleft()
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            AI_BREAKER_STATE.set(STATE_VALUES[state])
+            AI_BREAKER_TRANSITIONS.inc(state=state)
+
+
+# Absolute time.monotonic() deadline shared by the AI calls of one request
+_deadline: ContextVar[Optional[float]] = ContextVar("ai_deadline", default=None)
+
+
+@contextmanager
+def ai_deadline(seconds: float = AI_REQUEST_BUDGET_SECONDS):
+    """
+    Scope an AI deadline budget. Nested scopes keep the outer deadline, so a
+    request that chains several validator methods shares one budget.
+    """
+    if _deadline.get() is not None:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def request_ai_budget() -> None:
+    """FastAPI dependency: one AI deadline budget for the whole request."""
+    _deadline.set(time.monotonic() + AI_REQUEST_BUDGET_SECONDS)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current AI budget (None when no budget is set)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _backoff(attempt: int, error: Exception) -> float:
+    delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+def resilient_completion(client, validator: str, method: str, **kwargs):
+    """
+    openai_completion with deadlines, bounded retries and the circuit breaker.
+
+    Args:
+        client: OpenAI client (created with max_retries=0; retries happen here)
+        validator: Validator name label ("ai_validator", "poi_validator")
+        method: Calling method label
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        The completion response
+
+    Raises:
+        CircuitOpenError: The breaker is open
+        DeadlineExceededError: Not enough budget left for an attempt
+        openai.OpenAIError: The last attempt's error
+    """
+    breaker = get_circuit_breaker()
+    attempt = 0
+    while True:
+        remaining = remaining_budget()
+        timeout = AI_CALL_TIMEOUT_SECONDS if remaining is None else min(AI_CALL_TIMEOUT_SECONDS, remaining)
+        if timeout < MIN_ATTEMPT_SECONDS:
+            AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="budget_exhausted")
+            raise DeadlineExceededError(f"{remaining or 0:.1f}s left in the AI budget")
+        if not breaker.allow():
+            AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="short_circuited")
+            raise CircuitOpenError("OpenAI circuit breaker is open")
+
+        try:
+            response = openai_completion(client, validator, method, timeout=timeout, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            breaker.record(failed=True)
+            delay = _backoff(attempt, e)
+            remaining = remaining_budget()
+            fits = remaining is None or remaining - delay >= MIN_ATTEMPT_SECONDS
+            if attempt >= AI_MAX_RETRIES or not fits or not breaker.allow_retry():
+                AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="failed")
+                raise
+            AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="retried")
+            logger.info("Retrying OpenAI call", extra={
+                "validator": validator, "method": method, "attempt": attempt + 1,
+                "delay_seconds": round(delay, 2), "error": type(e).__name__
+            })
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except Exception:
+            # Bad request, auth, etc.: not an availability problem
+            breaker.record(failed=False)
+            AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="failed")
+            raise
+
+        breaker.record(failed=False)
+        AI_CALL_OUTCOMES.inc(validator=validator, method=method, outcome="ok")
+        return response
+
+
+# Global instance
+_breaker_instance: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get or create the OpenAI circuit breaker instance"""
+    global _breaker_instance
+    if _breaker_instance is None:
+        _breaker_instance = CircuitBreaker()
+    return _breaker_instance
@@ -3,13 +3,246 @@ AI Validation Service using OpenAI GPT
 Analyzes civic reports to improve categorization and priority assignment
 Includes image analysis with GPT-4 Vision for complete validation
 """
+import logging
 from openai import OpenAI
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import json
 import base64
 import requests
 from pathlib import Path
-from backend.config import OPENAI_API_KEY, OPENAI_MODEL, AI_VALIDATION_ENABLED
+from backend.config import (
+    OPENAI_API_KEY, OPENAI_MODEL, AI_VALIDATION_ENABLED, TEXT_PREFILTER_ENABLED, REPORT_CLASSIFIER_ENABLED,
+    AI_STRONG_MODEL
+)
+from backend.utils.metrics import TEXT_PREFILTER_DECISIONS, REPORT_CLASSIFIER_PREDICTIONS
+from backend.services.text_prefilter import get_text_prefilter
+from backend.services.report_classifier import get_report_classifier
+from backend.services.model_router import routed_completion, image_part, confident, batch_line
+from backend.services.ai_resilience import resilient_completion, ai_deadline, get_circuit_breaker
+from backend.services.prompts import Prompt, register, get_prompt, literal
+
+logger = logging.getLogger(__name__)
+
+# Reasoning of _default_validation; reports stored with it had no AI analysis
+DEFAULT_REASONING = "Validación básica sin IA"
+
+
+# ---------------------------------------------------------------------------
+# Prompts (see services/prompts.py): static instructions first, the report's
+# values last, so consecutive calls share a cacheable prefix
+# ---------------------------------------------------------------------------
+
+REPORT_SYSTEM_PROMPT = """Eres un experto analista de reportes cívicos para municipios en Yucatán, México.
+Tu trabajo es analizar reportes ciudadanos sobre problemas urbanos y determinar:
+1. Si el reporte es válido y está en la categoría correcta
+2. El nivel de prioridad (1-5, donde 5 es crítico)
+3. El nivel de urgencia (low, medium, high, critical)
+4. Palabras clave relevantes
+5. Impacto estimado en la comunidad
+6. Recomendaciones para el personal municipal
+
+Categorías válidas (4 categorías englobadas):
+- via_mal_estado: Baches, grietas, fisuras, hundimientos, deformaciones y topes irregulares en calles
+- infraestructura_danada: Banquetas rotas, drenaje insuficiente, alcantarillas o tapas de registro dañadas
+- senalizacion_transito: Señalización dañada, semáforos fuera de servicio, pintura vial desgastada
+- iluminacion_visibilidad: Falta de alumbrado público, vegetación que obstruye visibilidad
+
+Responde SIEMPRE en formato JSON con esta estructura exacta:
+{
+    "is_valid": true/false,
+    "confidence": 0.0-1.0,
+    "suggested_category": "categoria",
+    "suggested_priority": 1-5,
+    "reasoning": "explicación breve",
+    "keywords": ["palabra1", "palabra2"],
+    "urgency_level": "low/medium/high/critical",
+    "estimated_impact": "descripción del impacto",
+    "recommendations": ["recomendación1", "recomendación2"]
+}"""
+
+register(Prompt(
+    "report_analysis", 1,
+    system=REPORT_SYSTEM_PROMPT,
+    user="""Analiza este reporte ciudadano:
+
+Categoría seleccionada: {category}
+Descripción: {description}
+{photo_info}
+
+Proporciona un análisis completo en formato JSON.""",
+    truncate=("description",)
+))
+
+MODERATION_SYSTEM_PROMPT = """Eres un moderador de contenido experto en detectar lenguaje ofensivo, vulgar e inapropiado en español.
+Debes ser ESTRICTO al detectar:
+- Groserías y palabras vulgares
+- Insultos y lenguaje ofensivo
+- Contenido sexual explícito
+- Amenazas o violencia
+- Discriminación
+- Spam o texto sin sentido (letras aleatorias, tecleo sin sentido)
+- Texto de prueba (menciones de "prueba", "test", "hackathon", "demo")
+- Descripciones extremadamente vagas (menos de 10 palabras sin contexto útil)
+
+IMPORTANTE:
+- Para texto de prueba: Sé AMIGABLE y CREATIVO, confirma que el sistema funciona
+- Para texto sin sentido: Pide descripción clara del problema
+- Para texto vago: Solicita más detalles específicos
+- NO rechaces descripciones cortas pero claras (ej: "bache grande en calle principal")
+
+Responde siempre en formato JSON."""
+
+MODERATION_CHECKS = """Analiza el siguiente texto de un reporte cívico y determina si contiene:
+- Lenguaje ofensivo, vulgar o groserías
+- Insultos o palabras inapropiadas
+- Contenido sexual explícito
+- Amenazas o violencia
+- Discriminación o discurso de odio
+- Spam o texto sin sentido (ej: "asdfghjkl", "snionioaendionodneiodnioqenioe")
+- Texto de prueba (ej: "esto es una prueba", "test", "prueba del sistema", "hackathon")
+- Descripciones extremadamente vagas que no explican el problema"""
+
+MODERATION_FEEDBACK = """IMPORTANTE: El mensaje "professional_feedback" debe:
+- Usar "detectamos" en lugar de "la IA detectó"
+- Ser profesional y respetuoso
+- Si es texto de prueba, ser CREATIVO y amigable: "¡Excelente! El sistema funciona perfectamente. Ahora que confirmaste que todo está listo, puedes crear tu reporte real cuando lo necesites. 🚀"
+- Si es texto sin sentido, explicar claramente: "Detectamos que el texto no tiene sentido. Por favor, describe el problema de infraestructura vial que deseas reportar."
+- Si es muy vago, pedir más detalles: "La descripción es muy general. Por favor, proporciona más detalles sobre el problema para que podamos atenderlo mejor."
+- Invitar al usuario a corregir el contenido"""
+
+MODERATION_SCHEMA = """Responde en formato JSON:
+{
+    "is_offensive": true/false,
+    "is_inappropriate": true/false,
+    "is_spam": true/false,
+    "is_test": true/false,
+    "is_nonsense": true/false,
+    "is_too_vague": true/false,
+    "offense_type": "vulgar/insult/sexual/threat/hate/spam/test/nonsense/vague/none",
+    "detected_words": ["palabra1", "palabra2"],
+    "severity": "low/medium/high/critical",
+    "requires_strike": true/false,
+    "rejection_reason": "razón específica si es ofensivo",
+    "professional_feedback": "mensaje profesional para el usuario usando 'detectamos'"
+}"""
+
+# v1: text to analyze in the middle of the user message
+register(Prompt(
+    "text_moderation", 1,
+    system=MODERATION_SYSTEM_PROMPT,
+    user=(
+        f"{literal(MODERATION_CHECKS)}\n\nTexto a analizar: \"{{description}}\"\n\n"
+        f"{literal(MODERATION_FEEDBACK)}\n\n{literal(MODERATION_SCHEMA)}"
+    ),
+    truncate=("description",)
+))
+# v2: all instructions in the system message, only the text in the user message
+register(Prompt(
+    "text_moderation", 2,
+    system="\n\n".join([MODERATION_SYSTEM_PROMPT, MODERATION_CHECKS, MODERATION_FEEDBACK, MODERATION_SCHEMA]),
+    user='Texto a analizar: "{description}"',
+    truncate=("description",)
+))
+
+VISION_RULES = """Eres un experto analista de imágenes para reportes cívicos municipales con ALTA SENSIBILIDAD para detectar imágenes inválidas.
+
+IMPORTANTE: Debes ser MUY ESTRICTO al validar imágenes. Rechaza cualquier imagen que:
+- Sea una selfie o foto de personas (rostros, retratos)
+- Sea un meme, captura de pantalla, o imagen de internet
+- No muestre CLARAMENTE el problema reportado
+- Sea una foto genérica que no evidencie el problema específico
+- Muestre algo completamente diferente a la categoría
+
+Tu trabajo es analizar la imagen y determinar:
+1. ¿Es una foto REAL del problema reportado? (no selfies, no memes, no screenshots)
+2. ¿Corresponde EXACTAMENTE a la categoría reportada?
+3. La severidad del problema (escala 1-10) - SOLO si es válida
+4. Detalles específicos observados
+5. Cantidad/magnitud del problema
+
+Categorías de problemas cívicos VÁLIDOS (4 categorías englobadas):
+- via_mal_estado: Baches, grietas, fisuras, hundimientos, deformaciones y topes irregulares en calles
+- infraestructura_danada: Banquetas rotas, drenaje insuficiente, alcantarillas o tapas de registro dañadas
+- senalizacion_transito: Señalización dañada, semáforos fuera de servicio, pintura vial desgastada
+- iluminacion_visibilidad: Falta de alumbrado público, vegetación que obstruye visibilidad
+
+EJEMPLOS DE IMÁGENES INVÁLIDAS:
+- Selfies o fotos de personas
+- Memes o imágenes de internet
+- Screenshots de redes sociales
+- Fotos que no muestran el problema
+- Imágenes borrosas donde no se ve nada
+- Fotos de interiores cuando el problema es exterior
+- Contenido ofensivo, vulgar o inapropiado
+- Gestos obscenos o contenido sexual
+- Violencia gráfica
+- Discriminación o discurso de odio
+
+DETECCIÓN DE CONTENIDO OFENSIVO:
+Debes identificar si la imagen contiene:
+- Lenguaje ofensivo visible (grafiti, letreros)
+- Gestos obscenos o vulgares
+- Contenido sexual o desnudez
+- Violencia o gore
+- Símbolos de odio o discriminación
+- Burlas o acoso hacia personas"""
+
+VISION_SCHEMA = """Responde SIEMPRE en formato JSON:
+{
+    "image_valid": true/false,
+    "confidence": 0.0-1.0 (qué tan seguro estás de este veredicto),
+    "matches_category": true/false,
+    "severity_score": 1-10 (o null si es inválida),
+    "observed_details": "descripción detallada de lo que ves",
+    "quantity_assessment": "mucho/moderado/poco" (o null si es inválida),
+    "is_joke_or_fake": true/false,
+    "is_offensive": true/false,
+    "is_inappropriate": true/false,
+    "offense_type": "selfie/meme/offensive/inappropriate/none",
+    "rejection_reason": "razón específica si es inválida, null si es válida",
+    "professional_feedback": "mensaje profesional y claro para el usuario",
+    "requires_strike": true/false,
+    "strike_severity": "low/medium/high/critical" (si requires_strike es true)
+}"""
+
+# v1: checklist after the report values in the user message
+register(Prompt(
+    "image_analysis", 1,
+    system=f"{VISION_RULES}\n\n{VISION_SCHEMA}",
+    user="""Analiza esta imagen de un reporte cívico:
+
+Categoría reportada: {category}
+Descripción del usuario: {description}
+
+Valida si la imagen:
+1. Corresponde a la categoría "{category}"
+2. Muestra evidencia real del problema
+3. No es una broma o imagen irrelevante
+4. Qué tan severo es el problema (1-10)
+5. Cantidad/magnitud del problema
+
+Proporciona análisis completo en JSON.""",
+    truncate=("description",)
+))
+# v2: checklist in the system message, only the report values in the user message
+register(Prompt(
+    "image_analysis", 2,
+    system=f"""{VISION_RULES}
+
+Valida si la imagen:
+1. Corresponde a la categoría reportada
+2. Muestra evidencia real del problema
+3. No es una broma o imagen irrelevante
+4. Qué tan severo es el problema (1-10)
+5. Cantidad/magnitud del problema
+
+{VISION_SCHEMA}""",
+    user="""Analiza esta imagen de un reporte cívico:
+
+Categoría reportada: {category}
+Descripción del usuario: {description}""",
+    truncate=("description",)
+))
 
 
 class AIValidator:
@@ -20,9 +253,10 @@ class AIValidator:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not configured in .env")
         
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        # Retries and timeouts are handled by ai_resilience
+        self.client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
         self.model = OPENAI_MODEL
-        self.vision_model = "gpt-4o"  # GPT-4 Vision for image analysis
+        self.vision_model = AI_STRONG_MODEL  # Strong tier; see model_router
     
     def analyze_report_with_image(
         self,
@@ -41,28 +275,33 @@ class AIValidator:
         Returns:
             Dict with complete analysis including image validation
         """
-        if not AI_VALIDATION_ENABLED:
+        if not AI_VALIDATION_ENABLED or get_circuit_breaker().is_open:
             return self._default_validation(category)
         
         try:
-            # Analyze image if provided
-            image_analysis = None
-            if image_path:
-                image_analysis = self._analyze_image(category, description, image_path)
-            
-            # Analyze text
-            text_analysis = self._analyze_text(category, description, bool(image_path))
+            with ai_deadline():
+                # Analyze image if provided
+                image_analysis = None
+                if image_path:
+                    image_analysis = self._analyze_image(category, description, image_path)
+                
+                # Analyze text
+                text_analysis = self._analyze_text(category, description, bool(image_path))
             
             # Combine analyses
             return self._combine_analyses(text_analysis, image_analysis, category)
             
         except Exception as e:
-            print(f"❌ Complete AI Validation Error: {e}")
+            logger.exception("Complete AI validation failed")
             return self._default_validation(category)
     
     def _analyze_image(self, category: str, description: str, image_path: str) -> Dict:
         """
-        Analyze image using GPT-4 Vision to validate it matches the report.
+        Analyze image with a vision model to validate it matches the report.
+        
+        The fast tier (low-detail image) answers clear, confident approvals;
+        rejections and low-confidence verdicts are re-checked by the strong
+        tier, since a rejected image can cost the user a strike.
         
         Returns:
             Dict with image analysis results
@@ -71,42 +310,39 @@ class AIValidator:
             # Encode image
             image_data = self._encode_image(image_path)
             
-            # Create vision prompt
-            prompt = self._build_vision_prompt(category, description)
+            prompt = get_prompt("image_analysis")
+            
+            def build_messages(detail: str):
+                return prompt.messages(
+                    image=image_part(image_data, detail), category=category, description=description
+                )
             
-            # Call GPT-4 Vision
-            response = self.client.chat.completions.create(
-                model=self.vision_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_vision_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                }
-                            }
-                        ]
-                    }
-                ],
+            return routed_completion(
+                self.client, "ai_validator", "analyze_image",
+                build_messages=build_messages,
+                accept=self._is_clear_image_approval,
+                prompt=prompt,
                 response_format={"type": "json_object"},
                 max_tokens=1000,
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
-            return result
-            
         except Exception as e:
-            print(f"⚠️  Image analysis failed: {e}")
+            logger.warning("Image analysis failed", extra={"error": str(e)})
             return None
     
+    @staticmethod
+    def _is_clear_image_approval(result: Dict) -> bool:
+        """Fast-tier image verdict that needs no second opinion"""
+        return (
+            result.get("image_valid") is True
+            and result.get("matches_category", True) is True
+            and not result.get("is_joke_or_fake")
+            and not result.get("is_offensive")
+            and not result.get("is_inappropriate")
+            and confident(result, "confidence")
+        )
+    
     def _encode_image(self, image_path: str) -> str:
         """Encode image to base64"""
         try:
@@ -118,26 +354,19 @@ class AIValidator:
                 with open(image_path, "rb") as image_file:
                     return base64.b64encode(image_file.read()).decode('utf-8')
         except Exception as e:
-            print(f"Error encoding image: {e}")
+            logger.warning("Error encoding image", extra={"error": str(e)})
             return None
     
     def _analyze_text(self, category: str, description: str, has_photo: bool) -> Dict:
         """Analyze text description (original method)"""
         try:
-            prompt = self._build_prompt(category, description, has_photo)
+            prompt = get_prompt("report_analysis")
             
-            response = self.client.chat.completions.create(
+            response = resilient_completion(
+                self.client, "ai_validator", "analyze_text",
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                prompt=prompt,
+                messages=self._report_messages(prompt, category, description, has_photo),
                 response_format={"type": "json_object"},
                 temperature=0.3,
                 max_tokens=800
@@ -147,85 +376,36 @@ class AIValidator:
             return result
             
         except Exception as e:
-            print(f"⚠️  Text analysis failed: {e}")
+            logger.warning("Text analysis failed", extra={"error": str(e)})
             return None
     
     def check_offensive_text(self, description: str) -> Dict:
         """
         Check if text contains offensive, vulgar, or inappropriate content.
         
+        Obvious cases are decided by the local pre-filter (see
+        text_prefilter); only ambiguous text is sent to the model.
+        
         Args:
             description: Text to analyze
             
         Returns:
             Dict with offensive content detection results
         """
+        if TEXT_PREFILTER_ENABLED:
+            local = get_text_prefilter().classify(description)
+            TEXT_PREFILTER_DECISIONS.inc(decision=local["decision"] if local else "escalated")
+            if local is not None:
+                return local
+        
         try:
-            prompt = f"""Analiza el siguiente texto de un reporte cívico y determina si contiene:
-- Lenguaje ofensivo, vulgar o groserías
-- Insultos o palabras inapropiadas
-- Contenido sexual explícito
-- Amenazas o violencia
-- Discriminación o discurso de odio
-- Spam o texto sin sentido (ej: "asdfghjkl", "snionioaendionodneiodnioqenioe")
-- Texto de prueba (ej: "esto es una prueba", "test", "prueba del sistema", "hackathon")
-- Descripciones extremadamente vagas que no explican el problema
-
-Texto a analizar: "{description}"
-
-IMPORTANTE: El mensaje "professional_feedback" debe:
-- Usar "detectamos" en lugar de "la IA detectó"
-- Ser profesional y respetuoso
-- Si es texto de prueba, ser CREATIVO y amigable: "¡Excelente! El sistema funciona perfectamente. Ahora que confirmaste que todo está listo, puedes crear tu reporte real cuando lo necesites. 🚀"
-- Si es texto sin sentido, explicar claramente: "Detectamos que el texto no tiene sentido. Por favor, describe el problema de infraestructura vial que deseas reportar."
-- Si es muy vago, pedir más detalles: "La descripción es muy general. Por favor, proporciona más detalles sobre el problema para que podamos atenderlo mejor."
-- Invitar al usuario a corregir el contenido
-
-Responde en formato JSON:
-{{
-    "is_offensive": true/false,
-    "is_inappropriate": true/false,
-    "is_spam": true/false,
-    "is_test": true/false,
-    "is_nonsense": true/false,
-    "is_too_vague": true/false,
-    "offense_type": "vulgar/insult/sexual/threat/hate/spam/test/nonsense/vague/none",
-    "detected_words": ["palabra1", "palabra2"],
-    "severity": "low/medium/high/critical",
-    "requires_strike": true/false,
-    "rejection_reason": "razón específica si es ofensivo",
-    "professional_feedback": "mensaje profesional para el usuario usando 'detectamos'"
-}}"""
-
-            response = self.client.chat.completions.create(
+            prompt = get_prompt("text_moderation")
+            
+            response = resilient_completion(
+                self.client, "ai_validator", "check_offensive_text",
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Eres un moderador de contenido experto en detectar lenguaje ofensivo, vulgar e inapropiado en español.
-Debes ser ESTRICTO al detectar:
-- Groserías y palabras vulgares
-- Insultos y lenguaje ofensivo
-- Contenido sexual explícito
-- Amenazas o violencia
-- Discriminación
-- Spam o texto sin sentido (letras aleatorias, tecleo sin sentido)
-- Texto de prueba (menciones de "prueba", "test", "hackathon", "demo")
-- Descripciones extremadamente vagas (menos de 10 palabras sin contexto útil)
-
-IMPORTANTE:
-- Para texto de prueba: Sé AMIGABLE y CREATIVO, confirma que el sistema funciona
-- Para texto sin sentido: Pide descripción clara del problema
-- Para texto vago: Solicita más detalles específicos
-- NO rechaces descripciones cortas pero claras (ej: "bache grande en calle principal")
-
-Responde siempre en formato JSON."""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                prompt=prompt,
+                messages=prompt.messages(description=description),
                 response_format={"type": "json_object"},
                 temperature=0.2,
                 max_tokens=500
@@ -235,7 +415,7 @@ Responde siempre en formato JSON."""
             return result
             
         except Exception as e:
-            print(f"⚠️  Offensive text check failed: {e}")
+            logger.warning("Offensive text check failed", extra={"error": str(e)})
             return {
                 "is_offensive": False,
                 "is_inappropriate": False,
@@ -251,6 +431,9 @@ Responde siempre en formato JSON."""
         """
         Analyze a civic report using AI to validate and improve categorization.
         
+        Answered by the locally trained classifier when it is confident
+        (see report_classifier); otherwise by OpenAI.
+        
         Args:
             category: User-selected category (via_mal_estado, infraestructura_danada, senalizacion_transito, iluminacion_visibilidad)
             description: User's description of the issue
@@ -274,23 +457,25 @@ Responde siempre en formato JSON."""
             # Return default validation if AI is disabled
             return self._default_validation(category)
         
+        classifier = get_report_classifier() if REPORT_CLASSIFIER_ENABLED else None
+        if classifier is not None:
+            local = classifier.analyze(category, description)
+            REPORT_CLASSIFIER_PREDICTIONS.inc(outcome="local" if local else "escalated")
+            if local is not None:
+                return local
+        
+        if get_circuit_breaker().is_open:
+            return self._default_validation(category)
+        
         try:
-            # Construct the prompt
-            prompt = self._build_prompt(category, description, has_photo)
+            prompt = get_prompt("report_analysis")
             
             # Call OpenAI API
-            response = self.client.chat.completions.create(
+            response = resilient_completion(
+                self.client, "ai_validator", "analyze_report",
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                prompt=prompt,
+                messages=self._report_messages(prompt, category, description, has_photo),
                 response_format={"type": "json_object"},
                 temperature=0.3,  # Lower temperature for more consistent results
                 max_tokens=800
@@ -303,51 +488,15 @@ Responde siempre en formato JSON."""
             return self._normalize_response(result, category)
             
         except Exception as e:
-            print(f"❌ AI Validation Error: {e}")
+            logger.exception("AI validation failed")
             # Fallback to default validation on error
             return self._default_validation(category)
     
-    def _get_system_prompt(self) -> str:
-        """Get the system prompt for the AI"""
-        return """Eres un experto analista de reportes cívicos para municipios en Yucatán, México.
-Tu trabajo es analizar reportes ciudadanos sobre problemas urbanos y determinar:
-1. Si el reporte es válido y está en la categoría correcta
-2. El nivel de prioridad (1-5, donde 5 es crítico)
-3. El nivel de urgencia (low, medium, high, critical)
-4. Palabras clave relevantes
-5. Impacto estimado en la comunidad
-6. Recomendaciones para el personal municipal
-
-Categorías válidas (4 categorías englobadas):
-- via_mal_estado: Baches, grietas, fisuras, hundimientos, deformaciones y topes irregulares en calles
-- infraestructura_danada: Banquetas rotas, drenaje insuficiente, alcantarillas o tapas de registro dañadas
-- senalizacion_transito: Señalización dañada, semáforos fuera de servicio, pintura vial desgastada
-- iluminacion_visibilidad: Falta de alumbrado público, vegetación que obstruye visibilidad
-
-Responde SIEMPRE en formato JSON con esta estructura exacta:
-{
-    "is_valid": true/false,
-    "confidence": 0.0-1.0,
-    "suggested_category": "categoria",
-    "suggested_priority": 1-5,
-    "reasoning": "explicación breve",
-    "keywords": ["palabra1", "palabra2"],
-    "urgency_level": "low/medium/high/critical",
-    "estimated_impact": "descripción del impacto",
-    "recommendations": ["recomendación1", "recomendación2"]
-}"""
-    
-    def _build_prompt(self, category: str, description: str, has_photo: bool) -> str:
-        """Build the user prompt"""
+    @staticmethod
+    def _report_messages(prompt: Prompt, category: str, description: str, has_photo: bool) -> List[Dict]:
+        """Messages for the report text analysis (interactive and batch)."""
         photo_info = "El reporte INCLUYE una fotografía." if has_photo else "El reporte NO incluye fotografía."
-        
-        return f"""Analiza este reporte ciudadano:
-
-Categoría seleccionada: {category}
-Descripción: {description}
-{photo_info}
-
-Proporciona un análisis completo en formato JSON."""
+        return prompt.messages(category=category, description=description, photo_info=photo_info)
     
     def _normalize_response(self, result: Dict, original_category: str) -> Dict:
         """Normalize and validate AI response"""
@@ -383,7 +532,7 @@ Proporciona un análisis completo en formato JSON."""
             "confidence": 0.5,
             "suggested_category": category,
             "suggested_priority": 3,
-            "reasoning": "Validación básica sin IA",
+            "reasoning": DEFAULT_REASONING,
             "keywords": [],
             "urgency_level": "medium",
             "estimated_impact": "Requiere evaluación manual",
@@ -393,83 +542,27 @@ Proporciona un análisis completo en formato JSON."""
             "severity_score": 5
         }
     
-    def _get_vision_system_prompt(self) -> str:
-        """System prompt for GPT-4 Vision"""
-        return """Eres un experto analista de imágenes para reportes cívicos municipales con ALTA SENSIBILIDAD para detectar imágenes inválidas.
-
-IMPORTANTE: Debes ser MUY ESTRICTO al validar imágenes. Rechaza cualquier imagen que:
-- Sea una selfie o foto de personas (rostros, retratos)
-- Sea un meme, captura de pantalla, o imagen de internet
-- No muestre CLARAMENTE el problema reportado
-- Sea una foto genérica que no evidencie el problema específico
-- Muestre algo completamente diferente a la categoría
-
-Tu trabajo es analizar la imagen y determinar:
-1. ¿Es una foto REAL del problema reportado? (no selfies, no memes, no screenshots)
-2. ¿Corresponde EXACTAMENTE a la categoría reportada?
-3. La severidad del problema (escala 1-10) - SOLO si es válida
-4. Detalles específicos observados
-5. Cantidad/magnitud del problema
-
-Categorías de problemas cívicos VÁLIDOS (4 categorías englobadas):
-- via_mal_estado: Baches, grietas, fisuras, hundimientos, deformaciones y topes irregulares en calles
-- infraestructura_danada: Banquetas rotas, drenaje insuficiente, alcantarillas o tapas de registro dañadas
-- senalizacion_transito: Señalización dañada, semáforos fuera de servicio, pintura vial desgastada
-- iluminacion_visibilidad: Falta de alumbrado público, vegetación que obstruye visibilidad
-
-EJEMPLOS DE IMÁGENES INVÁLIDAS:
-- Selfies o fotos de personas
-- Memes o imágenes de internet
-- Screenshots de redes sociales
-- Fotos que no muestran el problema
-- Imágenes borrosas donde no se ve nada
-- Fotos de interiores cuando el problema es exterior
-- Contenido ofensivo, vulgar o inapropiado
-- Gestos obscenos o contenido sexual
-- Violencia gráfica
-- Discriminación o discurso de odio
-
-DETECCIÓN DE CONTENIDO OFENSIVO:
-Debes identificar si la imagen contiene:
-- Lenguaje ofensivo visible (grafiti, letreros)
-- Gestos obscenos o vulgares
-- Contenido sexual o desnudez
-- Violencia o gore
-- Símbolos de odio o discriminación
-- Burlas o acoso hacia personas
-
-Responde SIEMPRE en formato JSON:
-{
-    "image_valid": true/false,
-    "matches_category": true/false,
-    "severity_score": 1-10 (o null si es inválida),
-    "observed_details": "descripción detallada de lo que ves",
-    "quantity_assessment": "mucho/moderado/poco" (o null si es inválida),
-    "is_joke_or_fake": true/false,
-    "is_offensive": true/false,
-    "is_inappropriate": true/false,
-    "offense_type": "selfie/meme/offensive/inappropriate/none",
-    "rejection_reason": "razón específica si es inválida, null si es válida",
-    "professional_feedback": "mensaje profesional y claro para el usuario",
-    "requires_strike": true/false,
-    "strike_severity": "low/medium/high/critical" (si requires_strike es true)
-}"""
+    # ------------------------------------------------------------------
+    # Batch mode (OpenAI Batch API, see services/ai_batch.py)
+    # ------------------------------------------------------------------
     
-    def _build_vision_prompt(self, category: str, description: str) -> str:
-        """Build prompt for vision analysis"""
-        return f"""Analiza esta imagen de un reporte cívico:
-
-Categoría reportada: {category}
-Descripción del usuario: {description}
-
-Valida si la imagen:
-1. Corresponde a la categoría "{category}"
-2. Muestra evidencia real del problema
-3. No es una broma o imagen irrelevante
-4. Qué tan severo es el problema (1-10)
-5. Cantidad/magnitud del problema
-
-Proporciona análisis completo en JSON."""
+    def batch_request(self, report) -> Dict:
+        """
+        JSONL request that re-analyzes a report's text in a batch.
+        
+        Same prompt and model as analyze_report; custom_id is "report:<id>".
+        """
+        return batch_line(
+            f"report:{report.id}", self.model,
+            self._report_messages(
+                get_prompt("report_analysis"), report.category, report.description, bool(report.photo_url)
+            ),
+            max_tokens=800
+        )
+    
+    def batch_result(self, result: Dict, category: str) -> Dict:
+        """Normalized analysis from a batch response."""
+        return self._normalize_response(result, category)
     
     def _combine_analyses(self, text_analysis: Dict, image_analysis: Dict, category: str) -> Dict:
         """Combine text and image analyses into final result"""
@@ -0,0 +1,270 @@
+"""
+Idempotency-Key support for create endpoints.
+
+Mobile clients on flaky networks retry POST /reports/ and
+POST /points-of-interest/ when a response is lost, which created duplicate
+rows and ran the AI validation again. A request sent with an
+Idempotency-Key header now claims (user, key) in idempotency_keys before
+doing any work:
+
+- First request: runs normally; its response (the created record, or a
+  4xx such as a rejected photo) is stored with the key
+- Retry with the same key and body: gets the stored response with an
+  Idempotency-Replayed header, no validation or insert
+- Retry while the first one is still running: 409 with Retry-After
+- Same key with a different body or endpoint: 422
+- 5xx and unexpected errors release the key so the retry runs again;
+  a claim left unfinished (crashed worker) can be retaken after
+  IDEMPOTENCY_LOCK_SECONDS
+
+Rows expire after IDEMPOTENCY_TTL_HOURS and are deleted periodically by
+the workers. Requests without the header behave as before.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.models.idempotency_key import IdempotencyKey
+from backend.utils.metrics import IDEMPOTENCY_REQUESTS
+from backend.config import IDEMPOTENCY_ENABLED, IDEMPOTENCY_TTL_HOURS, IDEMPOTENCY_LOCK_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+# Delete expired keys this often (per worker)
+CLEANUP_INTERVAL_SECONDS = 600
+# Retry-After for a retry that arrives while the original is running
+IN_PROGRESS_RETRY_AFTER_SECONDS = 2
+
+
+def request_hash(endpoint: str, payload: BaseModel) -> str:
+    """SHA-256 of the endpoint and the validated request body."""
+    canonical = json.dumps(
+        {"endpoint": endpoint, "body": jsonable_encoder(payload)},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every value is written in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class IdempotencyStore:
+    """Claims and stored responses in idempotency_keys"""
+
+    def __init__(self, ttl_hours: int = IDEMPOTENCY_TTL_HOURS, lock_seconds: int = IDEMPOTENCY_LOCK_SECONDS):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.lock = timedelta(seconds=lock_seconds)
+        self._last_cleanup = 0.0
+
+    def claim(
+        self, db: Session, user_id: int, key: str, endpoint: str, digest: str
+    ) -> Tuple[Optional[IdempotencyKey], Optional[datetime]]:
+        """
+        Claim a key for a new request.
+
+        Returns:
+            (row, None) with the stored response to replay, or
+            (None, claimed_at) if the caller should run the request;
+            claimed_at identifies this claim in complete() and release()
+
+        Raises:
+            HTTPException 409: The original request is still running
+            HTTPException 422: The key was used for a different request
+        """
+        self._cleanup(db)
+        for _ in range(3):
+            now = datetime.now(timezone.utc)
+            db.add(IdempotencyKey(user_id=user_id, key=key, endpoint=endpoint, request_hash=digest,
+                                  created_at=now))
+            try:
+                db.commit()
+                IDEMPOTENCY_REQUESTS.inc(endpoint=endpoint, outcome="new")
+                return None, now
+            except IntegrityError:
+                db.rollback()
+
+            row = db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+            if row is None:
+                continue  # Deleted in between
+            age = now - _aware(row.created_at)
+            if age < self.ttl and row.request_hash != digest:
+                IDEMPOTENCY_REQUESTS.inc(endpoint=endpoint, outcome="key_reused")
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={
+                        "error": "idempotency_key_reused",
+                        "message": "La clave Idempotency-Key ya se usó con otra solicitud"
+                    }
+                )
+            if age < self.ttl and row.status_code is not None:
+                IDEMPOTENCY_REQUESTS.inc(endpoint=endpoint, outcome="replayed")
+                return row, None
+            if age < self.lock:
+                IDEMPOTENCY_REQUESTS.inc(endpoint=endpoint, outcome="in_progress")
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={
+                        "error": "idempotency_in_progress",
+                        "message": "Esta solicitud todavía se está procesando. Intenta de nuevo en unos segundos."
+                    },
+                    headers={"Retry-After": str(IN_PROGRESS_RETRY_AFTER_SECONDS)}
+                )
+
+            # Expired, or abandoned by a crashed worker: retake it unless
+            # another retry got there first
+            retaken = db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                       IdempotencyKey.created_at == row.created_at)
+                .values(endpoint=endpoint, request_hash=digest, status_code=None, response=None,
+                        created_at=now)
+            ).rowcount
+            db.commit()
+            if retaken:
+                IDEMPOTENCY_REQUESTS.inc(endpoint=endpoint, outcome="new")
+                return None, now
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "idempotency_in_progress",
+                "message": "Esta solicitud todavía se está procesando. Intenta de nuevo en unos segundos."
+            },
+            headers={"Retry-After": str(IN_PROGRESS_RETRY_AFTER_SECONDS)}
+        )
+
+    def settled(self, db: Session, user_id: int, key: str, endpoint: str) -> bool:
+        """
+        Whether a request with this key will be answered from the store.
+
+        True for a stored response (replay) or a claim still within
+        IDEMPOTENCY_LOCK_SECONDS (409) on the same endpoint: the handler
+        won't run, so callers can skip work done ahead of it, such as AI
+        rate limiting. A claim that could be retaken, or one made on
+        another endpoint, counts as not settled.
+        """
+        row = db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+        if row is None or row.endpoint != endpoint:
+            return False
+        age = datetime.now(timezone.utc) - _aware(row.created_at)
+        return age < self.ttl and (row.status_code is not None or age < self.lock)
+
+    def complete(
+        self, db: Session, user_id: int, key: str, claimed_at: datetime, status_code: int, response: Any
+    ) -> None:
+        """
+        Store the response of a claimed request.
+
+        A request that outlived IDEMPOTENCY_LOCK_SECONDS may have had its
+        claim retaken by a retry; matching on claimed_at keeps it from
+        overwriting the retry's row.
+        """
+        db.rollback()
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                   IdempotencyKey.created_at == claimed_at)
+            .values(status_code=status_code, response=response)
+        )
+        db.commit()
+
+    def release(self, db: Session, user_id: int, key: str, claimed_at: datetime) -> None:
+        """Drop an unfinished claim so a retry runs the request again (only this request's claim)."""
+        db.rollback()
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                   IdempotencyKey.created_at == claimed_at, IdempotencyKey.status_code.is_(None))
+        )
+        db.commit()
+
+    def _cleanup(self, db: Session) -> None:
+        if time.monotonic() - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = time.monotonic()
+        deleted = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < datetime.now(timezone.utc) - self.ttl)
+        ).rowcount
+        db.commit()
+        if deleted:
+            logger.info("Expired idempotency keys deleted", extra={"deleted": deleted})
+
+
+# Global instance
+_idempotency_store_instance: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get or create the idempotency store instance"""
+    global _idempotency_store_instance
+    if _idempotency_store_instance is None:
+        _idempotency_store_instance = IdempotencyStore()
+    return _idempotency_store_instance
+
+
+async def idempotent_response(
+    db: Session,
+    user_id: int,
+    key: Optional[str],
+    endpoint: str,
+    payload: BaseModel,
+    handle: Callable[[], Awaitable[Any]],
+    response_model: Type[BaseModel],
+    status_code: int = status.HTTP_201_CREATED
+) -> Any:
+    """
+    Run a create handler at most once per Idempotency-Key.
+
+    Args:
+        db: Database session
+        user_id: Authenticated user (keys are scoped per user)
+        key: Idempotency-Key header value (None runs the handler as usual)
+        endpoint: Endpoint label ("reports", "pois"), part of the request hash
+        payload: Validated request body
+        handle: Coroutine function doing the actual work
+        response_model: Route response model, used to store the response
+        status_code: Route success status
+
+    Returns:
+        The handler's result, or a JSONResponse replaying the stored one
+    """
+    if not key or not IDEMPOTENCY_ENABLED:
+        return await handle()
+
+    store = get_idempotency_store()
+    stored, claimed_at = store.claim(db, user_id, key, endpoint, request_hash(endpoint, payload))
+    if stored is not None:
+        return JSONResponse(
+            content=stored.response,
+            status_code=stored.status_code,
+            headers={"Idempotency-Replayed": "true"}
+        )
+
+    try:
+        result = await handle()
+    except HTTPException as e:
+        if e.status_code < 500:
+            # Rejections (invalid image, location...) are answered the same way on retry
+            store.complete(db, user_id, key, claimed_at, e.status_code, {"detail": jsonable_encoder(e.detail)})
+        else:
+            store.release(db, user_id, key, claimed_at)
+        raise
+    except Exception:
+        store.release(db, user_id, key, claimed_at)
+        raise
+
+    store.complete(db, user_id, key, claimed_at, status_code,
+                   jsonable_encoder(response_model.model_validate(result)))
+    return result
@@ -0,0 +1,282 @@
+"""
+Local screening of report photos against previously rejected ones.
+
+Users who get a photo rejected (memes, screenshots, jokes, offensive
+content) often upload it again, sometimes re-encoded, resized or slightly
+edited. Every rejection is fingerprinted and stored in rejected_images;
+/reports/validate-photo checks new uploads against the index before the
+vision call and answers matches with the stored rejection, no OpenAI call.
+
+- Exact re-uploads: same content hash (media store sha256), no decoding
+- Near-duplicates: 64-bit difference hash (dHash) of a 9x8 grayscale
+  thumbnail, matched within IMAGE_SCREEN_MAX_DISTANCE differing bits
+  through multi-index hashing (a lookup compares a small part of the index)
+- dHash needs Pillow; without it only exact re-uploads are caught
+- Low-information hashes (flat, dark, low-texture photos) are only matched
+  exactly, never as near-duplicates
+- A near-duplicate of another user's rejection only sends the upload to
+  the vision model; the stored verdict (and its strike) is reused for the
+  same file or the same uploader only
+- Each worker keeps its own copy and loads new rows from other workers
+  every IMAGE_SCREEN_REFRESH_SECONDS
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from io import BytesIO
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import requests
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from backend.models.rejected_image import RejectedImage
+from backend.utils.metrics import IMAGE_SCREEN_LOOKUPS, IMAGE_SCREEN_INDEX_SIZE
+from backend.config import IMAGE_SCREEN_MAX_DISTANCE, IMAGE_SCREEN_REFRESH_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+# Hashes with fewer minority bits than this (nearly all 0s or all 1s: dark,
+# flat or low-texture photos) collide too easily for near-duplicate matching
+LOW_INFORMATION_BITS = 8
+# Fields of the AI verdict stored with a rejection and returned on a match
+ANALYSIS_FIELDS = (
+    "image_valid", "image_matches_category", "is_joke_or_fake", "is_offensive", "is_inappropriate",
+    "offense_type", "requires_strike", "strike_severity", "observed_details", "rejection_reason",
+    "professional_feedback",
+)
+
+_pillow_warned = False
+
+
+def dhash(data: bytes) -> Optional[int]:
+    """
+    64-bit difference hash of an image.
+
+    Each bit says whether a pixel of a 9x8 grayscale thumbnail is brighter
+    than its right neighbour, so the hash survives re-encoding, resizing
+    and small edits. Returns None if Pillow is missing or the data can't
+    be decoded.
+    """
+    global _pillow_warned
+    try:
+        # Imported lazily: optional dependency
+        from PIL import Image, ImageOps
+    except ImportError:
+        if not _pillow_warned:
+            logger.warning("Pillow not installed: rejected photo screening only matches exact re-uploads")
+            _pillow_warned = True
+        return None
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            # JPEG: decode at reduced scale, we only need a thumbnail
+            image.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+            image = ImageOps.exif_transpose(image).convert("L")
+            pixels = list(image.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS).getdata())
+    except Exception as e:
+        logger.info("Could not fingerprint image", extra={"error": str(e)})
+        return None
+
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def image_fingerprint(source: str) -> Optional[int]:
+    """dHash of a media store source (local path or fetchable URL)."""
+    try:
+        if source.startswith("http"):
+            response = requests.get(source, timeout=10)
+            response.raise_for_status()
+            data = response.content
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+    except Exception as e:
+        logger.warning("Could not read image for fingerprinting", extra={"error": str(e)})
+        return None
+    return dhash(data)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def low_information(value: int, bits: int = HASH_SIZE * HASH_SIZE) -> bool:
+    """Whether a hash is almost all 0 or all 1 bits."""
+    ones = value.bit_count()
+    return min(ones, bits - ones) < LOW_INFORMATION_BITS
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes with Hamming distance.
+
+    The hash is split into radius + 1 disjoint chunks, each with its own
+    exact-match table. Two hashes within radius bits must agree exactly on
+    at least one chunk (pigeonhole), so a search only compares against the
+    entries sharing a chunk with the query instead of the whole index.
+    """
+
+    def __init__(self, radius: int, bits: int = HASH_SIZE * HASH_SIZE):
+        chunks = min(radius + 1, bits)
+        bounds = [bits * i // chunks for i in range(chunks + 1)]
+        # (shift, mask) per chunk
+        self._chunks = [(start, (1 << (stop - start)) - 1) for start, stop in zip(bounds, bounds[1:])]
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._chunks]
+        self._entries: List[Tuple[int, object]] = []
+        self.radius = radius
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, value_hash: int, value) -> None:
+        position = len(self._entries)
+        self._entries.append((value_hash, value))
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value_hash >> shift) & mask, []).append(position)
+
+    def search(self, query: int) -> List[Tuple[int, object]]:
+        """(distance, value) pairs within radius, closest first."""
+        candidates = set()
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            candidates.update(table.get((query >> shift) & mask, ()))
+        found = []
+        for position in candidates:
+            value_hash, value = self._entries[position]
+            distance = hamming(query, value_hash)
+            if distance <= self.radius:
+                found.append((distance, value))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+@dataclass
+class ScreenMatch:
+    """A previously rejected image matching an upload"""
+    entry_id: int
+    distance: int
+    analysis: Dict
+    user_id: Optional[int]
+    # Same file (sha256), not just a close or equal dHash
+    exact: bool = False
+
+
+class RejectedImageIndex:
+    """In-memory index of rejected_images, loaded incrementally"""
+
+    def __init__(self, max_distance: int = IMAGE_SCREEN_MAX_DISTANCE,
+                 refresh_seconds: int = IMAGE_SCREEN_REFRESH_SECONDS):
+        self.max_distance = max_distance
+        self.refresh_seconds = refresh_seconds
+        self._hashes = MultiIndexHash(max_distance)
+        self._by_sha: Dict[str, int] = {}
+        self._analyses: Dict[int, Dict] = {}
+        self._owners: Dict[int, Optional[int]] = {}
+        self._last_id = 0
+        self._loaded_at: Optional[float] = None
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._analyses)
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Load rows added since the last refresh (by any worker)."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+            return
+        rows = db.execute(
+            select(RejectedImage.id, RejectedImage.sha256, RejectedImage.dhash, RejectedImage.analysis,
+                   RejectedImage.user_id)
+            .where(RejectedImage.id > self._last_id)
+            .order_by(RejectedImage.id)
+        ).all()
+        with self._lock:
+            for entry_id, sha256, hex_hash, analysis, user_id in rows:
+                self._add(entry_id, sha256, int(hex_hash, 16) if hex_hash else None, analysis, user_id)
+            if rows:
+                self._last_id = rows[-1][0]
+            self._loaded_at = time.monotonic()
+        IMAGE_SCREEN_INDEX_SIZE.set(self.size)
+
+    def match_sha(self, sha256: str) -> Optional[ScreenMatch]:
+        """Exact re-upload of a rejected file."""
+        entry_id = self._by_sha.get(sha256)
+        if entry_id is None:
+            return None
+        IMAGE_SCREEN_LOOKUPS.inc(outcome="exact")
+        return ScreenMatch(entry_id, 0, self._analyses[entry_id], self._owners[entry_id], exact=True)
+
+    def match_hash(self, image_hash: Optional[int]) -> Optional[ScreenMatch]:
+        """Closest rejected image within max_distance bits."""
+        if image_hash is None:
+            IMAGE_SCREEN_LOOKUPS.inc(outcome="unhashable")
+            return None
+        if low_information(image_hash):
+            IMAGE_SCREEN_LOOKUPS.inc(outcome="low_information")
+            return None
+        with self._lock:
+            found = self._hashes.search(image_hash)
+        if not found:
+            IMAGE_SCREEN_LOOKUPS.inc(outcome="miss")
+            return None
+        distance, entry_id = found[0]
+        IMAGE_SCREEN_LOOKUPS.inc(outcome="near")
+        return ScreenMatch(entry_id, distance, self._analyses[entry_id], self._owners[entry_id])
+
+    def record_rejection(self, db: Session, sha256: str, image_hash: Optional[int], user_id: Optional[int],
+                         category: Optional[str], analysis: Dict) -> None:
+        """Store a rejected upload so later re-uploads match it."""
+        if sha256 in self._by_sha:
+            return
+        entry = RejectedImage(
+            sha256=sha256,
+            dhash=f"{image_hash:016x}" if image_hash is not None else None,
+            user_id=user_id,
+            category=category,
+            analysis={field: analysis.get(field) for field in ANALYSIS_FIELDS}
+        )
+        db.add(entry)
+        db.commit()
+        # Local writes are visible right away; _last_id only moves on refresh
+        # so rows other workers inserted in between are still loaded
+        with self._lock:
+            self._add(entry.id, sha256, image_hash, entry.analysis, user_id)
+        IMAGE_SCREEN_INDEX_SIZE.set(self.size)
+
+    def record_hit(self, db: Session, match: ScreenMatch) -> None:
+        db.execute(
+            update(RejectedImage)
+            .where(RejectedImage.id == match.entry_id)
+            .values(hits=RejectedImage.hits + 1, last_hit_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+
+    def _add(self, entry_id: int, sha256: str, image_hash: Optional[int], analysis: Dict,
+             user_id: Optional[int]) -> None:
+        if entry_id in self._analyses:
+            return
+        self._analyses[entry_id] = analysis
+        self._owners[entry_id] = user_id
+        self._by_sha.setdefault(sha256, entry_id)
+        if image_hash is not None and not low_information(image_hash):
+            self._hashes.add(image_hash, entry_id)
+
+
+# Global instance
+_rejected_image_index_instance: Optional[RejectedImageIndex] = None
+
+
+def get_rejected_image_index() -> RejectedImageIndex:
+    """Get or create the rejected image index instance"""
+    global _rejected_image_index_instance
+    if _rejected_image_index_instance is None:
+        _rejected_image_index_instance = RejectedImageIndex()
+    return _rejected_image_index_instance
@@ -0,0 +1,276 @@
+"""
+Media garbage collector.
+
+Removes uploaded files that no record references anymore:
+- Media store blobs whose ref_count dropped to 0 (rejected photos from
+  /reports/validate-photo, photos of deleted reports/POIs/announcements)
+- Legacy uuid/temp_ files in backend/static/uploads and backend/uploads
+  that no report, POI or announcement points to
+- Leftover .part files from interrupted uploads
+
+Blobs are deleted through the configured storage backend, so the sweep
+works the same for local and S3-compatible storage.
+
+Both the database and the upload directories are scanned in fixed-size
+batches, so memory use stays bounded regardless of how many files exist.
+Only files older than `min_age` are touched, which leaves room for an upload
+to be attached to a record after it was stored.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models.report import Report
+from backend.models.point_of_interest import PointOfInterest
+from backend.models.announcement import Announcement
+from backend.models.media_blob import MediaBlob
+from backend.services.media_store import blob_key, blob_url, hash_from_url
+from backend.services.storage import get_storage
+from backend.config import (
+    MEDIA_GC_ENABLED, MEDIA_GC_INTERVAL_MINUTES, MEDIA_GC_MIN_AGE_HOURS, MEDIA_TMP_DIR
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Directory to scan -> URL prefix its files are served under
+LEGACY_UPLOAD_DIRS = {
+    "backend/static/uploads": "/static/uploads",
+    "backend/uploads": "/uploads",
+}
+BATCH_SIZE = 500
+
+
+class MediaGarbageCollector:
+    """Finds and removes unreferenced uploaded media"""
+
+    def __init__(self, db: Session, min_age: timedelta = timedelta(hours=MEDIA_GC_MIN_AGE_HOURS),
+                 batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.min_age = min_age
+        self.batch_size = batch_size
+
+    def collect(self, dry_run: bool = False) -> Dict:
+        """
+        Run a full sweep.
+
+        Args:
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Dict with counters and the list of orphaned paths
+        """
+        stats = {
+            "dry_run": dry_run,
+            "blobs_scanned": 0,
+            "files_scanned": 0,
+            "orphaned": [],
+            "deleted_files": 0,
+            "deleted_blobs": 0,
+            "bytes_freed": 0,
+        }
+        self._sweep_blobs(stats, dry_run)
+        self._sweep_legacy_files(stats, dry_run)
+        self._sweep_partial_uploads(stats, dry_run)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Media store blobs
+    # ------------------------------------------------------------------
+
+    def _sweep_blobs(self, stats: Dict, dry_run: bool) -> None:
+        cutoff = datetime.now(timezone.utc) - self.min_age
+        last_id = 0
+        while True:
+            blobs = self.db.query(MediaBlob)\
+                .filter(
+                    MediaBlob.id > last_id,
+                    MediaBlob.ref_count == 0,
+                    MediaBlob.updated_at < cutoff
+                )\
+                .order_by(MediaBlob.id)\
+                .limit(self.batch_size)\
+                .all()
+            if not blobs:
+                break
+            last_id = blobs[-1].id
+            stats["blobs_scanned"] += len(blobs)
+
+            # ref_count is a cache; double-check against the real references
+            # Plain values: commits below expire the loaded objects
+            urls = {
+                blob_url(blob.sha256, blob.extension): (blob.id, blob_key(blob.sha256, blob.extension), blob.size_bytes)
+                for blob in blobs
+            }
+            referenced = self._referenced_urls(list(urls))
+
+            storage = get_storage()
+            for url, (blob_id, key, size) in urls.items():
+                if url in referenced:
+                    continue
+                stats["orphaned"].append(url)
+                if dry_run:
+                    continue
+                # Re-checked in SQL: a request may have referenced or
+                # re-uploaded the blob since it was loaded
+                deleted = self.db.execute(
+                    delete(MediaBlob)
+                    .where(
+                        MediaBlob.id == blob_id,
+                        MediaBlob.ref_count == 0,
+                        MediaBlob.updated_at < cutoff
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not deleted:
+                    self.db.commit()
+                    continue
+                # Committed only once the object is gone: a concurrent
+                # re-upload blocks on the deleted row until then, finds it
+                # missing and stores the content again
+                try:
+                    storage.delete(key)
+                except Exception:
+                    self.db.rollback()
+                    raise
+                self.db.commit()
+                stats["deleted_blobs"] += 1
+                stats["deleted_files"] += 1
+                stats["bytes_freed"] += size
+
+    # ------------------------------------------------------------------
+    # Files on disk
+    # ------------------------------------------------------------------
+
+    def _sweep_legacy_files(self, stats: Dict, dry_run: bool) -> None:
+        for batch in self._batched(self._old_legacy_files()):
+            stats["files_scanned"] += len(batch)
+            urls = [url for _, url in batch]
+            referenced = self._referenced_urls(urls)
+            known_blobs = self._known_blob_hashes(urls)
+
+            for path, url in batch:
+                if url in referenced:
+                    continue
+                sha256 = hash_from_url(url)
+                if sha256 and sha256 in known_blobs:
+                    continue  # Managed through the media_blobs table
+                stats["orphaned"].append(path)
+                if not dry_run:
+                    stats["bytes_freed"] += self._remove(path, stats)
+
+    def _sweep_partial_uploads(self, stats: Dict, dry_run: bool) -> None:
+        tmp_dir = MEDIA_TMP_DIR
+        if not os.path.isdir(tmp_dir):
+            return
+        cutoff = time.time() - self.min_age.total_seconds()
+        with os.scandir(tmp_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    stats["orphaned"].append(entry.path)
+                    if not dry_run:
+                        stats["bytes_freed"] += self._remove(entry.path, stats)
+
+    def _old_legacy_files(self) -> Iterator[Tuple[str, str]]:
+        """Yield (path, url) for upload files older than min_age."""
+        cutoff = time.time() - self.min_age.total_seconds()
+        tmp_dir = os.path.normpath(MEDIA_TMP_DIR)
+        for root_dir, url_prefix in LEGACY_UPLOAD_DIRS.items():
+            if not os.path.isdir(root_dir):
+                continue
+            for dirpath, dirnames, filenames in os.walk(root_dir):
+                if os.path.normpath(dirpath) == tmp_dir:
+                    dirnames[:] = []
+                    continue
+                for filename in filenames:
+                    if filename.startswith("."):
+                        continue  # .gitkeep and friends
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        if os.stat(path).st_mtime >= cutoff:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    relative = os.path.relpath(path, root_dir).replace(os.sep, "/")
+                    yield path, f"{url_prefix}/{relative}"
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _referenced_urls(self, urls: List[str]) -> Set[str]:
+        """Subset of `urls` referenced by any report, POI or announcement."""
+        if not urls:
+            return set()
+        referenced = set()
+        for column in (Report.photo_url, PointOfInterest.photo_url, Announcement.image_url):
+            rows = self.db.query(column).filter(column.in_(urls)).all()
+            referenced.update(row[0] for row in rows)
+        return referenced
+
+    def _known_blob_hashes(self, urls: List[str]) -> Set[str]:
+        hashes = [h for h in (hash_from_url(url) for url in urls) if h]
+        if not hashes:
+            return set()
+        rows = self.db.query(MediaBlob.sha256).filter(MediaBlob.sha256.in_(hashes)).all()
+        return {row[0] for row in rows}
+
+    def _batched(self, items: Iterator) -> Iterator[List]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _remove(self, path: str, stats: Dict) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        stats["deleted_files"] += 1
+        return size
+
+
+def run_media_gc(dry_run: bool = False, min_age_hours: Optional[float] = None) -> Dict:
+    """Run one sweep with its own database session."""
+    db = SessionLocal()
+    try:
+        min_age = timedelta(hours=MEDIA_GC_MIN_AGE_HOURS if min_age_hours is None else min_age_hours)
+        return MediaGarbageCollector(db, min_age=min_age).collect(dry_run=dry_run)
+    finally:
+        db.close()
+
+
+async def media_gc_loop():
+    """Background task: sweep periodically without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(MEDIA_GC_INTERVAL_MINUTES * 60)
+        try:
+            stats = await loop.run_in_executor(None, run_media_gc)
+            logger.info(
+                "Media GC finished",
+                extra={
+                    "deleted_files": stats["deleted_files"],
+                    "deleted_blobs": stats["deleted_blobs"],
+                    "bytes_freed": stats["bytes_freed"],
+                }
+            )
+        except Exception:
+            logger.exception("Media GC failed")
+
+
+def start_media_gc() -> Optional[asyncio.Task]:
+    """Start the background sweeper if enabled in configuration."""
+    if not MEDIA_GC_ENABLED:
+        return None
+    return asyncio.create_task(media_gc_loop())
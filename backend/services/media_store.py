@@ -0,0 +1,346 @@
+"""
+Content-addressed media store.
+
+Uploaded files are stored once per distinct content, under a key derived
+from their SHA-256 digest:
+
+    ab/cd/abcd1234...ef.jpg
+
+The same bytes uploaded twice (e.g. a photo retried after an AI rejection in
+/reports/validate-photo and then attached with /reports/{id}/upload-photo)
+resolve to the same object and the same URL. Reference counts live in the
+media_blobs table; a blob with ref_count 0 is kept until it is garbage
+collected, so a fresh upload can still be attached to a record.
+
+Objects are written through the configured storage backend
+(backend/services/storage.py): local filesystem or S3-compatible storage.
+"""
+import hashlib
+import os
+import re
+import uuid
+from typing import Optional
+import anyio
+from fastapi import UploadFile
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.models.media_blob import MediaBlob
+from backend.services.storage import get_storage
+from backend.config import MEDIA_TMP_DIR
+
+
+CHUNK_SIZE = 64 * 1024
+
+# .../ab/cd/<sha256>.<ext>
+BLOB_URL_RE = re.compile(r"/([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+
+class MediaTooLargeError(ValueError):
+    """Raised when an upload exceeds the allowed size."""
+
+
+class MediaGoneError(LookupError):
+    """Raised when a media store URL points to a blob that no longer exists."""
+
+
+def blob_key(sha256: str, extension: str) -> str:
+    """Storage key for a blob, e.g. 'ab/cd/abcd...ef.jpg'."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def blob_url(sha256: str, extension: str) -> str:
+    """Public URL for a blob."""
+    return get_storage().url(blob_key(sha256, extension))
+
+
+def blob_source(sha256: str, extension: str) -> str:
+    """Local path or fetchable URL to read a blob's content."""
+    return get_storage().source(blob_key(sha256, extension))
+
+
+def hash_from_url(url: Optional[str]) -> Optional[str]:
+    """
+    Extract the content hash from a media store URL.
+
+    Returns None for URLs that do not belong to the store (legacy uuid
+    uploads, external links, empty values).
+    """
+    if not url:
+        return None
+    match = BLOB_URL_RE.search(url.split("?", 1)[0])
+    if not match:
+        return None
+    shard_a, shard_b, digest = match.groups()
+    if digest[:2] != shard_a or digest[2:4] != shard_b:
+        return None
+    return digest
+
+
+def media_source_for_url(url: str) -> str:
+    """
+    Local path or fetchable URL to read the file behind a stored URL.
+
+    Handles media store URLs (any backend), legacy /static and /uploads
+    paths, and external http(s) links.
+    """
+    match = BLOB_URL_RE.search(url.split("?", 1)[0])
+    if match and hash_from_url(url):
+        extension = os.path.splitext(url.split("?", 1)[0])[1]
+        return blob_source(match.group(3), extension)
+    if url.startswith("http"):
+        return url
+    return f"backend{url}"
+
+
+class MediaStore:
+    """Service for storing and reference-counting uploaded media"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def store_bytes(self, content: bytes, extension: str) -> MediaBlob:
+        """
+        Store raw bytes, reusing the existing blob if the content is known.
+
+        Args:
+            content: File content
+            extension: File extension including the dot (".jpg")
+
+        Returns:
+            MediaBlob for the content (ref_count unchanged)
+        """
+        tmp_path = self._tmp_path()
+        async with await anyio.open_file(tmp_path, "wb") as buffer:
+            await buffer.write(content)
+        return await self._commit_file(
+            tmp_path, hashlib.sha256(content).hexdigest(), extension, len(content)
+        )
+
+    async def store_upload(
+        self,
+        upload: UploadFile,
+        extension: str,
+        max_size: Optional[int] = None
+    ) -> MediaBlob:
+        """
+        Stream an UploadFile into the store, hashing while writing.
+
+        Args:
+            upload: Incoming upload
+            extension: File extension including the dot (".jpg")
+            max_size: Optional size limit in bytes
+
+        Returns:
+            MediaBlob for the content (ref_count unchanged)
+
+        Raises:
+            MediaTooLargeError: If the upload exceeds max_size
+        """
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = self._tmp_path()
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as buffer:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise MediaTooLargeError(
+                            f"Archivo muy grande. Máximo: {max_size // (1024 * 1024)}MB"
+                        )
+                    digest.update(chunk)
+                    await buffer.write(chunk)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return await self._commit_file(tmp_path, digest.hexdigest(), extension, size)
+
+    def get(self, sha256: str) -> Optional[MediaBlob]:
+        """Get a blob by content hash."""
+        return self.db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).first()
+
+    def get_by_url(self, url: Optional[str]) -> Optional[MediaBlob]:
+        """Get the blob behind a media store URL (None for legacy URLs)."""
+        sha256 = hash_from_url(url)
+        if not sha256:
+            return None
+        return self.get(sha256)
+
+    def acquire(self, url: Optional[str]) -> bool:
+        """
+        Register a new reference to the blob behind `url`.
+
+        Call this when a record starts pointing to the URL. Legacy URLs are
+        ignored. The count is incremented in SQL, so concurrent requests
+        don't lose updates. Does not commit; the caller's commit persists
+        the change.
+
+        Returns:
+            True if a blob was referenced
+        """
+        sha256 = hash_from_url(url)
+        if not sha256:
+            return False
+        return self.db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == sha256)
+            .values(ref_count=MediaBlob.ref_count + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount > 0
+
+    def acquire_existing(self, url: Optional[str]) -> None:
+        """
+        acquire() for a URL sent by a client.
+
+        The blob may have been garbage collected since the client uploaded
+        it, in which case the record must not be saved pointing to it.
+
+        Raises:
+            MediaGoneError: If the URL belongs to the store but its blob is gone
+        """
+        if not self.acquire(url) and hash_from_url(url):
+            raise MediaGoneError(f"Blob de {url} no encontrado")
+
+    def release(self, url: Optional[str]) -> bool:
+        """
+        Drop a reference to the blob behind `url`.
+
+        The object is kept in storage; unreferenced blobs are removed by the
+        garbage collector once they are old enough. Does not commit.
+
+        Returns:
+            True if a reference was dropped
+        """
+        sha256 = hash_from_url(url)
+        if not sha256:
+            return False
+        return self.db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count > 0)
+            .values(ref_count=MediaBlob.ref_count - 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount > 0
+
+    async def register_uploaded(
+        self,
+        sha256: str,
+        extension: str,
+        size: int,
+        max_size: Optional[int] = None
+    ) -> Optional[MediaBlob]:
+        """
+        Record a blob that a client uploaded directly to storage.
+
+        Verifies that the object exists, that it has the size declared when
+        the upload was presigned and, when the backend keeps one, that its
+        checksum matches the claimed hash. Objects that fail a check are
+        deleted from storage.
+
+        Args:
+            sha256: Claimed content hash
+            extension: File extension
+            size: Size declared by the client
+            max_size: Optional size limit in bytes
+
+        Returns:
+            MediaBlob, or None if the object is missing or does not match
+
+        Raises:
+            MediaTooLargeError: If the stored object exceeds max_size
+        """
+        blob = self.get(sha256)
+        if blob:
+            blob = self._touch(blob)
+            if blob:
+                return blob
+
+        storage = get_storage()
+        key = blob_key(sha256, extension)
+        stored_size = await storage.asize(key)
+        if stored_size is None:
+            return None
+        if max_size is not None and stored_size > max_size:
+            await storage.adelete(key)
+            raise MediaTooLargeError(
+                f"Archivo muy grande. Máximo: {max_size // (1024 * 1024)}MB"
+            )
+        if stored_size != size:
+            await storage.adelete(key)
+            return None
+        checksum = await storage.achecksum_sha256(key)
+        if checksum is not None and checksum != sha256:
+            await storage.adelete(key)
+            return None
+        return self._insert(sha256, extension, stored_size)
+
+    async def _commit_file(self, tmp_path: str, sha256: str, extension: str, size: int) -> MediaBlob:
+        """Move a fully written temp file into storage and record the blob."""
+        blob = self.get(sha256)
+        if blob:
+            extension = blob.extension
+            # Touched before checking storage: once touched, the garbage
+            # collector leaves the object alone
+            blob = self._touch(blob)
+
+        storage = get_storage()
+        key = blob_key(sha256, extension)
+        if await storage.aexists(key):
+            os.remove(tmp_path)
+        else:
+            await storage.asave(key, tmp_path)
+
+        if blob:
+            return blob
+        return self._insert(sha256, extension, size)
+
+    def _touch(self, blob: MediaBlob) -> Optional[MediaBlob]:
+        """
+        Mark an existing blob as just uploaded.
+
+        An unreferenced blob is only collected once updated_at is old
+        enough, so a re-upload must restart that clock before a record
+        references it.
+
+        Returns:
+            The blob, or None if the garbage collector deleted it first (the
+            collector keeps the row locked until the object is removed, so
+            the content must then be stored again)
+        """
+        touched = self.db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.id == blob.id)
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        if not touched:
+            self.db.expunge(blob)
+            return None
+        self.db.refresh(blob)
+        return blob
+
+    def _insert(self, sha256: str, extension: str, size: int) -> MediaBlob:
+        blob = MediaBlob(sha256=sha256, extension=extension, size_bytes=size, ref_count=0)
+        self.db.add(blob)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Same content uploaded concurrently; the other request won
+            self.db.rollback()
+            blob = self.get(sha256)
+        self.db.refresh(blob)
+        return blob
+
+    def _tmp_path(self) -> str:
+        os.makedirs(MEDIA_TMP_DIR, exist_ok=True)
+        return os.path.join(MEDIA_TMP_DIR, f"{uuid.uuid4()}.part")
+
+
+def get_media_store(db: Session) -> MediaStore:
+    """Get media store instance"""
+    return MediaStore(db)
@@ -0,0 +1,143 @@
+"""
+Tiered model routing for OpenAI validations.
+
+Vision and POI checks used to go straight to the large model. With
+routing, every call first goes to the fast tier (AI_FAST_MODEL, images at
+AI_FAST_IMAGE_DETAIL="low", a 512px thumbnail with a fixed token cost).
+The caller's accept() predicate decides whether that verdict is good
+enough; low-confidence or borderline verdicts (and fast-tier errors) are
+escalated to the strong tier (AI_STRONG_MODEL, full image detail).
+
+Metrics: ai_routing_decisions_total (fast / escalated / fast_error /
+strong_only), and per-tier latency and estimated cost (ai_tier_*).
+"""
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+from backend.config import (
+    AI_ROUTING_ENABLED, AI_FAST_MODEL, AI_STRONG_MODEL,
+    AI_FAST_IMAGE_DETAIL, AI_STRONG_IMAGE_DETAIL, AI_ESCALATION_CONFIDENCE
+)
+from backend.utils.metrics import estimate_openai_cost, AI_ROUTING_DECISIONS, AI_TIER_LATENCY, AI_TIER_COST
+from backend.services.ai_resilience import resilient_completion, AIUnavailableError
+
+
+logger = logging.getLogger(__name__)
+
+
+class Tier:
+    """A model plus the image detail it receives"""
+
+    def __init__(self, name: str, model: str, image_detail: str):
+        self.name = name
+        self.model = model
+        self.image_detail = image_detail
+
+
+FAST = Tier("fast", AI_FAST_MODEL, AI_FAST_IMAGE_DETAIL)
+STRONG = Tier("strong", AI_STRONG_MODEL, AI_STRONG_IMAGE_DETAIL)
+
+
+def image_part(image_data: str, detail: str) -> Dict:
+    """Chat message content part for a base64 JPEG."""
+    return {
+        "type": "image_url",
+        "image_url": {"url": f"data:image/jpeg;base64,{image_data}", "detail": detail},
+    }
+
+
+def confident(result: Dict, *fields: str, threshold: float = AI_ESCALATION_CONFIDENCE) -> bool:
+    """True when every confidence field is present and >= threshold."""
+    for field in fields:
+        value = result.get(field)
+        if not isinstance(value, (int, float)) or value < threshold:
+            return False
+    return True
+
+
+def _call(client, validator: str, method: str, tier: Tier, build_messages, kwargs) -> Dict:
+    started = time.perf_counter()
+    try:
+        response = resilient_completion(
+            client, validator, method,
+            model=tier.model,
+            messages=build_messages(tier.image_detail),
+            **kwargs
+        )
+    finally:
+        AI_TIER_LATENCY.observe(time.perf_counter() - started, validator=validator, method=method, tier=tier.name)
+    cost = estimate_openai_cost(tier.model, getattr(response, "usage", None))
+    if cost is not None:
+        AI_TIER_COST.inc(cost, validator=validator, method=method, tier=tier.name)
+    return json.loads(response.choices[0].message.content)
+
+
+def routed_completion(
+    client,
+    validator: str,
+    method: str,
+    build_messages: Callable[[str], List[Dict]],
+    accept: Callable[[Dict], bool],
+    **kwargs
+) -> Dict:
+    """
+    Run a JSON-mode chat completion through the model tiers.
+
+    Args:
+        client: OpenAI client
+        validator: Validator name label ("ai_validator", "poi_validator")
+        method: Calling method label
+        build_messages: Builds the messages for a given image detail
+        accept: Whether a fast-tier verdict can be returned as is
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        Parsed JSON verdict, with "model_tier" set to the tier that produced it
+
+    Raises:
+        AIUnavailableError from either tier, or whatever the strong-tier call
+        raises (other fast-tier errors escalate)
+    """
+    if not AI_ROUTING_ENABLED:
+        result = _call(client, validator, method, STRONG, build_messages, kwargs)
+        AI_ROUTING_DECISIONS.inc(validator=validator, method=method, outcome="strong_only")
+        result["model_tier"] = STRONG.name
+        return result
+
+    fast_result: Optional[Dict] = None
+    try:
+        fast_result = _call(client, validator, method, FAST, build_messages, kwargs)
+    except AIUnavailableError:
+        # Breaker open or budget spent: the strong tier would fail the same way
+        raise
+    except Exception as e:
+        logger.warning("Fast tier failed, escalating",
+                       extra={"validator": validator, "method": method, "error": str(e)})
+
+    if fast_result is not None and accept(fast_result):
+        AI_ROUTING_DECISIONS.inc(validator=validator, method=method, outcome="fast")
+        fast_result["model_tier"] = FAST.name
+        return fast_result
+
+    outcome = "escalated" if fast_result is not None else "fast_error"
+    AI_ROUTING_DECISIONS.inc(validator=validator, method=method, outcome=outcome)
+    result = _call(client, validator, method, STRONG, build_messages, kwargs)
+    result["model_tier"] = STRONG.name
+    return result
+
+
+def batch_line(custom_id: str, model: str, messages: List[Dict], **kwargs) -> Dict:
+    """One JSONL request for the OpenAI Batch API (JSON-mode chat completion)."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "messages": messages,
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3,
+            **kwargs,
+        },
+    }
@@ -10,7 +10,7 @@ Implements progressive ban system (más gradual):
 - Strike 7+: Permanente
 """
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query
 from backend.models.user import User
 from backend.models.strike import Strike
 from typing import Dict, Optional
@@ -217,13 +217,15 @@ class ModerationService:
             "last_strike_at": user.last_strike_at
         }
     
+    def user_strikes_query(self, user_id: int) -> Query:
+        """Strike history of a user, newest first (also EXPLAINed by check_query_plans)"""
+        return self.db.query(Strike).filter(
+            Strike.user_id == user_id
+        ).order_by(Strike.created_at.desc())
+    
     def get_user_strikes(self, user_id: int) -> list:
         """Get all strikes for a user"""
-        strikes = self.db.query(Strike).filter(
-            Strike.user_id == user_id
-        ).order_by(Strike.created_at.desc()).all()
-        
-        return strikes
+        return self.user_strikes_query(user_id).all()
     
     def unban_user(self, user_id: int, admin_reason: str = "Unbanned by admin") -> bool:
         """
@@ -0,0 +1,380 @@
+"""
+Importación masiva de POIs oficiales desde CSV o GeoJSON.
+
+Los archivos se leen en streaming (csv.DictReader, y para GeoJSON un
+lector incremental de "features"), las filas se validan con
+POIImportRow y se escriben por lotes:
+
+- Llave natural: nombre (espacios normalizados) + coordenadas redondeadas
+  a 5 decimales (~1 m)
+- Por lote: un SELECT de los existentes, un INSERT masivo de los nuevos
+  y un UPDATE masivo por id de los existentes
+- Fuentes oficiales: se omite la validación IA y los POIs quedan
+  aprobados, públicos y marcados como oficiales
+
+Usado por POST /points-of-interest/import y por backend/import_pois.py.
+"""
+import csv
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from backend.models.point_of_interest import PointOfInterest
+from backend.schemas.point_of_interest import POIImportRow
+from backend.services.poi_validator import VALID_CATEGORIES
+from backend.config import POI_IMPORT_BATCH_SIZE, POI_IMPORT_MAX_ERRORS
+
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+
+# Encabezados alternativos comunes en datasets municipales
+FIELD_ALIASES = {
+    "name": "nombre",
+    "nombre_del_establecimiento": "nombre",
+    "description": "descripcion",
+    "descripción": "descripcion",
+    "category": "categoria",
+    "categoría": "categoria",
+    "subcategory": "subcategoria",
+    "address": "direccion",
+    "dirección": "direccion",
+    "domicilio": "direccion",
+    "cp": "codigo_postal",
+    "postal_code": "codigo_postal",
+    "lat": "latitude",
+    "latitud": "latitude",
+    "lon": "longitude",
+    "lng": "longitude",
+    "longitud": "longitude",
+    "phone": "telefono",
+    "teléfono": "telefono",
+    "hours": "horarios",
+}
+
+
+# ============================================================================
+# Lectores
+# ============================================================================
+
+def iter_csv_rows(stream: TextIO) -> Iterator[Dict]:
+    """Filas de un CSV con encabezado."""
+    yield from csv.DictReader(stream)
+
+
+def iter_geojson_rows(stream: TextIO) -> Iterator[Dict]:
+    """
+    Filas de un FeatureCollection GeoJSON sin cargar el archivo completo.
+
+    Cada Feature con geometría Point produce sus properties más
+    latitude/longitude.
+    """
+    for feature in _iter_features(stream):
+        row = dict(feature.get("properties") or {})
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") == "Point" and len(geometry.get("coordinates") or []) >= 2:
+            row["longitude"], row["latitude"] = geometry["coordinates"][:2]
+        yield row
+
+
+def _iter_features(stream: TextIO) -> Iterator[Dict]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, eof
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer += chunk
+        return True
+
+    # Avanzar hasta el arreglo "features": [
+    while True:
+        key = buffer.find('"features"')
+        start = buffer.find("[", key) if key >= 0 else -1
+        if start >= 0:
+            buffer = buffer[start + 1:]
+            break
+        if not read_more():
+            raise ValueError("GeoJSON sin arreglo 'features'")
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not buffer:
+            if not read_more():
+                raise ValueError("GeoJSON incompleto")
+            continue
+        if buffer[0] == "]":
+            return
+        try:
+            feature, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof or not read_more():
+                raise ValueError("GeoJSON inválido o incompleto")
+            continue
+        buffer = buffer[end:]
+        yield feature
+
+
+def open_rows(stream: TextIO, fmt: str) -> Iterator[Dict]:
+    """Lector por formato: 'csv' o 'geojson'."""
+    if fmt == "csv":
+        return iter_csv_rows(stream)
+    if fmt in ("geojson", "json"):
+        return iter_geojson_rows(stream)
+    raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def detect_format(filename: str) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".geojson", ".json")):
+        return "geojson"
+    return None
+
+
+# ============================================================================
+# Normalización
+# ============================================================================
+
+def normalize_row(raw: Dict) -> Dict:
+    """Encabezados a nombres de columna, vacíos a None, horarios a dict."""
+    row = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        field = key.strip().lower().replace(" ", "_")
+        field = FIELD_ALIASES.get(field, field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        row[field] = value
+
+    horarios = row.get("horarios")
+    if isinstance(horarios, str):
+        try:
+            parsed = json.loads(horarios)
+        except ValueError:
+            parsed = None
+        row["horarios"] = parsed if isinstance(parsed, dict) else {"general": horarios}
+    if isinstance(row.get("horarios"), dict):
+        row["horarios"] = {str(k): str(v) for k, v in row["horarios"].items()}
+
+    for field in ("codigo_postal", "telefono", "whatsapp"):
+        if isinstance(row.get(field), (int, float)):
+            row[field] = str(row[field])
+    return row
+
+
+def natural_key(nombre: str, latitude: float, longitude: float) -> Tuple[str, float, float]:
+    return (" ".join(nombre.split()), round(latitude, 5), round(longitude, 5))
+
+
+# ============================================================================
+# Importador
+# ============================================================================
+
+class POIImportStats:
+    """Contadores y errores de una importación"""
+
+    def __init__(self, source: str, dry_run: bool, max_errors: int = POI_IMPORT_MAX_ERRORS):
+        self.source = source
+        self.dry_run = dry_run
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.invalid = 0
+        self.batches = 0
+        self.errors: List[Dict] = []
+        self.max_errors = max_errors
+        self._started = time.perf_counter()
+
+    def add_error(self, row: int, error: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": error})
+
+    @property
+    def duration_seconds(self) -> float:
+        return round(time.perf_counter() - self._started, 3)
+
+    def to_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "dry_run": self.dry_run,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "duration_seconds": self.duration_seconds,
+            "errors": self.errors,
+        }
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    parts = []
+    for item in error.errors():
+        field = ".".join(str(loc) for loc in item["loc"])
+        parts.append(f"{field}: {item['msg']}")
+    return "; ".join(parts)
+
+
+class POIImporter:
+    """Valida y hace upsert por lotes de POIs oficiales"""
+
+    # Columnas que una reimportación actualiza en POIs existentes
+    UPDATE_FIELDS = (
+        "nombre", "descripcion", "categoria", "subcategoria", "direccion", "colonia",
+        "codigo_postal", "latitude", "longitude", "telefono", "whatsapp", "email",
+        "website", "facebook", "instagram", "horarios",
+    )
+
+    def __init__(
+        self,
+        db: Session,
+        created_by: int,
+        source: str,
+        batch_size: int = POI_IMPORT_BATCH_SIZE,
+        dry_run: bool = False
+    ):
+        self.db = db
+        self.created_by = created_by
+        self.source = source
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def run(
+        self,
+        rows: Iterable[Dict],
+        progress: Optional[Callable[[POIImportStats], None]] = None
+    ) -> POIImportStats:
+        """
+        Importa todas las filas.
+
+        Args:
+            rows: Diccionarios crudos (ver open_rows)
+            progress: Callback llamado después de cada lote
+
+        Returns:
+            POIImportStats con el resumen
+        """
+        stats = POIImportStats(self.source, self.dry_run)
+        batch: List[Dict] = []
+
+        for row_number, raw in enumerate(rows, start=1):
+            stats.processed += 1
+            row = self._validate(raw, row_number, stats)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, stats, progress)
+                batch = []
+
+        if batch:
+            self._flush(batch, stats, progress)
+
+        summary = stats.to_dict()
+        summary.pop("errors")
+        logger.info("POI import finished", extra=summary)
+        return stats
+
+    def _validate(self, raw: Dict, row_number: int, stats: POIImportStats) -> Optional[Dict]:
+        try:
+            row = POIImportRow.model_validate(normalize_row(raw))
+        except ValidationError as e:
+            stats.add_error(row_number, _format_validation_error(e))
+            return None
+
+        categoria = row.categoria.lower() if row.categoria else "otro"
+        if categoria not in VALID_CATEGORIES:
+            stats.add_error(row_number, f"categoria: '{row.categoria}' no es una categoría válida")
+            return None
+        subcategoria = row.subcategoria.lower() if row.subcategoria else None
+
+        data = row.model_dump(exclude={"photo_url"})
+        data["nombre"] = " ".join(row.nombre.split())
+        data["categoria"] = categoria
+        data["subcategoria"] = subcategoria
+        return data
+
+    def _flush(
+        self,
+        batch: List[Dict],
+        stats: POIImportStats,
+        progress: Optional[Callable[[POIImportStats], None]]
+    ) -> None:
+        # Dentro del lote, la última fila con la misma llave gana
+        by_key = {natural_key(r["nombre"], r["latitude"], r["longitude"]): r for r in batch}
+
+        names = {row["nombre"] for row in by_key.values()}
+        existing = {}
+        for poi_id, nombre, latitude, longitude in self.db.execute(
+            select(PointOfInterest.id, PointOfInterest.nombre, PointOfInterest.latitude, PointOfInterest.longitude)
+            .where(PointOfInterest.nombre.in_(names))
+        ):
+            existing[natural_key(nombre, latitude, longitude)] = poi_id
+
+        now = datetime.utcnow()
+        official = {
+            "ia_status": "approved_ia",
+            "ia_validation_result": {"skipped": True, "reason": "official_source", "source": self.source},
+            "human_status": "approved",
+            "human_validator_id": self.created_by,
+            "human_validated_at": now,
+            "human_notes": f"Importado de {self.source}",
+            "status": "approved",
+            "is_public": True,
+            "is_official": True,
+            "updated_at": now,
+        }
+
+        inserts, updates = [], []
+        for key, row in by_key.items():
+            if key in existing:
+                updates.append({
+                    "id": existing[key],
+                    **{field: row[field] for field in self.UPDATE_FIELDS},
+                    **official,
+                })
+            else:
+                inserts.append({
+                    **row,
+                    **official,
+                    "user_id": self.created_by,
+                    "categoria_original_ia": None,
+                    "views_count": 0,
+                    "reports_count": 0,
+                    "created_at": now,
+                })
+
+        if not self.dry_run:
+            try:
+                if inserts:
+                    self.db.execute(insert(PointOfInterest), inserts)
+                if updates:
+                    self.db.execute(update(PointOfInterest), updates)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+        stats.inserted += len(inserts)
+        stats.updated += len(updates)
+        stats.batches += 1
+        logger.info(
+            "POI import batch",
+            extra={"source": self.source, "batch": stats.batches, "processed": stats.processed,
+                   "inserted": stats.inserted, "updated": stats.updated, "invalid": stats.invalid}
+        )
+        if progress:
+            progress(stats)
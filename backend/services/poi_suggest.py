@@ -0,0 +1,244 @@
+"""
+Índice en memoria para autocompletar la búsqueda de POIs.
+
+Cubre nombres, categorías y colonias de los POIs públicos. Es un arreglo
+ordenado de llaves normalizadas (minúsculas, sin acentos ni puntuación)
+consultado con bisect: cada tecla es una búsqueda binaria más el ranking
+de los candidatos del rango, sin tocar la base de datos.
+
+- Cada etiqueta se indexa completa y a partir de cada palabra, así
+  "luc" encuentra "Parque de Santa Lucía"
+- Las rutas de escritura llaman a sync_poi()/remove_poi() para
+  actualizarlo al aprobar, editar o eliminar un POI
+- Se reconstruye completo cada POI_SUGGEST_REFRESH_SECONDS (cada worker
+  tiene su propia copia y solo ve en vivo sus propias escrituras) y
+  después de una importación masiva (invalidate)
+"""
+import logging
+import time
+from bisect import bisect_left, insort
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.models.point_of_interest import PointOfInterest
+from backend.services.search import query_terms
+from backend.config import POI_SUGGEST_REFRESH_SECONDS, POI_SUGGEST_MAX_SCAN
+
+
+logger = logging.getLogger(__name__)
+
+MAX_LABEL_WORDS = 8
+
+# (llave, tipo, identificador, es_inicio_de_etiqueta)
+# identificador: id del POI, o la llave normalizada de la categoría/colonia
+Entry = Tuple[str, str, object, int]
+
+GROUP_KINDS = ("categoria", "colonia")
+KIND_ORDER = {"categoria": 0, "colonia": 1, "poi": 2}
+
+
+def normalize(value: Optional[str]) -> str:
+    """'Parque de Santa Lucía ' -> 'parque de santa lucia'."""
+    return " ".join(query_terms(value or "")) if value else ""
+
+
+def _label_keys(label: str) -> List[Tuple[str, int]]:
+    words = normalize(label).split()[:MAX_LABEL_WORDS]
+    return [(" ".join(words[i:]), int(i == 0)) for i in range(len(words))]
+
+
+def _is_public(poi) -> bool:
+    return poi.status == "approved" and bool(poi.is_public)
+
+
+class POISuggestIndex:
+    """Arreglo ordenado de prefijos con actualización incremental"""
+
+    def __init__(self, refresh_seconds: int = POI_SUGGEST_REFRESH_SECONDS, max_scan: int = POI_SUGGEST_MAX_SCAN):
+        self.refresh_seconds = refresh_seconds
+        self.max_scan = max_scan
+        self._entries: List[Entry] = []
+        # id -> (nombre, categoria, colonia, views_count)
+        self._pois: Dict[int, Tuple[str, Optional[str], Optional[str], int]] = {}
+        # (tipo, llave) -> [etiqueta, número de POIs]
+        self._groups: Dict[Tuple[str, str], List] = {}
+        self._built_at: Optional[float] = None
+        self._lock = Lock()
+        self._rebuild_lock = Lock()
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    @property
+    def is_stale(self) -> bool:
+        """Nunca construido, invalidado o caducado."""
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at >= self.refresh_seconds
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Reconstruir si hace falta (una sola reconstrucción a la vez)."""
+        with self._rebuild_lock:
+            if self.is_stale:
+                self.rebuild(db)
+
+    def rebuild(self, db: Session) -> None:
+        started = time.perf_counter()
+        rows = db.execute(
+            select(
+                PointOfInterest.id, PointOfInterest.nombre, PointOfInterest.categoria,
+                PointOfInterest.colonia, PointOfInterest.views_count
+            ).where(PointOfInterest.status == "approved", PointOfInterest.is_public == True)
+        ).all()
+
+        pois = {}
+        groups: Dict[Tuple[str, str], List] = {}
+        entries: List[Entry] = []
+        for poi_id, nombre, categoria, colonia, views in rows:
+            pois[poi_id] = (nombre, categoria, colonia, views or 0)
+            entries.extend((key, "poi", poi_id, start) for key, start in _label_keys(nombre))
+            for kind, label in zip(GROUP_KINDS, (categoria, colonia)):
+                group_key = normalize(label)
+                if not group_key:
+                    continue
+                if (kind, group_key) not in groups:
+                    groups[(kind, group_key)] = [label, 0]
+                    entries.extend((key, kind, group_key, start) for key, start in _label_keys(label))
+                groups[(kind, group_key)][1] += 1
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._pois = pois
+            self._groups = groups
+            self._built_at = time.monotonic()
+
+        logger.info(
+            "POI suggest index rebuilt",
+            extra={"pois": len(pois), "entries": len(entries),
+                   "duration_ms": round((time.perf_counter() - started) * 1000, 2)}
+        )
+
+    def invalidate(self) -> None:
+        """Forzar reconstrucción en la siguiente consulta."""
+        self._built_at = None
+
+    # ------------------------------------------------------------------
+    # Actualización incremental
+    # ------------------------------------------------------------------
+
+    def sync_poi(self, poi) -> None:
+        """Reflejar el estado actual de un POI (aprobado y público o no)."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(poi.id)
+            if _is_public(poi):
+                self._add(poi.id, poi.nombre, poi.categoria, poi.colonia, poi.views_count or 0)
+
+    def remove_poi(self, poi_id: int) -> None:
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(poi_id)
+
+    def _add(self, poi_id: int, nombre: str, categoria: Optional[str], colonia: Optional[str], views: int) -> None:
+        self._pois[poi_id] = (nombre, categoria, colonia, views)
+        for key, start in _label_keys(nombre):
+            insort(self._entries, (key, "poi", poi_id, start))
+        for kind, label in zip(GROUP_KINDS, (categoria, colonia)):
+            group_key = normalize(label)
+            if not group_key:
+                continue
+            group = self._groups.get((kind, group_key))
+            if group is None:
+                self._groups[(kind, group_key)] = [label, 1]
+                for key, start in _label_keys(label):
+                    insort(self._entries, (key, kind, group_key, start))
+            else:
+                group[1] += 1
+
+    def _remove(self, poi_id: int) -> None:
+        previous = self._pois.pop(poi_id, None)
+        if previous is None:
+            return
+        nombre, categoria, colonia, _ = previous
+        for key, start in _label_keys(nombre):
+            self._delete_entry((key, "poi", poi_id, start))
+        for kind, label in zip(GROUP_KINDS, (categoria, colonia)):
+            group_key = normalize(label)
+            group = self._groups.get((kind, group_key)) if group_key else None
+            if group is None:
+                continue
+            group[1] -= 1
+            if group[1] <= 0:
+                del self._groups[(kind, group_key)]
+                for key, start in _label_keys(group[0]):
+                    self._delete_entry((key, kind, group_key, start))
+
+    def _delete_entry(self, entry: Entry) -> None:
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """
+        Sugerencias para lo tecleado hasta ahora.
+
+        Orden: coincidencias al inicio de la etiqueta primero; dentro de
+        ellas categorías y colonias (máximo un cuarto del límite cada una,
+        por número de POIs) y luego POIs por vistas.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        with self._lock:
+            entries = self._entries
+            lo = bisect_left(entries, (prefix,))
+            hi = min(bisect_left(entries, (prefix + "\uffff",)), lo + self.max_scan)
+
+            best: Dict[Tuple[str, object], Tuple] = {}
+            for key, kind, ident, start in entries[lo:hi]:
+                if kind == "poi":
+                    nombre, categoria, _, views = self._pois[ident]
+                    weight, text = views, nombre
+                else:
+                    text, weight = self._groups[(kind, ident)]
+                    categoria = None
+                rank = (-start, KIND_ORDER[kind], -weight, text)
+                current = best.get((kind, ident))
+                if current is None or rank < current[0]:
+                    best[(kind, ident)] = (rank, kind, ident, text, categoria, weight)
+
+        group_quota = max(1, limit // 4)
+        taken = {kind: 0 for kind in GROUP_KINDS}
+        results = []
+        for rank, kind, ident, text, categoria, weight in sorted(best.values(), key=lambda item: item[0]):
+            if kind == "poi":
+                results.append({"type": "poi", "text": text, "id": ident, "categoria": categoria})
+            elif taken[kind] < group_quota:
+                taken[kind] += 1
+                results.append({"type": kind, "text": text, "count": weight})
+            if len(results) >= limit:
+                break
+        return results
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance
+_suggest_index_instance = None
+
+def get_suggest_index() -> POISuggestIndex:
+    """Get or create POI suggest index instance"""
+    global _suggest_index_instance
+    if _suggest_index_instance is None:
+        _suggest_index_instance = POISuggestIndex()
+    return _suggest_index_instance
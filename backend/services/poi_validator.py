@@ -7,12 +7,23 @@ Valida puntos de interés con IA:
 - Valida fotos
 - Sugiere mejoras
 """
+import logging
 from openai import OpenAI
-from typing import Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
 import json
 import base64
+import requests
+from datetime import datetime, timezone
 from pathlib import Path
-from backend.config import OPENAI_API_KEY, AI_VALIDATION_ENABLED
+from backend.config import OPENAI_API_KEY, AI_VALIDATION_ENABLED, AI_STRONG_MODEL, AI_STRONG_IMAGE_DETAIL
+from backend.services.model_router import routed_completion, image_part, confident, batch_line
+from backend.services.media_store import media_source_for_url
+from backend.services.ai_resilience import ai_deadline, get_circuit_breaker
+from backend.services.prompts import Prompt, register, get_prompt, literal
+
+
+logger = logging.getLogger(__name__)
 
 
 # Categorías válidas
@@ -38,153 +49,56 @@ VALID_CATEGORIES = {
 }
 
 
-class POIValidator:
-    """Servicio de validación IA para POIs"""
-    
-    def __init__(self):
-        """Inicializar cliente OpenAI"""
-        if not OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY not configured in .env")
-        
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
-        self.model = "gpt-4o"  # Modelo con visión
-    
-    async def validate_poi(
-        self,
-        nombre: str,
-        descripcion: Optional[str],
-        direccion: str,
-        telefono: Optional[str] = None,
-        photo_path: Optional[str] = None
-    ) -> Dict:
-        """
-        Validación completa de POI con IA.
-        
-        Returns:
-            Dict con resultado de validación
-        """
-        if not AI_VALIDATION_ENABLED:
-            return self._default_validation()
-        
-        try:
-            # Validar foto si existe
-            photo_analysis = None
-            if photo_path:
-                photo_analysis = await self._validate_photo(photo_path, nombre, descripcion)
-                
-                # Si foto es rechazada, rechazar todo
-                if not photo_analysis.get("approved", True):
-                    return {
-                        "approved": False,
-                        "confidence": 0.1,
-                        "categoria": None,
-                        "subcategoria": None,
-                        "confidence_categoria": 0.0,
-                        "issues": ["Foto inapropiada o no válida"],
-                        "warnings": [],
-                        "suggestions": {},
-                        "spam_level": "none",
-                        "spam_acceptable": False,
-                        "rejection_reason": photo_analysis.get("rejection_reason", "Foto no válida")
-                    }
-            
-            # Validar datos del POI
-            data_analysis = await self._validate_data(
-                nombre, descripcion, direccion, telefono
-            )
-            
-            # Combinar análisis
-            return self._combine_analyses(data_analysis, photo_analysis)
-            
-        except Exception as e:
-            print(f"❌ POI Validation Error: {e}")
-            return self._default_validation()
-    
-    async def _validate_photo(
-        self,
-        photo_path: str,
-        nombre: str,
-        descripcion: Optional[str]
-    ) -> Dict:
-        """
-        Valida foto del POI con GPT-4 Vision.
-        """
-        try:
-            # Codificar imagen
-            image_data = self._encode_image(photo_path)
-            
-            prompt = f"""
-Analiza esta foto de un punto de interés (negocio/lugar):
-
-Nombre: {nombre}
-Descripción: {descripcion or "No proporcionada"}
+# ---------------------------------------------------------------------------
+# Prompts (ver services/prompts.py): instrucciones estáticas primero y los
+# datos del POI al final, para compartir un prefijo cacheable entre llamadas
+# ---------------------------------------------------------------------------
 
-Valida:
+POI_PHOTO_CHECKS = """Valida:
 1. ¿Es una foto real de un negocio, local o lugar?
 2. ¿Es apropiada para un directorio público?
 3. ¿NO contiene contenido sexual, violento o inapropiado?
-4. ¿La calidad es aceptable?
+4. ¿La calidad es aceptable?"""
 
-Responde en JSON:
-{{
+POI_PHOTO_SCHEMA = """Responde en JSON:
+{
   "approved": true/false,
   "confidence": 0.0-1.0,
   "is_business_photo": true/false,
   "quality": "buena/regular/mala",
   "issues": ["lista de problemas"],
   "rejection_reason": "razón si rechaza"
-}}
-"""
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=500,
-                temperature=0.3
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-            
-        except Exception as e:
-            print(f"❌ Photo Validation Error: {e}")
-            return {"approved": True, "confidence": 0.5}  # Permisivo en caso de error
-    
-    async def _validate_data(
-        self,
-        nombre: str,
-        descripcion: Optional[str],
-        direccion: str,
-        telefono: Optional[str]
-    ) -> Dict:
-        """
-        Valida datos del POI y determina categoría con ChatGPT.
-        """
-        try:
-            prompt = f"""
-Analiza esta propuesta de punto de interés para Ucú, Yucatán:
+}"""
 
-DATOS:
-Nombre: "{nombre}"
-Descripción: "{descripcion or 'No proporcionada'}"
-Dirección: "{direccion}"
-Teléfono: "{telefono or 'No proporcionado'}"
+# v1: solo mensaje de usuario, con los datos antes de las instrucciones
+register(Prompt(
+    "poi_photo", 1,
+    user=f"""
+Analiza esta foto de un punto de interés (negocio/lugar):
+
+Nombre: {{nombre}}
+Descripción: {{descripcion}}
+
+{literal(POI_PHOTO_CHECKS)}
+
+{literal(POI_PHOTO_SCHEMA)}
+""",
+    truncate=("descripcion",)
+))
+# v2: instrucciones en el mensaje de sistema
+register(Prompt(
+    "poi_photo", 2,
+    system=f"Eres un validador de fotos de puntos de interés para un directorio público.\n\n{POI_PHOTO_CHECKS}\n\n{POI_PHOTO_SCHEMA}",
+    user="""Analiza esta foto de un punto de interés (negocio/lugar):
+
+Nombre: {nombre}
+Descripción: {descripcion}""",
+    truncate=("descripcion",)
+))
+
+POI_DATA_SYSTEM_PROMPT = "Eres un validador de puntos de interés. Debes ser permisivo con lenguaje comercial normal pero estricto con contenido inapropiado."
 
-TAREAS:
+POI_DATA_TASKS = f"""TAREAS:
 
 1. IDENTIFICAR CATEGORÍA:
    Determina la categoría más apropiada de esta lista:
@@ -246,40 +160,271 @@ RESPONDE EN JSON:
 IMPORTANTE: 
 - Spam comercial normal es ACEPTABLE
 - Solo rechaza contenido REALMENTE inapropiado
-- Sé permisivo con promociones y lenguaje comercial
-"""
+- Sé permisivo con promociones y lenguaje comercial"""
+
+# v1: datos del POI antes de las tareas
+register(Prompt(
+    "poi_data", 1,
+    system=POI_DATA_SYSTEM_PROMPT,
+    user=f"""
+Analiza esta propuesta de punto de interés para Ucú, Yucatán:
+
+DATOS:
+Nombre: "{{nombre}}"
+Descripción: "{{descripcion}}"
+Dirección: "{{direccion}}"
+Teléfono: "{{telefono}}"
+
+{literal(POI_DATA_TASKS)}
+""",
+    truncate=("descripcion",)
+))
+# v2: tareas en el mensaje de sistema, solo los datos en el mensaje de usuario
+register(Prompt(
+    "poi_data", 2,
+    system=f"{POI_DATA_SYSTEM_PROMPT}\n\n{POI_DATA_TASKS}",
+    user="""Analiza esta propuesta de punto de interés para Ucú, Yucatán:
+
+DATOS:
+Nombre: "{nombre}"
+Descripción: "{descripcion}"
+Dirección: "{direccion}"
+Teléfono: "{telefono}\"""",
+    truncate=("descripcion",)
+))
+
+
+class POIValidator:
+    """Servicio de validación IA para POIs"""
+    
+    def __init__(self):
+        """Inicializar cliente OpenAI"""
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY not configured in .env")
+        
+        # Reintentos y timeouts se manejan en ai_resilience
+        self.client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+        self.model = AI_STRONG_MODEL  # Nivel fuerte; ver model_router
+    
+    async def validate_poi(
+        self,
+        nombre: str,
+        descripcion: Optional[str],
+        direccion: str,
+        telefono: Optional[str] = None,
+        photo_path: Optional[str] = None
+    ) -> Dict:
+        """
+        Validación completa de POI con IA.
+        
+        Returns:
+            Dict con resultado de validación
+        """
+        if not AI_VALIDATION_ENABLED or get_circuit_breaker().is_open:
+            return self._default_validation()
+        
+        try:
+            with ai_deadline():
+                # Validar foto si existe
+                photo_analysis = None
+                if photo_path:
+                    photo_analysis = await self._validate_photo(photo_path, nombre, descripcion)
+                    
+                    # Si foto es rechazada, rechazar todo
+                    if not photo_analysis.get("approved", True):
+                        return self._photo_rejection(photo_analysis)
+                
+                # Validar datos del POI
+                data_analysis = await self._validate_data(
+                    nombre, descripcion, direccion, telefono
+                )
+            
+            # Combinar análisis
+            return self._combine_analyses(data_analysis, photo_analysis)
+            
+        except Exception as e:
+            logger.exception("Error en validación de POI")
+            return self._default_validation()
+    
+    async def _validate_photo(
+        self,
+        photo_path: str,
+        nombre: str,
+        descripcion: Optional[str]
+    ) -> Dict:
+        """
+        Valida foto del POI con visión.
+        Primero el modelo rápido (imagen en baja resolución); si no aprueba
+        con confianza, se escala al modelo fuerte.
+        """
+        try:
+            # Codificar imagen
+            image_data = await run_in_threadpool(self._encode_image, photo_path)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un validador de puntos de interés. Debes ser permisivo con lenguaje comercial normal pero estricto con contenido inapropiado."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            prompt = get_prompt("poi_photo")
+            
+            def build_messages(detail: str):
+                return self._photo_messages(prompt, image_data, detail, nombre, descripcion)
+            
+            # Llamadas síncronas: en un hilo, sin bloquear el event loop
+            return await run_in_threadpool(
+                routed_completion,
+                self.client, "poi_validator", "validate_photo",
+                build_messages=build_messages,
+                prompt=prompt,
+                accept=lambda r: r.get("approved") is True and confident(r, "confidence"),
                 response_format={"type": "json_object"},
-                max_tokens=1000,
+                max_tokens=500,
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.exception("Error en validación de foto")
+            return {"approved": True, "confidence": 0.5}  # Permisivo en caso de error
+    
+    async def _validate_data(
+        self,
+        nombre: str,
+        descripcion: Optional[str],
+        direccion: str,
+        telefono: Optional[str]
+    ) -> Dict:
+        """
+        Valida datos del POI y determina categoría con ChatGPT.
+        El modelo rápido responde si aprueba con confianza en validación
+        y categoría; rechazos y casos dudosos se escalan al modelo fuerte.
+        """
+        try:
+            prompt = get_prompt("poi_data")
+            
+            def build_messages(detail: str):
+                return self._data_messages(prompt, nombre, descripcion, direccion, telefono)
             
-            # Validar que la categoría sea válida
-            if result.get("categoria") not in VALID_CATEGORIES:
-                result["categoria"] = "otro"
-                result["subcategoria"] = None
-                result["confidence_categoria"] = 0.5
+            result = await run_in_threadpool(
+                routed_completion,
+                self.client, "poi_validator", "validate_data",
+                build_messages=build_messages,
+                prompt=prompt,
+                accept=lambda r: (
+                    r.get("approved") is True
+                    and r.get("categoria") in VALID_CATEGORIES
+                    and r.get("spam_level") != "high"
+                    and confident(r, "confidence", "confidence_categoria")
+                ),
+                response_format={"type": "json_object"},
+                max_tokens=1000,
+                temperature=0.3
+            )
             
-            return result
+            return self._check_categoria(result)
             
         except Exception as e:
-            print(f"❌ Data Validation Error: {e}")
+            logger.exception("Error en validación de datos")
             return self._default_validation()
     
+    @staticmethod
+    def _photo_messages(
+        prompt: Prompt,
+        image_data: str,
+        detail: str,
+        nombre: str,
+        descripcion: Optional[str]
+    ) -> List[Dict]:
+        """Mensajes para validar la foto (modo interactivo y batch)."""
+        return prompt.messages(
+            image=image_part(image_data, detail),
+            nombre=nombre,
+            descripcion=descripcion or "No proporcionada"
+        )
+    
+    @staticmethod
+    def _data_messages(
+        prompt: Prompt,
+        nombre: str,
+        descripcion: Optional[str],
+        direccion: str,
+        telefono: Optional[str]
+    ) -> List[Dict]:
+        """Mensajes para validar los datos y la categoría (modo interactivo y batch)."""
+        return prompt.messages(
+            nombre=nombre,
+            descripcion=descripcion or "No proporcionada",
+            direccion=direccion,
+            telefono=telefono or "No proporcionado"
+        )
+    
+    @staticmethod
+    def _check_categoria(result: Dict) -> Dict:
+        """Validar que la categoría sea válida."""
+        if result.get("categoria") not in VALID_CATEGORIES:
+            result["categoria"] = "otro"
+            result["subcategoria"] = None
+            result["confidence_categoria"] = 0.5
+        return result
+    
+    @staticmethod
+    def _photo_rejection(photo_analysis: Dict) -> Dict:
+        """Resultado completo cuando la foto es rechazada."""
+        return {
+            "approved": False,
+            "confidence": 0.1,
+            "categoria": None,
+            "subcategoria": None,
+            "confidence_categoria": 0.0,
+            "issues": ["Foto inapropiada o no válida"],
+            "warnings": [],
+            "suggestions": {},
+            "spam_level": "none",
+            "spam_acceptable": False,
+            "rejection_reason": photo_analysis.get("rejection_reason", "Foto no válida")
+        }
+    
+    # ------------------------------------------------------------------
+    # Modo batch (OpenAI Batch API, ver services/ai_batch.py)
+    # ------------------------------------------------------------------
+    
+    def batch_requests(self, poi) -> List[Dict]:
+        """
+        Solicitudes JSONL para validar un POI en un batch.
+        
+        Sin enrutamiento por niveles: el batch no permite escalar, así que
+        se usa el modelo fuerte (a mitad de precio). Si la foto no se puede
+        leer, se valida solo con los datos.
+        
+        Returns:
+            Líneas del batch con custom_id "poi:<id>:data" y "poi:<id>:photo"
+        """
+        lines = [batch_line(
+            f"poi:{poi.id}:data", self.model,
+            self._data_messages(get_prompt("poi_data"), poi.nombre, poi.descripcion, poi.direccion, poi.telefono),
+            max_tokens=1000
+        )]
+        if poi.photo_url:
+            try:
+                image_data = self._encode_image(media_source_for_url(poi.photo_url))
+                lines.append(batch_line(
+                    f"poi:{poi.id}:photo", self.model,
+                    self._photo_messages(
+                        get_prompt("poi_photo"), image_data, AI_STRONG_IMAGE_DETAIL, poi.nombre, poi.descripcion
+                    ),
+                    max_tokens=500
+                ))
+            except Exception:
+                logger.warning("Foto omitida del batch", extra={"poi_id": poi.id})
+        return lines
+    
+    def combine_batch_results(self, data_analysis: Optional[Dict], photo_analysis: Optional[Dict]) -> Optional[Dict]:
+        """
+        Resultado final de un POI a partir de las respuestas del batch
+        (misma lógica que validate_poi). None si falta el análisis de datos.
+        """
+        if photo_analysis is not None and not photo_analysis.get("approved", True):
+            return self._photo_rejection(photo_analysis)
+        if data_analysis is None:
+            return None
+        data_analysis.setdefault("warnings", [])
+        return self._combine_analyses(self._check_categoria(data_analysis), photo_analysis)
+    
     def _combine_analyses(
         self,
         data_analysis: Dict,
@@ -305,12 +450,16 @@ IMPORTANTE:
         return result
     
     def _encode_image(self, image_path: str) -> str:
-        """Codifica imagen a base64."""
+        """Codifica imagen a base64 (ruta local o URL del almacenamiento)."""
         try:
+            if image_path.startswith('http'):
+                response = requests.get(image_path, timeout=30)
+                response.raise_for_status()
+                return base64.b64encode(response.content).decode('utf-8')
             with open(image_path, "rb") as image_file:
                 return base64.b64encode(image_file.read()).decode('utf-8')
         except Exception as e:
-            print(f"❌ Image Encoding Error: {e}")
+            logger.exception("Error codificando imagen")
             raise
     
     def _default_validation(self) -> Dict:
@@ -332,5 +481,22 @@ IMPORTANTE:
         }
 
 
+def apply_validation_result(poi, ia_result: Dict) -> None:
+    """Copia el resultado de la IA al POI (sin commit)."""
+    poi.categoria = ia_result.get("categoria")
+    poi.subcategoria = ia_result.get("subcategoria")
+    poi.categoria_confidence = ia_result.get("confidence_categoria")
+    poi.categoria_original_ia = ia_result.get("categoria")
+    poi.ia_status = "approved_ia" if ia_result.get("approved") else "rejected_ia"
+    poi.ia_confidence_score = ia_result.get("confidence")
+    poi.ia_spam_level = ia_result.get("spam_level")
+    poi.ia_spam_acceptable = ia_result.get("spam_acceptable")
+    poi.ia_warnings = ia_result.get("warnings")
+    poi.ia_suggested_changes = ia_result.get("suggestions")
+    poi.ia_rejection_reason = ia_result.get("rejection_reason")
+    poi.ia_validation_result = ia_result
+    poi.ia_validated_at = datetime.now(timezone.utc)
+
+
 # Instancia global
 poi_validator = POIValidator()
@@ -0,0 +1,226 @@
+"""
+Prompt registry: versioned prompts, local token counts and per-version metrics.
+
+The validators used to rebuild their long Spanish prompts inline on every
+call, with the user's text interpolated in the middle. Each prompt is now a
+registered Prompt (name + version) with a static system part and a short
+user template:
+
+- Layout: everything static goes first (system message, then the static
+  head of the user template) and the variable values last, so consecutive
+  calls share the longest possible prefix for provider prompt caching
+  (OpenAI caches prefixes of 1024+ tokens automatically)
+- Versions: a change to a prompt registers a new version; the latest is
+  used unless AI_PROMPT_VERSIONS pins another one ("text_moderation=1"),
+  so a layout or wording change can be compared or rolled back
+- Token budget: messages are counted locally before sending (tiktoken
+  when installed, otherwise a character estimate); user-supplied fields
+  listed in `truncate` are shortened to keep the text within
+  AI_PROMPT_MAX_INPUT_TOKENS
+- Metrics: openai_completion(prompt=...) records latency and estimated,
+  billed, cached and completion tokens per prompt version
+  (ai_prompt_duration_seconds, ai_prompt_tokens_total)
+
+Inspect the registered prompts with python -m backend.check_prompts.
+"""
+import logging
+import string
+from typing import Dict, List, Optional, Tuple
+from backend.config import AI_PROMPT_VERSIONS, AI_PROMPT_MAX_INPUT_TOKENS
+from backend.utils.metrics import AI_PROMPT_TRUNCATIONS
+
+
+logger = logging.getLogger(__name__)
+
+# Fallback estimate when tiktoken is not installed (Spanish prose with JSON)
+CHARS_PER_TOKEN = 3.5
+# Per-message framing tokens of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+# Image input tokens by detail: "low" is a flat 85; high/auto depends on the
+# size, 765 is a 1024x1024 image (4 tiles)
+IMAGE_TOKENS = {"low": 85}
+DEFAULT_IMAGE_TOKENS = 765
+# Minimum prefix OpenAI caches
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            # Imported lazily: optional dependency
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o family
+        except Exception:
+            logger.info("tiktoken not available, estimating prompt tokens from characters")
+    return _encoding
+
+
+def tokenizer_available() -> bool:
+    """Whether token counts are exact (tiktoken installed)."""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in a text (exact with tiktoken, estimated otherwise)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:int(max_tokens * CHARS_PER_TOKEN)]
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """Input tokens of a chat messages list, images included."""
+    tokens = 3  # reply priming
+    for message in messages:
+        tokens += MESSAGE_OVERHEAD_TOKENS
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += count_tokens(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                tokens += count_tokens(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS.get(part["image_url"].get("detail"), DEFAULT_IMAGE_TOKENS)
+    return tokens
+
+
+def literal(text: str) -> str:
+    """Escape braces so a static block can be embedded in a user template."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class Prompt:
+    """A versioned prompt: static system message plus a user template"""
+
+    def __init__(
+        self,
+        name: str,
+        version: int,
+        user: str,
+        system: Optional[str] = None,
+        truncate: Tuple[str, ...] = (),
+        max_input_tokens: int = AI_PROMPT_MAX_INPUT_TOKENS
+    ):
+        """
+        Args:
+            name: Prompt name (metric label)
+            version: Version number; bump it whenever the text or layout changes
+            user: User message template (str.format fields; see literal())
+            system: Static system message
+            truncate: User-supplied fields that may be shortened to fit the budget
+            max_input_tokens: Text token budget for the whole prompt
+        """
+        self.name = name
+        self.version = version
+        self.user = user
+        self.system = system
+        self.truncate = truncate
+        self.max_input_tokens = max_input_tokens
+        self.fields = [field for _, field, _, _ in string.Formatter().parse(user) if field]
+
+    @property
+    def label(self) -> str:
+        return f"v{self.version}"
+
+    @property
+    def prefix_tokens(self) -> int:
+        """Tokens shared by every call: system message + static head of the user template."""
+        head = next(string.Formatter().parse(self.user), ("",))[0]
+        system_tokens = count_tokens(self.system) + MESSAGE_OVERHEAD_TOKENS if self.system else 0
+        return system_tokens + MESSAGE_OVERHEAD_TOKENS + count_tokens(head)
+
+    def estimate(self, messages: List[Dict]) -> int:
+        """Local input token count of messages built from this prompt."""
+        return count_message_tokens(messages)
+
+    def messages(self, image: Optional[Dict] = None, **values) -> List[Dict]:
+        """
+        Chat messages with values filled in, within the token budget.
+
+        Args:
+            image: Optional image content part (model_router.image_part),
+                sent after the text
+            **values: Template fields
+        """
+        text = self.user.format(**values)
+        fixed = count_tokens(self.system) if self.system else 0
+        excess = fixed + count_tokens(text) - self.max_input_tokens
+        if excess > 0 and self.truncate:
+            for field in sorted(self.truncate, key=lambda f: -len(str(values.get(f) or ""))):
+                value = str(values.get(field) or "")
+                if not value:
+                    continue
+                values[field] = truncate_to_tokens(value, count_tokens(value) - excess)
+                text = self.user.format(**values)
+                excess = fixed + count_tokens(text) - self.max_input_tokens
+                if excess <= 0:
+                    break
+            AI_PROMPT_TRUNCATIONS.inc(prompt=self.name, version=self.label)
+            logger.info("Prompt values truncated to the token budget",
+                        extra={"prompt": self.name, "version": self.label, "budget": self.max_input_tokens})
+
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        if image is not None:
+            messages.append({"role": "user", "content": [{"type": "text", "text": text}, image]})
+        else:
+            messages.append({"role": "user", "content": text})
+        return messages
+
+
+_registry: Dict[str, Dict[int, Prompt]] = {}
+
+
+def _pinned_versions() -> Dict[str, int]:
+    pinned = {}
+    for item in AI_PROMPT_VERSIONS.split(","):
+        name, _, version = item.partition("=")
+        if name.strip() and version.strip().isdigit():
+            pinned[name.strip()] = int(version)
+    return pinned
+
+
+_PINNED = _pinned_versions()
+
+
+def register(prompt: Prompt) -> Prompt:
+    """Add a prompt version to the registry."""
+    versions = _registry.setdefault(prompt.name, {})
+    if prompt.version in versions:
+        raise ValueError(f"Prompt {prompt.name} v{prompt.version} already registered")
+    versions[prompt.version] = prompt
+    return prompt
+
+
+def get_prompt(name: str) -> Prompt:
+    """Active version of a prompt: pinned by AI_PROMPT_VERSIONS, else the latest."""
+    versions = _registry[name]
+    pinned = _PINNED.get(name)
+    if pinned in versions:
+        return versions[pinned]
+    return versions[max(versions)]
+
+
+def registered_prompts() -> List[Prompt]:
+    """Every registered version, by name and version."""
+    return [_registry[name][version] for name in sorted(_registry) for version in sorted(_registry[name])]
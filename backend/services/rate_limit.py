@@ -0,0 +1,217 @@
+"""
+Rate limiting for the AI-backed endpoints.
+
+/reports/validate-photo, POST /reports/ and /points-of-interest/pre-validate
+each make one to three OpenAI calls, so a single client looping on them can
+spend the whole OpenAI quota and keep every worker busy. Requests to these
+endpoints are admitted in two steps (see backend/middleware/rate_limit.py):
+
+- Token buckets per user and per client IP: AI_RATE_LIMIT_*_PER_MINUTE
+  tokens refill continuously up to AI_RATE_LIMIT_*_BURST; a request takes
+  one token from each bucket or gets a 429 with the seconds until the next
+  token as Retry-After
+- Concurrency cap: at most AI_MAX_CONCURRENT_REQUESTS AI-backed requests run
+  at once in a worker; others wait up to AI_CONCURRENCY_WAIT_SECONDS for a
+  slot, then get a 429
+
+A bucket is stored as one timestamp, GCRA's "theoretical arrival time"
+(equivalent to a token bucket): it lies ahead of now by the time the
+missing tokens take to refill. The memory backend keeps buckets per worker;
+AI_RATE_LIMIT_BACKEND=database shares them through rate_limit_buckets, where
+taking a token is a single conditional UPDATE, so workers never race.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional
+from sqlalchemy import create_engine, case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from backend.models.rate_limit_bucket import RateLimitBucket
+from backend.utils.metrics import AI_REQUESTS_IN_FLIGHT
+from backend.config import (
+    AI_RATE_LIMIT_BACKEND, AI_RATE_LIMIT_DATABASE_URL,
+    AI_MAX_CONCURRENT_REQUESTS, AI_CONCURRENCY_WAIT_SECONDS
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Memory backend: drop full buckets every this many checks
+PRUNE_EVERY = 1000
+# Database backend: delete full buckets this often
+CLEANUP_INTERVAL_SECONDS = 600
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    """Refill rate and capacity of a token bucket"""
+    per_minute: float
+    burst: int
+
+    @property
+    def interval(self) -> float:
+        """Seconds to refill one token."""
+        return 60.0 / self.per_minute
+
+    @property
+    def window(self) -> float:
+        """Seconds to refill an empty bucket."""
+        return self.burst * self.interval
+
+
+class MemoryRateLimiter:
+    """Token buckets in this worker's memory (thread-safe)"""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, float] = {}
+        self._lock = Lock()
+        self._checks = 0
+
+    def acquire(self, key: str, limit: BucketLimit, cost: int = 1) -> float:
+        """
+        Take cost tokens from a bucket.
+
+        Returns:
+            0 if the tokens were taken, else seconds until they are available
+        """
+        now = time.monotonic()
+        increment = limit.interval * cost
+        with self._lock:
+            tat = max(self._buckets.get(key, now), now) + increment
+            wait = tat - now - limit.window
+            if wait > 0:
+                return wait
+            self._buckets[key] = tat
+            self._checks += 1
+            if self._checks % PRUNE_EVERY == 0:
+                self._buckets = {k: v for k, v in self._buckets.items() if v > now}
+        return 0.0
+
+
+class DatabaseRateLimiter:
+    """Token buckets in rate_limit_buckets, shared by every worker"""
+
+    blocking = True
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._last_cleanup = 0.0
+
+    def acquire(self, key: str, limit: BucketLimit, cost: int = 1) -> float:
+        """
+        Take cost tokens from a bucket.
+
+        Fails open: if the database can't be reached the request is let
+        through (the concurrency cap still applies).
+
+        Returns:
+            0 if the tokens were taken, else seconds until they are available
+        """
+        now = time.time()
+        increment = limit.interval * cost
+        start = case((RateLimitBucket.tat > now, RateLimitBucket.tat), else_=now)
+        try:
+            self._cleanup(now)
+            for _ in range(2):
+                try:
+                    with self.engine.begin() as conn:
+                        taken = conn.execute(
+                            update(RateLimitBucket)
+                            .where(RateLimitBucket.key == key, start + increment - now <= limit.window)
+                            .values(tat=start + increment)
+                        ).rowcount
+                        if taken:
+                            return 0.0
+                        tat = conn.execute(
+                            select(RateLimitBucket.tat).where(RateLimitBucket.key == key)
+                        ).scalar()
+                        if tat is not None:
+                            return max(tat, now) + increment - now - limit.window
+                        conn.execute(insert(RateLimitBucket).values(key=key, tat=now + increment))
+                        return 0.0
+                except IntegrityError:
+                    # Another worker created the bucket first; take from it
+                    continue
+        except SQLAlchemyError as e:
+            logger.warning("Rate limit check failed, allowing request", extra={"error": str(e)})
+        return 0.0
+
+    def _cleanup(self, now: float) -> None:
+        if now - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = now
+        with self.engine.begin() as conn:
+            conn.execute(delete(RateLimitBucket).where(RateLimitBucket.tat < now))
+
+
+class AIConcurrencyLimiter:
+    """Cap on AI-backed requests running at once in this worker"""
+
+    def __init__(self, max_concurrent: int = AI_MAX_CONCURRENT_REQUESTS,
+                 wait_seconds: float = AI_CONCURRENCY_WAIT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.wait_seconds = wait_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @property
+    def saturated(self) -> bool:
+        """True when every slot is taken (acquire would wait)"""
+        return self._semaphore.locked()
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to wait_seconds; False if none freed up."""
+        if self.saturated:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_seconds)
+            except asyncio.TimeoutError:
+                return False
+        else:
+            await self._semaphore.acquire()
+        AI_REQUESTS_IN_FLIGHT.inc()
+        return True
+
+    def release(self) -> None:
+        self._semaphore.release()
+        AI_REQUESTS_IN_FLIGHT.dec()
+
+
+def _create_engine(database_url: str):
+    if "sqlite" in database_url:
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(database_url, pool_size=2, max_overflow=5, pool_pre_ping=True)
+    # Not the application database, so Alembic doesn't manage it
+    RateLimitBucket.__table__.create(engine, checkfirst=True)
+    return engine
+
+
+# Global instances
+_rate_limiter_instance = None
+_ai_concurrency_instance: Optional[AIConcurrencyLimiter] = None
+
+
+def get_rate_limiter():
+    """Get or create the rate limiter for AI_RATE_LIMIT_BACKEND"""
+    global _rate_limiter_instance
+    if _rate_limiter_instance is None:
+        if AI_RATE_LIMIT_BACKEND == "database":
+            if AI_RATE_LIMIT_DATABASE_URL:
+                engine = _create_engine(AI_RATE_LIMIT_DATABASE_URL)
+            else:
+                from backend.database import engine
+            _rate_limiter_instance = DatabaseRateLimiter(engine)
+        else:
+            _rate_limiter_instance = MemoryRateLimiter()
+    return _rate_limiter_instance
+
+
+def get_ai_concurrency_limiter() -> AIConcurrencyLimiter:
+    """Get or create the AI concurrency limiter instance"""
+    global _ai_concurrency_instance
+    if _ai_concurrency_instance is None:
+        _ai_concurrency_instance = AIConcurrencyLimiter()
+    return _ai_concurrency_instance
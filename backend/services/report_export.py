@@ -0,0 +1,180 @@
+"""
+Streaming export of reports for GIS tools and spreadsheets.
+
+Rows are read with a server-side cursor (yield_per: a named cursor on
+PostgreSQL) and written out chunk by chunk, so exporting a full year of
+reports keeps memory flat. Only plain columns are selected: no ORM
+objects, no identity map and no reporter PII (email/CURP).
+
+Formats:
+- csv: header plus one row per report; text cells starting with a formula
+  character (= + - @ tab CR) are prefixed with ' so spreadsheets show them
+  as text instead of evaluating citizen-written content
+- ndjson: one JSON object per line
+- geojson: FeatureCollection of Point features (properties = columns)
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Dict, Iterator, Optional
+from sqlalchemy import select
+from backend.database import SessionLocal
+from backend.models.report import Report
+from backend.config import REPORT_EXPORT_BATCH_SIZE
+
+
+EXPORT_COLUMNS = [
+    Report.id,
+    Report.category,
+    Report.status,
+    Report.priority,
+    Report.description,
+    Report.latitude,
+    Report.longitude,
+    Report.photo_url,
+    Report.user_id,
+    Report.assigned_to,
+    Report.ai_urgency_level,
+    Report.ai_severity_score,
+    Report.created_at,
+    Report.updated_at,
+]
+FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "geojson": "application/geo+json",
+}
+EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "geojson": "geojson"}
+
+
+class ExportFilters:
+    """Optional filters applied to an export"""
+
+    def __init__(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        min_priority: Optional[int] = None
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = status
+        self.category = category
+        self.min_priority = min_priority
+
+    def apply(self, query):
+        if self.start_date:
+            query = query.where(Report.created_at >= datetime.combine(self.start_date, time.min))
+        if self.end_date:
+            # end_date is inclusive
+            query = query.where(Report.created_at <= datetime.combine(self.end_date, time.max))
+        if self.status:
+            query = query.where(Report.status == self.status)
+        if self.category:
+            query = query.where(Report.category == self.category)
+        if self.min_priority:
+            query = query.where(Report.priority >= self.min_priority)
+        return query
+
+
+def iter_report_rows(filters: ExportFilters, batch_size: int = REPORT_EXPORT_BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Yield reports as plain dicts, oldest first.
+
+    Opens its own session: the generator outlives the request handler
+    while the StreamingResponse is being sent.
+    """
+    query = filters.apply(select(*EXPORT_COLUMNS)).order_by(Report.created_at, Report.id)
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            yield dict(zip(FIELD_NAMES, row))
+    finally:
+        db.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default, separators=(",", ":"))
+
+
+# Leading characters that make Excel/LibreOffice/Sheets treat a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows: Iterator[Dict], chunk_rows: int = 500) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELD_NAMES)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_csv_cell(value) for value in row.values()])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterator[Dict], chunk_rows: int = 500) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(_dumps(row))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_geojson(rows: Iterator[Dict], chunk_rows: int = 500) -> Iterator[str]:
+    yield '{"type":"FeatureCollection","features":['
+    features = []
+    first = True
+    for row in rows:
+        properties = {key: value for key, value in row.items() if key not in ("latitude", "longitude")}
+        features.append(_dumps({
+            "type": "Feature",
+            "id": row["id"],
+            "geometry": {"type": "Point", "coordinates": [row["longitude"], row["latitude"]]},
+            "properties": properties,
+        }))
+        if len(features) >= chunk_rows:
+            yield ("" if first else ",") + ",".join(features)
+            first = False
+            features = []
+    if features:
+        yield ("" if first else ",") + ",".join(features)
+    yield "]}"
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "geojson": stream_geojson,
+}
+
+
+def export_reports(fmt: str, filters: ExportFilters) -> Iterator[bytes]:
+    """Encoded export body for StreamingResponse."""
+    for chunk in STREAMERS[fmt](iter_report_rows(filters)):
+        if chunk:
+            yield chunk.encode("utf-8")
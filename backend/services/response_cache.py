@@ -0,0 +1,245 @@
+"""
+Response cache for public (unauthenticated) endpoints.
+
+Landing-page endpoints (/announcements/public, /reports/public/approved,
+/points-of-interest/public) change rarely but are hit on every visit. This
+module caches their serialized JSON bodies:
+
+- In-process LRU with TTL (always on)
+- Optional shared Redis backend (RESPONSE_CACHE_REDIS_URL) so every API
+  worker shares entries and invalidations
+
+Entries are grouped in namespaces ("announcements", "reports", "pois").
+Write routes call invalidate(namespace), which bumps the namespace version:
+old entries become unreachable immediately and age out of the LRU.
+
+Without Redis, versions live in each worker's memory, so a write only
+invalidates the worker that handled it; the others keep serving their copy
+for up to RESPONSE_CACHE_TTL_SECONDS. Run a single worker or set
+RESPONSE_CACHE_REDIS_URL when WEB_CONCURRENCY > 1 (a warning is logged).
+
+Responses carry a strong ETag; If-None-Match requests get a 304 without
+touching the database.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from backend.config import (
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_REDIS_URL, WEB_CONCURRENCY
+)
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+# (etag, body)
+CacheEntry = Tuple[str, bytes]
+
+
+class ResponseCache:
+    """In-process LRU/TTL cache with optional Redis sharing"""
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        default_ttl: int = RESPONSE_CACHE_TTL_SECONDS,
+        redis_url: Optional[str] = RESPONSE_CACHE_REDIS_URL
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._redis = None
+        if redis_url:
+            # Imported lazily: only needed when a shared backend is configured
+            import redis
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.2)
+        elif WEB_CONCURRENCY > 1:
+            logger.warning(
+                "Response cache without Redis on several workers: invalidations "
+                "only reach the worker that made the write",
+                extra={"workers": WEB_CONCURRENCY, "stale_for_seconds": default_ttl}
+            )
+
+    def get(self, namespace: str, key: str, version: Optional[int] = None) -> Optional[CacheEntry]:
+        """Get a cached entry, or None on miss/expiry."""
+        full_key = self._full_key(namespace, key, version)
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(full_key)
+            if item is not None:
+                expires_at, entry = item
+                if expires_at > now:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return entry
+                del self._entries[full_key]
+
+        entry = self._shared_get(full_key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store_local(full_key, entry, self.default_ttl)
+        return entry
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        entry: CacheEntry,
+        ttl: Optional[int] = None,
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Store an entry in the local LRU (and the shared backend).
+
+        Pass the version read before building the entry: if the namespace
+        was invalidated meanwhile, the entry lands under the old version and
+        is never served.
+        """
+        ttl = ttl or self.default_ttl
+        full_key = self._full_key(namespace, key, version)
+        with self._lock:
+            self._store_local(full_key, entry, ttl)
+        self._shared_set(full_key, entry, ttl)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Invalidate every entry of the given namespaces."""
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+                prefix = f"{namespace}:"
+                for full_key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[full_key]
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                for namespace in namespaces:
+                    pipe.incr(f"rc:ver:{namespace}")
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Response cache invalidation failed", extra={"error": str(e)})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _full_key(self, namespace: str, key: str, version: Optional[int] = None) -> str:
+        if version is None:
+            version = self.version(namespace)
+        return f"{namespace}:{version}:{key}"
+
+    def version(self, namespace: str) -> int:
+        """Current version of a namespace."""
+        if self._redis is not None:
+            try:
+                return int(self._redis.get(f"rc:ver:{namespace}") or 0)
+            except Exception:
+                pass
+        return self._versions.get(namespace, 0)
+
+    def _store_local(self, full_key: str, entry: CacheEntry, ttl: int) -> None:
+        self._entries[full_key] = (time.monotonic() + ttl, entry)
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_get(self, full_key: str) -> Optional[CacheEntry]:
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(f"rc:{full_key}")
+        except Exception:
+            return None
+        if not raw:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode(), body
+
+    def _shared_set(self, full_key: str, entry: CacheEntry, ttl: int) -> None:
+        if self._redis is None:
+            return
+        etag, body = entry
+        try:
+            self._redis.set(f"rc:{full_key}", etag.encode() + b"\n" + body, ex=ttl)
+        except Exception as e:
+            logger.warning("Response cache write failed", extra={"error": str(e)})
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def cached_json_response(
+    request: Request,
+    namespace: str,
+    build: Callable[[], Any],
+    ttl: Optional[int] = None
+) -> Response:
+    """
+    Serve a JSON response from the cache, building it on a miss.
+
+    Args:
+        request: Incoming request (path + query string form the cache key)
+        namespace: Invalidation namespace ("announcements", "reports", "pois")
+        build: Callable returning the JSON-serializable payload
+        ttl: Optional TTL override in seconds
+
+    Returns:
+        200 with the cached body and ETag, or 304 if the client's copy is current
+    """
+    cache = get_response_cache()
+    key = f"{request.url.path}?{'&'.join(sorted(request.url.query.split('&')))}"
+
+    # Read once: a write landing while build() runs must not get its fresh
+    # version attached to the stale body
+    version = cache.version(namespace) if RESPONSE_CACHE_ENABLED else 0
+    entry = cache.get(namespace, key, version) if RESPONSE_CACHE_ENABLED else None
+    if entry is None:
+        body = json.dumps(
+            jsonable_encoder(build()), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        entry = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        if RESPONSE_CACHE_ENABLED:
+            cache.set(namespace, key, entry, ttl, version)
+
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_public_cache(*namespaces: str) -> None:
+    """Invalidate cached public responses after a write."""
+    get_response_cache().invalidate(*namespaces)
+
+
+# Singleton instance
+_response_cache_instance = None
+
+def get_response_cache() -> ResponseCache:
+    """Get or create response cache instance"""
+    global _response_cache_instance
+    if _response_cache_instance is None:
+        _response_cache_instance = ResponseCache()
+    return _response_cache_instance
@@ -0,0 +1,294 @@
+"""
+Full-text search over reports and points of interest.
+
+Indexed text:
+- reports: description (weight A) and ai_keywords (weight B)
+- points_of_interest: nombre (A), descripcion (B), direccion + colonia (C)
+
+Backends, chosen by database dialect:
+- PostgreSQL: STORED generated tsvector columns (search_vector) with a GIN
+  index, using the es_unaccent text search configuration (Spanish stemming
+  plus accent folding). Generated columns keep themselves up to date.
+- SQLite: FTS5 external-content tables (reports_fts, points_of_interest_fts)
+  with the unicode61 tokenizer (case and accent folding), kept in sync by
+  triggers. FTS5 has no Spanish stemmer, so query terms get light plural
+  stripping and prefix matching instead ("baches" -> bach*).
+- Anything else, or a database where the schema has not been installed:
+  fallback to ILIKE on the main text column.
+
+Install the schema with `alembic upgrade head`, or with
+install_search_schema() on databases built with create_all.
+
+Results are ranked (ts_rank_cd / bm25) and paginated.
+"""
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Select, column, func, inspect, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from backend.models.report import Report
+from backend.models.point_of_interest import PointOfInterest
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 8
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchTarget:
+    """A searchable table: indexed columns and their weights"""
+
+    def __init__(self, model, columns: List[Tuple[str, str]], fallback_column):
+        self.model = model
+        self.table = model.__tablename__
+        self.fts_table = f"{self.table}_fts"
+        # (column name, tsvector weight)
+        self.columns = columns
+        self.fallback_column = fallback_column
+
+    @property
+    def column_names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+
+REPORTS = SearchTarget(Report, [("description", "A"), ("ai_keywords", "B")], Report.description)
+POIS = SearchTarget(
+    PointOfInterest,
+    [("nombre", "A"), ("descripcion", "B"), ("direccion", "C"), ("colonia", "C")],
+    PointOfInterest.nombre,
+)
+TARGETS = [REPORTS, POIS]
+
+
+# ============================================================================
+# Query parsing
+# ============================================================================
+
+def fold(value: str) -> str:
+    """Lowercase and strip accents ("Mérida" -> "merida")."""
+    normalized = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+def query_terms(query: str) -> List[str]:
+    """Folded words of a user query (at most MAX_TERMS)."""
+    return _WORD_RE.findall(fold(query or ""))[:MAX_TERMS]
+
+
+def _strip_plural(term: str) -> str:
+    # Poor man's Spanish stemming for FTS5: luminarias -> luminari, baches -> bach
+    if len(term) > 4 and term.endswith("es"):
+        return term[:-2]
+    if len(term) > 3 and term.endswith("s"):
+        return term[:-1]
+    return term
+
+
+def fts5_match(terms: List[str]) -> str:
+    return " AND ".join(f'"{_strip_plural(term)}"*' for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+# ============================================================================
+# Schema
+# ============================================================================
+
+# Same objects as migration b7e3d9f1c2a5, which keeps its own frozen copy of
+# the DDL; changing the indexed columns here needs a new migration.
+
+def _postgres_ddl(target: SearchTarget) -> List[str]:
+    parts = " || ".join(
+        f"setweight(to_tsvector('es_unaccent', coalesce({name}, '')), '{weight}')"
+        for name, weight in target.columns
+    )
+    return [
+        f"ALTER TABLE {target.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({parts}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{target.table}_search_vector ON {target.table} USING GIN (search_vector)",
+    ]
+
+
+def _sqlite_ddl(target: SearchTarget) -> List[str]:
+    cols = ", ".join(target.column_names)
+    new_values = ", ".join(f"new.{name}" for name in target.column_names)
+    old_values = ", ".join(f"old.{name}" for name in target.column_names)
+    fts = target.fts_table
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{target.table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {target.table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {target.table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {target.table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+POSTGRES_CONFIG_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+]
+
+
+def install_search_schema(conn: Connection) -> List[str]:
+    """
+    Create the full-text objects for every existing searchable table.
+
+    Idempotent; on SQLite it also rebuilds the FTS index from the table.
+
+    Returns:
+        Names of the tables that were indexed
+    """
+    dialect = conn.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        logger.warning("Full-text search not supported", extra={"dialect": dialect})
+        return []
+
+    inspector = inspect(conn)
+    indexed = []
+    if dialect == "postgresql":
+        for statement in POSTGRES_CONFIG_DDL:
+            conn.execute(text(statement))
+    for target in TARGETS:
+        if not inspector.has_table(target.table):
+            continue
+        statements = _postgres_ddl(target) if dialect == "postgresql" else _sqlite_ddl(target)
+        for statement in statements:
+            conn.execute(text(statement))
+        indexed.append(target.table)
+    _available.clear()
+    return indexed
+
+
+def drop_search_schema(conn: Connection) -> None:
+    """Remove the full-text objects created by install_search_schema."""
+    dialect = conn.dialect.name
+    inspector = inspect(conn)
+    for target in TARGETS:
+        if dialect == "postgresql" and inspector.has_table(target.table):
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_{target.table}_search_vector"))
+            conn.execute(text(f"ALTER TABLE {target.table} DROP COLUMN IF EXISTS search_vector"))
+        elif dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {target.fts_table}_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {target.fts_table}"))
+    if dialect == "postgresql":
+        conn.execute(text("DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent"))
+    _available.clear()
+
+
+# (engine url, table) -> full-text objects present
+_available: Dict[Tuple[str, str], bool] = {}
+
+
+def _has_fulltext(db: Session, target: SearchTarget) -> bool:
+    bind = db.get_bind()
+    key = (str(bind.url), target.table)
+    if key not in _available:
+        inspector = inspect(bind)
+        if bind.dialect.name == "sqlite":
+            _available[key] = inspector.has_table(target.fts_table)
+        elif bind.dialect.name == "postgresql":
+            _available[key] = inspector.has_table(target.table) and any(
+                column["name"] == "search_vector" for column in inspector.get_columns(target.table)
+            )
+        else:
+            _available[key] = False
+    return _available[key]
+
+
+# ============================================================================
+# Search
+# ============================================================================
+
+def ranked_ids(db: Session, target: SearchTarget, query: str) -> Optional[Select]:
+    """
+    SELECT (id, rank) of rows matching `query`; lower rank is better.
+
+    Returns None when the query has no searchable words.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return None
+
+    dialect = db.get_bind().dialect.name
+    if _has_fulltext(db, target):
+        if dialect == "sqlite":
+            fts = table(target.fts_table, column("rowid"))
+            return (
+                select(fts.c.rowid.label("id"), func.bm25(literal_column(fts.name)).label("rank"))
+                .where(literal_column(fts.name).op("MATCH")(fts5_match(terms)))
+            )
+        vector = literal_column("search_vector")
+        ts_query = func.to_tsquery(literal_column("'es_unaccent'"), tsquery(terms))
+        return (
+            select(target.model.id.label("id"), (-func.ts_rank_cd(vector, ts_query)).label("rank"))
+            .where(vector.op("@@")(ts_query))
+        )
+
+    # No full-text schema: unranked substring match on the main column
+    condition = target.fallback_column.ilike(f"%{query.strip()}%")
+    return select(target.model.id.label("id"), literal_column("0").label("rank")).where(condition)
+
+
+def search(
+    db: Session,
+    target: SearchTarget,
+    query: str,
+    filters: Optional[list] = None,
+    page: int = 1,
+    page_size: int = 20,
+    options: Optional[list] = None
+) -> Tuple[list, int]:
+    """
+    Ranked, paginated full-text search.
+
+    Args:
+        db: Database session
+        target: REPORTS or POIS
+        query: User query
+        filters: Extra SQLAlchemy conditions on the model
+        page: 1-based page number
+        page_size: Results per page
+        options: Loader options for the page query (e.g. joinedload)
+
+    Returns:
+        (model instances for the page, total matches)
+    """
+    matches = ranked_ids(db, target, query)
+    if matches is None:
+        return [], 0
+    matches = matches.subquery()
+    model = target.model
+
+    base = select(model, matches.c.rank).join(matches, model.id == matches.c.id)
+    for condition in filters or []:
+        base = base.where(condition)
+
+    total = db.execute(select(func.count()).select_from(base.subquery())).scalar()
+    page_query = base.options(*options) if options else base
+    rows = db.execute(
+        page_query.order_by(matches.c.rank, model.id.desc())
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+    ).all()
+    return [row[0] for row in rows], total
@@ -0,0 +1,285 @@
+"""
+Storage backends for uploaded media.
+
+The media store writes blobs through a StorageBackend instead of hard-coded
+filesystem paths, so several API replicas can share one bucket:
+
+- LocalStorage: files under backend/static/uploads/media, served by the
+  /static mount (default, single instance / development)
+- S3Storage: any S3-compatible object store (AWS S3, MinIO, Cloudflare R2).
+  Large files use multipart uploads, and clients can upload directly to the
+  bucket with presigned URLs so the bytes never pass through API workers.
+
+Backends expose blocking methods plus async wrappers (a*) that run them in a
+worker thread, so route handlers never block the event loop on storage I/O.
+
+Select the backend with STORAGE_BACKEND=local|s3 (see config.py). For local
+S3 testing, run MinIO and point S3_ENDPOINT_URL at it:
+
+    docker run -p 9000:9000 minio/minio server /data
+
+or, without Docker, the in-memory stand-in used by the tests:
+
+    uvicorn backend.benchmarks.fake_s3:app --port 9100
+"""
+import base64
+import os
+from mimetypes import guess_type
+from typing import Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from backend.config import (
+    STORAGE_BACKEND, MEDIA_LOCAL_ROOT, MEDIA_URL_PREFIX,
+    S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID,
+    S3_SECRET_ACCESS_KEY, S3_PUBLIC_URL, S3_PRESIGN_EXPIRES_SECONDS
+)
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class StorageError(Exception):
+    """Raised when the storage backend cannot complete an operation."""
+
+
+class StorageBackend:
+    """Base class for media storage backends"""
+
+    supports_presigned_uploads = False
+
+    def save(self, key: str, local_path: str) -> None:
+        """Move/upload a fully written local file to `key`."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None if the object does not exist."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public URL stored in photo_url/image_url columns."""
+        raise NotImplementedError
+
+    def source(self, key: str) -> str:
+        """Local path or fetchable URL used to read the content (AI analysis)."""
+        raise NotImplementedError
+
+    def checksum_sha256(self, key: str) -> Optional[str]:
+        """Hex SHA-256 recorded by the backend, if it keeps one."""
+        return None
+
+    def presign_upload(self, key: str, sha256: str, content_type: str, size: int) -> Dict:
+        """Presigned direct-upload request for clients, limited to exactly `size` bytes."""
+        raise StorageError("Este almacenamiento no soporta subidas directas")
+
+    # Async wrappers -----------------------------------------------------
+
+    async def asave(self, key: str, local_path: str) -> None:
+        await run_in_threadpool(self.save, key, local_path)
+
+    async def aexists(self, key: str) -> bool:
+        return await run_in_threadpool(self.exists, key)
+
+    async def asize(self, key: str) -> Optional[int]:
+        return await run_in_threadpool(self.size, key)
+
+    async def adelete(self, key: str) -> None:
+        await run_in_threadpool(self.delete, key)
+
+    async def apresign_upload(self, key: str, sha256: str, content_type: str, size: int) -> Dict:
+        return await run_in_threadpool(self.presign_upload, key, sha256, content_type, size)
+
+    async def achecksum_sha256(self, key: str) -> Optional[str]:
+        return await run_in_threadpool(self.checksum_sha256, key)
+
+
+class LocalStorage(StorageBackend):
+    """Local filesystem storage served by the /static mount"""
+
+    def __init__(self, root: str = MEDIA_LOCAL_ROOT, url_prefix: str = MEDIA_URL_PREFIX):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def save(self, key: str, local_path: str) -> None:
+        final_path = self.path(key)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(local_path, final_path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def source(self, key: str) -> str:
+        return self.path(key)
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible object storage (AWS S3, MinIO, R2)"""
+
+    supports_presigned_uploads = True
+
+    def __init__(
+        self,
+        bucket: str = S3_BUCKET,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: str = S3_REGION,
+        access_key_id: Optional[str] = S3_ACCESS_KEY_ID,
+        secret_access_key: Optional[str] = S3_SECRET_ACCESS_KEY,
+        public_url: Optional[str] = S3_PUBLIC_URL,
+        presign_expires: int = S3_PRESIGN_EXPIRES_SECONDS,
+    ):
+        if not bucket:
+            raise ValueError("S3_BUCKET not configured in .env")
+
+        # Imported lazily: only needed when STORAGE_BACKEND=s3
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presign_expires = presign_expires
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            config=Config(
+                signature_version="s3v4",
+                s3={"addressing_style": "path"},
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        )
+
+    def save(self, key: str, local_path: str) -> None:
+        try:
+            self.client.upload_file(
+                local_path,
+                self.bucket,
+                key,
+                ExtraArgs={
+                    "ContentType": guess_type(key)[0] or "application/octet-stream",
+                    "CacheControl": IMMUTABLE_CACHE_CONTROL,
+                },
+                Config=self.transfer_config,
+            )
+        except Exception as e:
+            raise StorageError(f"Error subiendo {key} a S3: {e}") from e
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+
+    def _head(self, key: str, **kwargs) -> Optional[Dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key, **kwargs)
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise StorageError(f"Error consultando {key} en S3: {e}") from e
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        head = self._head(key)
+        return head["ContentLength"] if head else None
+
+    def checksum_sha256(self, key: str) -> Optional[str]:
+        head = self._head(key, ChecksumMode="ENABLED")
+        checksum = head.get("ChecksumSHA256") if head else None
+        if not checksum or "-" in checksum:
+            return None  # Missing, or composite checksum of a multipart upload
+        return base64.b64decode(checksum).hex()
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+        except self._client_error as e:
+            raise StorageError(f"Error eliminando {key} de S3: {e}") from e
+
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        base = (self.endpoint_url or f"https://{self.bucket}.s3.amazonaws.com").rstrip("/")
+        if self.endpoint_url:
+            return f"{base}/{self.bucket}/{key}"
+        return f"{base}/{key}"
+
+    def source(self, key: str) -> str:
+        if self.public_url:
+            return self.url(key)
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.presign_expires,
+        )
+
+    def presign_upload(self, key: str, sha256: str, content_type: str, size: int) -> Dict:
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode("ascii")
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "CacheControl": IMMUTABLE_CACHE_CONTROL,
+                "ChecksumSHA256": checksum,
+                # Signed, so the bucket rejects a PUT of any other length
+                "ContentLength": size,
+            },
+            ExpiresIn=self.presign_expires,
+        )
+        return {
+            "method": "PUT",
+            "url": url,
+            "headers": {
+                "Content-Type": content_type,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+                "x-amz-checksum-sha256": checksum,
+            },
+            "expires_in": self.presign_expires,
+        }
+
+
+# Singleton instance
+_storage_instance = None
+
+def get_storage() -> StorageBackend:
+    """Get or create the configured storage backend"""
+    global _storage_instance
+    if _storage_instance is None:
+        if STORAGE_BACKEND == "s3":
+            _storage_instance = S3Storage()
+        else:
+            _storage_instance = LocalStorage()
+    return _storage_instance
@@ -0,0 +1,302 @@
+"""
+Local pre-filter for report descriptions, run before the OpenAI moderation call.
+
+AIValidator.check_offensive_text used to send every description to the
+model. Most descriptions are either obviously fine ("bache enorme frente
+a la escuela de la calle 21") or obviously bad (profanity, "esto es una
+prueba", "asdfghjkl"). This module decides those cases locally in
+microseconds and returns None for everything else, which is then
+escalated to the model as before.
+
+Signals (all on accent-folded, lowercase text):
+- Profanity lexicon: strong terms decide "offensive"; mild or
+  context-dependent terms ("pinche", "idiota", threats) force escalation
+- Leetspeak and stretched letters are normalized first ("p3nd3jooo")
+- Test phrases: "prueba", "test", "hackathon"... with almost nothing else
+- Nonsense: keyboard runs, vowel-less or long consonant runs, character
+  bigrams unseen in Spanish, and very low character entropy
+- Word counts: four or more words with a civic keyword and no other
+  signal are clean. Short texts are never rejected as vague locally: "Ruido
+  excesivo" or "Vandalismo" can be real complaints, so the model decides
+
+Local rejections can issue strikes, so every rule is tuned for precision;
+recall is left to the model. The labelled corpus and the precision/recall
+benchmark live in backend/benchmarks (prefilter_corpus.jsonl, prefilter.py).
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+from backend.config import TEXT_PREFILTER_ACCEPT_CLEAN
+
+
+_TOKEN_RE = re.compile(r"[\w@$]+", re.UNICODE)
+_LETTER_RE = re.compile(r"[a-z]")
+_STRETCH_RE = re.compile(r"([a-z])\1{2,}")
+_LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s"})
+
+VOWELS = set("aeiouy")
+
+# Strong terms: decided locally. Pattern -> (offense_type, severity)
+STRONG_TERMS = {
+    r"pendej\w*": ("vulgar", "medium"),
+    r"put[oa]s?": ("vulgar", "medium"),
+    r"putiza\w*": ("vulgar", "medium"),
+    r"ching(?:a|as|ar|ada|adas|ado|ados|adera|aderas|ue|uen|ues)": ("vulgar", "medium"),
+    r"vergas?": ("vulgar", "medium"),
+    r"culer[oa]s?": ("vulgar", "medium"),
+    r"ojetes?": ("vulgar", "medium"),
+    r"mamadas?": ("vulgar", "medium"),
+    r"mamon(?:es|a|as)?": ("insult", "medium"),
+    r"hij[oa]s? de (?:su )?(?:puta|perra)": ("insult", "high"),
+    r"jot[oa]s?": ("hate", "high"),
+    r"maricon(?:es|a|as)?": ("hate", "high"),
+}
+
+# Mild or context-dependent: never decided locally ("un chingo de baches",
+# "el pinche bache", "casi me mato en el hoyo")
+ESCALATE_TERMS = [
+    r"pinche\w*", r"chingo\w*", r"chingon\w*", r"cabron\w*", r"mierda\w*", r"idiota\w*",
+    r"imbecil\w*", r"estupid\w*", r"inutil\w*", r"rateros?", r"corrupt\w*", r"mat(?:ar|o|e|en|an|arte|arlo)",
+    r"muer\w*", r"sexo", r"culo", r"nalga\w*", r"naco\w*", r"indio\w*", r"gord[oa]\w*",
+    r"wey", r"guey", r"alv", r"ptm", r"hdp", r"nmms", r"xd+",
+]
+
+TEST_MARKERS = {
+    "prueba", "pruebas", "probando", "probar", "test", "testing", "testeo", "tester",
+    "hackathon", "hackaton", "demo", "demostracion", "lorem", "ipsum", "dummy", "foo", "mundo",
+}
+# Words that usually come along with a test marker ("hola, probando la app")
+TEST_FILLER = {
+    "hola", "sistema", "funciona", "app", "aplicacion", "ejemplo", "reporte",
+    "primer", "primera", "otra", "otro", "vez", "equipo", "plataforma", "uno", "dos", "tres",
+    "dolor", "sit", "amet",
+}
+
+# Word stems of the four report categories (and common places)
+CIVIC_STEMS = (
+    "bache", "hoyo", "hueco", "zanja", "calle", "avenida", "av", "carretera", "camino", "banquet",
+    "acera", "paviment", "asfalt", "grieta", "fisura", "hundi", "socavon", "tope", "reductor",
+    "alcantarill", "coladera", "registro", "tapa", "drenaj", "desague", "fuga", "agua", "inund",
+    "encharc", "charco", "poste", "luminari", "lampara", "alumbrado", "ilumin", "luz", "luces",
+    "foco", "oscur", "apagad", "fundid", "semaforo", "senal", "letrero", "pintura", "paso",
+    "peatonal", "cruce", "crucero", "esquina", "glorieta", "rampa", "puente", "arbol", "rama",
+    "maleza", "vegetacion", "hierba", "cable", "basura", "escuela", "parque", "colonia",
+    "fraccionamiento", "cuadra", "vecin", "carril", "vialidad", "trafico", "transito",
+)
+
+STOPWORDS = {
+    "a", "al", "algo", "ante", "con", "de", "del", "el", "ella", "en", "es", "esta", "este",
+    "esto", "eso", "la", "las", "le", "lo", "los", "me", "mi", "muy", "no", "o", "para", "pero",
+    "por", "que", "se", "si", "sin", "su", "sus", "un", "una", "uno", "y", "ya", "yo", "tu",
+    "solo", "nada", "mas", "bien", "ok", "okey", "va", "ver", "hay", "ser", "son", "como",
+}
+
+KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+
+# Spanish sample for the character bigram model: category vocabulary plus
+# common words. Only the set of observed bigrams is used.
+SPANISH_SAMPLE = """
+el la los las un una unos unas de del al en con por para sin sobre entre hasta desde hacia
+que como cuando donde porque pero aunque mientras muy mas menos tambien todavia ya nunca siempre
+hay esta estan estaba tiene tienen hace hacen puede pueden necesita necesitan desde hace semanas meses
+dias anos noche tarde manana hoy ayer frente junto cerca lejos esquina cruce calle avenida carretera
+camino privada cerrada fraccionamiento colonia centro norte sur oriente poniente numero entre y
+bache baches hoyo hoyos hueco grieta grietas fisura fisuras hundimiento hundimientos socavon tope topes
+pavimento asfalto banqueta banquetas acera rota roto rotas dañada dañado levantada levantado
+alcantarilla alcantarillas coladera registro tapa tapas drenaje desague fuga fugas agua aguas negras
+inundacion inundada encharcamiento charco lluvia lluvias poste postes luminaria luminarias lampara
+lamparas alumbrado publico luz luces foco focos oscuro oscura apagada apagado fundida fundido
+semaforo semaforos señal señales senalamiento letrero pintura vial desgastada paso peatonal cebra
+rampa puente arbol arboles rama ramas maleza vegetacion hierba cable cables basura escombro
+peligro peligroso peligrosa accidente accidentes autos carros coches motos bicicletas camion
+camiones peatones ninos personas vecinos escuela parque mercado iglesia hospital tienda casa casas
+grande grandes pequeño profundo profunda enorme varios varias mucho mucha muchos muchas todo toda
+caer cayo cayeron caido caida llanta llantas ponchada dañar daña golpe golpes reparar reparen
+arreglar arreglen atender urgente favor gracias reporto reportar problema problemas servicio
+municipio ayuntamiento trabajo obra obras quedo quedaron dejaron abierto abierta tapado tapada
+visible visibilidad obstruye obstruyen impide tapar bloquea bloquean funciona funcionan sirve
+mal estado desde hace tiempo nadie viene vino vinieron ningun ninguna nueva nuevo vieja viejo
+metros cuadras altura orilla mitad lado derecho izquierdo ambos sentidos carril carriles vuelta
+ciudad pueblo comisaria merida ucu yucatan zona area cruzar cruzan pasar pasan circulan conducir
+"""
+
+
+def fold(value: str) -> str:
+    """Lowercase and strip accents ("Señal" -> "senal")."""
+    normalized = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+def _bigrams(word: str) -> List[str]:
+    padded = f"^{word}$"
+    return [padded[i:i + 2] for i in range(len(padded) - 1)]
+
+
+SPANISH_BIGRAMS = {bigram for word in fold(SPANISH_SAMPLE).split() for bigram in _bigrams(word)}
+
+_STRONG_RE = [
+    (re.compile(rf"\b{pattern}\b"), offense_type, severity)
+    for pattern, (offense_type, severity) in STRONG_TERMS.items()
+]
+_ESCALATE_RE = re.compile(r"\b(?:" + "|".join(ESCALATE_TERMS) + r")\b")
+
+SEVERITY_ORDER = ["low", "medium", "high", "critical"]
+
+FEEDBACK = {
+    "offensive": "Detectamos lenguaje inapropiado en la descripción. Por favor, describe el problema de forma respetuosa para que podamos atenderlo.",
+    "test": "¡Excelente! El sistema funciona perfectamente. Ahora que confirmaste que todo está listo, puedes crear tu reporte real cuando lo necesites. 🚀",
+    "nonsense": "Detectamos que el texto no tiene sentido. Por favor, describe el problema de infraestructura vial que deseas reportar.",
+}
+
+REJECTION_REASONS = {
+    "test": "Texto de prueba",
+    "nonsense": "Texto sin sentido",
+}
+
+
+class TextPrefilter:
+    """Rule-based classifier for the obvious cases of check_offensive_text"""
+
+    def __init__(self, accept_clean: bool = TEXT_PREFILTER_ACCEPT_CLEAN):
+        self.accept_clean = accept_clean
+
+    def classify(self, description: str) -> Optional[Dict]:
+        """
+        Classify a description locally.
+
+        Args:
+            description: Report description
+
+        Returns:
+            A dict shaped like the model's check_offensive_text response
+            (plus "source": "prefilter"), or None to escalate to the model
+        """
+        text = self._normalize(description or "")
+        words = [token for token in _TOKEN_RE.findall(text) if _LETTER_RE.search(token)]
+
+        strong = [(match, offense_type, severity)
+                  for pattern, offense_type, severity in _STRONG_RE
+                  for match in pattern.findall(text)]
+        if strong:
+            severity = max((item[2] for item in strong), key=SEVERITY_ORDER.index)
+            offense_type = "hate" if any(item[1] == "hate" for item in strong) else strong[0][1]
+            detected = sorted({match for match, _, _ in strong})
+            return self._result(
+                "offensive", offense_type=offense_type, severity=severity, detected_words=detected,
+                rejection_reason="Lenguaje ofensivo o vulgar"
+            )
+
+        if _ESCALATE_RE.search(text):
+            return None
+
+        letters = _LETTER_RE.findall(text)
+        civic = [word for word in words if word.startswith(CIVIC_STEMS)]
+        content = [word for word in words if word not in STOPWORDS]
+
+        if len(letters) < 3:
+            return self._result("nonsense", offense_type="nonsense", severity="low")
+
+        markers = [word for word in content if word in TEST_MARKERS]
+        real_content = [word for word in content if word not in TEST_MARKERS and word not in TEST_FILLER]
+        if markers and len(real_content) <= 1 and not civic:
+            return self._result("test", offense_type="test", severity="low")
+
+        if not civic and self.nonsense_ratio(words) >= 0.6:
+            return self._result("nonsense", offense_type="nonsense", severity="low")
+        if not civic and len(letters) >= 8 and self.char_entropy(letters) < 2.0:
+            return self._result("nonsense", offense_type="nonsense", severity="low")
+
+        if (self.accept_clean and civic and len(words) >= 4 and not markers
+                and self.nonsense_ratio(words) < 0.2):
+            return self._result("clean")
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(description: str) -> str:
+        text = fold(description)
+        # De-leet only mixed tokens, so "calle 60" keeps its number
+        text = _TOKEN_RE.sub(
+            lambda m: m.group(0).translate(_LEET) if _LETTER_RE.search(m.group(0)) else m.group(0),
+            text
+        )
+        return _STRETCH_RE.sub(r"\1", text)
+
+    @staticmethod
+    def is_gibberish(word: str) -> bool:
+        """Heuristic for keyboard mash in a single (folded) word."""
+        if len(word) < 3 or not word.isalpha():
+            return False
+        if len(word) >= 20 or not any(ch in VOWELS for ch in word):
+            return True
+        if any(row[i:i + 4] in word for row in KEYBOARD_ROWS for i in range(len(row) - 3)):
+            return True
+        if len(word) < 5:
+            return False
+        run = longest = 0
+        for ch in word:
+            run = 0 if ch in VOWELS else run + 1
+            longest = max(longest, run)
+        if longest >= 5:
+            return True
+        bigrams = _bigrams(word)
+        unseen = sum(1 for bigram in bigrams if bigram not in SPANISH_BIGRAMS)
+        return unseen / len(bigrams) >= 0.3
+
+    @classmethod
+    def nonsense_ratio(cls, words: List[str]) -> float:
+        """Share of letters that belong to gibberish words."""
+        total = sum(len(word) for word in words)
+        if not total:
+            return 0.0
+        return sum(len(word) for word in words if cls.is_gibberish(word)) / total
+
+    @staticmethod
+    def char_entropy(letters: List[str]) -> float:
+        """Shannon entropy (bits) of the letter distribution."""
+        counts = Counter(letters)
+        total = len(letters)
+        return -sum(count / total * math.log2(count / total) for count in counts.values())
+
+    @staticmethod
+    def _result(
+        decision: str,
+        offense_type: str = "none",
+        severity: str = "low",
+        detected_words: Optional[List[str]] = None,
+        rejection_reason: Optional[str] = None
+    ) -> Dict:
+        rejected = decision != "clean"
+        return {
+            "is_offensive": decision == "offensive",
+            "is_inappropriate": decision == "offensive",
+            "is_spam": decision == "nonsense",
+            "is_test": decision == "test",
+            "is_nonsense": decision == "nonsense",
+            "is_too_vague": False,
+            "offense_type": offense_type,
+            "detected_words": detected_words or [],
+            "severity": severity,
+            "requires_strike": rejected and decision != "test",
+            "rejection_reason": (rejection_reason or REJECTION_REASONS.get(decision)) if rejected else None,
+            "professional_feedback": FEEDBACK.get(decision) if rejected else None,
+            "decision": decision,
+            "source": "prefilter",
+        }
+
+
+# Singleton instance
+_text_prefilter_instance = None
+
+def get_text_prefilter() -> TextPrefilter:
+    """Get or create text pre-filter instance"""
+    global _text_prefilter_instance
+    if _text_prefilter_instance is None:
+        _text_prefilter_instance = TextPrefilter()
+    return _text_prefilter_instance
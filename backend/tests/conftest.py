@@ -0,0 +1,160 @@
+"""
+Pytest fixtures for the UCU Reporta backend.
+
+The app runs against a throwaway SQLite database (never the DATABASE_URL in
+.env) with OpenAI, rate limiting and background workers turned off:
+
+    python -m pytest backend/tests
+"""
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+_TMP_DIR = tempfile.mkdtemp(prefix="ucu-tests-")
+
+# Must be set before backend.config is imported; load_dotenv doesn't
+# override variables that are already set
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["MEDIA_LOCAL_ROOT"] = os.path.join(_TMP_DIR, "media")
+os.environ["MEDIA_TMP_DIR"] = os.path.join(_TMP_DIR, "media_tmp")
+os.environ.update({
+    "ENVIRONMENT": "test",
+    "OPENAI_API_KEY": "sk-test",
+    "QUERY_AUDIT_ENABLED": "true",
+    "AI_RATE_LIMIT_ENABLED": "false",
+    "MEDIA_GC_ENABLED": "false",
+    "AI_BATCH_WORKER_ENABLED": "false",
+    "LOG_LEVEL": "WARNING",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.models  # noqa: F401 - registers every table on Base.metadata
+from backend.database import Base, SessionLocal, engine
+from backend.main import app
+from backend.models.user import User
+from backend.auth.jwt_handler import create_access_token
+from backend.services.ai_validator import get_ai_validator
+from backend.services.poi_validator import poi_validator
+
+CLEAN_TEXT = {"is_offensive": False, "is_inappropriate": False, "is_nonsense": False,
+              "is_too_vague": False, "is_test": False}
+VALID_ANALYSIS = {"is_valid": True, "image_valid": True, "is_offensive": False,
+                  "is_inappropriate": False, "is_joke_or_fake": False, "confidence": 0.5,
+                  "suggested_category": "via_mal_estado", "urgency_level": "media"}
+APPROVED_POI = {"approved": True, "categoria": "restaurante", "subcategoria": None,
+                "confidence_categoria": 0.9, "confidence": 0.9, "spam_level": "none",
+                "spam_acceptable": True, "warnings": [], "suggestions": {}, "rejection_reason": None}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once per test session."""
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not used as a context manager: startup would start the media GC and
+    # batch workers
+    return TestClient(app)
+
+
+def _create_user(role: str) -> User:
+    suffix = uuid.uuid4().hex[:8]
+    session = SessionLocal()
+    try:
+        user = User(
+            name=f"Test {role} {suffix}",
+            email=f"{role}-{suffix}@example.com",
+            curp=f"TEST{suffix.upper()}HYN00",
+            hashed_password="!",
+            role=role,
+        )
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+        return user
+    finally:
+        session.close()
+
+
+def _headers(user: User) -> dict:
+    token = create_access_token(data={"sub": user.email, "user_id": user.id, "role": user.role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def make_user():
+    """Create extra users: make_user("citizen")."""
+    return _create_user
+
+
+@pytest.fixture
+def citizen() -> User:
+    return _create_user("citizen")
+
+
+@pytest.fixture
+def citizen_headers(citizen: User) -> dict:
+    return _headers(citizen)
+
+
+@pytest.fixture
+def admin_headers() -> dict:
+    return _headers(_create_user("admin"))
+
+
+class FakeValidator:
+    """Stands in for the report and POI validators' OpenAI calls, with a fixed latency"""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.text_result = dict(CLEAN_TEXT)
+        self.analysis = dict(VALID_ANALYSIS)
+        self.poi_result = dict(APPROVED_POI)
+        self.calls = []
+
+    def _answer(self, method: str, result: dict) -> dict:
+        self.calls.append(method)
+        time.sleep(self.latency)
+        return dict(result)
+
+    def check_offensive_text(self, *args, **kwargs) -> dict:
+        return self._answer("check_offensive_text", self.text_result)
+
+    def analyze_report(self, *args, **kwargs) -> dict:
+        return self._answer("analyze_report", self.analysis)
+
+    def analyze_report_with_image(self, *args, **kwargs) -> dict:
+        return self._answer("analyze_report_with_image", self.analysis)
+
+    async def validate_poi(self, *args, **kwargs) -> dict:
+        self.calls.append("validate_poi")
+        await asyncio.sleep(self.latency)
+        return dict(self.poi_result)
+
+
+@pytest.fixture
+def fake_validator(monkeypatch) -> FakeValidator:
+    fake = FakeValidator()
+    validator = get_ai_validator()
+    for method in ("check_offensive_text", "analyze_report", "analyze_report_with_image"):
+        monkeypatch.setattr(validator, method, getattr(fake, method))
+    monkeypatch.setattr(poi_validator, "validate_poi", fake.validate_poi)
+    return fake
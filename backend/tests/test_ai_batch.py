@@ -0,0 +1,115 @@
+"""
+Batch validation end to end: AIBatchProcessor submits pending reports and
+POIs to backend.benchmarks.fake_openai's Files/Batches API, polls the job
+and applies the verdicts.
+"""
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from openai import OpenAI
+
+import backend.services.ai_batch as ai_batch
+from backend.benchmarks import fake_openai
+from backend.models.ai_batch_job import AIBatchJob
+from backend.models.point_of_interest import PointOfInterest
+from backend.models.report import Report
+from backend.services.ai_batch import IN_FLIGHT, AIBatchProcessor
+
+
+@pytest.fixture(scope="module")
+def fake_openai_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def processor(db, fake_openai_url, monkeypatch) -> AIBatchProcessor:
+    monkeypatch.setattr(ai_batch, "AI_VALIDATION_ENABLED", True)
+    monkeypatch.setattr(fake_openai, "BATCH_DELAY_S", 0)
+    return AIBatchProcessor(db, client=OpenAI(api_key="sk-fake", base_url=fake_openai_url, max_retries=0))
+
+
+@pytest.fixture
+def pending(db, citizen):
+    """A report stored without AI analysis and a POI waiting for the batch."""
+    report = Report(
+        user_id=citizen.id, category="via_mal_estado", description="Bache profundo en la calle 60",
+        latitude=20.9674, longitude=-89.6237, priority=1, status="pendiente"
+    )
+    poi = PointOfInterest(
+        user_id=citizen.id, nombre="Cocina Económica Doña Mary", direccion="Calle 60, Centro",
+        latitude=20.9674, longitude=-89.6237, ia_status="pending_ia"
+    )
+    db.add_all([report, poi])
+    db.commit()
+    return report, poi
+
+
+def poll_until_finished(processor: AIBatchProcessor, timeout: float = 10.0):
+    """Poll like the worker does until no job is in flight."""
+    finished = []
+    deadline = time.monotonic() + timeout
+    while processor.db.query(AIBatchJob).filter(AIBatchJob.status.in_(IN_FLIGHT)).count():
+        assert time.monotonic() < deadline, "batch did not finish"
+        finished += processor.poll()
+        time.sleep(0.05)
+    return finished
+
+
+def test_submit_poll_apply(db, processor, pending):
+    report, poi = pending
+
+    jobs = {kind: processor.submit(kind) for kind in ("report", "poi")}
+    assert report.id in jobs["report"].item_ids
+    assert poi.id in jobs["poi"].item_ids
+    assert jobs["poi"].status in IN_FLIGHT
+
+    finished = poll_until_finished(processor)
+
+    assert {job.id for job in finished} >= {job.id for job in jobs.values()}
+    for job in jobs.values():
+        db.refresh(job)
+        assert job.status == "applied"
+        assert job.applied_count == len(job.item_ids)
+        assert job.failed_count == 0
+        assert job.completed_at is not None
+
+    db.refresh(report)
+    assert report.ai_validated == 1
+    assert report.ai_reasoning == fake_openai.VERDICT["reasoning"]
+    assert report.ai_suggested_category == fake_openai.VERDICT["suggested_category"]
+    # Confident analysis of a report nobody is working on sets its priority
+    assert report.priority == fake_openai.VERDICT["suggested_priority"]
+
+    db.refresh(poi)
+    assert poi.ia_status == "approved_ia"
+    assert poi.categoria == fake_openai.VERDICT["categoria"]
+    assert poi.ia_validated_at is not None
+
+    assert processor.pending_count("report") == 0
+    assert processor.pending_count("poi") == 0
+
+
+def test_items_in_flight_are_not_submitted_again(processor, pending):
+    report, _ = pending
+    first = processor.submit("report")
+    assert report.id in first.item_ids
+
+    # Everything pending is already in the first job
+    assert processor.pending_count("report") == 0
+    assert processor.submit("report") is None
+
+    poll_until_finished(processor)
+    assert processor.pending_count("report") == 0
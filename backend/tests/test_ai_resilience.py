@@ -0,0 +1,128 @@
+"""
+Circuit breaker transitions and AI deadline budgets of resilient_completion,
+on a fake clock so cooldowns and budgets don't need real sleeps.
+"""
+import httpx
+import openai
+import pytest
+
+import backend.services.ai_resilience as ai_resilience
+from backend.services.ai_resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceededError,
+    ai_deadline, remaining_budget, resilient_completion
+)
+
+COOLDOWN = 30.0
+
+
+class FakeClock:
+    """Stands in for the time module inside ai_resilience"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(ai_resilience, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch) -> CircuitBreaker:
+    instance = CircuitBreaker(error_rate=0.5, min_calls=4, window_seconds=60, cooldown_seconds=COOLDOWN,
+                              retry_ratio=0)
+    monkeypatch.setattr(ai_resilience, "_breaker_instance", instance)
+    return instance
+
+
+@pytest.fixture
+def openai_calls(clock, monkeypatch):
+    """openai_completion stand-in: each call takes call_seconds and fails while `failing`."""
+    calls = []
+    state = {"failing": False, "call_seconds": 0.5}
+
+    def completion(client, validator, method, timeout, **kwargs):
+        calls.append(timeout)
+        clock.now += state["call_seconds"]
+        if state["failing"]:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1"))
+        return "response"
+
+    monkeypatch.setattr(ai_resilience, "openai_completion", completion)
+    return calls, state
+
+
+def call():
+    return resilient_completion(None, "ai_validator", "test")
+
+
+def test_breaker_opens_then_half_opens_with_a_single_probe(breaker, clock):
+    for failed in (False, True, True, True):
+        assert breaker.allow()
+        breaker.record(failed=failed)
+    assert breaker.state == OPEN
+    assert breaker.is_open
+    assert not breaker.allow()
+
+    clock.now += COOLDOWN
+    assert not breaker.is_open
+    assert breaker.allow()  # The probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+
+    breaker.record(failed=True)  # Probe failed: another cooldown
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now += COOLDOWN
+    assert breaker.allow()
+    breaker.record(failed=False)  # Probe succeeded
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_open_breaker_short_circuits_calls(breaker, openai_calls):
+    calls, state = openai_calls
+    state["failing"] = True
+    for _ in range(breaker.min_calls):
+        with pytest.raises(openai.APIConnectionError):
+            call()
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        call()
+    assert len(calls) == breaker.min_calls
+
+
+def test_call_is_not_started_without_enough_budget(breaker, openai_calls):
+    calls, _ = openai_calls
+    with ai_deadline(ai_resilience.MIN_ATTEMPT_SECONDS - 0.5):
+        with pytest.raises(DeadlineExceededError):
+            call()
+    assert calls == []
+
+
+def test_calls_share_the_request_deadline(breaker, clock, openai_calls):
+    calls, state = openai_calls
+    state["call_seconds"] = 3.0
+    with ai_deadline(8.0):
+        call()
+        with ai_deadline(60.0):  # Nested scopes keep the outer deadline
+            assert remaining_budget() == pytest.approx(5.0)
+            call()
+        # 2 s left: below MIN_ATTEMPT_SECONDS once the clock moves on
+        clock.now += 0.5
+        with pytest.raises(DeadlineExceededError):
+            call()
+
+    assert len(calls) == 2
+    # Each attempt's timeout is capped by what is left of the budget
+    assert calls[1] == pytest.approx(5.0)
@@ -0,0 +1,94 @@
+"""
+Pooled connection hold time of the AI-backed report routes.
+
+validate-photo, POST /reports/ and POST /points-of-interest/ release their
+connection before calling OpenAI, so the time a connection stays checked out must not grow with AI
+latency. Pool checkout/checkin events measure it directly (the benchmark's
+--max-connection-hold-ms checks the same thing from /metrics).
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event
+
+from backend.benchmarks.run import CATEGORIES, REPORT_DESCRIPTION, make_png
+from backend.database import engine
+
+FAST_AI_SECONDS = 0.5
+SLOW_AI_SECONDS = 2.0
+
+
+@contextmanager
+def connection_holds() -> Iterator[List[float]]:
+    """Seconds each pooled connection stayed checked out during the block."""
+    holds: List[float] = []
+    started = {}
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        started[id(connection_record)] = time.perf_counter()
+
+    def on_checkin(dbapi_connection, connection_record):
+        begin = started.pop(id(connection_record), None)
+        if begin is not None:
+            holds.append(time.perf_counter() - begin)
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    try:
+        yield holds
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+        event.remove(engine, "checkin", on_checkin)
+
+
+def validate_photo(client, headers, seed: int):
+    return client.post(
+        "/reports/validate-photo",
+        params={"category": CATEGORIES[0], "description": REPORT_DESCRIPTION},
+        files={"photo": (f"hold-{seed}.png", make_png(seed), "image/png")},
+        headers=headers,
+    )
+
+
+def create_report(client, headers, seed: int):
+    return client.post("/reports/", json={
+        "category": CATEGORIES[0],
+        "description": REPORT_DESCRIPTION,
+        "latitude": 20.9674,
+        "longitude": -89.6237,
+    }, headers=headers)
+
+
+def create_poi(client, headers, seed: int):
+    return client.post("/points-of-interest/", json={
+        "nombre": f"Cocina económica {seed}",
+        "descripcion": "Comida corrida yucateca",
+        "direccion": "Calle 60 por 55, Centro",
+        "latitude": 20.9674,
+        "longitude": -89.6237,
+    }, headers=headers)
+
+
+@pytest.mark.parametrize("send, expected_status", [
+    (validate_photo, 200),
+    (create_report, 201),
+    (create_poi, 201),
+], ids=["validate_photo", "create_report", "create_poi"])
+def test_connection_hold_does_not_grow_with_ai_latency(
+    client, citizen_headers, fake_validator, send, expected_status
+):
+    longest = {}
+    for seed, latency in enumerate((FAST_AI_SECONDS, SLOW_AI_SECONDS)):
+        fake_validator.latency = latency
+        with connection_holds() as holds:
+            response = send(client, citizen_headers, seed)
+        assert response.status_code == expected_status, response.text
+        assert holds, "the request never checked out a connection"
+        longest[latency] = max(holds)
+
+    # Held across the AI call, the hold would grow by the full 1.5 s
+    growth = longest[SLOW_AI_SECONDS] - longest[FAST_AI_SECONDS]
+    assert growth < (SLOW_AI_SECONDS - FAST_AI_SECONDS) / 3, longest
+    assert longest[SLOW_AI_SECONDS] < FAST_AI_SECONDS, longest
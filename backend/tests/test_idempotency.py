@@ -0,0 +1,93 @@
+"""
+Idempotency-Key claims on POST /reports/: in-progress retries, key reuse,
+and retaking a claim abandoned past IDEMPOTENCY_LOCK_SECONDS.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import backend.routes.reports as reports_routes
+from backend.benchmarks.run import CATEGORIES, REPORT_DESCRIPTION
+from backend.models.idempotency_key import IdempotencyKey
+from backend.schemas.report import ReportCreate
+from backend.services.idempotency import get_idempotency_store, request_hash
+
+REPORT = {
+    "category": CATEGORIES[0],
+    "description": REPORT_DESCRIPTION,
+    "latitude": 20.9674,
+    "longitude": -89.6237,
+}
+
+
+@pytest.fixture(autouse=True)
+def no_ai(monkeypatch):
+    monkeypatch.setattr(reports_routes, "AI_VALIDATION_ENABLED", False)
+
+
+@pytest.fixture
+def key() -> str:
+    return str(uuid.uuid4())
+
+
+def abandoned_claim(db, user_id: int, key: str) -> datetime:
+    """A claim for REPORT whose worker died before the lock expired."""
+    claimed_at = datetime.now(timezone.utc) - timedelta(seconds=get_idempotency_store().lock.total_seconds() + 1)
+    db.add(IdempotencyKey(user_id=user_id, key=key, endpoint="reports",
+                          request_hash=request_hash("reports", ReportCreate(**REPORT)), created_at=claimed_at))
+    db.commit()
+    return claimed_at
+
+
+def post(client, headers, key: str, body=REPORT):
+    return client.post("/reports/", json=body, headers={**headers, "Idempotency-Key": key})
+
+
+def test_retry_while_running_gets_409(client, db, citizen, citizen_headers, key):
+    stored, claimed_at = get_idempotency_store().claim(
+        db, citizen.id, key, "reports", request_hash("reports", ReportCreate(**REPORT))
+    )
+    assert stored is None and claimed_at is not None
+
+    response = post(client, citizen_headers, key)
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["error"] == "idempotency_in_progress"
+    assert "Retry-After" in response.headers
+
+
+def test_key_reused_with_other_body_gets_422(client, citizen_headers, key):
+    assert post(client, citizen_headers, key).status_code == 201
+
+    response = post(client, citizen_headers, key, body={**REPORT, "latitude": 20.9700})
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["error"] == "idempotency_key_reused"
+
+
+def test_abandoned_claim_is_retaken(client, db, citizen, citizen_headers, key):
+    abandoned_claim(db, citizen.id, key)
+
+    response = post(client, citizen_headers, key)
+    assert response.status_code == 201, response.text
+    assert "Idempotency-Replayed" not in response.headers
+
+    replay = post(client, citizen_headers, key)
+    assert replay.headers.get("Idempotency-Replayed") == "true"
+    assert replay.json()["id"] == response.json()["id"]
+
+
+def test_stale_request_cannot_touch_retaken_claim(client, db, citizen, citizen_headers, key):
+    stale_claimed_at = abandoned_claim(db, citizen.id, key)
+    created = post(client, citizen_headers, key)
+    assert created.status_code == 201, created.text
+
+    # The original request finally finishes (or fails) after the retake
+    store = get_idempotency_store()
+    store.complete(db, citizen.id, key, stale_claimed_at, 400, {"detail": "stale"})
+    store.release(db, citizen.id, key, stale_claimed_at)
+
+    replay = post(client, citizen_headers, key)
+    assert replay.status_code == 201
+    assert replay.json()["id"] == created.json()["id"]
@@ -0,0 +1,103 @@
+"""
+Screening of validate-photo uploads against previously rejected images.
+
+Only the same file, or the same user's own rejected photo, is answered
+from the stored verdict (and can carry a strike) without the vision call.
+"""
+import hashlib
+import random
+import uuid
+
+import pytest
+
+import backend.routes.reports as reports_routes
+from backend.benchmarks.run import CATEGORIES, REPORT_DESCRIPTION
+from backend.models.user import User
+from backend.services.image_hash import get_rejected_image_index, low_information
+
+OFFENSIVE = {"is_valid": False, "image_valid": False, "is_offensive": True, "is_inappropriate": False,
+             "is_joke_or_fake": False, "requires_strike": True, "strike_severity": "high",
+             "rejection_reason": "Contenido ofensivo"}
+
+
+def fresh_hash() -> int:
+    """A random, matchable dHash (the index is shared by every test)."""
+    while True:
+        value = random.getrandbits(64)
+        if not low_information(value):
+            return value
+
+
+@pytest.fixture
+def screen(db, monkeypatch):
+    """
+    Fingerprint uploads 2 bits away from a hash unique to the test, and
+    return a recorder of rejections with that hash.
+    """
+    image_hash = fresh_hash()
+    monkeypatch.setattr(reports_routes, "image_fingerprint", lambda path: image_hash ^ 0b101)
+    index = get_rejected_image_index()
+
+    def record(owner: User, content: bytes) -> None:
+        index.record_rejection(db, hashlib.sha256(content).hexdigest(), image_hash,
+                               owner.id, CATEGORIES[0], OFFENSIVE)
+    return record
+
+
+def upload(client, headers, content: bytes):
+    return client.post(
+        "/reports/validate-photo",
+        params={"category": CATEGORIES[0], "description": REPORT_DESCRIPTION},
+        files={"photo": ("photo.png", content, "image/png")},
+        headers=headers,
+    )
+
+
+def strike_count(db, user: User) -> int:
+    return db.get(User, user.id, populate_existing=True).strike_count
+
+
+def photo() -> bytes:
+    return b"\x89PNG" + uuid.uuid4().bytes
+
+
+def test_near_match_of_another_users_rejection_uses_the_vision_model(
+    client, db, citizen, citizen_headers, make_user, fake_validator, screen
+):
+    other = make_user("citizen")
+    screen(other, photo())
+
+    response = upload(client, citizen_headers, photo())
+
+    assert response.status_code == 200, response.text
+    assert "analyze_report_with_image" in fake_validator.calls
+    assert strike_count(db, citizen) == 0
+
+
+def test_near_match_of_own_rejection_is_a_repeat_offense(
+    client, db, citizen, citizen_headers, fake_validator, screen
+):
+    screen(citizen, photo())
+
+    response = upload(client, citizen_headers, photo())
+
+    assert response.status_code == 422, response.text
+    detail = response.json()["detail"]
+    assert detail["matched_previous_rejection"] is True
+    assert detail["strike_issued"] is True
+    assert "analyze_report_with_image" not in fake_validator.calls
+    assert strike_count(db, citizen) == 1
+
+
+def test_same_file_keeps_the_stored_verdict(
+    client, db, citizen, citizen_headers, make_user, fake_validator, screen
+):
+    other = make_user("citizen")
+    content = photo()
+    screen(other, content)
+
+    response = upload(client, citizen_headers, content)
+
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"]["matched_previous_rejection"] is True
+    assert "analyze_report_with_image" not in fake_validator.calls
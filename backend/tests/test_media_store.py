@@ -0,0 +1,92 @@
+"""
+Media store references against garbage collection.
+
+A blob can be collected between its upload and its use: records must not be
+saved pointing to a collected blob, and a re-upload racing the collector must
+leave both the row and the object in place.
+"""
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.benchmarks.run import CATEGORIES, REPORT_DESCRIPTION, make_png
+from backend.database import SessionLocal
+from backend.models.media_blob import MediaBlob
+from backend.models.report import Report
+from backend.services import storage as storage_module
+from backend.services.media_gc import MediaGarbageCollector
+from backend.services.media_store import MediaStore, blob_key, blob_url, get_media_store
+from backend.services.storage import get_storage
+
+
+def collect_behind_the_scenes(sha256: str) -> None:
+    """Do what the collector does to a blob, from another session."""
+    session = SessionLocal()
+    try:
+        blob = session.query(MediaBlob).filter(MediaBlob.sha256 == sha256).one()
+        get_storage().delete(blob_key(blob.sha256, blob.extension))
+        session.delete(blob)
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_report_with_collected_photo_is_rejected(client, citizen_headers, db, fake_validator):
+    photo_url = blob_url(hashlib.sha256(b"collected").hexdigest(), ".png")
+
+    response = client.post("/reports/", json={
+        "category": CATEGORIES[0],
+        "description": REPORT_DESCRIPTION,
+        "latitude": 20.9674,
+        "longitude": -89.6237,
+        "photo_url": photo_url,
+    }, headers=citizen_headers)
+
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"]["error"] == "photo_expired"
+    assert db.query(Report).filter(Report.photo_url == photo_url).count() == 0
+
+
+def test_reupload_racing_the_collector_stores_again(db, monkeypatch):
+    content = make_png(101)
+    store = get_media_store(db)
+    first = asyncio.run(store.store_bytes(content, ".png"))
+    sha256 = first.sha256
+
+    touch = MediaStore._touch
+
+    def collected_before_touch(self, blob):
+        collect_behind_the_scenes(blob.sha256)
+        return touch(self, blob)
+
+    monkeypatch.setattr(MediaStore, "_touch", collected_before_touch)
+    blob = asyncio.run(store.store_bytes(content, ".png"))
+
+    assert blob.sha256 == sha256
+    assert db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).count() == 1
+    assert get_storage().exists(blob_key(sha256, ".png"))
+    store.acquire_existing(blob_url(sha256, ".png"))
+    db.commit()
+    db.refresh(blob)
+    assert blob.ref_count == 1
+
+
+def test_collector_keeps_row_when_storage_delete_fails(db, monkeypatch):
+    blob = asyncio.run(get_media_store(db).store_bytes(make_png(102), ".png"))
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    db.query(MediaBlob).filter(MediaBlob.id == blob.id).update({"updated_at": old})
+    db.commit()
+
+    def unavailable(key):
+        raise OSError("storage unavailable")
+
+    monkeypatch.setattr(storage_module.get_storage(), "delete", unavailable)
+    with pytest.raises(OSError):
+        MediaGarbageCollector(SessionLocal()).collect()
+
+    db.expire_all()
+    assert db.query(MediaBlob).filter(MediaBlob.id == blob.id).count() == 1
+    assert os.path.exists(get_storage().path(blob_key(blob.sha256, ".png")))
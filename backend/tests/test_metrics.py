@@ -0,0 +1,34 @@
+"""/metrics is only served to scrapers sending METRICS_TOKEN."""
+import pytest
+
+import backend.main as main
+
+
+@pytest.fixture
+def metrics_token(monkeypatch) -> str:
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+
+def test_metrics_without_configured_token_is_not_served(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"Authorization": "Bearer wrong"},
+    {"Authorization": "scrape-secret"},
+], ids=["missing", "wrong", "not_bearer"])
+def test_metrics_rejects_bad_token(client, metrics_token, headers):
+    response = client.get("/metrics", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_metrics_with_token(client, metrics_token):
+    client.get("/health")
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
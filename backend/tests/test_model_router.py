@@ -0,0 +1,101 @@
+"""
+Fast -> strong tier routing: which model answers, with which image detail,
+and how each outcome is counted in ai_routing_decisions_total.
+"""
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import backend.services.model_router as model_router
+from backend.services.ai_resilience import CircuitOpenError
+from backend.services.model_router import Tier, confident, routed_completion
+from backend.utils.metrics import AI_ROUTING_DECISIONS
+
+# Fixed tiers, whatever AI_FAST_MODEL / AI_STRONG_MODEL are set to
+FAST = Tier("fast", "fast-model", "low")
+STRONG = Tier("strong", "strong-model", "high")
+SURE = {"is_valid": True, "confidence": 0.95}
+UNSURE = {"is_valid": True, "confidence": 0.4}
+
+
+class FakeTiers:
+    """resilient_completion stand-in answering per model"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, client, validator, method, model, messages, **kwargs):
+        self.calls.append((model, messages[0]["detail"]))
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))],
+            usage=None,
+        )
+
+
+@pytest.fixture
+def method() -> str:
+    """Unique method label, so decision counters start at zero."""
+    return f"test_{uuid.uuid4().hex[:8]}"
+
+
+def route(monkeypatch, method, answers, routing_enabled=True):
+    fake = FakeTiers(answers)
+    monkeypatch.setattr(model_router, "resilient_completion", fake)
+    monkeypatch.setattr(model_router, "AI_ROUTING_ENABLED", routing_enabled)
+    monkeypatch.setattr(model_router, "FAST", FAST)
+    monkeypatch.setattr(model_router, "STRONG", STRONG)
+    result = routed_completion(
+        None, "ai_validator", method,
+        build_messages=lambda detail: [{"detail": detail}],
+        accept=lambda verdict: confident(verdict, "confidence"),
+    )
+    return result, fake.calls
+
+
+def decisions(method, outcome):
+    return AI_ROUTING_DECISIONS.value(validator="ai_validator", method=method, outcome=outcome)
+
+
+def test_confident_fast_verdict_is_kept(monkeypatch, method):
+    result, calls = route(monkeypatch, method, {FAST.model: SURE, STRONG.model: SURE})
+
+    assert calls == [(FAST.model, FAST.image_detail)]
+    assert result["model_tier"] == "fast"
+    assert decisions(method, "fast") == 1
+
+
+def test_low_confidence_escalates_to_strong(monkeypatch, method):
+    strong_answer = {"is_valid": False, "confidence": 0.9}
+    result, calls = route(monkeypatch, method, {FAST.model: UNSURE, STRONG.model: strong_answer})
+
+    assert calls == [(FAST.model, FAST.image_detail), (STRONG.model, STRONG.image_detail)]
+    assert result["model_tier"] == "strong"
+    assert result["is_valid"] is False
+    assert decisions(method, "escalated") == 1
+
+
+def test_fast_error_escalates(monkeypatch, method):
+    result, calls = route(monkeypatch, method, {FAST.model: ValueError("bad JSON"), STRONG.model: SURE})
+
+    assert [model for model, _ in calls] == [FAST.model, STRONG.model]
+    assert result["model_tier"] == "strong"
+    assert decisions(method, "fast_error") == 1
+
+
+def test_unavailable_ai_is_not_escalated(monkeypatch, method):
+    with pytest.raises(CircuitOpenError):
+        route(monkeypatch, method, {FAST.model: CircuitOpenError("open"), STRONG.model: SURE})
+
+
+def test_routing_disabled_uses_strong_only(monkeypatch, method):
+    result, calls = route(monkeypatch, method, {FAST.model: SURE, STRONG.model: SURE}, routing_enabled=False)
+
+    assert calls == [(STRONG.model, STRONG.image_detail)]
+    assert result["model_tier"] == "strong"
+    assert decisions(method, "strong_only") == 1
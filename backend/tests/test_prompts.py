@@ -0,0 +1,104 @@
+"""
+Prompt versions: which version is active, the token budget, and the
+per-version token accounting of openai_completion(prompt=...).
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import backend.services.prompts as prompts
+from backend.services.prompts import Prompt, count_tokens, get_prompt
+from backend.utils.metrics import (
+    AI_PROMPT_LATENCY, AI_PROMPT_TOKENS, AI_PROMPT_TRUNCATIONS, openai_completion
+)
+
+SYSTEM = "Eres un moderador de reportes ciudadanos. Responde solo en JSON."
+
+
+@pytest.fixture
+def name() -> str:
+    """Unique prompt name, so per-version counters start at zero."""
+    return f"test_{uuid.uuid4().hex[:8]}"
+
+
+def fake_client(prompt_tokens=0, cached_tokens=0, completion_tokens=0, error=None):
+    def create(**kwargs):
+        if error is not None:
+            raise error
+        return SimpleNamespace(choices=[], usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        ))
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def tokens(prompt: Prompt, type: str) -> float:
+    return AI_PROMPT_TOKENS.value(prompt=prompt.name, version=prompt.label, type=type)
+
+
+def test_tokens_are_counted_per_version(name):
+    v1 = Prompt(name, 1, "Reporte: {description}", system=SYSTEM)
+    v2 = Prompt(name, 2, "Analiza este reporte ciudadano.\nReporte: {description}", system=SYSTEM)
+
+    messages = v1.messages(description="Bache en la calle 60")
+    openai_completion(fake_client(1200, 1024, 80), "ai_validator", "test", prompt=v1, messages=messages)
+    openai_completion(fake_client(1100, 0, 60), "ai_validator", "test", prompt=v1, messages=messages)
+    v2_messages = v2.messages(description="Bache en la calle 60")
+    openai_completion(fake_client(1300, 1024, 90), "ai_validator", "test", prompt=v2, messages=v2_messages)
+
+    assert tokens(v1, "estimated") == 2 * v1.estimate(messages)
+    assert tokens(v1, "prompt") == 2300
+    assert tokens(v1, "cached") == 1024
+    assert tokens(v1, "completion") == 140
+    assert AI_PROMPT_LATENCY.count(prompt=name, version="v1") == 2
+
+    assert tokens(v2, "estimated") == v2.estimate(v2_messages)
+    assert tokens(v2, "prompt") == 1300
+    assert tokens(v2, "cached") == 1024
+    assert tokens(v2, "completion") == 90
+    assert AI_PROMPT_LATENCY.count(prompt=name, version="v2") == 1
+
+
+def test_failed_call_counts_latency_but_no_billed_tokens(name):
+    prompt = Prompt(name, 1, "Reporte: {description}", system=SYSTEM)
+    messages = prompt.messages(description="Bache en la calle 60")
+
+    with pytest.raises(TimeoutError):
+        openai_completion(fake_client(error=TimeoutError()), "ai_validator", "test", prompt=prompt,
+                          messages=messages)
+
+    assert tokens(prompt, "estimated") == prompt.estimate(messages)
+    assert tokens(prompt, "prompt") == 0
+    assert AI_PROMPT_LATENCY.count(prompt=name, version="v1") == 1
+
+
+def test_latest_version_unless_pinned(name, monkeypatch):
+    monkeypatch.setattr(prompts, "_registry", {})
+    for version in (1, 2, 3):
+        prompts.register(Prompt(name, version, "Reporte: {description}"))
+    with pytest.raises(ValueError):
+        prompts.register(Prompt(name, 2, "Otro texto: {description}"))
+
+    assert get_prompt(name).version == 3
+    monkeypatch.setattr(prompts, "_PINNED", {name: 1})
+    assert get_prompt(name).version == 1
+    # A pin to a version that doesn't exist falls back to the latest
+    monkeypatch.setattr(prompts, "_PINNED", {name: 9})
+    assert get_prompt(name).version == 3
+
+
+def test_user_values_are_truncated_to_the_budget(name):
+    prompt = Prompt(name, 1, "Categoría: {category}\nReporte: {description}", system=SYSTEM,
+                    truncate=("description",), max_input_tokens=60)
+    description = "Hay un bache muy grande frente a la escuela primaria. " * 20
+
+    text = prompt.messages(category="via_mal_estado", description=description)[-1]["content"]
+
+    assert count_tokens(SYSTEM) + count_tokens(text) <= prompt.max_input_tokens
+    assert text.startswith("Categoría: via_mal_estado\nReporte: Hay un bache")
+    assert AI_PROMPT_TRUNCATIONS.value(prompt=name, version="v1") == 1
+
+    prompt.messages(category="via_mal_estado", description="Bache en la calle 60")
+    assert AI_PROMPT_TRUNCATIONS.value(prompt=name, version="v1") == 1
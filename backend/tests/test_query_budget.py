@@ -0,0 +1,76 @@
+"""
+Query budgets for the hottest list endpoints.
+
+Each endpoint is called with several rows owned by different users, so an
+N+1 (a lazy load per row) shows up as a repeated statement shape and blows
+the budget.
+"""
+import uuid
+
+import pytest
+
+from backend.models.announcement import Announcement
+from backend.models.point_of_interest import PointOfInterest
+from backend.models.report import Report
+from backend.models.user import User
+from backend.services.response_cache import invalidate_public_cache
+from backend.utils.query_audit import assert_query_budget
+
+ROWS = 6
+
+
+@pytest.fixture(scope="module")
+def seeded(database):
+    from backend.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        for i in range(ROWS):
+            suffix = uuid.uuid4().hex[:8]
+            user = User(name=f"Budget {i}", email=f"budget-{suffix}@example.com",
+                        curp=f"BDGT{suffix.upper()}HYN00", hashed_password="!", role="admin")
+            session.add(user)
+            session.flush()
+            session.add(Report(
+                user_id=user.id, category="bache", description="Bache en la calle 60, Mérida",
+                latitude=20.9674, longitude=-89.6237, priority=3, status="pendiente"
+            ))
+            session.add(Announcement(
+                title=f"Aviso {i}", description="Corte de agua programado", type="aviso",
+                priority=i, active=True, created_by=user.id
+            ))
+            session.add(PointOfInterest(
+                user_id=user.id, nombre=f"Parque {i}", direccion="Calle 60, Centro",
+                latitude=20.9674, longitude=-89.6237, categoria="parque",
+                status="approved", is_public=True
+            ))
+        session.commit()
+    finally:
+        session.close()
+    invalidate_public_cache("announcements", "reports", "pois")
+
+
+def test_list_reports_budget(client, admin_headers, seeded):
+    with assert_query_budget(3, max_repeats=1):
+        response = client.get("/reports/", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= ROWS
+
+
+def test_list_announcements_budget(client, admin_headers, seeded):
+    with assert_query_budget(3, max_repeats=1):
+        response = client.get("/announcements/", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= ROWS
+
+
+def test_public_pois_budget(client, seeded):
+    invalidate_public_cache("pois")
+    with assert_query_budget(2, max_repeats=1):
+        response = client.get("/points-of-interest/public")
+    assert response.status_code == 200
+    assert len(response.json()) >= ROWS
+
+    # Served from the response cache
+    with assert_query_budget(0):
+        assert client.get("/points-of-interest/public").status_code == 200
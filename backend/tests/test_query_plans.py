@@ -0,0 +1,28 @@
+"""
+Query plans of the hot routes (backend/check_query_plans.py under pytest).
+
+The test database is built with create_all, so this checks the indexes
+declared on the models; run the CLI against a migrated database too.
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from backend.check_query_plans import HOT_QUERIES, plan_problems, sqlite_full_scans
+
+
+@pytest.mark.parametrize("hot_query", HOT_QUERIES, ids=[q.name for q in HOT_QUERIES])
+def test_hot_query_searches_an_index(database, hot_query):
+    with database.connect() as conn:
+        db = Session(bind=conn)
+        try:
+            assert plan_problems(conn, db, hot_query) == []
+        finally:
+            db.close()
+
+
+def test_full_index_walk_is_flagged(database):
+    with database.connect() as conn:
+        problems = sqlite_full_scans(
+            conn, "SELECT * FROM reports WHERE priority >= 4 ORDER BY created_at DESC", "reports"
+        )
+        assert problems, "a range that walks ix_reports_created_at must not pass"
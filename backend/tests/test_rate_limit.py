@@ -0,0 +1,59 @@
+"""AI rate limiting of POST /reports/ together with Idempotency-Key retries."""
+import uuid
+
+import pytest
+
+import backend.middleware.rate_limit as rate_limit
+import backend.routes.reports as reports_routes
+from backend.benchmarks.run import CATEGORIES, REPORT_DESCRIPTION
+from backend.services.rate_limit import BucketLimit
+
+REPORT = {
+    "category": CATEGORIES[0],
+    "description": REPORT_DESCRIPTION,
+    "latitude": 20.9674,
+    "longitude": -89.6237,
+}
+
+
+@pytest.fixture
+def one_request_per_user(monkeypatch):
+    """Enable the limiter with a one-token user bucket and no IP bucket."""
+    monkeypatch.setattr(rate_limit, "AI_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "USER_LIMIT", BucketLimit(per_minute=1, burst=1))
+    monkeypatch.setattr(rate_limit, "IP_LIMIT", BucketLimit(per_minute=0, burst=0))
+    monkeypatch.setattr(reports_routes, "AI_VALIDATION_ENABLED", False)
+
+
+def test_idempotent_replay_is_not_charged(client, citizen_headers, one_request_per_user):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/reports/", json=REPORT, headers={**citizen_headers, **key})
+    assert first.status_code == 201, first.text
+
+    # The bucket is empty, but the retry is answered from the store
+    replay = client.post("/reports/", json=REPORT, headers={**citizen_headers, **key})
+    assert replay.status_code == 201, replay.text
+    assert replay.headers.get("Idempotency-Replayed") == "true"
+    assert replay.json()["id"] == first.json()["id"]
+
+    # A new submission still pays
+    other = {"Idempotency-Key": str(uuid.uuid4())}
+    limited = client.post("/reports/", json=REPORT, headers={**citizen_headers, **other})
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+
+
+def test_settled_key_does_not_exempt_other_routes(client, citizen_headers, one_request_per_user):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.post("/reports/", json=REPORT, headers={**citizen_headers, **key})
+    assert first.status_code == 201, first.text
+
+    # validate-photo never replays, so the key must not skip its limit
+    limited = client.post(
+        "/reports/validate-photo",
+        params={"category": CATEGORIES[0], "description": REPORT_DESCRIPTION},
+        files={"photo": ("photo.png", b"\x89PNG", "image/png")},
+        headers={**citizen_headers, **key},
+    )
+    assert limited.status_code == 429
@@ -0,0 +1,83 @@
+"""
+Local report classifier in AIValidator.analyze_report: confident predictions
+are answered locally, anything below REPORT_CLASSIFIER_MIN_CONFIDENCE goes to
+OpenAI.
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import backend.services.ai_validator as ai_validator
+from backend.config import REPORT_CLASSIFIER_MIN_CONFIDENCE
+from backend.services.report_classifier import LOCAL_REASONING_PREFIX, ReportClassifier
+
+POTHOLES = ["Bache profundo en la calle {n}", "Bache enorme frente al parque de la calle {n}",
+            "Hay un bache peligroso en la calle {n}"]
+LAMPS = ["Lámpara apagada en la calle {n}", "La lámpara del poste de la calle {n} no enciende",
+         "Luminaria apagada toda la noche en la calle {n}"]
+OPENAI_ANSWER = {"is_valid": True, "confidence": 0.8, "suggested_category": "infraestructura_danada",
+                 "suggested_priority": 2, "reasoning": "Análisis del modelo", "keywords": [],
+                 "urgency_level": "low"}
+
+
+def samples():
+    for n in range(20, 40):
+        for template in POTHOLES:
+            yield {"category": "via_mal_estado", "description": template.format(n=n),
+                   "ai_category": "via_mal_estado", "ai_urgency": "high", "priority": 4,
+                   "keywords": ["bache"]}
+        for template in LAMPS:
+            yield {"category": "iluminacion_visibilidad", "description": template.format(n=n),
+                   "ai_category": "iluminacion_visibilidad", "ai_urgency": "low", "priority": 2,
+                   "keywords": ["lampara"]}
+
+
+@pytest.fixture(scope="module")
+def model() -> ReportClassifier:
+    return ReportClassifier.train(list(samples()))
+
+
+@pytest.fixture
+def openai_calls(model, monkeypatch):
+    """Install the model and record the OpenAI completions analyze_report makes."""
+    calls = []
+
+    def completion(client, service, operation, **kwargs):
+        calls.append(operation)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(OPENAI_ANSWER)))])
+
+    monkeypatch.setattr(ai_validator, "AI_VALIDATION_ENABLED", True)
+    monkeypatch.setattr(ai_validator, "REPORT_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(ai_validator, "get_report_classifier", lambda: model)
+    monkeypatch.setattr(ai_validator, "resilient_completion", completion)
+    return calls
+
+
+def test_confident_prediction_is_answered_locally(openai_calls):
+    analysis = ai_validator.AIValidator().analyze_report("via_mal_estado", "Bache profundo en la calle 25")
+
+    assert openai_calls == []
+    assert analysis["source"] == "local_classifier"
+    assert analysis["reasoning"].startswith(LOCAL_REASONING_PREFIX)
+    assert analysis["suggested_category"] == "via_mal_estado"
+    assert analysis["urgency_level"] == "high"
+    assert analysis["suggested_priority"] == 4
+
+
+def test_low_confidence_falls_back_to_openai(model, openai_calls):
+    description = "Algo raro pasa en la esquina"
+    prediction = model.predict("senalizacion_transito", description)
+    assert min(prediction["category_confidence"], prediction["urgency_confidence"]) < REPORT_CLASSIFIER_MIN_CONFIDENCE
+
+    analysis = ai_validator.AIValidator().analyze_report("senalizacion_transito", description)
+
+    assert openai_calls == ["analyze_report"]
+    assert "source" not in analysis
+    assert analysis["reasoning"] == OPENAI_ANSWER["reasoning"]
+
+
+def test_min_confidence_threshold(model):
+    description = "Bache profundo en la calle 25"
+    assert model.analyze("via_mal_estado", description, min_confidence=0.5) is not None
+    assert model.analyze("via_mal_estado", description, min_confidence=1.01) is None
@@ -0,0 +1,76 @@
+"""
+Admin report export: one row per format, and CSV cells that a spreadsheet
+would evaluate as formulas are neutralized.
+"""
+import csv
+import io
+import json
+import uuid
+
+import pytest
+
+from backend.models.report import Report
+from backend.services.report_export import FIELD_NAMES, stream_csv
+
+FORMULA = '=HYPERLINK("http://example.com","Ver foto")'
+
+
+@pytest.fixture
+def exported_report(db, citizen):
+    """A single report in its own category, so exports can filter down to it."""
+    report = Report(
+        user_id=citizen.id, category=f"export-{uuid.uuid4().hex[:8]}", description=FORMULA,
+        latitude=20.9674, longitude=-89.6237, priority=3, status="pendiente"
+    )
+    db.add(report)
+    db.commit()
+    db.refresh(report)
+    return report
+
+
+def export(client, headers, fmt: str, category: str):
+    response = client.get(
+        "/admin/reports/export",
+        params={"format": fmt, "category": category},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.text
+
+
+@pytest.mark.parametrize("value", ["=1+1", "+1", "-1", "@SUM(A1)", "\tx", "\rx"])
+def test_csv_prefixes_formula_cells(value):
+    row = dict.fromkeys(FIELD_NAMES)
+    row.update(id=1, description=value, longitude=-89.6237)
+    body = "".join(stream_csv(iter([row])))
+    record = next(csv.DictReader(io.StringIO(body, newline="")))
+    assert record["description"] == "'" + value
+    # Numbers are not text a spreadsheet could evaluate
+    assert record["longitude"] == "-89.6237"
+
+
+def test_csv_export(client, admin_headers, exported_report):
+    rows = list(csv.DictReader(io.StringIO(
+        export(client, admin_headers, "csv", exported_report.category), newline=""
+    )))
+    assert len(rows) == 1
+    assert rows[0]["id"] == str(exported_report.id)
+    assert rows[0]["description"] == "'" + FORMULA
+
+
+def test_ndjson_export(client, admin_headers, exported_report):
+    lines = export(client, admin_headers, "ndjson", exported_report.category).splitlines()
+    assert len(lines) == 1
+    row = json.loads(lines[0])
+    assert row["id"] == exported_report.id
+    # Only the CSV is opened in spreadsheets; JSON keeps the text as written
+    assert row["description"] == FORMULA
+
+
+def test_geojson_export(client, admin_headers, exported_report):
+    collection = json.loads(export(client, admin_headers, "geojson", exported_report.category))
+    assert collection["type"] == "FeatureCollection"
+    [feature] = collection["features"]
+    assert feature["id"] == exported_report.id
+    assert feature["geometry"]["coordinates"] == [-89.6237, 20.9674]
+    assert feature["properties"]["description"] == FORMULA
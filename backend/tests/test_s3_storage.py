@@ -0,0 +1,167 @@
+"""
+S3Storage and the presigned upload flow, against backend.benchmarks.fake_s3.
+
+The fake verifies presigned signatures and SHA-256 checksums like S3, so a
+direct upload of the wrong length or content is refused by the bucket, and
+/media/confirm refuses objects that don't match what the client declared.
+"""
+import hashlib
+import socket
+import threading
+import time
+import uuid
+
+import httpx
+import pytest
+import uvicorn
+
+from backend.benchmarks import fake_s3
+from backend.benchmarks.run import make_png
+from backend.services import storage as storage_module
+from backend.services.media_store import blob_key
+from backend.services.storage import S3Storage
+
+
+@pytest.fixture(scope="module")
+def fake_s3_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake_s3.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def s3(fake_s3_url, monkeypatch) -> S3Storage:
+    """S3Storage on a fresh bucket, installed as the app's storage backend."""
+    backend = S3Storage(
+        bucket=f"media-{uuid.uuid4().hex[:8]}",
+        endpoint_url=fake_s3_url,
+        access_key_id=fake_s3.ACCESS_KEY_ID,
+        secret_access_key=fake_s3.SECRET_ACCESS_KEY,
+    )
+    monkeypatch.setattr(storage_module, "_storage_instance", backend)
+    return backend
+
+
+def stored(s3: S3Storage, key: str):
+    return fake_s3.buckets.get(s3.bucket, {}).get(key)
+
+
+def presign(client, headers, content: bytes):
+    sha256 = hashlib.sha256(content).hexdigest()
+    response = client.post("/media/presign", json={
+        "sha256": sha256, "extension": ".png", "size": len(content)
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return sha256, response.json()
+
+
+def confirm(client, headers, sha256: str, size: int):
+    return client.post("/media/confirm", json={
+        "sha256": sha256, "extension": ".png", "size": size
+    }, headers=headers)
+
+
+def test_save_head_and_delete(s3, tmp_path):
+    content = make_png(1)
+    local_path = tmp_path / "photo.png"
+    local_path.write_bytes(content)
+
+    s3.save("ab/cd/photo.png", str(local_path))
+
+    assert not local_path.exists()
+    assert s3.exists("ab/cd/photo.png")
+    assert s3.size("ab/cd/photo.png") == len(content)
+    assert stored(s3, "ab/cd/photo.png")["content_type"] == "image/png"
+    assert httpx.get(s3.source("ab/cd/photo.png")).content == content
+
+    s3.delete("ab/cd/photo.png")
+    assert not s3.exists("ab/cd/photo.png")
+    assert s3.size("ab/cd/photo.png") is None
+
+
+def test_presigned_upload_and_confirm(client, citizen_headers, s3):
+    content = make_png(2)
+    sha256, presigned = presign(client, citizen_headers, content)
+    assert presigned["exists"] is False
+
+    upload = presigned["upload"]
+    response = httpx.request(upload["method"], upload["url"], content=content, headers=upload["headers"])
+    assert response.status_code == 200, response.text
+    assert s3.checksum_sha256(blob_key(sha256, ".png")) == sha256
+
+    response = confirm(client, citizen_headers, sha256, len(content))
+    assert response.status_code == 200, response.text
+    assert response.json()["content_hash"] == sha256
+    assert response.json()["photo_url"] == s3.url(blob_key(sha256, ".png"))
+
+    # Already stored: the next presign skips the upload
+    _, again = presign(client, citizen_headers, content)
+    assert again["exists"] is True
+
+
+@pytest.mark.parametrize("body", [
+    lambda content: content[:-1],
+    lambda content: content + b"\0",
+], ids=["shorter", "longer"])
+def test_presigned_upload_rejects_other_length(client, citizen_headers, s3, body):
+    content = make_png(3)
+    sha256, presigned = presign(client, citizen_headers, content)
+    upload = presigned["upload"]
+
+    response = httpx.request(upload["method"], upload["url"], content=body(content), headers=upload["headers"])
+
+    assert response.status_code == 403
+    assert stored(s3, blob_key(sha256, ".png")) is None
+
+
+def test_presigned_upload_rejects_other_content(client, citizen_headers, s3):
+    content = make_png(4)
+    sha256, presigned = presign(client, citizen_headers, content)
+    upload = presigned["upload"]
+    tampered = content[:-1] + bytes([content[-1] ^ 0xFF])
+
+    response = httpx.request(upload["method"], upload["url"], content=tampered, headers=upload["headers"])
+
+    assert response.status_code == 400
+    assert "BadDigest" in response.text
+    assert stored(s3, blob_key(sha256, ".png")) is None
+
+
+def test_confirm_rejects_size_mismatch(client, citizen_headers, s3):
+    content = make_png(5)
+    sha256 = hashlib.sha256(content).hexdigest()
+    key = blob_key(sha256, ".png")
+    s3.client.put_object(Bucket=s3.bucket, Key=key, Body=content + b"extra")
+
+    response = confirm(client, citizen_headers, sha256, len(content))
+
+    assert response.status_code == 404
+    assert not s3.exists(key)
+
+
+def test_confirm_rejects_checksum_mismatch(client, citizen_headers, s3):
+    content = make_png(6)
+    sha256 = hashlib.sha256(content).hexdigest()
+    key = blob_key(sha256, ".png")
+    other = make_png(7)
+    assert len(other) == len(content)
+    s3.client.put_object(Bucket=s3.bucket, Key=key, Body=other, ChecksumAlgorithm="SHA256")
+
+    response = confirm(client, citizen_headers, sha256, len(content))
+
+    assert response.status_code == 404
+    assert not s3.exists(key)
+
+
+def test_confirm_missing_object(client, citizen_headers, s3):
+    content = make_png(8)
+    response = confirm(client, citizen_headers, hashlib.sha256(content).hexdigest(), len(content))
+    assert response.status_code == 404
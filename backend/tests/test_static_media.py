@@ -0,0 +1,23 @@
+"""Range header parsing for served media."""
+import pytest
+
+from backend.utils.static_media import parse_range
+
+UNSATISFIABLE = (-1, -1)
+
+
+@pytest.mark.parametrize("header, size, expected", [
+    (None, 10, None),
+    ("bytes=2-4", 10, (2, 4)),
+    ("bytes=5-", 10, (5, 9)),
+    ("bytes=-3", 10, (7, 9)),
+    ("bytes=-20", 10, (0, 9)),
+    ("bytes=8-50", 10, (8, 9)),
+    ("bytes=10-", 10, UNSATISFIABLE),
+    ("bytes=-0", 10, UNSATISFIABLE),
+    # Empty file: nothing can be satisfied, including suffix ranges
+    ("bytes=-5", 0, UNSATISFIABLE),
+    ("bytes=0-", 0, UNSATISFIABLE),
+])
+def test_parse_range(header, size, expected):
+    assert parse_range(header, size) == expected
@@ -0,0 +1,25 @@
+"""Local text pre-filter decisions that can issue strikes without the model."""
+import pytest
+
+from backend.services.text_prefilter import TextPrefilter
+
+
+@pytest.fixture
+def prefilter() -> TextPrefilter:
+    return TextPrefilter(accept_clean=True)
+
+
+@pytest.mark.parametrize("text", ["Ruido excesivo", "Robo frecuente", "Vandalismo", "Muy peligroso"])
+def test_short_texts_go_to_the_model(prefilter, text):
+    assert prefilter.classify(text) is None
+
+
+@pytest.mark.parametrize("text, decision", [
+    ("esto es una prueba", "test"),
+    ("asdfghjkl qwertyuiop", "nonsense"),
+    ("bache enorme frente a la escuela de la calle 21", "clean"),
+])
+def test_obvious_cases_are_decided_locally(prefilter, text, decision):
+    result = prefilter.classify(text)
+    assert result is not None and result["decision"] == decision
+    assert result["is_too_vague"] is False
@@ -0,0 +1,128 @@
+"""
+Entrena el clasificador local de categoría/urgencia de reportes.
+
+Usa el historial de reportes analizados por GPT (ai_suggested_category,
+ai_urgency_level, ai_keywords y la prioridad asignada) para ajustar un
+modelo TF-IDF + Naive Bayes (backend/services/report_classifier.py). Con
+el modelo instalado, AIValidator.analyze_report responde localmente los
+reportes en los que el modelo tiene confianza alta y solo consulta OpenAI
+en los demás.
+
+Antes de guardar, evalúa sobre un conjunto de prueba (--holdout) y reporta
+exactitud y cobertura al umbral de confianza configurado. Los reportes
+clasificados localmente se excluyen del entrenamiento.
+
+Reinicia la API después de entrenar para cargar el modelo nuevo.
+
+Usage:
+    python -m backend.train_report_classifier
+    python -m backend.train_report_classifier --min-confidence 0.95 --output /srv/models/reports.json
+    python -m backend.train_report_classifier --dry-run
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from backend.config import DATABASE_URL, REPORT_CLASSIFIER_PATH, REPORT_CLASSIFIER_MIN_CONFIDENCE
+from backend.models.report import Report
+from backend.services.report_classifier import ReportClassifier, LOCAL_REASONING_PREFIX, TARGETS
+
+
+def load_samples(database_url: str):
+    """Reportes con análisis de GPT como ejemplos de entrenamiento."""
+    engine = create_engine(database_url)
+    query = (
+        select(Report.category, Report.description, Report.ai_suggested_category, Report.ai_urgency_level,
+               Report.ai_keywords, Report.ai_confidence, Report.priority)
+        .where(
+            Report.ai_validated == 1,
+            Report.ai_suggested_category.isnot(None),
+            Report.ai_urgency_level.isnot(None),
+            (Report.ai_reasoning.is_(None)) | (Report.ai_reasoning.notlike(f"{LOCAL_REASONING_PREFIX}%")),
+        )
+        .order_by(Report.id)
+    )
+    samples = []
+    with Session(engine) as db:
+        for category, description, ai_category, ai_urgency, ai_keywords, ai_confidence, priority in \
+                db.execute(query.execution_options(yield_per=2000)):
+            try:
+                keywords = json.loads(ai_keywords) if ai_keywords else []
+            except ValueError:
+                keywords = []
+            samples.append({
+                "category": category,
+                "description": description,
+                "ai_category": ai_category,
+                "ai_urgency": ai_urgency,
+                "keywords": keywords if isinstance(keywords, list) else [],
+                # La prioridad solo viene de la IA cuando su confianza fue > 0.7
+                "priority": priority if (ai_confidence or 0) > 0.7 else None,
+            })
+    engine.dispose()
+    return samples
+
+
+def fmt(value) -> str:
+    return f"{value:.1%}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el clasificador local de reportes")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Base de datos origen (default: DATABASE_URL)")
+    parser.add_argument("--output", default=REPORT_CLASSIFIER_PATH,
+                        help=f"Archivo del modelo (default: {REPORT_CLASSIFIER_PATH})")
+    parser.add_argument("--min-confidence", type=float, default=REPORT_CLASSIFIER_MIN_CONFIDENCE,
+                        help="Umbral de confianza para evaluar la cobertura")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fracción para evaluación (default: 0.2)")
+    parser.add_argument("--min-samples", type=int, default=200, help="Mínimo de reportes para entrenar")
+    parser.add_argument("--dry-run", action="store_true", help="Solo evaluar, sin guardar el modelo")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧠 ENTRENAMIENTO DEL CLASIFICADOR LOCAL DE REPORTES")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    samples = load_samples(args.database_url)
+    print(f"📄 {len(samples):,} reportes con análisis de IA")
+    if len(samples) < args.min_samples:
+        print(f"❌ Se necesitan al menos {args.min_samples} reportes para entrenar")
+        sys.exit(1)
+
+    report = ReportClassifier.evaluate(samples, args.min_confidence, holdout=args.holdout)
+    if report:
+        print(f"\n📊 Evaluación ({report['train']:,} entrenamiento / {report['test']:,} prueba, "
+              f"umbral {args.min_confidence}):")
+        for target in TARGETS:
+            stats = report[target]
+            print(f"   {target:<9} exactitud {fmt(stats['accuracy'])} | cobertura {fmt(stats['coverage'])} "
+                  f"| exactitud con confianza {fmt(stats['confident_accuracy'])}")
+        joint = report["joint"]
+        print(f"   {'local':<9} respondidos sin OpenAI {fmt(joint['coverage'])} "
+              f"| exactitud {fmt(joint['confident_accuracy'])}")
+
+    model = ReportClassifier.train(samples)
+    model.metadata["evaluation"] = report
+    print(f"\n🔤 Vocabulario: {len(model.idf):,} términos | palabras clave: {len(model.keywords):,}")
+
+    if args.dry_run:
+        print("ℹ️  Dry run: modelo no guardado")
+    else:
+        model.save(args.output)
+        size_kb = os.path.getsize(args.output) / 1024
+        print(f"💾 Modelo guardado en {args.output} ({size_kb:,.0f} KB)")
+        print("   Reinicia la API para cargarlo")
+
+    print(f"⏱️  {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+A deliberately small registry (counters, gauges, histograms with labels)
+so the hot path is a dict lookup plus a few additions under a lock, with
+no extra dependency. Exposed at /metrics by backend/main.py.
+
+Application metrics defined here:
+- HTTP: per-route latency histogram, request counter, in-flight gauge
+  (recorded by backend.middleware.metrics.MetricsMiddleware)
+- Database: per-query latency, per-request query count and time, and how
+  long pooled connections stay checked out (SQLAlchemy engine and pool
+  events, see instrument_engine)
+- OpenAI: per validator method latency, tokens and estimated cost
+  (see openai_completion), per routing tier (model_router), local text
+  pre-filter decisions and local classifier predictions, call outcomes
+  and circuit breaker state (ai_resilience), Batch API items (ai_batch),
+  rejected photo screening (image_hash)
+- Admission: AI endpoint rate limiting (rate_limit) and Idempotency-Key
+  outcomes of create requests (idempotency)
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+OPENAI_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# USD per 1M tokens (input, output); used for cost estimates only
+OPENAI_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+# Batch API jobs are billed at half the list price
+BATCH_PRICE_FACTOR = 0.5
+# Prompt tokens served from the provider's prompt cache
+CACHED_PRICE_FACTOR = 0.5
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served")
+HTTP_IN_FLIGHT.set(0)
+
+# Database
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", buckets=QUERY_BUCKETS)
+DB_REQUEST_QUERIES = registry.histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("route",), buckets=COUNT_BUCKETS)
+DB_REQUEST_TIME = registry.histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("route",))
+DB_CONNECTION_HOLD = registry.histogram(
+    "db_connection_hold_seconds", "Time a pooled connection stays checked out")
+DB_REQUEST_MAX_HOLD = registry.histogram(
+    "db_connection_max_hold_per_request_seconds", "Longest pooled connection checkout per HTTP request",
+    ("route",))
+
+# OpenAI
+OPENAI_LATENCY = registry.histogram(
+    "openai_request_duration_seconds", "OpenAI API call latency",
+    ("validator", "method", "model", "status"), buckets=OPENAI_BUCKETS)
+OPENAI_TOKENS = registry.counter(
+    "openai_tokens_total", "OpenAI tokens used", ("validator", "method", "model", "type"))
+OPENAI_COST = registry.counter(
+    "openai_cost_usd_total", "Estimated OpenAI cost in USD", ("validator", "method", "model"))
+
+# Local text pre-filter (decision="escalated" means the model was called)
+TEXT_PREFILTER_DECISIONS = registry.counter(
+    "text_prefilter_decisions_total", "Local text pre-filter outcomes", ("decision",))
+
+# Tiered model routing (see backend/services/model_router.py)
+AI_ROUTING_DECISIONS = registry.counter(
+    "ai_routing_decisions_total", "Routed AI calls by outcome (fast, escalated, fast_error, strong_only)",
+    ("validator", "method", "outcome"))
+AI_TIER_LATENCY = registry.histogram(
+    "ai_tier_duration_seconds", "AI call latency by routing tier", ("validator", "method", "tier"),
+    buckets=OPENAI_BUCKETS)
+AI_TIER_COST = registry.counter(
+    "ai_tier_cost_usd_total", "Estimated OpenAI cost in USD by routing tier", ("validator", "method", "tier"))
+
+# Local report classifier (outcome="escalated" means the model was called)
+REPORT_CLASSIFIER_PREDICTIONS = registry.counter(
+    "report_classifier_predictions_total", "Local report classifier outcomes", ("outcome",))
+
+# OpenAI resilience (see backend/services/ai_resilience.py)
+AI_CALL_OUTCOMES = registry.counter(
+    "ai_call_outcomes_total",
+    "OpenAI call attempts by outcome (ok, retried, failed, short_circuited, budget_exhausted)",
+    ("validator", "method", "outcome"))
+AI_BREAKER_STATE = registry.gauge(
+    "ai_circuit_breaker_state", "OpenAI circuit breaker state (0 closed, 1 half-open, 2 open)")
+AI_BREAKER_TRANSITIONS = registry.counter(
+    "ai_circuit_breaker_transitions_total", "OpenAI circuit breaker state changes", ("state",))
+
+# OpenAI Batch API jobs (see backend/services/ai_batch.py)
+AI_BATCH_ITEMS = registry.counter(
+    "ai_batch_items_total", "Items sent through the Batch API by outcome (submitted, applied, failed)",
+    ("kind", "outcome"))
+
+# Prompt versions (see backend/services/prompts.py); type: estimated (local
+# count before sending), prompt and completion (billed), cached (prompt tokens
+# served from the provider's prompt cache)
+AI_PROMPT_TOKENS = registry.counter(
+    "ai_prompt_tokens_total", "Tokens by prompt version and type (estimated, prompt, cached, completion)",
+    ("prompt", "version", "type"))
+AI_PROMPT_LATENCY = registry.histogram(
+    "ai_prompt_duration_seconds", "OpenAI call latency by prompt version", ("prompt", "version"),
+    buckets=OPENAI_BUCKETS)
+AI_PROMPT_TRUNCATIONS = registry.counter(
+    "ai_prompt_truncations_total", "Prompts whose user-supplied values were cut to the token budget",
+    ("prompt", "version"))
+
+# Rejected photo screening (see backend/services/image_hash.py)
+IMAGE_SCREEN_LOOKUPS = registry.counter(
+    "image_screen_lookups_total",
+    "Photo re-upload checks by outcome (exact, near, miss, low_information, unhashable)", ("outcome",))
+IMAGE_SCREEN_INDEX_SIZE = registry.gauge(
+    "image_screen_index_size", "Rejected image fingerprints loaded in this worker")
+
+# AI endpoint rate limiting (see backend/services/rate_limit.py); scope: user,
+# ip (token buckets), concurrency (in-flight cap) or idempotency (replays)
+AI_RATE_LIMIT_DECISIONS = registry.counter(
+    "ai_rate_limit_decisions_total",
+    "AI endpoint admission checks by scope and outcome (allowed, limited; replayed for "
+    "Idempotency-Key retries let through uncharged)",
+    ("scope", "outcome"))
+AI_REQUESTS_IN_FLIGHT = registry.gauge(
+    "ai_requests_in_flight", "AI-backed requests running in this worker")
+
+# Idempotency-Key handling (see backend/services/idempotency.py)
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "idempotency_requests_total",
+    "Create requests with an Idempotency-Key by outcome (new, replayed, in_progress, key_reused)",
+    ("endpoint", "outcome"))
+
+
+# ---------------------------------------------------------------------------
+# Per-request database accounting
+# ---------------------------------------------------------------------------
+
+class RequestDBStats:
+    """Mutable per-request counters shared with worker threads via contextvars"""
+
+    __slots__ = ("queries", "seconds", "max_hold_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.max_hold_seconds = 0.0
+
+
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Attach query timing hooks to a SQLAlchemy engine (idempotent)."""
+    from sqlalchemy import event
+
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = current_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        # Check-in may happen outside the request context; keep its stats here
+        connection_record.info["checkout"] = (time.perf_counter(), current_db_stats.get())
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checkout = connection_record.info.pop("checkout", None)
+        if checkout is None:
+            return
+        started, stats = checkout
+        held = time.perf_counter() - started
+        DB_CONNECTION_HOLD.observe(held)
+        if stats is not None and held > stats.max_hold_seconds:
+            stats.max_hold_seconds = held
+
+    engine._metrics_instrumented = True
+
+
+# ---------------------------------------------------------------------------
+# OpenAI instrumentation
+# ---------------------------------------------------------------------------
+
+def _cached_tokens(usage) -> int:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def estimate_openai_cost(model: str, usage, price_factor: float = 1.0) -> Optional[float]:
+    """
+    Estimated USD cost of a response's usage block (None if the model is not
+    priced). price_factor scales list prices (BATCH_PRICE_FACTOR for batch jobs);
+    prompt tokens served from the prompt cache are billed at CACHED_PRICE_FACTOR.
+    """
+    pricing = OPENAI_PRICING.get(model)
+    if usage is None or not pricing:
+        return None
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    cached_tokens = _cached_tokens(usage)
+    input_cost = (prompt_tokens - cached_tokens + cached_tokens * CACHED_PRICE_FACTOR) * pricing[0]
+    return (input_cost + completion_tokens * pricing[1]) / 1_000_000 * price_factor
+
+
+def record_openai_usage(validator: str, method: str, model: str, usage, price_factor: float = 1.0) -> None:
+    """Record token counts and estimated cost from a response's usage block."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    OPENAI_TOKENS.inc(prompt_tokens, validator=validator, method=method, model=model, type="prompt")
+    OPENAI_TOKENS.inc(completion_tokens, validator=validator, method=method, model=model, type="completion")
+
+    cost = estimate_openai_cost(model, usage, price_factor)
+    if cost is not None:
+        OPENAI_COST.inc(cost, validator=validator, method=method, model=model)
+
+
+def record_prompt_usage(prompt, usage) -> None:
+    """Billed, cached and completion tokens of a response, by prompt version."""
+    if usage is None:
+        return
+    labels = {"prompt": prompt.name, "version": prompt.label}
+    AI_PROMPT_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, type="prompt", **labels)
+    AI_PROMPT_TOKENS.inc(_cached_tokens(usage), type="cached", **labels)
+    AI_PROMPT_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, type="completion", **labels)
+
+
+def openai_completion(client, validator: str, method: str, prompt=None, **kwargs):
+    """
+    Call client.chat.completions.create and record latency, tokens and cost.
+
+    Args:
+        client: OpenAI client
+        validator: Validator name label ("ai_validator", "poi_validator")
+        method: Calling method label
+        prompt: Registered Prompt the messages were built from (services/prompts);
+            adds per-version latency and token metrics
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        The completion response
+    """
+    model = kwargs.get("model", "")
+    if prompt is not None:
+        AI_PROMPT_TOKENS.inc(prompt.estimate(kwargs.get("messages", [])),
+                             prompt=prompt.name, version=prompt.label, type="estimated")
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = client.chat.completions.create(**kwargs)
+        status = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        OPENAI_LATENCY.observe(elapsed, validator=validator, method=method, model=model, status=status)
+        if prompt is not None:
+            AI_PROMPT_LATENCY.observe(elapsed, prompt=prompt.name, version=prompt.label)
+    usage = getattr(response, "usage", None)
+    record_openai_usage(validator, method, model, usage)
+    if prompt is not None:
+        record_prompt_usage(prompt, usage)
+    return response
@@ -0,0 +1,150 @@
+"""
+Per-request SQL auditing for development and tests.
+
+Counts the statements each request issues and groups them by shape
+(the SQL text with literals and IN-lists collapsed). The same shape
+repeated many times in one request is the signature of an N+1 query,
+e.g. lazy-loading report.user once per row.
+
+Enabled with QUERY_AUDIT_ENABLED (off by default; set in development and
+by backend/tests):
+- QueryAuditMiddleware adds X-Query-Count to every response and logs a
+  warning when a request repeats a shape or exceeds its query budget
+- assert_query_budget() lets tests pin the number of queries an
+  endpoint may issue:
+
+    with assert_query_budget(3, max_repeats=1):
+        client.get("/reports/", headers=admin_headers)
+
+  (see backend/tests/test_query_budget.py)
+
+  Statements run in the current context count, and so do HTTP requests
+  served during the block, including those the TestClient runs in its
+  own thread.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Iterator, List, Optional, Tuple
+
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*[?%$:][\w()]*\s*,?)+\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeated executions compare equal."""
+    shape = _LITERAL_RE.sub("?", statement)
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by assert_query_budget when a block issues too many queries."""
+
+
+class QueryAudit:
+    """Statements issued within one request or audited block"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.shapes: Counter = Counter()
+        self._lock = Lock()
+
+    def record(self, statement: str) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed at least `threshold` times (likely N+1)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, limit: int = 5) -> str:
+        lines = [f"{self.label or 'block'}: {self.count} queries"]
+        for shape, n in self.shapes.most_common(limit):
+            lines.append(f"  {n}x {shape[:200]}")
+        return "\n".join(lines)
+
+
+current_query_audit: ContextVar[Optional[QueryAudit]] = ContextVar("current_query_audit", default=None)
+
+# Collectors registered by assert_query_budget; finished request audits are
+# published to them so requests served in other threads are counted
+_collectors: List[List[QueryAudit]] = []
+_collectors_lock = Lock()
+
+
+def instrument_engine(engine) -> None:
+    """Attach the statement recorder to a SQLAlchemy engine (idempotent)."""
+    from sqlalchemy import event
+
+    if getattr(engine, "_query_audit_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        audit = current_query_audit.get()
+        if audit is not None:
+            audit.record(statement)
+
+    engine._query_audit_instrumented = True
+
+
+@contextmanager
+def audit_queries(label: str = "") -> Iterator[QueryAudit]:
+    """Record every statement issued in the current context."""
+    audit = QueryAudit(label)
+    token = current_query_audit.set(audit)
+    try:
+        yield audit
+    finally:
+        current_query_audit.reset(token)
+
+
+def publish_request_audit(audit: QueryAudit) -> None:
+    """Hand a finished request audit to active assert_query_budget blocks."""
+    if not _collectors:
+        return
+    with _collectors_lock:
+        for collector in _collectors:
+            collector.append(audit)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryAudit]:
+    """
+    Fail if the block, or any request served during it, exceeds the budget.
+
+    Args:
+        max_queries: Maximum statements per request (and for direct code in
+            the block)
+        max_repeats: Maximum executions of one statement shape; catches N+1
+            patterns that stay under max_queries with small fixtures
+
+    Raises:
+        QueryBudgetExceeded: With the offending statements
+    """
+    requests: List[QueryAudit] = []
+    with _collectors_lock:
+        _collectors.append(requests)
+    try:
+        with audit_queries("block") as audit:
+            yield audit
+    finally:
+        with _collectors_lock:
+            _collectors.remove(requests)
+
+    failures = []
+    for entry in [audit] + requests:
+        if entry.count > max_queries:
+            failures.append(f"budget {max_queries} exceeded\n{entry.summary()}")
+        if max_repeats is not None and entry.repeated(max_repeats + 1):
+            failures.append(f"statement repeated more than {max_repeats} times\n{entry.summary()}")
+    if failures:
+        raise QueryBudgetExceeded("\n".join(failures))
@@ -0,0 +1,296 @@
+"""
+Cache-friendly static file serving for uploaded media.
+
+Drop-in replacement for Starlette's StaticFiles that adds:
+- Strong ETags derived from the file content hash. For content-addressed
+  media store paths the hash is the filename, so no I/O is needed.
+- Cache-Control: immutable for content-addressed paths (the URL changes
+  whenever the content does), revalidation for legacy uuid uploads.
+- Single byte-range requests (206 / 416) for partial downloads.
+- Precompressed variants (file.br / file.gz) when the client accepts them.
+- Zero-copy sends through the ASGI "http.response.zerocopysend" extension
+  when the server supports it, falling back to chunked reads otherwise.
+"""
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from mimetypes import guess_type
+from threading import Lock
+from typing import Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Receive, Scope, Send
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+
+# Content-addressed files are named after their SHA-256 digest
+CONTENT_HASH_RE = re.compile(r"(?:^|/)([0-9a-f]{64})\.[A-Za-z0-9]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Precompressed variants, in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+ETAG_CACHE_SIZE = 4096
+
+
+class _ETagCache:
+    """Small LRU of content hashes keyed by (path, mtime, size)."""
+
+    def __init__(self, maxsize: int = ETAG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, int, int], value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_etag_cache = _ETagCache()
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash_for(path: str, stat_result: os.stat_result) -> str:
+    """
+    SHA-256 of a file's content.
+
+    Taken from the filename for content-addressed paths; otherwise computed
+    once and cached until the file's mtime or size changes.
+    """
+    match = CONTENT_HASH_RE.search(str(path).replace(os.sep, "/"))
+    if match:
+        return match.group(1)
+    key = (str(path), stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _etag_cache.get(key)
+    if cached is None:
+        cached = _hash_file(str(path))
+        _etag_cache.put(key, cached)
+    return cached
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=start-end" header.
+
+    Returns:
+        (start, end) inclusive, None when the header is absent or not a
+        single range (the full file is served), or (-1, -1) when the range
+        cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+    if not start_str:
+        # Suffix range: last N bytes
+        length = int(end_str)
+        if length == 0 or size == 0:
+            # An empty file has no last N bytes to send
+            return (-1, -1)
+        return (max(size - length, 0), size - 1)
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        return (-1, -1)
+    return (start, min(end, size - 1))
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse that can send a byte range and use zero-copy sends."""
+
+    def __init__(self, *args, offset: int = 0, length: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offset = offset
+        self.length = length
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        length = self.length if self.length is not None else self.stat_result.st_size - self.offset
+        if self.send_header_only or length <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": length,
+                    "more_body": False,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = length
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    })
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+class MediaStaticFiles(StaticFiles):
+    """StaticFiles with strong ETags, long-lived caching and range support"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        # Content hashing may read the file; keep it off the event loop
+        response = await super().get_response(path, scope)
+        if isinstance(response, _PendingMediaResponse):
+            return await anyio.to_thread.run_sync(response.resolve)
+        return response
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        return _PendingMediaResponse(self, str(full_path), stat_result, scope, status_code)
+
+    def build_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        method = scope["method"]
+
+        etag = f'"{content_hash_for(full_path, stat_result)}"'
+        immutable = CONTENT_HASH_RE.search(full_path.replace(os.sep, "/")) is not None
+        headers = {
+            "etag": etag,
+            "cache-control": IMMUTABLE_CACHE_CONTROL if immutable else DEFAULT_CACHE_CONTROL,
+            "accept-ranges": "bytes",
+            "vary": "Accept-Encoding",
+        }
+
+        byte_range = None
+        variant = None
+        if status_code == 200:
+            if_range = request_headers.get("if-range")
+            if if_range is None or if_range == etag:
+                byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+            if byte_range is None:
+                variant = self._precompressed_variant(full_path, request_headers)
+                if variant:
+                    # Each encoded representation needs its own strong ETag
+                    headers["etag"] = f'"{etag[1:-1]}-{variant[0]}"'
+
+        if status_code == 200 and self._etag_matches(request_headers.get("if-none-match"), headers["etag"]):
+            return NotModifiedResponse(Headers(headers))
+
+        if byte_range == (-1, -1):
+            return Response(
+                status_code=416,
+                headers={**headers, "content-range": f"bytes */{stat_result.st_size}"},
+            )
+
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            headers["content-length"] = str(length)
+            return MediaFileResponse(
+                full_path, status_code=206, headers=headers, stat_result=stat_result,
+                method=method, offset=start, length=length,
+            )
+
+        if variant:
+            encoding, variant_path, variant_stat = variant
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(variant_stat.st_size)
+            headers.pop("accept-ranges")
+            # Media type comes from the original filename, not .br/.gz
+            media_type = guess_type(full_path)[0] or "text/plain"
+            return MediaFileResponse(
+                variant_path, status_code=status_code, headers=headers,
+                stat_result=variant_stat, method=method, media_type=media_type,
+            )
+
+        return MediaFileResponse(
+            full_path, status_code=status_code, headers=headers,
+            stat_result=stat_result, method=method,
+        )
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates
+
+    @staticmethod
+    def _precompressed_variant(full_path: str, request_headers: Headers):
+        accept_encoding = request_headers.get("accept-encoding", "")
+        if not accept_encoding:
+            return None
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.split(",")}
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            variant_path = full_path + suffix
+            try:
+                return encoding, variant_path, os.stat(variant_path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return None
+
+
+class _PendingMediaResponse(Response):
+    """Placeholder returned by file_response, resolved in a worker thread."""
+
+    def __init__(self, files: MediaStaticFiles, full_path: str, stat_result: os.stat_result,
+                 scope: Scope, status_code: int):
+        self.files = files
+        self.full_path = full_path
+        self.stat_result = stat_result
+        self.scope = scope
+        self.pending_status_code = status_code
+
+    def resolve(self) -> Response:
+        return self.files.build_response(
+            self.full_path, self.stat_result, self.scope, self.pending_status_code
+        )
@@ -414,9 +414,10 @@ export default function ReportFormPage() {
           const errorMessages = err.response.data.detail.map(e => `${e.loc.join('.')}: ${e.msg}`).join(', ');
           setError(`Error de validación: ${errorMessages}`);
         } else {
-          setError(typeof err.response.data.detail === 'string' 
-            ? err.response.data.detail 
-            : 'Error al crear el reporte');
+          // Objetos de error (ej. límite de solicitudes de IA) traen su propio mensaje
+          setError(typeof err.response.data.detail === 'string'
+            ? err.response.data.detail
+            : err.response.data.detail.message || 'Error al crear el reporte');
         }
       } else if (err.message) {
         setError(err.message);